@@ -0,0 +1,203 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+# Coded for Circuit Python 8.x
+"""Rolling link quality statistics for the range finder
+
+Keeps the last WINDOW packets in fixed size arrays, allocated once, so
+recording a packet allocates nothing:
+
+- RSSI and SNR percentiles, from histograms updated as packets enter and
+  leave the window
+- packet loss, from gaps in frame sequence numbers, counted separately
+  for each sender and schema since each has its own sequence
+- round trip time, from the peer echoing our frame sequence numbers
+- packets per minute
+
+Runs the same on a desktop, see link_stats_check.py.
+"""
+
+from array import array
+
+WINDOW = 64
+# Sent frames remembered for round trip times
+SENT_SLOTS = 16
+# Sender and schema pairs whose last sequence number is remembered
+STREAMS = 16
+
+
+class RollingStat:
+    """Percentiles of the last ``size`` integer samples in [low, high].
+
+    Samples outside the range are clamped to it. The histogram has a bin
+    per ``step`` values, so percentiles are rounded down to a multiple of
+    step from low.
+    """
+
+    def __init__(self, size, low, high, step=1):
+        self.low = low
+        self.high = high
+        self.step = step
+        self._samples = array("h", [0] * size)
+        self._histogram = array("H", [0] * ((high - low) // step + 1))
+        self._next = 0
+        self.count = 0
+        self.total = 0
+
+    def add(self, value):
+        """Add a sample, dropping the oldest once the window is full."""
+        value = min(max(int(value), self.low), self.high)
+        samples = self._samples
+        if self.count == len(samples):
+            old = samples[self._next]
+            self._histogram[(old - self.low) // self.step] -= 1
+            self.total -= old
+        else:
+            self.count += 1
+        samples[self._next] = value
+        self._next = (self._next + 1) % len(samples)
+        self._histogram[(value - self.low) // self.step] += 1
+        self.total += value
+
+    def percentile(self, percent):
+        """The smallest sample with at least percent % of samples at or below it.
+
+        :return: The sample, or None with no samples.
+        """
+        if not self.count:
+            return None
+        # Samples ranked at or below this one, at least 1
+        rank = max(1, (percent * self.count + 99) // 100)
+        seen = 0
+        for offset, hits in enumerate(self._histogram):
+            seen += hits
+            if seen >= rank:
+                return self.low + offset * self.step
+        return self.high
+
+    @property
+    def mean(self):
+        """Mean of the samples, None with no samples."""
+        return self.total / self.count if self.count else None
+
+
+class LinkStats:
+    """Link quality over the last ``window`` packets received.
+
+    Call `sent` after each frame goes out and `received` for each packet
+    that arrives.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, window=WINDOW):
+        self.rssi = RollingStat(window, -140, 0)
+        """RSSI in dB"""
+        self.snr = RollingStat(window, -128, 127)
+        """SNR in quarter dB, as the radio measures it"""
+        self.rtt = RollingStat(window, 0, 30000, 50)
+        """Round trip time in ms, capped at 30 s, percentiles in 50 ms steps"""
+        self._arrivals = array("L", [0] * window)
+        self._lost = array("H", [0] * window)
+        self._next = 0
+        self._count = 0
+        self._lost_total = 0
+        # Last sequence number by stream, see received()
+        self._last_sequence = {}
+        self._sent_sequence = array("l", [-1] * SENT_SLOTS)
+        self._sent_ms = array("L", [0] * SENT_SLOTS)
+        self.received_total = 0
+        """Packets received since start"""
+        self.lost_total = 0
+        """Packets missed since start, judged by sequence gaps"""
+
+    def sent(self, sequence, time_ms):
+        """Remember when a frame went out, for round trip times."""
+        slot = sequence % SENT_SLOTS
+        self._sent_sequence[slot] = sequence
+        self._sent_ms[slot] = time_ms
+
+    def received(self, time_ms, rssi, snr, sequence=None, echo=None, stream=0):
+        """Record a received packet.
+
+        :param int time_ms: When it arrived, from lora_frames.ticks_ms().
+        :param int rssi: rfm9x.last_rssi
+        :param float snr: rfm9x.last_snr
+        :param int sequence: The peer's frame sequence number, None for
+          packets that aren't frames.
+        :param int echo: Our sequence number the peer echoed, if any.
+        :param int stream: Which sequence the frame belongs to. Every
+          FrameWriter numbers its frames on its own, so pass a number that
+          tells senders and schemas apart, such as
+          ``sender << 8 | frame.schema.id``.
+        """
+        # pylint: disable=too-many-arguments
+        self.received_total += 1
+        self.rssi.add(rssi)
+        self.snr.add(round(snr * 4))
+
+        lost = 0
+        if sequence is not None:
+            last_sequence = self._last_sequence
+            last = last_sequence.get(stream)
+            if last is not None:
+                gap = (sequence - last - 1) & 0xFFFF
+                # A huge gap is a restarted peer or a late duplicate
+                if gap < 0x8000:
+                    lost = gap
+            elif len(last_sequence) >= STREAMS:
+                # More streams than expected, start counting afresh
+                last_sequence.clear()
+            last_sequence[stream] = sequence
+        self.lost_total += lost
+
+        index = self._next
+        if self._count == len(self._arrivals):
+            self._lost_total -= self._lost[index]
+        else:
+            self._count += 1
+        self._arrivals[index] = time_ms
+        lost = min(lost, 0xFFFF)
+        self._lost[index] = lost
+        self._lost_total += lost
+        self._next = (index + 1) % len(self._arrivals)
+
+        if echo is not None:
+            slot = echo % SENT_SLOTS
+            if self._sent_sequence[slot] == echo:
+                self.rtt.add((time_ms - self._sent_ms[slot]) & 0xFFFFFFFF)
+                self._sent_sequence[slot] = -1
+
+    @property
+    def loss(self):
+        """Fraction of packets missed in the window, 0.0 to 1.0."""
+        expected = self._count + self._lost_total
+        return self._lost_total / expected if expected else 0.0
+
+    @property
+    def per_minute(self):
+        """Packets received per minute over the window, None below 2 packets."""
+        if self._count < 2:
+            return None
+        newest = self._arrivals[(self._next - 1) % len(self._arrivals)]
+        # Until the window fills, the oldest arrival is still at index 0
+        oldest = self._arrivals[self._next if self._count == len(self._arrivals) else 0]
+        span = (newest - oldest) & 0xFFFFFFFF
+        if not span:
+            return None
+        return (self._count - 1) * 60000 / span
+
+    def summary(self):
+        """Two short lines for the TFT."""
+        rssi = self.rssi
+        if not rssi.count:
+            return "No packets yet\n"
+        per_minute = self.per_minute
+        rtt = self.rtt.percentile(50)
+        return "RSSI p10 {} p50 {}  SNR {:.1f}\nLoss {:.0%}  {}/min  RTT {}".format(
+            rssi.percentile(10),
+            rssi.percentile(50),
+            self.snr.percentile(50) / 4,
+            self.loss,
+            "-" if per_minute is None else round(per_minute),
+            "-" if rtt is None else "{}ms".format(rtt),
+        )
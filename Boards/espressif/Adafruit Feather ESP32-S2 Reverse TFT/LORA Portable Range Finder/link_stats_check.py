@@ -0,0 +1,183 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""link_stats on a simulated ping and echo link
+
+Desktop script, run from this folder:
+    python link_stats_check.py
+The range finder sends a frame every 2 seconds and the receiver echoes
+each one it hears after a random delay. Either direction drops packets at
+random, with bursts of loss as the walk goes out of range. Sequence numbers
+start near the 16 bit wrap and the clock near the 32 bit wrap.
+
+Checks loss, RSSI/SNR percentiles, round trip time and packets per minute
+against the same figures worked out from plain lists of the last WINDOW
+packets, that loss is counted right when frames of several schemas and
+senders arrive interleaved, then that memory doesn't build up as packets
+are recorded.
+"""
+
+import random
+import tracemalloc
+
+from link_stats import WINDOW, LinkStats
+
+PACKETS = 5000
+PERIOD_MS = 2000
+START_MS = 0xFFFFFFFF - 30_000
+START_SEQUENCE = 0xFFF0
+
+
+def list_percentile(values, percent):
+    """The smallest value with at least percent % of values at or below it."""
+    ordered = sorted(values)
+    rank = max(1, (percent * len(ordered) + 99) // 100)
+    return ordered[rank - 1]
+
+
+def simulate(stats, rng, packets, history=None):
+    """Send frames and feed the echoes heard to stats.
+
+    Echoes heard are appended to history as (arrival ms, rssi, quarter dB
+    snr, frames missed before it, round trip ms).
+    """
+    now = START_MS
+    sequence = START_SEQUENCE
+    peer_sequence = 0
+    missed = 0
+    rssi = -60
+    for index in range(packets):
+        stats.sent(sequence, now & 0xFFFFFFFF)
+        # A burst of loss every 1000 packets
+        drop = 0.6 if index % 1000 > 900 else 0.1
+        rssi = max(-120, min(-40, rssi + rng.choice((-2, -1, 0, 1, 2))))
+        if rng.random() < drop:
+            # Lost on the way out, the peer has nothing to echo
+            pass
+        elif rng.random() < drop:
+            # The echo is lost on the way back
+            peer_sequence = (peer_sequence + 1) & 0xFFFF
+            missed += 1
+        else:
+            delay = rng.randrange(40, 1500)
+            arrival = (now + delay) & 0xFFFFFFFF
+            snr = rng.choice(range(-40, 48)) / 4
+            stats.received(arrival, rssi, snr, peer_sequence, sequence)
+            if history is not None:
+                history.append((arrival, rssi, round(snr * 4), missed, delay))
+            peer_sequence = (peer_sequence + 1) & 0xFFFF
+            missed = 0
+        sequence = (sequence + 1) & 0xFFFF
+        now += PERIOD_MS
+
+
+def check_against_lists():
+    """The rolling figures match ones worked out from lists."""
+    stats = LinkStats()
+    history = []
+    simulate(stats, random.Random(3), PACKETS, history)
+    window = history[-WINDOW:]
+    # The first packet has no sequence before it to count losses from
+    if len(history) <= WINDOW:
+        window[0] = window[0][:3] + (0,) + window[0][4:]
+    arrivals = [entry[0] for entry in window]
+    rssi = [entry[1] for entry in window]
+    snr = [entry[2] for entry in window]
+    lost = sum(entry[3] for entry in window)
+    rtt = [entry[4] // 50 * 50 for entry in window]
+
+    for percent in (1, 10, 50, 90, 100):
+        assert stats.rssi.percentile(percent) == list_percentile(rssi, percent)
+        assert stats.snr.percentile(percent) == list_percentile(snr, percent)
+        assert stats.rtt.percentile(percent) == list_percentile(rtt, percent)
+    assert stats.rssi.mean == sum(rssi) / len(rssi)
+    assert abs(stats.loss - lost / (len(window) + lost)) < 1e-9
+    span = (arrivals[-1] - arrivals[0]) & 0xFFFFFFFF
+    assert abs(stats.per_minute - (len(window) - 1) * 60000 / span) < 1e-9
+    total_lost = sum(entry[3] for entry in history)
+    assert stats.lost_total == total_lost
+    assert stats.received_total == len(history)
+    print(f"{len(history)} of {PACKETS} echoes received, {total_lost} frames missed")
+    print(stats.summary())
+
+
+def check_partial_window():
+    """Figures are right before the window fills."""
+    stats = LinkStats()
+    assert stats.summary() == "No packets yet\n"
+    assert stats.per_minute is None
+    stats.sent(7, 1000)
+    stats.received(1500, -80, 2.5, 10, 7)
+    stats.received(3500, -70, 3.0, 13)
+    assert stats.rssi.percentile(50) == -80
+    assert stats.rtt.percentile(50) == 500
+    assert stats.loss == 2 / 4
+    assert stats.per_minute == 30
+    # An echo of a frame we no longer remember is ignored
+    stats.received(5500, -70, 3.0, 14, 7)
+    assert stats.rtt.count == 1
+
+
+def check_interleaved_streams():
+    """Each sender and schema has its own sequence, gaps are counted per stream."""
+    stats = LinkStats()
+    rng = random.Random(11)
+    # (sender, schema id): the next sequence number each one sends
+    streams = {(1, 2): 0xFFFE, (1, 3): 40, (2, 4): 7000, (3, 2): 0}
+    # Whether each frame sent in a stream was heard
+    heard = {key: [] for key in streams}
+    now = START_MS
+    for _ in range(PACKETS):
+        key = rng.choice(list(streams))
+        sequence = streams[key]
+        streams[key] = (sequence + 1) & 0xFFFF
+        now += PERIOD_MS
+        heard[key].append(rng.random() >= 0.1)
+        if heard[key][-1]:
+            stats.received(
+                now & 0xFFFFFFFF, -70, 2.0, sequence, stream=key[0] << 8 | key[1]
+            )
+    # Only drops between the first and last frame heard in a stream show
+    expected = 0
+    for frames in heard.values():
+        first = frames.index(True)
+        last = len(frames) - frames[::-1].index(True)
+        expected += frames[first:last].count(False)
+    assert stats.lost_total == expected, (stats.lost_total, expected)
+    print(f"{len(streams)} interleaved streams, {expected} frames missed")
+
+
+def retained(packets):
+    """Bytes link_stats holds on to while recording more packets."""
+    stats = LinkStats()
+    simulate(stats, random.Random(5), 200)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for index in range(packets):
+        stats.sent(index & 0xFFFF, index * PERIOD_MS)
+        stats.received(index * PERIOD_MS + 300, -60 - index % 50, 5.25, index, index)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return sum(
+        stat.size_diff
+        for stat in after.compare_to(before, "filename")
+        if stat.traceback[0].filename.endswith("link_stats.py")
+    )
+
+
+def check_no_allocation():
+    """Recording packets allocates nothing that builds up.
+
+    The few bytes held are the integers in the latest totals and timestamps,
+    the same however many packets go by.
+    """
+    few = retained(PACKETS // 10)
+    many = retained(PACKETS)
+    assert many == few and many < 512, (few, many)
+    print(f"{PACKETS} packets recorded, {many} bytes retained by link_stats")
+
+
+check_partial_window()
+check_against_lists()
+check_interleaved_streams()
+check_no_allocation()
+print("OK")
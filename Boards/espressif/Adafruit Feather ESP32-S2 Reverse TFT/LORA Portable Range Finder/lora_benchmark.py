@@ -0,0 +1,143 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""lora_frames against the text packets on a simulated lossy link
+
+Desktop script, run from this folder:
+    python lora_benchmark.py
+Replays an hour of range finder telemetry, a reading every 2 seconds of
+RSSI, SNR and battery voltage. It is sent the old way, one
+str(now) + " " + message + "\\r\\n" text packet per reading, and as frames of
+1, 8 and as many readings as fit, with and without delta encoding.
+
+Airtime uses the Semtech LoRa time on air formula for the settings in
+transmitter.py: SF7, 125 kHz, coding rate 4/5, preamble 8, explicit header,
+CRC on, plus the 4 byte RadioHead header. The link drops 5% of packets at
+random and, at a bit error rate of 1e-4, corrupts longer packets more often.
+
+Reports payload bytes per reading, airtime per reading, delivered readings
+per second of airtime and host codec time per reading.
+"""
+
+import math
+import random
+import time
+
+from lora_frames import RANGE_FINDER as TELEMETRY, FrameWriter, decode
+
+READINGS = 1800  # an hour at one every 2 seconds
+PERIOD_MS = 2000
+SPREADING_FACTOR = 7
+BANDWIDTH = 125000
+CODING_RATE = 5  # 4/5
+PREAMBLE = 8
+RADIOHEAD_HEADER = 4
+DROP = 0.05
+BIT_ERROR_RATE = 1e-4
+
+
+def airtime_s(payload):
+    """LoRa time on air in seconds for a payload length in bytes."""
+    symbol = (1 << SPREADING_FACTOR) / BANDWIDTH
+    length = payload + RADIOHEAD_HEADER
+    bits = 8 * length - 4 * SPREADING_FACTOR + 28 + 16
+    symbols = 8 + max(math.ceil(bits / (4 * SPREADING_FACTOR)) * (CODING_RATE), 0)
+    return (PREAMBLE + 4.25 + symbols) * symbol
+
+
+def telemetry():
+    """(time ms, (rssi, snr, vbat)) readings as a walk gets further away."""
+    rng = random.Random(7)
+    rssi, snr, vbat = -45, 9.5, 4.15
+    readings = []
+    for index in range(READINGS):
+        rssi = max(-127, min(-30, rssi + rng.choice((-2, -1, -1, 0, 1))))
+        snr = max(-20, min(12, snr + rng.choice((-0.5, -0.25, 0, 0.25, 0.25))))
+        vbat -= rng.random() * 0.0002
+        readings.append((index * PERIOD_MS, (rssi, snr, round(vbat, 3))))
+    return readings
+
+
+def text_packets(readings):
+    """The old format: one text packet per reading."""
+    packets = []
+    for time_ms, (rssi, snr, vbat) in readings:
+        now = time_ms / 1000
+        message = f"RSSI {rssi} SNR {snr} VBAT {vbat:.2f} 🙂"
+        packets.append((bytes(str(now) + " " + message + "\r\n", "utf-8"), 1))
+    return packets
+
+
+def frame_packets(readings, per_frame, delta):
+    """Frames of up to per_frame readings, sent when full."""
+    writer = FrameWriter(TELEMETRY, delta=delta)
+    packets = []
+    for time_ms, values in readings:
+        full = writer.add(values, time_ms)
+        if full or len(writer) >= per_frame:
+            count = len(writer)
+            packets.append((bytes(writer.pack()), count))
+    if len(writer):
+        packets.append((bytes(writer.pack()), len(writer)))
+    return packets
+
+
+def check(readings, packets):
+    """Frames decode back to the readings they were packed from."""
+    decoded = []
+    for packet, _ in packets:
+        frame = decode(packet, {TELEMETRY.id: TELEMETRY})
+        decoded.extend(frame.readings)
+    assert len(decoded) == len(readings)
+    for (time_ms, values), (got_ms, got) in zip(readings, decoded):
+        assert got_ms == time_ms
+        for value, scale, back in zip(values, TELEMETRY.scales, got):
+            assert abs(value - back) <= 0.5 / scale
+
+
+def send(packets):
+    """Returns (airtime s, delivered readings) over the lossy link."""
+    rng = random.Random(11)
+    airtime = 0
+    delivered = 0
+    for packet, count in packets:
+        airtime += airtime_s(len(packet))
+        survives = (1 - DROP) * (1 - BIT_ERROR_RATE) ** (8 * len(packet))
+        if rng.random() < survives:
+            delivered += count
+    return airtime, delivered
+
+
+def codec_us(make_packets, readings):
+    """Host time to encode and decode, per reading."""
+    start = time.perf_counter_ns()
+    packets = make_packets(readings)
+    for packet, _ in packets:
+        if not decode(packet, {TELEMETRY.id: TELEMETRY}):
+            str(packet, "utf-8").split()
+    return (time.perf_counter_ns() - start) / len(readings) / 1000
+
+
+READINGS_LOG = telemetry()
+FORMATS = (
+    ("text, 1 per packet", text_packets),
+    ("frame, 1 per packet", lambda r: frame_packets(r, 1, False)),
+    ("frame, 8, no delta", lambda r: frame_packets(r, 8, False)),
+    ("frame, 8, delta", lambda r: frame_packets(r, 8, True)),
+    ("frame, full, no delta", lambda r: frame_packets(r, 1000, False)),
+    ("frame, full, delta", lambda r: frame_packets(r, 1000, True)),
+)
+
+print(
+    f"{'Format':<24}{'B/read':>8}{'ms air/read':>13}{'Delivered':>11}"
+    f"{'read/s air':>12}{'us codec':>10}"
+)
+for name, make in FORMATS:
+    sent = make(READINGS_LOG)
+    if name.startswith("frame"):
+        check(READINGS_LOG, sent)
+    total_bytes = sum(len(packet) for packet, _ in sent)
+    air, got = send(sent)
+    print(
+        f"{name:<24}{total_bytes / READINGS:>8.1f}{air / READINGS * 1000:>13.2f}"
+        f"{got / READINGS:>10.1%}{got / air:>12.1f}{codec_us(make, READINGS_LOG):>10.1f}"
+    )
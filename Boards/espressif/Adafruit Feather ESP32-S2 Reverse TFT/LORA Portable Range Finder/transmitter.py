@@ -11,6 +11,8 @@ import displayio
 import terminalio
 import adafruit_imageload
 import adafruit_rfm9x
+import link_stats
+import lora_frames
 from adafruit_display_text import label
 from adafruit_max1704x import MAX17048
 
@@ -61,6 +63,12 @@ rssi_label.anchored_position = (DISPLAY_WIDTH/2, 75)
 rssi_label.scale = (3)
 rssi_label.color = TEXT_WHITE
 
+stats_label = label.Label(terminalio.FONT)
+stats_label.anchor_point = (0, 1.0)
+stats_label.anchored_position = (5, DISPLAY_HEIGHT - 2)
+stats_label.scale = 1
+stats_label.color = TEXT_GRAY
+
 vbat_label = label.Label(terminalio.FONT)
 vbat_label.anchor_point = (1.0, 1.0)
 vbat_label.anchored_position = (DISPLAY_WIDTH - 15, 20)
@@ -122,6 +130,7 @@ text_group.append(yellowbmp_label)
 text_group.append(orangebmp_label)
 text_group.append(redbmp_label)
 text_group.append(rssi_label)
+text_group.append(stats_label)
 display.show(main_group)
 
 # Initialze RFM radio
@@ -156,6 +165,14 @@ rfm9x.destination = 255
 
 with_header = True  # Set if you want header bytes printed for debug
 
+# Packets are sent as binary frames with a sequence number (see lora_frames.py)
+telemetry = lora_frames.FrameWriter(lora_frames.RANGE_FINDER)
+# Readings taken in between are batched into one frame
+TRANSMIT_INTERVAL_MS = 10_000
+# Loss, RSSI/SNR percentiles and round trip time over the last 64 packets
+stats = link_stats.LinkStats()
+vbat = 0.0
+
 def _format_datetime(datetime):
     return "{:02}/{:02}/{} {:02}:{:02}:{:02}".format(
         datetime.tm_mon,
@@ -176,7 +193,8 @@ while True:
 
     # USB Power Sensing
     try:
-        vbat_label.text = f"{battery_monitor.cell_voltage:.2f}"
+        vbat = battery_monitor.cell_voltage
+        vbat_label.text = f"{vbat:.2f}"
     except (ValueError, RuntimeError, OSError) as e:
         print("MAX17048 Error: \n", e)
     # Set USB plug icon and voltage label to white
@@ -244,19 +262,39 @@ while True:
         # Now we're inside a received packet!
         LED.value = True
         try:
+            # Frames are decoded, text from older code is shown as before
+            frame = lora_frames.decode(
+                packet[4:] if with_header else packet, lora_frames.SCHEMAS
+            )
+            if frame is not None:
+                packet_text = str(frame)
             # Header bytes are raw bytes. Good for debugging.
-            if with_header:
+            elif with_header:
                 packet_text = str(packet)
             # No header strips header bytes and decodes to ascii.
-            if not with_header:
+            else:
                 packet_text = str(packet, "ascii")
-        except (UnicodeError) as e:
-            print("Unicode Error", e)
+        except (UnicodeError, ValueError) as e:
+            print("Packet Error", e)
             continue
 
         # received sig strenth and sig/noise
         rssi = rfm9x.last_rssi
         last_snr = rfm9x.last_snr
+        echo = None
+        if frame is not None and frame.schema is lora_frames.RANGE_ECHO:
+            echo = frame.readings[-1][1][0]
+        # Each sender numbers each schema's frames on its own. The RadioHead
+        # header's second byte is the sender's node address.
+        sender = packet[1] if with_header else 0
+        stats.received(
+            lora_frames.ticks_ms(),
+            rssi,
+            last_snr,
+            None if frame is None else frame.sequence,
+            echo,
+            stream=0 if frame is None else sender << 8 | frame.schema.id,
+        )
         # Debug printing of packet data:
         debug_raw_received = True
         if debug_raw_received:
@@ -285,8 +323,15 @@ while True:
     # Transmit Test
     rssi_label.text = f"RSSI: {rfm9x.last_rssi}"
     print("Received RSSI: {0}".format(rfm9x.last_rssi))
-    message = str("Test 🙂")
-    rfm9x.send(bytes(str(now) + " " + message + "\r\n", "utf-8"), keep_listening=True)
-    print("(Sent)" + " " + message)
+    # RSSI, SNR and battery voltage, 15 bytes for the first reading in a
+    # frame and 5 for each one after it
+    full = telemetry.add((rfm9x.last_rssi, rfm9x.last_snr, vbat))
+    if full or telemetry.due(TRANSMIT_INTERVAL_MS):
+        sequence = telemetry.sequence
+        count = len(telemetry)
+        rfm9x.send(telemetry.pack(), keep_listening=True)
+        stats.sent(sequence, lora_frames.ticks_ms())
+        print("(Sent) Frame #{0}, {1} readings".format(sequence, count))
+    stats_label.text = stats.summary()
     print("Monotonic: " + str(now), "\n")
     time.sleep(2) # The smaller the delay the more likely for packet loss. There is a speed limit.
@@ -11,17 +11,21 @@ import digitalio
 import busio
 import ssl
 import wifi
-import json
 import socketpool
+import asyncio
 import adafruit_requests
-import re
 from analogio import AnalogOut
 from adafruit_ht16k33 import segments
+from fetch_scheduler import Endpoint, FetchScheduler
 
 Twitch_UserID = "0000000"
 
 # Initialize WiFi Pool (There can be only one pool)
 pool = socketpool.SocketPool(wifi.radio)
+# Keep-alive sessions, at most two sockets open on the radio
+requests = adafruit_requests.Session(
+    pool, ssl.create_default_context(), max_sockets=2, idle_timeout=60
+)
 
 # Initialize 7-Segment Backpack
 i2c = busio.I2C(board.SCL, board.SDA)
@@ -130,274 +134,152 @@ ADA_DISCORD_SOURCE = (
     + "/preview"
 )
 
-# Connect to Wi-Fi
-print("\n===============================")
-print("Connecting to WiFi...")
-requests = adafruit_requests.Session(pool, ssl.create_default_context())
-while not wifi.radio.ipv4_address:
-    try:
-        wifi.radio.connect(secrets['ssid'], secrets['password'])
-    except ConnectionError as e:
-        print("Connection Error:", e)
-        print("Retrying in 10 seconds")
-    time.sleep(10)
-    gc.collect()
-print("Connected!\n")
-
-while True:
-    try:
+
+def parse_youtube(json_data):
+    """Views and subscribers"""
+    statistics = json_data['items'][0]['statistics']
+    return statistics['viewCount'], statistics['subscriberCount']
+
+
+def parse_twitter(json_data):
+    """Tweets and followers"""
+    public_metrics = json_data['data']['public_metrics']
+    return public_metrics['tweet_count'], public_metrics['followers_count']
+
+
+def parse_discord(json_data):
+    """Members and members online"""
+    return json_data['approximate_member_count'], json_data['approximate_presence_count']
+
+
+def twitch_header():
+    """Twitch GET header, None until there is a bearer token"""
+    if twitch_token.value is None:
+        return None
+    return {
+        'Authorization': 'Bearer ' + twitch_token.value,
+        'Client-Id': secrets["Twitch_ClientID"]
+    }
+
+
+def show_update(endpoint):
+    """Log each successful refresh"""
+    print(endpoint.name, "updated:", endpoint.value)
+    print("Monotonic: ", time.monotonic())
+
+
+# Each API refreshes on its own schedule. One that fails retries with a
+# backoff and keeps showing its last good value meanwhile.
+youtube = Endpoint("YouTube", YT_SOURCE, parse_youtube, period=sleep_time)
+twitter = Endpoint(
+    "Twitter", TW_SOURCE, parse_twitter, headers=twitter_header, period=sleep_time
+)
+# First we use Client ID & Client Secret to create a token with POST
+twitch_token = Endpoint(
+    "Twitch token",
+    TWITCH_0AUTH_TOKEN,
+    lambda json_data: json_data['access_token'],
+    method="POST",
+    headers=twitch_0auth_header,
+    data=("&client_id="
+          + secrets["Twitch_ClientID"]
+          + "&client_secret="
+          + secrets["Twitch_Client_Secret"]
+          + "&grant_type=client_credentials"
+          ),
+    period=86400,
+)
+# Helix is the name of the current Twitch API
+# Recommend for finding your User ID
+# https://www.streamweasels.com/tools/convert-twitch-username-to-user-id/
+twitch = Endpoint(
+    "Twitch",
+    "https://api.twitch.tv/helix/users/follows?to_id=" + Twitch_UserID + "&first=1",
+    lambda json_data: json_data['total'],
+    headers=twitch_header,
+    # A 401 means the bearer token expired, fetch a new one before retrying
+    renew=twitch_token,
+    period=sleep_time,
+)
+github = Endpoint(
+    "Github",
+    GH_SOURCE,
+    lambda json_data: json_data['followers'],
+    headers=github_header,
+    period=sleep_time,
+)
+discord = Endpoint(
+    "Discord", ADA_DISCORD_SOURCE, parse_discord, headers=discord_header, period=sleep_time
+)
+scheduler = FetchScheduler(
+    requests,
+    (youtube, twitter, twitch_token, twitch, github, discord),
+    on_update=show_update,
+)
+
+# (display, label, endpoint, index into a tuple value or None)
+SCREENS = (
+    (red, "eyes", youtube, 0),
+    (red, "subs", youtube, 1),
+    (blue, "tweets", twitter, 0),
+    (blue, "subs", twitter, 1),
+    (blue, "twitch", twitch, None),
+    (green, "subs", github, None),
+    (white, "subs", discord, 0),
+    (white, "online", discord, 1),
+)
+
+
+async def show_stats():
+    """Cycle every display through its label and latest value"""
+    while True:
+        for display, text, endpoint, index in SCREENS:
+            value = endpoint.value
+            if value is None:
+                continue
+            if index is not None:
+                value = value[index]
+            display.brightness = 0.8
+            # One write per changed backpack instead of one per call
+            with display.batch():
+                display.fill(0)
+                display.print(text)
+            await asyncio.sleep(2)
+            with display.batch():
+                display.fill(0)
+                display.print(value)
+            await asyncio.sleep(2)
         gc.collect()
-        print("Attempting to GET YouTube Stats!")  # ------------------------------------------------
-        # Uncomment line below to print API URL with all data filled in
-        # print("Full API GET URL: ", YT_SOURCE)
-        print("===============================")
-        try:
-            response = requests.get(YT_SOURCE).json()
-        except ConnectionError as e:
-            print("Connection Error:", e)
-            print("Retrying in 10 seconds")
+        await asyncio.sleep(1)
 
-        # Print Full JSON to Serial
-        full_yt_json_response = False # Change to true to see full response
-        if full_yt_json_response:
-            dump_object = json.dumps(response)
-            print("JSON Dump: ", dump_object)
-
-        # Print Debugging to Serial
-        yt_debug = True # Set to True to print Serial data
-        if yt_debug:
-            print("Matching Results: ", response['pageInfo']['totalResults'])
-
-            YT_response_channel_kind = response['kind']
-            print("Response Kind: ", YT_response_channel_kind)
-
-            YT_response_channel_kind = response['items'][0]['kind']
-            print("Request Kind: ", YT_response_channel_kind)
-
-            YT_response_channel_id = response['items'][0]['id']
-            print("Channel ID: ", YT_response_channel_id)
-
-            YT_response_channel_videoCount = response['items'][0]['statistics']['videoCount']
-            print("Videos: ", YT_response_channel_videoCount)
-
-            YT_response_channel_viewCount = response['items'][0]['statistics']['viewCount']
-            print("Views: ", YT_response_channel_viewCount)
-
-            YT_response_channel_subscriberCount = response['items'][0]['statistics']['subscriberCount']
-            print("Subscribers: ", YT_response_channel_subscriberCount)
-            print("Monotonic: ", time.monotonic())
-
-        # YouTube 7-Segment Display
-        red.brightness = 0.8
-        red.fill(0)
-        red.print("eyes")
-        time.sleep(2)
-        red.fill(0)
-        red.print(YT_response_channel_viewCount)
-        time.sleep(2)
-        red.fill(0)
-        red.print("subs")
-        time.sleep(2)
-        red.fill(0)
-        red.print(YT_response_channel_subscriberCount)
-        # Marquee scrolling, 2nd parameter speed in seconds
-        # red.marquee(YT_response_channel_subscriberCount, 0.9)
-        
-        print("\nAttempting to GET TWITTER Stats!")  # ------------------------------------------------
-        print("===============================")
-        twitter_response = requests.get(url=TW_SOURCE, headers=twitter_header)
+
+def connect_wifi():
+    """Blocks until Wi-Fi is connected"""
+    print("\n===============================")
+    print("Connecting to WiFi...")
+    while not wifi.radio.ipv4_address:
         try:
-            twitter_json = twitter_response.json()
+            wifi.radio.connect(secrets['ssid'], secrets['password'])
         except ConnectionError as e:
             print("Connection Error:", e)
             print("Retrying in 10 seconds")
-        twitter_json = twitter_json['data']
-        # Uncomment line below to print API URL you're sending to Twitter
-        # print("Full API GET URL: ", TW_SOURCE)
-        # print(twitter_json)
-        twitter_userid = twitter_json['id']
-        print("User ID: ", twitter_userid)
-        twitter_username = twitter_json['name']
-        print("Name: ", twitter_username)
-        twitter_join_date = twitter_json['created_at']
-        print("Member Since: ", twitter_join_date)
-        twitter_tweet_count = twitter_json['public_metrics']['tweet_count']
-        print("Tweets: ", twitter_tweet_count)
-        twitter_follower_count = twitter_json['public_metrics']['followers_count']
-        print("Followers: ", twitter_follower_count)
-        print("Monotonic: ", time.monotonic())
-
-        # Twitter 7-Segment Display
-        blue.brightness = 0.8
-        blue.fill(0)
-        blue.print("tweets")
-        time.sleep(2)
-        blue.fill(0)
-        blue.print(twitter_tweet_count)
-        time.sleep(2)
-        blue.fill(0)
-        blue.print("subs")
-        time.sleep(2)
-        blue.fill(0)
-        blue.print(twitter_follower_count)
-        
+        time.sleep(10)
         gc.collect()
-        print("\nAttempting to GENERATE Twitch Bearer Token!")  # ------------------------------------------------
-        print("===============================")
-        twitch_0auth_data = ("&client_id="
-        + secrets["Twitch_ClientID"]
-        + "&client_secret="
-        + secrets["Twitch_Client_Secret"]
-        + "&grant_type=client_credentials"
-        )
-    
-        twitch_0auth_response = requests.post(url=TWITCH_0AUTH_TOKEN, data=twitch_0auth_data, headers=twitch_0auth_header)
-        try:
-            twitch_0auth_json = twitch_0auth_response.json()
-        except ConnectionError as e:
-            print("Connection Error:", e)
-            print("Retrying in 10 seconds")
-        # Uncomment line below to print API URL you're sending to Twitter
-        # print("Full API GET URL: ", TWITCH_0AUTH_TOKEN)
-        # print("JSON Dump: ", twitch_0auth_json)
-        twitch_access_token = twitch_0auth_json['access_token']
-        # print("Access Token: ", twitch_access_token)
-        twitch_token_expiration = twitch_0auth_json['expires_in']
-        print("Token Expires in: ", time_calc(twitch_token_expiration))
-        
-        twitch_token_type = twitch_0auth_json['token_type']
-        print("Token Type: ", twitch_token_type)
-        print("Monotonic: ", time.monotonic())
-
-        # Twitch 7-Segment Display
-        blue.brightness = 0.8
-        blue.fill(0)
-        blue.print("twitch")
-        time.sleep(2)
-        blue.fill(0)
-        blue.print("token")
-        time.sleep(2)
-        blue.fill(0)
-        blue.print(twitch_token_type)
-        
-        # Helix is the name of the current Twitch API
-        # Twitch API versioning uses names not numbers
-        # Recommend for finding your User ID
-        # https://www.streamweasels.com/tools/convert-twitch-username-to-user-id/
-        twitch_header = {
-        'Authorization': 'Bearer '+twitch_access_token+'',
-        'Client-Id': ''+ secrets["Twitch_ClientID"] +''
-        }
-        TWITCH_FOLLOWERS_SOURCE = (
-            "https://api.twitch.tv/helix/users"
-            + "/follows?"
-            + "to_id="
-            + Twitch_UserID
-            + "&first=1"
-        )
-        print("\nAttempting to GET TWITCH Stats!")  # ------------------------------------------------
-        print("===============================")
-        twitch_followers_response = requests.get(url=TWITCH_FOLLOWERS_SOURCE, headers=twitch_header)
-        try:
-            twitch_followers_json = twitch_followers_response.json()
-        except ConnectionError as e:
-            print("Connection Error:", e)
-            print("Retrying in 10 seconds")
-        # Uncomment line below to print API URL you're sending to Twitter
-        # print("Full API GET URL: ", TWITCH_FOLLOWERS_SOURCE)
-        # print("Header: ", twitch_header)
-        # print("JSON Full Response: ", twitch_followers_json)
-        twitch_username = twitch_followers_json['data'][0]['to_name']
-        print("Username: ", twitch_username)
-        twitch_followers = twitch_followers_json['total']
-        print("Followers: ", twitch_followers)
-            
-        # Twitch 7-Segment Display
-        blue.brightness = 0.8
-        blue.fill(0)
-        blue.print("subs")
-        time.sleep(2)
-        blue.fill(0)
-        blue.print(twitch_followers)
-        print("Monotonic: ", time.monotonic())
-        
-        print("\nAttempting to GET GITHUB Stats!")  # ------------------------------------------------
-        # Uncomment line below to print API URL with all data filled in
-        # print("Full API GET URL: ", GH_SOURCE)
-        print("===============================")
-        github_response = requests.get(url=GH_SOURCE, headers=github_header).json()
-
-        # Print Full JSON to Serial
-        full_github_json_response = False # Change to true to see full response
-        if full_github_json_response:
-            dump_object = json.dumps(github_response)
-            print("JSON Dump: ", dump_object)
-
-        # Print Debugging to Serial
-        github_debug = True # Set to True to print Serial data
-        if github_debug:
-            github_id = github_response['id']
-            print("UserID: ", github_id)
-            github_username = github_response['name']
-            print("Username: ", github_username)
-            github_followers = github_response['followers']
-            print("Followers: ", github_followers)
-        print("Monotonic: ", time.monotonic())
-
-        # Github 7-Segment Display
-        green.brightness = 0.8
-        green.fill(0)
-        green.print("subs")
-        time.sleep(2)
-        green.fill(0)
-        green.print(github_followers)
-
-        print("\nAttempting to GET DISCORD PREVIEW!")  # ------------------------------------------------
-        # Uncomment line below to print API URL with all data filled in
-        # print("Full API GET URL: ", ADA_DISCORD_SOURCE)
-        print("===============================")
-        try:
-            ada_discord_response = requests.get(url=ADA_DISCORD_SOURCE, headers=discord_header).json()
-        except ConnectionError as e:
-            print("Connection Error:", e)
-            print("Retrying in 10 seconds")
+    print("Connected!\n")
 
-        # Print Full JSON to Serial
-        full_ada_discord_json_response = False # Change to true to see full response
-        if full_ada_discord_json_response:
-            ada_discord_dump_object = json.dumps(ada_discord_response)
-            print("JSON Dump: ", ada_discord_dump_object)
-
-        # Print Debugging to Serial
-        ada_discord_debug = True # Set to True to print Serial data
-        if ada_discord_debug:
-            ada_discord_all_members = ada_discord_response['approximate_member_count']
-            print("Members: ", ada_discord_all_members)
-            ada_discord_all_members_online = ada_discord_response['approximate_presence_count']
-            print("Online: ", ada_discord_all_members_online)
-        print("Monotonic: ", time.monotonic())
-
-        # Discord 7-Segment Display
-        white.fill(0)
-        white.print("subs")
-        time.sleep(2)
-        white.fill(0)
-        white.print(ada_discord_all_members)
-        time.sleep(2)
-        white.fill(0)
-        white.print("online")
-        time.sleep(2)
-        white.fill(0)
-        white.print(ada_discord_all_members_online)
-
-        print("\nFinished!")
-        print("Next Update in: ", time_calc(sleep_time))
-        print("===============================")
-        gc.collect()
-    # pylint: disable=broad-except
-    except (ValueError, RuntimeError) as e:
-        print("Failed to get data, retrying\n", e)
-        time.sleep(60)
-        continue
-    # response = None
-    time.sleep(sleep_time)
+
+async def keep_wifi_connected():
+    """Reconnect whenever Wi-Fi drops"""
+    while True:
+        if not wifi.radio.ipv4_address:
+            connect_wifi()
+        await asyncio.sleep(10)
+
+
+async def main():
+    """Displays, Wi-Fi and every API run side by side"""
+    await asyncio.gather(show_stats(), keep_wifi_connected(), scheduler.run())
+
+
+connect_wifi()
+asyncio.run(main())
@@ -0,0 +1,148 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""HT16K33 bus traffic against stand-in backpacks
+
+Desktop script, run from this folder:
+    python ht16k33_benchmark.py
+Four Seg7x4 displays of two backpacks each replay the code.py stats cycle:
+fill(0) then print() a label, then fill(0) then print() its value, with the
+values changing every third cycle. A 16x8 pixel pattern drawn with auto_write
+on covers the _pixel path. The old show(), reproduced below, copied and
+wrote every backpack on each call.
+
+Reports I2C transactions, bytes on the bus (address byte included) and the
+bus time that takes at 100 kHz.
+"""
+
+import sys
+import types
+
+sys.path.insert(0, "lib")
+
+# Stand-ins for the board only modules the driver imports
+_micropython = types.ModuleType("micropython")
+_micropython.const = lambda value: value
+sys.modules.setdefault("micropython", _micropython)
+# Only used for type annotations
+_busio = types.ModuleType("busio")
+_busio.I2C = object
+sys.modules.setdefault("busio", _busio)
+
+
+class StandInBus:
+    """Counts what would go out on the I2C bus."""
+
+    def __init__(self):
+        self.transactions = 0
+        self.bytes = 0
+
+
+class StandInDevice:
+    """Enough of I2CDevice for the driver."""
+
+    def __init__(self, i2c, address):
+        self.i2c = i2c
+        self.address = address
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def write(self, buf, *, start=0, end=None):
+        end = len(buf) if end is None else end
+        self.i2c.transactions += 1
+        self.i2c.bytes += 1 + end - start
+
+
+_bus_device = types.ModuleType("adafruit_bus_device")
+_bus_device.i2c_device = types.ModuleType("adafruit_bus_device.i2c_device")
+_bus_device.i2c_device.I2CDevice = StandInDevice
+sys.modules["adafruit_bus_device"] = _bus_device
+sys.modules["adafruit_bus_device.i2c_device"] = _bus_device.i2c_device
+
+# pylint: disable=wrong-import-position
+from adafruit_ht16k33 import segments
+from adafruit_ht16k33.ht16k33 import HT16K33
+
+CYCLES = 30
+ADDRESSES = ((0x75, 0x70), (0x74, 0x73), (0x76, 0x77), (0x71, 0x72))
+LABELS = ("subs", "tweets", "github", "online")
+
+
+def legacy_show(self):
+    """The previous show: a copy of every backpack's buffer, every call."""
+    for index, i2c_dev in enumerate(self.i2c_device):
+        with i2c_dev:
+            offset = index * self._buffer_size
+            i2c_dev.write(self._buffer[offset : offset + self._buffer_size])
+
+
+class LegacySeg7x4(segments.Seg7x4):
+    """Seg7x4 on the previous show."""
+
+    show = legacy_show
+
+
+class LegacyHT16K33(HT16K33):
+    """HT16K33 on the previous show."""
+
+    show = legacy_show
+
+
+def stats_cycle(bus, display_class, batched):
+    """The code.py display loop."""
+    displays = [display_class(bus, address=pair) for pair in ADDRESSES]
+    bus.transactions = bus.bytes = 0
+    for cycle in range(CYCLES):
+        for number, (display, label) in enumerate(zip(displays, LABELS)):
+            value = 1000 + number * 37 + cycle // 3
+            for text in (label, value):
+                if batched:
+                    with display.batch():
+                        display.fill(0)
+                        display.print(text)
+                else:
+                    display.fill(0)
+                    display.print(text)
+
+
+def pixel_pattern(bus, display_class, batched):
+    """A checkerboard on two backpacks, one _pixel call per LED."""
+    display = display_class(bus, address=(0x70, 0x71))
+    bus.transactions = bus.bytes = 0
+    for frame in range(CYCLES):
+        if batched:
+            with display.batch():
+                for x in range(16):
+                    for y in range(8):
+                        display._pixel(x, y, (x + y + frame) % 2)
+        else:
+            for x in range(16):
+                for y in range(8):
+                    display._pixel(x, y, (x + y + frame) % 2)
+
+
+def measure(workload, display_class, batched):
+    """Returns (transactions, bytes, ms of bus time per cycle)."""
+    bus = StandInBus()
+    workload(bus, display_class, batched)
+    # 9 clocks per byte plus start and stop
+    bus_ms = (bus.bytes * 9 + bus.transactions * 2) / 100_000 * 1000
+    return bus.transactions, bus.bytes, bus_ms / CYCLES
+
+
+CASES = (
+    ("stats, old show", stats_cycle, LegacySeg7x4, False),
+    ("stats, dirty tracking", stats_cycle, segments.Seg7x4, False),
+    ("stats, batch()", stats_cycle, segments.Seg7x4, True),
+    ("pixels, old show", pixel_pattern, LegacyHT16K33, False),
+    ("pixels, dirty tracking", pixel_pattern, HT16K33, False),
+    ("pixels, batch()", pixel_pattern, HT16K33, True),
+)
+
+print(f"{'Workload':<26}{'Writes':>8}{'Bytes':>9}{'ms/cycle':>10}")
+for name, workload, display_type, batch in CASES:
+    writes, sent, ms = measure(workload, display_type, batch)
+    print(f"{name:<26}{writes:>8}{sent:>9}{ms:>10.1f}")
@@ -30,6 +30,24 @@ _HT16K33_CMD_BRIGHTNESS = const(0xE0)
 _HT16K33_OSCILATOR_ON = const(0x21)
 
 
+class _Batch:
+    """Holds back auto_write until the ``with`` block ends, then shows once."""
+
+    def __init__(self, display: "HT16K33") -> None:
+        self._display = display
+        self._auto_write = False
+
+    def __enter__(self) -> "HT16K33":
+        self._auto_write = self._display._auto_write
+        self._display._auto_write = False
+        return self._display
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._display._auto_write = self._auto_write
+        if self._auto_write:
+            self._display.show()
+
+
 class HT16K33:
     """
     The base class for all displays. Contains common methods.
@@ -57,6 +75,16 @@ class HT16K33:
         self._temp = bytearray(1)
         self._buffer_size = 17
         self._buffer = bytearray((self._buffer_size) * len(self.i2c_device))
+        # One view per device, so show() writes without copying
+        buffer = memoryview(self._buffer)
+        self._views = [
+            buffer[offset : offset + self._buffer_size]
+            for offset in range(0, len(self._buffer), self._buffer_size)
+        ]
+        # Devices changed since the last show, and what each was last sent.
+        # Nothing has been sent yet, so the first show writes every device.
+        self._dirty = bytearray(b"\x01" * len(self.i2c_device))
+        self._shown = None
         self._auto_write = auto_write
         self.fill(0)
         for i, _ in enumerate(self.i2c_device):
@@ -117,15 +145,49 @@ class HT16K33:
         else:
             raise ValueError("Must set to either True or False.")
 
+    def batch(self) -> _Batch:
+        """Group several changes into one update of the display.
+
+        With auto_write on, each change made inside the ``with`` block would
+        otherwise write every device. Instead the display is updated once,
+        when the block ends.
+
+        .. code-block:: python
+
+            with display.batch():
+                display.fill(0)
+                display.print("1234")
+        """
+        return _Batch(self)
+
     def show(self) -> None:
-        """Refresh the display and show the changes."""
+        """Refresh the display and show the changes.
+
+        Only devices whose data changed since the last call are written.
+        """
+        size = self._buffer_size
+        shown = self._shown
+        first = shown is None
+        if first:
+            shown = self._shown = bytearray(len(self._buffer))
+        dirty = self._dirty
         for index, i2c_dev in enumerate(self.i2c_device):
+            if not dirty[index]:
+                continue
+            dirty[index] = 0
+            offset = index * size
+            if not first:
+                # Set back to what the device already shows, skip the write
+                for i in range(offset + 1, offset + size):
+                    if self._buffer[i] != shown[i]:
+                        break
+                else:
+                    continue
             with i2c_dev:
                 # Byte 0 is 0x00, address of LED data register. The remaining 16
                 # bytes are the display register data to set.
-                offset = index * self._buffer_size
-                buffer = self._buffer[offset : offset + self._buffer_size]
-                i2c_dev.write(buffer)
+                i2c_dev.write(self._views[index])
+            shown[offset : offset + size] = self._views[index]
 
     def fill(self, color: bool) -> None:
         """Fill the whole display with the given color.
@@ -137,6 +199,7 @@ class HT16K33:
         for device, _ in enumerate(self.i2c_device):
             for i in range(self._buffer_size - 1):
                 self._buffer[device * self._buffer_size + i + 1] = fill
+            self._dirty[device] = 1
         if self._auto_write:
             self.show()
 
@@ -153,12 +216,14 @@ class HT16K33:
         else:
             # clear the bit
             self._buffer[addr + 1] &= ~mask
+        self._dirty[offset // self._buffer_size] = 1
         if self._auto_write:
             self.show()
         return None
 
     def _set_buffer(self, i: int, value: int) -> None:
         self._buffer[i + 1] = value  # Offset by 1 to move past register address.
+        self._dirty[i // self._buffer_size] = 1
 
     def _get_buffer(self, i: int) -> int:
         return self._buffer[i + 1]  # Offset by 1 to move past register address.
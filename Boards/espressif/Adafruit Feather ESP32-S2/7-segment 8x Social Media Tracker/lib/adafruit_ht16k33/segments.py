@@ -8,7 +8,7 @@ adafruit_ht16k33.segments
 =========================
 """
 
-from time import sleep
+from time import monotonic_ns, sleep
 from adafruit_ht16k33.ht16k33 import HT16K33
 
 try:
@@ -173,6 +173,9 @@ class Seg14x4(HT16K33):
                                   on each display.
     """
 
+    # The decimal point in a set_digit_raw bitmask
+    _DOT = 0b0100000000000000
+
     def __init__(
         self,
         i2c: I2C,
@@ -251,9 +254,16 @@ class Seg14x4(HT16K33):
                 self._get_buffer(self._adjusted_index(index * 2 + 1)) | 0b01000000,
             )
             return
+        bitmask = self._char_mask(char)
+        self._set_buffer(self._adjusted_index(index * 2), bitmask & 0xFF)
+        self._set_buffer(self._adjusted_index(index * 2 + 1), bitmask >> 8)
+
+    def _char_mask(self, char: str) -> Optional[int]:
+        """The set_digit_raw bitmask for a character, None if it has none."""
+        if not 32 <= ord(char) <= 127:
+            return None
         character = ord(char) * 2 - 64
-        self._set_buffer(self._adjusted_index(index * 2), CHARS[1 + character])
-        self._set_buffer(self._adjusted_index(index * 2 + 1), CHARS[character])
+        return CHARS[character] << 8 | CHARS[1 + character]
 
     def _push(self, char: str) -> None:
         """Scroll the display and add a character at the end."""
@@ -368,7 +378,9 @@ class Seg14x4(HT16K33):
 
     def marquee(self, text: str, delay: float = 0.25, loop: bool = True) -> None:
         """
-        Automatically scroll the text at the specified delay between characters
+        Automatically scroll the text at the specified delay between characters.
+        This blocks until the text has scrolled, or forever with loop. Use
+        `Marquee` to scroll without blocking.
 
         :param str text: The text to display
         :param float delay: (optional) The delay in seconds to pause before scrolling
@@ -378,26 +390,14 @@ class Seg14x4(HT16K33):
         """
         if isinstance(text, str):
             self.fill(False)
-            if loop:
-                while True:
-                    self._scroll_marquee(text, delay)
-            else:
-                self._scroll_marquee(text, delay)
-
-    def _scroll_marquee(self, text: str, delay: float) -> None:
-        """Scroll through the text string once using the delay"""
-        char_is_dot = False
-        for character in text:
-            self.print(character)
-            # Add delay if character is not a dot or more than 2 in a row
-            if character != "." or char_is_dot:
-                sleep(delay)
-            char_is_dot = character == "."
-            self.show()
+            scroller = Marquee(self, text, delay, loop)
+            while scroller.update():
+                sleep(scroller.time_to_next)
 
 
 class _AbstractSeg7x4(Seg14x4):
     POSITIONS = (0, 2, 6, 8)  #  The positions of characters.
+    _DOT = 0b10000000
 
     def __init__(  # pylint: disable=too-many-arguments
         self,
@@ -451,37 +451,34 @@ class _AbstractSeg7x4(Seg14x4):
         if not 0 <= index < self._chars:
             return
         index = self._adjusted_index(index)
+        if not (self._chardict and char in self._chardict):
+            if char == ".":
+                self._set_buffer(index, self._get_buffer(index) | 0b10000000)
+                return
+            if char == ":":
+                self._set_buffer(4, 0x02)
+                return
+            if char == ";":
+                self._set_buffer(4, 0x00)
+                return
+        bitmask = self._char_mask(char)
+        if bitmask is not None:
+            self._set_buffer(index, bitmask)
+
+    def _char_mask(self, char: str) -> Optional[int]:
+        """The set_digit_raw bitmask for a character, None if it has none."""
         if self._chardict and char in self._chardict:
-            self._set_buffer(index, self._chardict[char])
-            return
+            return self._chardict[char]
         char = char.lower()
-        if char == ".":
-            self._set_buffer(index, self._get_buffer(index) | 0b10000000)
-            return
         if char in "abcdefghijklmnopqrstuvwxy":
-            character = ord(char) - 97 + 10
-        elif char == "-":
-            character = 16
-        elif char in "0123456789":
-            character = ord(char) - 48
-        elif char == " ":
-            self._set_buffer(index, 0x00)
-            return
-        elif char == ":":
-            self._set_buffer(4, 0x02)
-            return
-        elif char == ";":
-            self._set_buffer(4, 0x00)
-            return
-        elif char in "lL":
-            self._set_buffer(index, 0b00111000)
-            return
-        elif char in "oO":
-            self._set_buffer(index, 0b00111111)
-            return
-        else:
-            return
-        self._set_buffer(index, NUMBERS[character])
+            return NUMBERS[ord(char) - 97 + 10]
+        if char == "-":
+            return NUMBERS[16]
+        if char in "0123456789":
+            return NUMBERS[ord(char) - 48]
+        if char == " ":
+            return 0x00
+        return None
 
     def set_digit_raw(self, index: int, bitmask: int) -> None:
         """Set digit at position to raw bitmask value. Position should be a value
@@ -642,3 +639,103 @@ class Colon:
         if key > self._num_of_colons - 1:
             raise ValueError("Trying to access a non-existent colon.")
         return bool(self._disp._get_buffer(0x04) & self.MASKS[key])
+
+
+class Marquee:
+    """Scrolls text across a segment display without blocking.
+
+    The segments for the whole text are worked out once, then each `update`
+    that is due moves the text one character and writes only the backpacks
+    that changed. Call `update` from the main loop, or from an asyncio task,
+    for as many displays as needed.
+
+    .. code-block:: python
+
+        scrollers = [Marquee(red, "youtube subs"), Marquee(blue, "twitter")]
+        while True:
+            for scroller in scrollers:
+                scroller.update()
+
+    :param Seg14x4 display: The display to scroll on, a Seg14x4 or Seg7x4
+    :param str text: The text to scroll. On a Seg7x4, ``:`` and ``;`` are skipped
+    :param float delay: (optional) Seconds between steps (default=0.25)
+    :param bool loop: (optional) Whether to endlessly loop the text (default=True)
+    """
+
+    # pylint: disable=protected-access
+
+    def __init__(
+        self, display: Seg14x4, text: str, delay: float = 0.25, loop: bool = True
+    ) -> None:
+        self.display = display
+        self.delay = delay
+        self.loop = loop
+        dot = display._DOT
+        masks = []
+        for char in text:
+            if char == "." and masks and not masks[-1] & dot:
+                # A dot lights the decimal point of the character before it
+                masks[-1] |= dot
+                continue
+            if char == ".":
+                masks.append(dot)
+                continue
+            if char in ":;" and isinstance(display, _AbstractSeg7x4):
+                continue
+            masks.append(display._char_mask(char) or 0)
+        self._masks = masks
+        # (position, buffer index, shift) for each byte of each character
+        per_char = display._bytes_per_char
+        self._slots = [
+            (position, display._adjusted_index(position * per_char + byte), 8 * byte)
+            for position in range(display._chars)
+            for byte in range(per_char)
+        ]
+        self._step = 0
+        self._next_ns = None
+
+    @property
+    def done(self) -> bool:
+        """True once the text has scrolled all the way, never with loop."""
+        return not self.loop and self._step >= len(self._masks)
+
+    @property
+    def time_to_next(self) -> float:
+        """Seconds until the next step is due."""
+        if self._next_ns is None:
+            return 0.0
+        return max(0, self._next_ns - monotonic_ns()) / 1_000_000_000
+
+    def update(self, now_ns: Optional[int] = None) -> bool:
+        """Scroll one step if it is due.
+
+        :param int now_ns: (optional) The time from ``time.monotonic_ns()``, to
+            share one reading between several displays
+        :return: False once the text has scrolled and its last delay has passed
+        """
+        if now_ns is None:
+            now_ns = monotonic_ns()
+        if self._next_ns is not None and now_ns < self._next_ns:
+            return True
+        if self.done or not self._masks:
+            return False
+        delay_ns = int(self.delay * 1_000_000_000)
+        if self._next_ns is None or now_ns - self._next_ns >= delay_ns:
+            # First step, or fell a whole step behind: restart the timing
+            self._next_ns = now_ns + delay_ns
+        else:
+            self._next_ns += delay_ns
+        self._show_step()
+        return True
+
+    def _show_step(self) -> None:
+        display = self.display
+        masks = self._masks
+        # The newest character goes on the right, earlier ones to its left
+        first = self._step - display._chars + 1
+        for position, index, shift in self._slots:
+            char = first + position
+            bitmask = masks[char % len(masks)] if char >= 0 else 0
+            display._set_buffer(index, (bitmask >> shift) & 0xFF)
+        display.show()
+        self._step += 1
@@ -0,0 +1,217 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""segments.Marquee against the old blocking marquee on stand-in backpacks
+
+Desktop script, run from this folder:
+    python marquee_benchmark.py
+First checks that Marquee shows the same frames as the old marquee, which
+printed one character at a time and slept between them, on a Seg14x4 and a
+Seg7x4 of two backpacks each. Then scrolls a different text across each of
+the four Seg7x4 displays from code.py: the old way one display after the
+other on the old show() that wrote every backpack, the new way all at once
+from one update() loop. Time is simulated, so the sleeps cost nothing.
+
+Reports the time until every display has scrolled, the longest the main
+loop is held up (for the old marquee a whole scroll, for Marquee the CPU
+time of one pass over the four update() calls), I2C bytes on the bus and the
+CPU time spent per step.
+"""
+
+import sys
+import time
+import types
+
+sys.path.insert(0, "lib")
+
+# Stand-ins for the board only modules the driver imports
+_micropython = types.ModuleType("micropython")
+_micropython.const = lambda value: value
+sys.modules.setdefault("micropython", _micropython)
+# Only used for type annotations
+_busio = types.ModuleType("busio")
+_busio.I2C = object
+sys.modules.setdefault("busio", _busio)
+
+
+class StandInBus:
+    """Counts what would go out on the I2C bus."""
+
+    def __init__(self):
+        self.bytes = 0
+
+
+class StandInDevice:
+    """Enough of I2CDevice for the driver."""
+
+    def __init__(self, i2c, address):
+        self.i2c = i2c
+        self.address = address
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def write(self, buf, *, start=0, end=None):
+        end = len(buf) if end is None else end
+        self.i2c.bytes += 1 + end - start
+
+
+_bus_device = types.ModuleType("adafruit_bus_device")
+_bus_device.i2c_device = types.ModuleType("adafruit_bus_device.i2c_device")
+_bus_device.i2c_device.I2CDevice = StandInDevice
+sys.modules["adafruit_bus_device"] = _bus_device
+sys.modules["adafruit_bus_device.i2c_device"] = _bus_device.i2c_device
+
+# pylint: disable=wrong-import-position
+from adafruit_ht16k33 import segments
+
+DELAY = 0.25
+ADDRESSES = ((0x75, 0x70), (0x74, 0x73), (0x76, 0x77), (0x71, 0x72))
+TEXTS = (
+    "youtube 12345 subs",
+    "twitter 2.5k. followers",
+    "github 42 stars",
+    "discord 7 online",
+)
+
+
+def legacy_show(self):
+    """The previous show: every backpack, every call."""
+    for index, i2c_dev in enumerate(self.i2c_device):
+        with i2c_dev:
+            offset = index * self._buffer_size
+            i2c_dev.write(self._buffer[offset : offset + self._buffer_size])
+
+
+class LegacySeg7x4(segments.Seg7x4):
+    """Seg7x4 on the previous show."""
+
+    show = legacy_show
+
+
+class Clock:
+    """Simulated time.monotonic_ns, advanced by sleep."""
+
+    now_ns = 0
+
+    @classmethod
+    def sleep(cls, seconds):
+        cls.now_ns += int(seconds * 1_000_000_000)
+
+
+def legacy_marquee(display, text, on_step, sleep):
+    """The previous marquee with loop=False.
+
+    on_step is called before each character that starts a new step, and at
+    the end, when the step before it is complete.
+    """
+    display.fill(False)
+    char_is_dot = False
+    for index, character in enumerate(text):
+        new_step = character != "." or char_is_dot
+        if new_step and index:
+            on_step(display)
+        display.print(character)
+        # Add delay if character is not a dot or more than 2 in a row
+        if new_step:
+            sleep(DELAY)
+        char_is_dot = character == "."
+        display.show()
+    on_step(display)
+
+
+def check_frames(display_class, text):
+    """Both marquees show the same frames, in order.
+
+    The old marquee showed a decimal point with the character after it,
+    Marquee shows it with its own digit, so frames are compared once each
+    step is complete.
+    """
+    old_frames = []
+    legacy_marquee(
+        display_class(StandInBus(), address=(0x70, 0x71)),
+        text,
+        lambda display: old_frames.append(bytes(display._buffer)),
+        Clock.sleep,
+    )
+    display = display_class(StandInBus(), address=(0x70, 0x71))
+    display.fill(False)
+    scroller = segments.Marquee(display, text, DELAY, loop=False)
+    new_frames = []
+    while scroller.update(Clock.now_ns):
+        new_frames.append(bytes(display._buffer))
+        Clock.sleep(DELAY)
+    assert new_frames == old_frames, (display_class.__name__, text)
+    return len(new_frames)
+
+
+def old_scroll():
+    """One display after the other with the blocking marquee."""
+    bus = StandInBus()
+    displays = [LegacySeg7x4(bus, address=pair) for pair in ADDRESSES]
+    start_ns = Clock.now_ns
+    longest_hold_ns = 0
+    cpu_ns = 0
+    steps = 0
+
+    def timed_sleep(seconds):
+        nonlocal cpu_ns, steps
+        cpu_ns += time.perf_counter_ns() - step_start[0]
+        steps += 1
+        Clock.sleep(seconds)
+        step_start[0] = time.perf_counter_ns()
+
+    for display, text in zip(displays, TEXTS):
+        hold_start = Clock.now_ns
+        step_start = [time.perf_counter_ns()]
+        legacy_marquee(display, text, lambda display: None, timed_sleep)
+        longest_hold_ns = max(longest_hold_ns, Clock.now_ns - hold_start)
+    return Clock.now_ns - start_ns, longest_hold_ns, bus.bytes, cpu_ns / steps
+
+
+def new_scroll():
+    """Every display at once from a main loop polling every 10 ms."""
+    bus = StandInBus()
+    displays = [segments.Seg7x4(bus, address=pair) for pair in ADDRESSES]
+    scrollers = [
+        segments.Marquee(display, text, DELAY, loop=False)
+        for display, text in zip(displays, TEXTS)
+    ]
+    start_ns = Clock.now_ns
+    longest_hold_ns = 0
+    cpu_ns = 0
+    steps = 0
+    running = True
+    while running:
+        running = False
+        pass_start = time.perf_counter_ns()
+        for scroller in scrollers:
+            before = scroller._step
+            started = time.perf_counter_ns()
+            running = scroller.update(Clock.now_ns) or running
+            if scroller._step != before:
+                cpu_ns += time.perf_counter_ns() - started
+                steps += 1
+        longest_hold_ns = max(longest_hold_ns, time.perf_counter_ns() - pass_start)
+        Clock.sleep(0.01)
+    return Clock.now_ns - start_ns, longest_hold_ns, bus.bytes, cpu_ns / steps
+
+
+for display_type, sample in (
+    (segments.Seg14x4, "V1.2..3 Hello, World!"),
+    (segments.Seg7x4, "12.5.. -3 abz 0.75"),
+):
+    frames = check_frames(display_type, sample)
+    print(f"{display_type.__name__}: {frames} frames match the old marquee")
+print()
+print(f"{'Marquee':<22}{'Done s':>8}{'Hold ms':>9}{'Bytes':>8}{'us/step':>9}")
+for name, scroll in (
+    ("old, one at a time", old_scroll),
+    ("new, all at once", new_scroll),
+):
+    done, hold, sent, step_ns = scroll()
+    print(
+        f"{name:<22}{done / 1e9:>8.2f}{hold / 1e6:>9.2f}{sent:>8}{step_ns / 1000:>9.1f}"
+    )
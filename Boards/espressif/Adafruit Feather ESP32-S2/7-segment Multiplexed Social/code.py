@@ -8,14 +8,16 @@ import os
 import time
 
 import adafruit_connection_manager
+import adafruit_requests
 import wifi
 
-import adafruit_requests
+import asyncio
 import board
 import busio
 import pwmio
 from adafruit_ht16k33 import segments
 import adafruit_tca9548a
+from fetch_scheduler import Endpoint, FetchScheduler
 
 # Ensure ALL of these are setup in settings.toml
 ssid = os.getenv("CIRCUITPY_WIFI_SSID")
@@ -58,10 +60,13 @@ SLEEP_TIME = 900
 # STREAMER WARNING: Credentials will be viewable
 DEBUG = False
 
-# Initalize Wifi, Socket Pool, Request Session
+# Initalize Wifi, Socket Pool, SSL Context
 pool = adafruit_connection_manager.get_radio_socketpool(wifi.radio)
 ssl_context = adafruit_connection_manager.get_radio_ssl_context(wifi.radio)
-requests = adafruit_requests.Session(pool, ssl_context)
+# Keep-alive sessions, at most two sockets open on the radio
+requests = adafruit_requests.Session(
+    pool, ssl_context, max_sockets=2, idle_timeout=60
+)
 
 
 def time_calc(input_time):
@@ -147,12 +152,139 @@ STEAM_SOURCE = ("http://api.steampowered.com/IPlayerService/"
                 "&format=json"
                 )
 
-while True:
-    # Arcade button for board reset. This powers the LED.
-    Reset_LED = pwmio.PWMOut(board.A0, frequency=25000, duty_cycle=0)
-    Reset_LED.duty_cycle = 32768  # duty cycle is brightness (0-65535)
-    gc.collect()
-    # Connect to Wi-Fi
+# Arcade button for board reset. This powers the LED.
+Reset_LED = pwmio.PWMOut(board.A0, frequency=25000, duty_cycle=0)
+Reset_LED.duty_cycle = 32768  # duty cycle is brightness (0-65535)
+
+
+def parse_youtube(json_data):
+    """Views and subscribers"""
+    statistics = json_data["items"][0]["statistics"]
+    return statistics["viewCount"], statistics["subscriberCount"]
+
+
+def parse_mastodon(json_data):
+    """Toots and followers"""
+    return json_data["statuses_count"], json_data["followers_count"]
+
+
+def twitch_header():
+    """Twitch GET header, None until there is a bearer token"""
+    # Bearer token is refreshed once a day, and on a 401 from Twitch
+    # Twitch sets token expiration to about 64 days
+    if twitch_token.value is None:
+        return None
+    return {"Authorization": "Bearer " + twitch_token.value, "Client-Id": TWITCH_CID}
+
+
+def show_update(endpoint):
+    """Log each successful refresh"""
+    if DEBUG:
+        print(f" | {endpoint.name} JSON: {endpoint.value}")
+    print(f"✅ {endpoint.name} updated at {time_calc(time.monotonic())} uptime")
+
+
+# Each API refreshes on its own schedule. One that fails retries with a
+# backoff and keeps showing its last good value meanwhile.
+youtube = Endpoint("YouTube", YOUTUBE_SOURCE, parse_youtube, period=SLEEP_TIME)
+mastodon = Endpoint(
+    "Mastodon",
+    MAST_SOURCE,
+    parse_mastodon,
+    headers=MASTODON_HEADER,
+    period=SLEEP_TIME,
+)
+# POST for the Twitch bearer token, then GET with it
+twitch_token = Endpoint(
+    "Twitch token",
+    TWITCH_0AUTH_TOKEN,
+    lambda json_data: json_data["access_token"],
+    method="POST",
+    headers=twitch_0auth_header,
+    data=(
+        "&client_id="
+        + TWITCH_CID
+        + "&client_secret="
+        + TWITCH_CS
+        + "&grant_type=client_credentials"
+    ),
+    period=86400,
+)
+# Helix is the name of the current Twitch API
+twitch = Endpoint(
+    "Twitch",
+    "https://api.twitch.tv/helix/channels/followers?broadcaster_id=" + TWITCH_UID,
+    lambda json_data: json_data["total"],
+    headers=twitch_header,
+    # A 401 means the bearer token expired, fetch a new one before retrying
+    renew=twitch_token,
+    period=SLEEP_TIME,
+)
+github = Endpoint(
+    "Github",
+    GITHUB_SOURCE,
+    lambda json_data: json_data["followers"],
+    headers=GITHUB_HEADER,
+    period=SLEEP_TIME,
+)
+discord = Endpoint(
+    "Discord",
+    ADA_DISCORD_JSON,
+    lambda json_data: json_data["value"].replace(" online", ""),
+    period=SLEEP_TIME,
+)
+# STEAM full response is a baaaad idea, only the game count is kept
+steam = Endpoint(
+    "Steam",
+    STEAM_SOURCE,
+    lambda json_data: json_data["response"]["game_count"],
+    period=SLEEP_TIME,
+    timeout=30,
+)
+scheduler = FetchScheduler(
+    requests,
+    (youtube, mastodon, twitch_token, twitch, github, discord, steam),
+    on_update=show_update,
+)
+
+# (display, label, endpoint, index into a tuple value or None)
+SCREENS = (
+    (red, "eyes", youtube, 0),
+    (red, "subs", youtube, 1),
+    (blue, "toots", mastodon, 0),
+    (blue, "subs", mastodon, 1),
+    (yellow, "twitch", twitch, None),
+    (green, "subs", github, None),
+    (white, "online", discord, None),
+    (green, "games", steam, None),
+)
+
+
+async def show_stats():
+    """Cycle every display through its label and latest value"""
+    while True:
+        for display, text, endpoint, index in SCREENS:
+            value = endpoint.value
+            if value is None:
+                continue
+            if index is not None:
+                value = value[index]
+            display.brightness = 0.8
+            # One write per changed backpack instead of one per call
+            with display.batch():
+                display.fill(0)
+                display.print(text)
+            await asyncio.sleep(2)
+            with display.batch():
+                display.fill(0)
+                display.print(value)
+            await asyncio.sleep(2)
+        gc.collect()
+        await asyncio.sleep(1)
+
+
+def connect_wifi():
+    """Blocks until Wi-Fi is connected"""
     print("\nConnecting to WiFi...")
     while not wifi.radio.ipv4_address:
         try:
@@ -160,245 +292,24 @@ while True:
         except ConnectionError as e:
             print("❌ Connection Error:", e)
             print("Retrying in 10 seconds")
+            time.sleep(10)
         gc.collect()
     print("✅ Wifi!")
-    print(" | Shuffling data to 7-Segment Displays")
-    print(" | This could take a minute...")
-
-    try:
-        with requests.get(YOUTUBE_SOURCE) as youtube_response:
-            try:
-                youtube_json = youtube_response.json()
-            except ConnectionError as e:
-                print("Connection Error:", e)
-                print("Retrying in 10 seconds")
-
-            if DEBUG:
-                print(f" | Full API GET URL: {YOUTUBE_SOURCE}")
-                print(f" | Full API Dump: {youtube_json}")
-            # Key:Value RESPONSES
-            if "items" in youtube_json:
-                YT_viewCount = youtube_json["items"][0]["statistics"]["viewCount"]
-                YT_subsCount = youtube_json["items"][0]["statistics"]["subscriberCount"]
-                
-            # YouTube 7-Segment Display
-            red.brightness = 0.8
-            red.fill(0)
-            red.print("eyes")
-            time.sleep(2)
-            red.fill(0)
-            red.print(YT_viewCount)
-            time.sleep(2)
-            red.fill(0)
-            red.print("subs")
-            time.sleep(2)
-            red.fill(0)
-            red.print(YT_subsCount)
-            gc.collect()
-            # Marquee scrolling, 2nd parameter speed in seconds
-            # red.marquee(YT_response_channel_subscriberCount, 0.9)
-            youtube_response.close()
-        
-        # Mastodon
-        try:
-            mastodon_response = requests.get(url=MAST_SOURCE, headers=MASTODON_HEADER)
-            mastodon_json = mastodon_response.json()
-        except ConnectionError as e:
-            print(f"Connection Error: {e}")
-            print("Retrying in 10 seconds")
-        DEBUG_RESPONSE = False
-        if DEBUG_RESPONSE:
-            print(f" |  | Full API GET URL: {MASTODON_HEADER} {MAST_SOURCE}")
-        mastodon_follower_count = mastodon_json["followers_count"]
-        mastodon_toot_count = mastodon_json["statuses_count"]
-        # Mastodon 7-Segment Display
-        blue.brightness = 0.8
-        blue.fill(0)
-        blue.print("toots")
-        time.sleep(2)
-        blue.fill(0)
-        blue.print(mastodon_toot_count)
-        time.sleep(2)
-        blue.fill(0)
-        blue.print("subs")
-        time.sleep(2)
-        blue.fill(0)
-        blue.print(mastodon_follower_count)
-        gc.collect()
-        mastodon_response.close()
-
-        # ------------- POST FOR TWITCH BEARER TOKEN -----------------
-        if DEBUG:
-            print(f"Full API GET URL: {TWITCH_0AUTH_TOKEN}")
-        twitch_0auth_data = (
-            "&client_id="
-            + TWITCH_CID
-            + "&client_secret="
-            + TWITCH_CS
-            + "&grant_type=client_credentials"
-        )
-
-        # POST REQUEST
-        twitch_0auth_response = requests.post(
-            url=TWITCH_0AUTH_TOKEN,
-            data=twitch_0auth_data,
-            headers=twitch_0auth_header,
-        )
-        try:
-            twitch_0auth_json = twitch_0auth_response.json()
-            twitch_access_token = twitch_0auth_json["access_token"]
-        except ConnectionError as e:
-            print(f"Connection Error: {e}")
-            print("Retrying in 10 seconds")
 
-        # STREAMER WARNING: your client secret will be viewable
-        if DEBUG:
-            print(f"JSON Dump: {twitch_0auth_json}")
-            print(f"Header: {twitch_0auth_header}")
-            print(f"Access Token: {twitch_access_token}")
-        # Twitch 7-Segment Display
-        yellow.brightness = 0.8
-        yellow.fill(0)
-        yellow.print("twitch")
-        time.sleep(2)
-
-        # -----------------------TWITCH GET DATA --------------------
-        # Bearer token is refreshed every time script runs :)
-        # Twitch sets token expiration to about 64 days
-        # Helix is the name of the current Twitch API
-        # Now that we have POST bearer token we can do a GET for data
-        # -----------------------------------------------------------
-        twitch_header = {
-            "Authorization": "Bearer " + twitch_access_token + "",
-            "Client-Id": "" + TWITCH_CID + "",
-        }
-        TWITCH_FOLLOWERS_SOURCE = (
-            "https://api.twitch.tv/helix/channels"
-            + "/followers?"
-            + "broadcaster_id="
-            + TWITCH_UID
-        )
-        
-        # Twitch GET
-        twitch_response = requests.get(
-            url=TWITCH_FOLLOWERS_SOURCE, headers=twitch_header
-        )
-        try:
-            twitch_json = twitch_response.json()
-        except ConnectionError as e:
-            print(f"Connection Error: {e}")
-            print("Retrying in 10 seconds")
-        if DEBUG:
-            print(f" | Full API GET URL: {TWITCH_FOLLOWERS_SOURCE}")
-            print(f" | Header: {twitch_header}")
-            print(f" | JSON Full Response: {twitch_json}")
-        # Error Responses
-        if "status" in twitch_json:
-            twitch_error_status = twitch_json["status"]
-            print(f"❌ Status: {twitch_error_status}")
-        if "error" in twitch_json:
-            twitch_error = twitch_json["error"]
-            print(f"❌ Error: {twitch_error}")
-        if "message" in twitch_json:
-            twitch_error_msg = twitch_json["message"]
-            print(f"❌ Message: {twitch_error_msg}")
-        # Key:Value Responses
-        if "total" in twitch_json:
-            twitch_followers = twitch_json["total"]
-        # Twitch 7-Segment Display
-        yellow.brightness = 0.8
-        yellow.fill(0)
-        yellow.print("subs")
-        time.sleep(2)
-        yellow.fill(0)
-        yellow.print(twitch_followers)
-        gc.collect()
-        twitch_response.close()
 
-        # Github
-        try:
-            github_response = requests.get(url=GITHUB_SOURCE, headers=GITHUB_HEADER)
-            github_json = github_response.json()
-        except ConnectionError as e:
-            print("Connection Error:", e)
-            print("Retrying in 10 seconds")
-        if DEBUG:
-            print("Full API GET URL: ", GITHUB_SOURCE)
-            print(github_json)
-        # Error Response
-        if "message" in github_json:
-            github_error_message = github_json["message"]
-            print(f"❌ Error: {github_error_message}")
-        else:
-            github_followers = github_json["followers"]
-            # Github 7-Segment Display
-            green.brightness = 0.8
-            green.fill(0)
-            green.print("subs")
-            time.sleep(2)
-            green.fill(0)
-            green.print(github_followers)
-            gc.collect()
-        github_response.close()
-        
-        # Discord Adafruit Shields.io
-        try:
-            shieldsio_response = requests.get(url=ADA_DISCORD_JSON)
-            shieldsio_json = shieldsio_response.json()
-        except ConnectionError as e:
-            print(f"Connection Error: {e}")
-            print("Retrying in 10 seconds")
-        DEBUG_RESPONSE = False
-        if DEBUG_RESPONSE:
-            print(" |  | Full API GET URL: ", ADA_DISCORD_JSON)
-            print(" |  | JSON Dump: ", shieldsio_json)
-        ada_users = shieldsio_json["value"]
-        ONLINE_STRING = " online"
-        REPLACE_WITH_NOTHING = ""
-        discord_users = ada_users.replace(ONLINE_STRING, REPLACE_WITH_NOTHING)
-        # Discord 7-Segment Display
-        white.fill(0)
-        white.print("online")
-        time.sleep(2)
-        white.fill(0)
-        white.print(discord_users)
-        gc.collect()
-        shieldsio_response.close()
-        
-        # STEAM
-        with requests.get(STEAM_SOURCE) as steam_response:
-            try:
-                steam_json = steam_response.json()
-            except ConnectionError as e:
-                print("Connection Error:", e)
-        DEBUG_STEAM = False
-        if DEBUG_STEAM:
-            print("Full API GET URL: ", STEAM_SOURCE)
-            # STEAM full response is a baaaad idea but its here if your into bad ideas.
-            # print(steam_json)  # uncomment at your microcontrollers peril
-        game_count = steam_json["response"]["game_count"]
-        # Mastodon 7-Segment Display
-        green.brightness = 0.8
-        time.sleep(2)
-        green.fill(0)
-        green.print("steam")
-        time.sleep(2)
-        green.fill(0)
-        green.print("games")
-        time.sleep(2)
-        green.fill(0)
-        green.print(game_count)
-        time.sleep(2)
-        gc.collect()
-        steam_response.close()
-        print("✂️ Disconnected from all API's")
-        
-    except (ValueError, RuntimeError) as e:
-        print(f"Failed to get data: {e}")
-
-    print("\nFinished!")
-    print(f"Board Uptime: {time_calc(time.monotonic())}")
-    print(f"Next Update: {time_calc(SLEEP_TIME)}")
-    print("===============================")
-    gc.collect()
-    time.sleep(SLEEP_TIME)
+async def keep_wifi_connected():
+    """Reconnect whenever Wi-Fi drops"""
+    while True:
+        if not wifi.radio.ipv4_address:
+            connect_wifi()
+        await asyncio.sleep(10)
+
+
+async def main():
+    """Displays, Wi-Fi and every API run side by side"""
+    await asyncio.gather(show_stats(), keep_wifi_connected(), scheduler.run())
+
+
+connect_wifi()
+print(" | Shuffling data to 7-Segment Displays")
+asyncio.run(main())
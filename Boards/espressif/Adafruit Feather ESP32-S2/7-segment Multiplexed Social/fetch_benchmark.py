@@ -0,0 +1,195 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""FetchScheduler against stand-in APIs with injected latency
+
+Desktop script, run from this folder:
+    python fetch_benchmark.py
+A stand-in adafruit_requests Session blocks for each host's latency, the
+way the real one blocks through DNS, the TLS handshake and the response.
+Runs one refresh of every endpoint alongside a display task that wants to
+tick every 0.1 s: the old loop, which made every request back to back
+before showing anything, then FetchScheduler's polling tasks, and both
+again with one API that never answers and runs into its timeout.
+
+Reports the refresh time, the longest the display task had to wait and the
+most requests that were in flight at once, which must stay at one. This
+is not concurrent fetching: the requests block, so a refresh takes as long
+as before. What the scheduler changes is that the display waits for one
+request at most, not all of them.
+
+Also checks that a 401 from Twitch fetches a new token before the retry.
+"""
+
+import asyncio
+import time
+
+from fetch_scheduler import Endpoint, FetchScheduler, HTTPError
+
+# Seconds each stand-in API takes to answer
+LATENCY = {
+    "youtube.googleapis.com": 0.45,
+    "mastodon.social": 0.30,
+    "id.twitch.tv": 0.35,
+    "api.twitch.tv": 0.40,
+    "api.github.com": 0.25,
+    "img.shields.io": 0.60,
+    "api.steampowered.com": 0.80,
+}
+HUNG = "api.steampowered.com"
+TIMEOUT = 2
+TICK = 0.1
+
+
+class StandInResponse:
+    """Enough of adafruit_requests.Response for FetchScheduler."""
+
+    def __init__(self, host, status_code=200):
+        self._host = host
+        self.status_code = status_code
+        self.text = "Unauthorized"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def json(self):
+        return {"host": self._host, "followers": 42}
+
+
+class StandInSession:
+    """Blocks for the host's latency, or the timeout if the host is hung."""
+
+    def __init__(self, hung=None):
+        self.hung = hung
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    def request(self, method, url, data=None, headers=None, timeout=60):
+        # pylint: disable=too-many-arguments,unused-argument
+        host = url.split("/")[2]
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        try:
+            if host == self.hung:
+                time.sleep(timeout)
+                raise OSError(116, "ETIMEDOUT")
+            time.sleep(LATENCY[host])
+        finally:
+            self.in_flight -= 1
+        if headers and headers.get("Authorization") == "Bearer expired":
+            return StandInResponse(host, 401)
+        return StandInResponse(host)
+
+
+def endpoints():
+    """One endpoint per stand-in API."""
+    return [
+        Endpoint(
+            host,
+            f"https://{host}/stats",
+            lambda json_data: json_data["followers"],
+            timeout=TIMEOUT,
+        )
+        for host in LATENCY
+    ]
+
+
+async def old_loop(scheduler):
+    """Every request back to back without yielding, like the old loop."""
+    # pylint: disable=protected-access
+    session = scheduler._session
+    for endpoint in scheduler.endpoints:
+        try:
+            with session.request(
+                "GET", endpoint.url, timeout=endpoint.timeout
+            ) as response:
+                endpoint.value = endpoint.parse(response.json())
+        except OSError:
+            pass
+    await asyncio.sleep(0)
+
+
+async def polling(scheduler):
+    """FetchScheduler's tasks, stopped once every endpoint was tried."""
+
+    async def poll(endpoint):
+        try:
+            endpoint.value = await scheduler.fetch(endpoint)
+        except OSError:
+            pass
+
+    await asyncio.gather(*(poll(endpoint) for endpoint in scheduler.endpoints))
+
+
+def measure(refresh, hung=None):
+    """Returns (seconds, longest display wait, most in flight, updated)."""
+    session = StandInSession(hung)
+    scheduler = FetchScheduler(session, endpoints())
+    gaps = []
+
+    async def display(done):
+        last = time.monotonic()
+        while not done.is_set():
+            await asyncio.sleep(TICK)
+            now = time.monotonic()
+            gaps.append(now - last - TICK)
+            last = now
+
+    async def main():
+        done = asyncio.Event()
+        ticker = asyncio.create_task(display(done))
+        await asyncio.sleep(0)
+        await refresh(scheduler)
+        done.set()
+        await ticker
+
+    start = time.monotonic()
+    asyncio.run(main())
+    elapsed = time.monotonic() - start
+    updated = sum(endpoint.value is not None for endpoint in scheduler.endpoints)
+    return elapsed, max(gaps), session.most_in_flight, updated
+
+
+def check_renew():
+    """A 401 answer refreshes the renew endpoint before the retry."""
+    token = Endpoint("Twitch token", "https://id.twitch.tv/token", lambda _: "fresh")
+    token.value = "expired"
+    twitch = Endpoint(
+        "Twitch",
+        "https://api.twitch.tv/followers",
+        lambda json_data: json_data["followers"],
+        headers=lambda: {"Authorization": "Bearer " + token.value},
+        renew=token,
+    )
+    scheduler = FetchScheduler(StandInSession(), (token, twitch))
+
+    async def main():
+        assert not await scheduler.refresh(twitch)
+        assert isinstance(twitch.error, HTTPError) and twitch.error.status == 401
+        assert token.value == "fresh", token.value
+        assert await scheduler.refresh(twitch)
+        assert twitch.value == 42
+
+    asyncio.run(main())
+    print("401 renews the token: ok")
+
+
+print(
+    f"Sum of latencies: {sum(LATENCY.values()):.2f} s, longest {max(LATENCY.values()):.2f} s"
+)
+print(f"{'Refresh':<34}{'Seconds':>8}{'Stall':>7}{'Flight':>7}{'Updated':>9}")
+for name, refresh, hung in (
+    ("old loop", old_loop, None),
+    ("FetchScheduler", polling, None),
+    ("old loop, " + HUNG.split(".")[1] + " hung", old_loop, HUNG),
+    ("FetchScheduler, " + HUNG.split(".")[1] + " hung", polling, HUNG),
+):
+    seconds, stall, flight, updated = measure(refresh, hung)
+    print(
+        f"{name:<34}{seconds:>8.2f}{stall:>7.2f}{flight:>7}"
+        f"{updated:>6}/{len(LATENCY)}"
+    )
+
+check_renew()
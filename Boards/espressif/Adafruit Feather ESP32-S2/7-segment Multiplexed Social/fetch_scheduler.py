@@ -0,0 +1,179 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+# Coded for Circuit Python 9.x
+"""Polls several web APIs on their own schedules with asyncio
+
+Each Endpoint gets its own task, refresh period, timeout and retry backoff.
+An endpoint that fails keeps its last good value until the next success.
+
+Requests go through one adafruit_requests Session, so its keep-alive pool
+reuses sockets and skips the TLS handshake on repeat requests to a host.
+adafruit_requests is blocking: DNS, connect, the handshake and reading the
+response all hold up the event loop for as long as the request takes. So
+only one request runs at a time and the other tasks, the display included,
+get their turn between requests rather than during them. Keep timeouts
+short enough for the display to stay lively.
+
+This is not concurrent fetching. Refreshing every endpoint takes as long
+as making the requests back to back. The scheduler adds per-endpoint
+periods and backoff, and a display that waits for one request at most.
+
+Requires asyncio and adafruit_ticks from the CircuitPython library bundle,
+and the adafruit_requests.py with the keep-alive pool from this folder's lib.
+"""
+
+import time
+
+import asyncio
+
+# Seconds the other tasks get after each request before the next one starts
+REQUEST_GAP = 0.05
+
+
+class HTTPError(ValueError):
+    """An error status from the server, kept in ``status``."""
+
+    def __init__(self, status, body):
+        super().__init__(f"HTTP {status}: {body}")
+        self.status = status
+
+
+class Endpoint:
+    """One API to poll.
+
+    :param str name: Label used in log messages.
+    :param url: The URL, or a function returning it, called before each request.
+    :param parse: Called with the decoded JSON, its result becomes ``value``.
+      Raise KeyError or ValueError to reject a response.
+    :param headers: Request headers, or a function returning them. A function
+      returning None skips the request, for endpoints waiting on another one.
+    :param str data: Request body, sent with ``method="POST"``.
+    :param renew: Endpoint to fetch straight away when this one gets HTTP
+      401, such as the one that fetches its bearer token.
+    :param float period: Seconds between refreshes after a success.
+    :param float timeout: Socket timeout for the request, in seconds.
+    :param int retries: Attempts after a failure before waiting a full period.
+    :param float backoff: Seconds before the first retry, doubled each retry.
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-few-public-methods
+
+    def __init__(
+        self,
+        name,
+        url,
+        parse=None,
+        *,
+        headers=None,
+        data=None,
+        renew=None,
+        method="GET",
+        period=900,
+        timeout=20,
+        retries=3,
+        backoff=2,
+    ):
+        # pylint: disable=too-many-arguments
+        self.name = name
+        self.url = url
+        self.parse = parse
+        self.headers = headers
+        self.data = data
+        self.renew = renew
+        self.method = method
+        self.period = period
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.value = None
+        """Last good result of parse, None until the first success"""
+        self.updated = None
+        """time.monotonic() of the last success"""
+        self.error = None
+        """The exception from the last failed attempt, None after a success"""
+        self.failures = 0
+        """Failed attempts since the last success"""
+
+
+class FetchScheduler:
+    """Runs every endpoint's polling task, one request at a time.
+
+    :param session: An adafruit_requests.Session. Give it ``max_sockets`` to
+      fit the radio; two is plenty since requests never overlap.
+    :param endpoints: The Endpoint objects to poll.
+    :param on_update: Optional function called with an endpoint after each
+      success.
+    """
+
+    def __init__(self, session, endpoints, on_update=None):
+        self._session = session
+        self._lock = asyncio.Lock()
+        self.endpoints = endpoints
+        self.on_update = on_update
+
+    async def fetch(self, endpoint):
+        """Request and parse one endpoint. Returns the parsed value.
+
+        Waits for any other request to finish first. The request itself
+        blocks the event loop until the response has been read.
+        """
+        url = endpoint.url() if callable(endpoint.url) else endpoint.url
+        headers = endpoint.headers
+        if callable(headers):
+            headers = headers()
+            if headers is None:
+                raise ValueError("Waiting for another endpoint")
+        async with self._lock:
+            with self._session.request(
+                endpoint.method,
+                url,
+                data=endpoint.data,
+                headers=headers,
+                timeout=endpoint.timeout,
+            ) as response:
+                status = response.status_code
+                # Error bodies are not always JSON
+                decoded = response.text if status >= 400 else response.json()
+            # Still holding the lock, so tasks that woke during the request
+            # run before the next queued request blocks the loop again
+            await asyncio.sleep(REQUEST_GAP)
+        if status >= 400:
+            raise HTTPError(status, decoded)
+        return endpoint.parse(decoded) if endpoint.parse else decoded
+
+    async def refresh(self, endpoint):
+        """Fetch one endpoint now and record the outcome on it.
+
+        Returns True on success. A 401 answer also refreshes the endpoint's
+        ``renew`` endpoint, so the next retry goes out with new credentials.
+        """
+        try:
+            endpoint.value = await self.fetch(endpoint)
+        except (OSError, RuntimeError, ValueError, KeyError, IndexError) as exc:
+            endpoint.error = exc
+            endpoint.failures += 1
+            print(f"❌ {endpoint.name}: {exc!r}")
+            if endpoint.renew is not None and getattr(exc, "status", None) == 401:
+                await self.refresh(endpoint.renew)
+            return False
+        endpoint.error = None
+        endpoint.failures = 0
+        endpoint.updated = time.monotonic()
+        if self.on_update:
+            self.on_update(endpoint)
+        return True
+
+    async def poll(self, endpoint):
+        """Refresh one endpoint forever."""
+        while True:
+            delay = endpoint.period
+            if not await self.refresh(endpoint):
+                # Back off 1, 2, 4... times backoff, then wait out a period
+                attempt = endpoint.failures % (endpoint.retries + 1)
+                if attempt:
+                    delay = endpoint.backoff * 2 ** (attempt - 1)
+            await asyncio.sleep(delay)
+
+    async def run(self):
+        """Poll every endpoint forever, each on its own schedule."""
+        await asyncio.gather(*(self.poll(endpoint) for endpoint in self.endpoints))
@@ -33,6 +33,9 @@ print("CSV Parsing...")
 # Header currently unused, document for reference in case Steam changes it.
 header = ["DateLocal", "Game", "Adds", "Deletes", "PurchasesAndActivations", "Gifts"]
 
+# Scroll the title while the CSV is parsed, which can take a long time
+blue.fill(0)
+title = segments.Marquee(blue, "GAME APPID ALL TIME ADDS", loop=False)  # Intentionally generic demo
 sums = 0
 with open(PATH) as csvfile:
     sep = ","
@@ -41,14 +44,15 @@ with open(PATH) as csvfile:
             sep = line.strip()[4:]
             # print(f"Delimiter is {sep}")
     for line in csv.DictReader(csvfile, delimiter=sep):
+        title.update()
         try:
             sums += int(line['Adds'])
         except (TypeError, ValueError):
             pass
 print("Calculating Sums...")
-blue.fill(0)
-blue.brightness = 0.5
-blue.marquee("GAME APPID ALL TIME ADDS", loop=False)  # Intentionally generic demo
+# Let the title finish scrolling before showing the total
+while title.update():
+    time.sleep(title.time_to_next)
 blue.fill(0)
 time.sleep(2)
 blue.print(sums)
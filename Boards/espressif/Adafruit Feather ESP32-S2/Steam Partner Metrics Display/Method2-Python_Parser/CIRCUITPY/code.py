@@ -28,78 +28,34 @@ print_all = True  # Show full JSON serial response (for debugging)
 if print_all:
     print(json_object)
 
-while True:
-    # Show on blue alphanumeric display
-    blue.fill(0)
-    blue.marquee("ALL TIME ADDS", loop=False)  # Intentionally generic
-    time.sleep(3)
 
+def scroll(text):
+    """Scrolls text once, yielding the seconds until each next step"""
     blue.fill(0)
-    blue.marquee("GAME0", loop=False)  # Intentionally generic demo
-    time.sleep(1)
-    blue.fill(0)
-    blue.print(json_object['Game0'])
-    time.sleep(3)
+    scroller = segments.Marquee(blue, text, loop=False)
+    while scroller.update():
+        yield scroller.time_to_next
 
-    blue.fill(0)
-    blue.marquee("GAME1", loop=False)  # Intentionally generic demo
-    time.sleep(1)
-    blue.fill(0)
-    blue.print(json_object['Game1'])
-    time.sleep(3)
-
-    blue.fill(0)
-    blue.marquee("GAME2", loop=False)  # Intentionally generic demo
-    time.sleep(1)
-    blue.fill(0)
-    blue.print(json_object['Game2'])
-    time.sleep(3)
 
-    blue.fill(0)
-    blue.marquee("GAME3", loop=False)  # Intentionally generic demo
-    time.sleep(1)
-    blue.fill(0)
-    blue.print(json_object['Game3'])
-    time.sleep(3)
+def show_screens():
+    """Cycles the title and every game, yielding the seconds to wait"""
+    while True:
+        # Show on blue alphanumeric display
+        yield from scroll("ALL TIME ADDS")  # Intentionally generic
+        yield 3
+        for game in range(10):
+            yield from scroll(f"GAME{game}")  # Intentionally generic demo
+            yield 1
+            blue.fill(0)
+            blue.print(json_object[f"Game{game}"])
+            yield 3
 
-    blue.fill(0)
-    blue.marquee("GAME4", loop=False)  # Intentionally generic demo
-    time.sleep(1)
-    blue.fill(0)
-    blue.print(json_object['Game4'])
-    time.sleep(3)
 
-    blue.fill(0)
-    blue.marquee("GAME5", loop=False)  # Intentionally generic demo
-    time.sleep(1)
-    blue.fill(0)
-    blue.print(json_object['Game5'])
-    time.sleep(3)
-
-    blue.fill(0)
-    blue.marquee("GAME6", loop=False)  # Intentionally generic demo
-    time.sleep(1)
-    blue.fill(0)
-    blue.print(json_object['Game6'])
-    time.sleep(3)
-
-    blue.fill(0)
-    blue.marquee("GAME7", loop=False)  # Intentionally generic demo
-    time.sleep(1)
-    blue.fill(0)
-    blue.print(json_object['Game7'])
-    time.sleep(3)
-
-    blue.fill(0)
-    blue.marquee("GAME8", loop=False)  # Intentionally generic demo
-    time.sleep(1)
-    blue.fill(0)
-    blue.print(json_object['Game8'])
-    time.sleep(3)
-
-    blue.fill(0)
-    blue.marquee("GAME9", loop=False)  # Intentionally generic demo
-    time.sleep(1)
-    blue.fill(0)
-    blue.print(json_object['Game9'])
-    time.sleep(3)
+screens = show_screens()
+next_step = time.monotonic()
+while True:
+    now = time.monotonic()
+    if now >= next_step:
+        next_step = now + next(screens)
+    # Nothing here waits on the display, other work can run in this loop
+    time.sleep(0.01)
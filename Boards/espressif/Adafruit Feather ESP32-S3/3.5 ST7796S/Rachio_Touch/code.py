@@ -129,10 +129,10 @@ display_bus = fourwire.FourWire(spi, command=tft_dc, chip_select=tft_cs, reset=t
 display = ST7796S(display_bus, width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT, rotation=DISPLAY_ROTATION)
 
 # Touch calibration
-TOUCH_X_MIN = 150
-TOUCH_X_MAX = 2000
-TOUCH_Y_MIN = 150
-TOUCH_Y_MAX = 2000
+TOUCH_X_MIN = 300
+TOUCH_X_MAX = 4000
+TOUCH_Y_MIN = 300
+TOUCH_Y_MAX = 4000
 
 touch = Touch(
     spi=spi,
@@ -580,11 +580,6 @@ menu_button_group.append(menu_button)
 
 display.root_group = main_group
 
-def map_touch_to_display(raw_x, raw_y, x_min=TOUCH_X_MIN, x_max=TOUCH_X_MAX, y_min=TOUCH_Y_MIN, y_max=TOUCH_Y_MAX):
-    mapped_x = DISPLAY_WIDTH * (raw_x - x_min) // (x_max - x_min)
-    mapped_y = DISPLAY_HEIGHT * (raw_y - y_min) // (y_max - y_min)
-    return mapped_x, mapped_y
-    
 def usb_battery_monitor(usb_sense):
     """ Set battery icon and voltage label """
     try:
@@ -726,9 +721,9 @@ def group_cleanup():
 
 def menu_switching(current_group, item1_target, item2_target, item3_target,):
     """ Touchscreen Popout Menu for root_group_switch """
-    touch_point = touch.raw_touch()
+    touch_point = touch.touch_point
     if touch_point is not None:
-        mapped_x, mapped_y = map_touch_to_display(touch_point[0], touch_point[1])
+        mapped_x, mapped_y = touch_point[0], touch_point[1]
         mapped_touch_point = (mapped_x, mapped_y)
         
         if menu_button.contains(mapped_touch_point):
@@ -970,10 +965,9 @@ while True:
                 usb_sense = supervisor.runtime.usb_connected
                 usb_battery_monitor(usb_sense)
 
-                touch_point = touch.raw_touch()
+                touch_point = touch.touch_point
                 if touch_point is not None:
-                    raw_x, raw_y = touch_point
-                    mapped_x, mapped_y = map_touch_to_display(raw_x, raw_y)
+                    mapped_x, mapped_y = touch_point[0], touch_point[1]
                     mapped_touch_point = (mapped_x, mapped_y)
                     if mapped_touch_point:
                         show_menu()
@@ -1100,10 +1094,9 @@ while True:
                               
             print("Entering Touch Loop")
             while (time.monotonic() - last) <= SLEEP_TIME and display.root_group is deviceinfo_group:
-                touch_point = touch.raw_touch()
+                touch_point = touch.touch_point
                 if touch_point is not None:
-                    raw_x, raw_y = touch_point
-                    mapped_x, mapped_y = map_touch_to_display(raw_x, raw_y)
+                    mapped_x, mapped_y = touch_point[0], touch_point[1]
                     mapped_touch_point = (mapped_x, mapped_y)
                     if mapped_touch_point:
                         menu_switching(deviceinfo_group, main_group, deviceinfo_group, wifi_credentials_group)
@@ -1175,10 +1168,9 @@ while True:
                 
             print("Entering Touch Loop")
             while (time.monotonic() - last) <= SLEEP_TIME and display.root_group is wifi_credentials_group:
-                touch_point = touch.raw_touch()
+                touch_point = touch.touch_point
                 if touch_point is not None:
-                    raw_x, raw_y = touch_point
-                    mapped_x, mapped_y = map_touch_to_display(raw_x, raw_y)
+                    mapped_x, mapped_y = touch_point[0], touch_point[1]
                     mapped_touch_point = (mapped_x, mapped_y)
                     if mapped_touch_point:
                         menu_switching(wifi_credentials_group, main_group, deviceinfo_group, wifi_credentials_group)
@@ -3,11 +3,35 @@ XPT2046 Touch module for CircuitPython
 Modified by DJDevon3 2024
 Modified from xpt2046.py of rdagger/micropython-ili9341
 https://github.com/rdagger/micropython-ili9341/blob/master/xpt2046.py
+
+Each sample reads Z1, Z2, X and Y in a single SPI transaction. Samples are
+gated on pressure, median and IIR filtered, then mapped to the display with
+either the min/max calibration or a 3-point affine calibration matrix.
+The min/max calibration is only known for rotations 0 and 180; 90 and 270
+need the calibration matrix.
+With int_pin wired to the controller's PENIRQ output the SPI bus is only
+used while the pen is down.
 """
-from time import sleep
+from micropython import const
 import digitalio
 from adafruit_bus_device.spi_device import SPIDevice
 
+# Pressure (z1 + 4095 - z2) below this is treated as no touch
+Z_THRESHOLD = const(400)
+
+# Samples taken back to back by get_touch
+SAMPLES = const(5)
+
+
+def _median3(a, b, c):
+    """Median of three values without allocating."""
+    if a > b:
+        a, b = b, a
+    if b > c:
+        b = c
+    return a if a > b else b
+
+
 class Touch(object):
     """Serial interface for XPT2046 Touch Screen Controller."""
 
@@ -24,138 +48,271 @@ class Touch(object):
     GET_TEMP1 = const(0b11110000)  # Temperature 1
     GET_BATTERY = const(0b10100000)  # Battery monitor
     GET_AUX = const(0b11100000)  # Auxiliary input to ADC
-    
-    """ For interrupt pin support
-    def __init__(self, spi, cs, int_pin=None, int_handler=None,
-                 width=240, height=320,
-                 x_min=100, x_max=1962, y_min=100, y_max=1900):
-    """
-    
+
+    # Z1, Z2, X and Y in one transaction. Each command is clocked in
+    # while the low byte of the previous result is clocked out, so
+    # result n is in bytes 2n + 1 and 2n + 2.
+    _BATCH = bytes((GET_Z1, 0, GET_Z2, 0, GET_X, 0, GET_Y, 0, 0))
+
     def __init__(self, spi, cs, width, height, rotation=0,
-                 x_min=100, x_max=1996, y_min=100, y_max=1996):
+                 x_min=200, x_max=3992, y_min=200, y_max=3992,
+                 int_pin=None, calibration=None,
+                 z_threshold=Z_THRESHOLD, smoothing=1):
         """Initialize touch screen controller.
 
         Args:
             spi (Class Spi):  SPI interface for OLED
             cs (Class Pin):  Chip select pin
-            int_pin (Class Pin):  Touch controller interrupt pin
-            int_handler (function): Handler for screen interrupt
             width (int): Width of LCD screen
             height (int): Height of LCD screen
+            rotation (int): Display rotation, 0 or 180, or 90 and 270
+                together with calibration
             x_min (int): Minimum x coordinate
             x_max (int): Maximum x coordinate
             y_min (int): Minimum Y coordinate
             y_max (int): Maximum Y coordinate
+                The min/max values are full 12-bit readings (0-4095). Older
+                versions of this driver halved every reading and defaulted
+                to 100-1996, so double any calibration measured with them.
+            int_pin (Class Pin): Touch controller PENIRQ pin, optional
+            calibration (tuple): Affine matrix (a, b, c, d, e, f) from
+                compute_calibration, used instead of the min/max values
+            z_threshold (int): Minimum pressure counted as a touch
+            smoothing (int): IIR filter strength, each new sample moves
+                the output 1/2**smoothing of the way. 0 disables it.
         """
         self.spi = spi
 
         self.cs_io = digitalio.DigitalInOut(cs)
         self.cs_io.direction = digitalio.Direction.OUTPUT
-        self.cs_io.value=1
+        self.cs_io.value = 1
         self.device = SPIDevice(self.spi, self.cs_io)
-        
+
+        self.int_io = None
+        if int_pin is not None:
+            self.int_io = digitalio.DigitalInOut(int_pin)
+            self.int_io.direction = digitalio.Direction.INPUT
+            self.int_io.pull = digitalio.Pull.UP
+
         self.rx_buf = bytearray(3)  # Receive buffer
         self.tx_buf = bytearray(3)  # Transmit buffer
+        self.batch_buf = bytearray(len(self._BATCH))
         self.width = width
         self.height = height
         self.rotation = rotation
+        self.calibration = calibration
+        self.z_threshold = z_threshold
+        self.smoothing = smoothing
+
+        # Last batched reading
+        self.z1 = self.z2 = self.x = self.y = 0
+        # Filter state: the last three raw samples per axis and the output
+        self._history_x = [0, 0, 0]
+        self._history_y = [0, 0, 0]
+        # get_touch burst, sorted in place for its median
+        self._burst_x = [0] * SAMPLES
+        self._burst_y = [0] * SAMPLES
+        self._filtered_x = self._filtered_y = 0
+        self._count = 0
 
         # Set calibration
         self.x_min = x_min
         self.x_max = x_max
         self.y_min = y_min
         self.y_max = y_max
-        
-        if self.rotation == 0:
-            self.x_multiplier = width / (x_max - x_min)
-            self.x_add = x_min * -self.x_multiplier
-            self.y_multiplier = height / (y_max - y_min)
-            self.y_add = y_min * -self.y_multiplier
-        elif self.rotation == 90:
-            # Interpolate over different dimensions of the screen             
-            self.x_multiplier = height / (x_max - x_min)
-            self.x_add = x_min * -self.x_multiplier
-            self.y_multiplier = width / (y_max - y_min)
-            self.y_add = y_min * -self.y_multiplier
-        elif self.rotation == 180:
-            # Interpolate over different dimensions of the screen             
-            self.x_multiplier = width / (x_max - x_min)
-            self.x_add = x_min * -self.x_multiplier
-            self.y_multiplier = height / (y_max - y_min)
-            self.y_add = y_min * -self.y_multiplier
-        
+
+        if rotation not in (0, 180) and calibration is None:
+            # Only 0 and 180 have been checked against a panel
+            raise ValueError("Rotation %d needs a calibration matrix" % rotation)
+        self.x_multiplier = width / (x_max - x_min)
+        self.y_multiplier = height / (y_max - y_min)
+        self.x_add = x_min * -self.x_multiplier
+        self.y_add = y_min * -self.y_multiplier
+
+    @staticmethod
+    def compute_calibration(touch_points, display_points):
+        """Solve the affine calibration matrix from three touches.
+
+        Args:
+            touch_points: Three (x, y) raw readings from read_batch
+            display_points: The three (x, y) display targets touched
+        Returns:
+            tuple: (a, b, c, d, e, f) with display x = a*x + b*y + c
+            and display y = d*x + e*y + f
+        """
+        (x0, y0), (x1, y1), (x2, y2) = touch_points
+        det = x0 * (y1 - y2) - x1 * (y0 - y2) + x2 * (y0 - y1)
+        if det == 0:
+            raise ValueError("Calibration points must not be in a line")
+        matrix = []
+        for axis in (0, 1):
+            t0, t1, t2 = (point[axis] for point in display_points)
+            matrix.append((t0 * (y1 - y2) - t1 * (y0 - y2) + t2 * (y0 - y1)) / det)
+            matrix.append((x0 * (t1 - t2) - x1 * (t0 - t2) + x2 * (t0 - t1)) / det)
+            matrix.append((x0 * (y1 * t2 - y2 * t1) - x1 * (y0 * t2 - y2 * t0)
+                           + x2 * (y0 * t1 - y1 * t0)) / det)
+        return tuple(matrix)
+
+    @property
+    def pen_down(self):
+        """True while PENIRQ reports a touch, None without int_pin."""
+        if self.int_io is None:
+            return None
+        return not self.int_io.value
+
+    def read_batch(self):
+        """Read Z1, Z2, X and Y in one SPI transaction.
+
+        Results are stored in z1, z2, x and y.
+
+        Returns:
+            int: Touch pressure, z1 + 4095 - z2, or 0 with no touch
+        """
+        buf = self.batch_buf
+        with self.device as spi:
+            spi.write_readinto(self._BATCH, buf)
+        self.z1 = ((buf[1] << 8) | buf[2]) >> 3
+        self.z2 = ((buf[3] << 8) | buf[4]) >> 3
+        self.x = ((buf[5] << 8) | buf[6]) >> 3
+        self.y = ((buf[7] << 8) | buf[8]) >> 3
+        if self.z1 == 0:
+            return 0
+        return self.z1 + 4095 - self.z2
+
+    def _sample(self):
+        """Take one pressure gated sample into the filter.
+
+        Returns:
+            int: Pressure, or None when the pen is up
+        """
+        if self.int_io is not None and self.int_io.value:
+            self._count = 0
+            return None
+        z = self.read_batch()
+        if z < self.z_threshold:
+            self._count = 0
+            return None
+        history_x = self._history_x
+        history_y = self._history_y
+        count = self._count
+        if count == 0:
+            # Pen just went down: fill the window with this sample
+            history_x[1] = history_x[2] = self.x
+            history_y[1] = history_y[2] = self.y
+        history_x[count % 3] = self.x
+        history_y[count % 3] = self.y
+        self._count += 1
+        median_x = _median3(history_x[0], history_x[1], history_x[2])
+        median_y = _median3(history_y[0], history_y[1], history_y[2])
+        if count < 3:
+            # Until the window holds three real samples, a spike can win
+            # the median, so restart the IIR from it each time
+            self._filtered_x = median_x
+            self._filtered_y = median_y
+        else:
+            self._filtered_x += (median_x - self._filtered_x) >> self.smoothing
+            self._filtered_y += (median_y - self._filtered_y) >> self.smoothing
+        return z
+
+    @property
+    def raw_point(self):
+        """Filtered raw touch, in the orientation raw_touch reports.
+
+        For calibration: call it every pass of the main loop and track
+        the extremes. Like touch_point it reports nothing until three
+        samples are in the median window.
+
+        Returns:
+            tuple(int, int, int): X, Y, pressure, or None when not touched
+        """
+        z = self._sample()
+        if z is None or self._count < 3:
+            return None
+        x, y = self._oriented(self._filtered_x, self._filtered_y)
+        return x, y, z
+
+    @property
+    def touch_point(self):
+        """Filtered touch in display coordinates.
+
+        Call it every pass of the main loop, the filter runs across calls.
+        The first two passes after the pen goes down only fill the median
+        window, so a spike on first contact is never reported.
+
+        Returns:
+            tuple(int, int, int): X, Y, pressure, or None when not touched
+        """
+        z = self._sample()
+        if z is None or self._count < 3:
+            return None
+        x, y = self.to_display(self._filtered_x, self._filtered_y)
+        return x, y, z
+
     def get_touch(self):
-        """Take multiple samples to get accurate touch reading."""
-        timeout = 2  # set timeout to 2 seconds
-        confidence = 5
-        buff = [[0, 0] for x in range(confidence)]
-        buf_length = confidence  # Require a confidence of 5 good samples
-        buffptr = 0  # Track current buffer position
-        nsamples = 0  # Count samples
-        while timeout > 0:
-            if nsamples == buf_length:
-                meanx = sum([c[0] for c in buff]) // buf_length
-                meany = sum([c[1] for c in buff]) // buf_length
-                dev = sum([(c[0] - meanx)**2 +
-                          (c[1] - meany)**2 for c in buff]) / buf_length
-                if dev <= 50:  # Deviation should be under margin of 50
-                    return self.normalize(meanx, meany)
-            # get a new value
-            sample = self.raw_touch()  # get a touch
-            if sample is None:
-                nsamples = 0    # Invalidate buff
-            else:
-                buff[buffptr] = sample  # put in buff
-                buffptr = (buffptr + 1) % buf_length  # Incr, until rollover
-                nsamples = min(nsamples + 1, buf_length)  # Incr. until max
-
-            sleep(.05)
-            timeout -= .05
-        return None
-    
+        """Take multiple samples to get accurate touch reading.
+
+        The median of the burst is used, so up to two spiked samples
+        out of five are ignored.
+
+        Returns:
+            tuple(int, int): X, Y in display coordinates, or None
+        """
+        # The burst stands alone, touch_point restarts its filter after it
+        self._count = 0
+        burst_x = self._burst_x
+        burst_y = self._burst_y
+        for index in range(SAMPLES):
+            if self._sample() is None:
+                return None
+            burst_x[index] = self.x
+            burst_y[index] = self.y
+            self._count = 0
+        burst_x.sort()
+        burst_y.sort()
+        return self.to_display(burst_x[SAMPLES // 2], burst_y[SAMPLES // 2])
+
+    def _oriented(self, x, y):
+        """Raw X,Y in the panel orientation the min/max values describe."""
+        if self.rotation == 0:
+            return y, x
+        return x, y
+
+    def to_display(self, x, y):
+        """Map raw X,Y values to display coordinates."""
+        if self.calibration is None:
+            return self.normalize(*self._oriented(x, y))
+        a, b, c, d, e, f = self.calibration
+        return int(a * x + b * y + c), int(d * x + e * y + f)
+
     def normalize(self, x, y):
         """Normalize mean X,Y values to match LCD screen."""
         x = int(self.x_multiplier * x + self.x_add)
         y = int(self.y_multiplier * y + self.y_add)
         return x, y
-        
+
     def get_pressure(self):
-        x = self.send_command(self.GET_X)
-        y = self.send_command(self.GET_Y)
-        z1 = self.send_command(self.GET_Z1)
-        z2 = self.send_command(self.GET_Z2)
-        #R_TOUCH = 400 * (0.49) * (z2 / z1 - 1)
-        if z1 is not 0:
-            R_TOUCH = 400 * (y / 4096) * (z2 / z1 - 1)
-            #print(y,z2, z1)
-            return R_TOUCH
-        else:
-            return None
-        
+        """Touch resistance in ohms, lower is firmer, None when untouched."""
+        self.read_batch()
+        if self.z1 != 0:
+            # R_TOUCH = R_X_PLATE * (X / 4096) * (Z2 / Z1 - 1)
+            return 400 * (self.x / 4096) * (self.z2 / self.z1 - 1)
+        return None
+
     def raw_touch(self):
         """Read raw X,Y touch values.
 
         Returns:
             tuple(int, int): X, Y
-        """ 
+        """
         # Raw values imply the display is in a factory orientation
         # regardless of rotation register, rotation or size param
         # All x,y,rotation adjustment math is based on these raws factory values
-        if self.rotation == 0:
-            y = self.send_command(self.GET_X)
-            x = self.send_command(self.GET_Y)
-        if self.rotation == 180:
-            x = self.send_command(self.GET_X)
-            y = self.send_command(self.GET_Y)
-        # Calibration
-#        if x > 0 and x < 2047:
-#            if y > 0 and y < 2047:
-#                print(x, y)
+        self.read_batch()
+        x, y = self._oriented(self.x, self.y)
 
         if self.x_min <= x <= self.x_max and self.y_min <= y <= self.y_max:
             return (x, y)
-        else:
-            return None
+        return None
 
     def send_command(self, command):
         """Write command to XT2046 (MicroPython).
@@ -171,4 +328,4 @@ class Touch(object):
         with self.device as spi:
             spi.write_readinto(self.tx_buf, self.rx_buf)
 
-        return (self.rx_buf[1] << 4) | (self.rx_buf[2] >> 4)
\ No newline at end of file
+        return ((self.rx_buf[1] << 8) | self.rx_buf[2]) >> 3
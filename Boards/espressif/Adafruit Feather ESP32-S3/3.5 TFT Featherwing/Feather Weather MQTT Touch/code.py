@@ -192,11 +192,26 @@ def _format_time(datetime):
 
 splash_label.text = "Loading Fonts..."
 # Fonts are optional
-forkawesome_font = bitmap_font.load_font("/fonts/forkawesome-12.pcf")
-arial_font = bitmap_font.load_font("/fonts/Arial-16.bdf")
-small_font = bitmap_font.load_font("/fonts/GoodTimesRg-Regular-16.bdf")
-medium_font = bitmap_font.load_font("/fonts/GoodTimesRg-Regular-40.bdf")
-huge_font = bitmap_font.load_font("/fonts/GoodTimesRg-Regular-121.bdf")
+# Each font comes up with the glyphs its main page labels show, so the first
+# weather update does not stop to read them. BDF glyph offsets are kept in
+# .idx files beside the fonts whenever CIRCUITPY is writable.
+fonts, font_load_ms = bitmap_font.load_fonts(
+    {
+        # Soft keyboard icons are loaded when the keyboard is built
+        "forkawesome": ("/fonts/forkawesome-12.pcf", ""),
+        "arial": ("/fonts/Arial-16.bdf", "0123456789.-% mphv<>"),
+        "small": ("/fonts/GoodTimesRg-Regular-16.bdf", "0123456789/: °FHumidityPressure"),
+        "medium": ("/fonts/GoodTimesRg-Regular-40.bdf", "0123456789.-% "),
+        "huge": ("/fonts/GoodTimesRg-Regular-121.bdf", "0123456789.-"),
+    },
+    index=True,
+)
+print(f"Font load ms: {font_load_ms}")
+forkawesome_font = fonts["forkawesome"]
+arial_font = fonts["arial"]
+small_font = fonts["small"]
+medium_font = fonts["medium"]
+huge_font = fonts["huge"]
 
 splash_label.text = "Loading Font Colors..."
 # Quick Colors for Labels
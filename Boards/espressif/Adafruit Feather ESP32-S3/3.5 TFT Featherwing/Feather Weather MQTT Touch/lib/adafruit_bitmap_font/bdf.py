@@ -0,0 +1,329 @@
+# SPDX-FileCopyrightText: 2019 Scott Shawcroft for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`adafruit_bitmap_font.bdf`
+====================================================
+
+Loads BDF format fonts.
+
+* Author(s): Scott Shawcroft
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://github.com/adafruit/circuitpython/releases
+
+"""
+
+try:
+    from typing import Union, Optional, Tuple, Iterable
+    from io import FileIO
+    from displayio import Bitmap
+except ImportError:
+    pass
+
+import gc
+import struct
+from fontio import Glyph
+from .glyph_cache import GlyphCache
+
+__version__ = "0.0.0+auto.0"
+__repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Bitmap_Font.git"
+
+
+# Sidecar index layout: magic, font file size, ascent, descent, point size,
+# x resolution, y resolution, glyph count, followed by one
+# (code point, STARTCHAR offset) pair per glyph.
+_INDEX_MAGIC = b"BDFj"
+_INDEX_HEADER = "<4sIhhhhhI"
+_INDEX_ENTRY = "<II"
+_NO_METRIC = -32768
+
+
+class BDF(GlyphCache):
+    """Loads glyphs from a BDF file in the given bitmap_class.
+
+    The first lookup scans the file once and records the byte offset of every
+    ``STARTCHAR`` so each later glyph load is a single seek. Pass ``index_path``
+    to keep that table in a sidecar file that is reused while the font file
+    size stays the same.
+    """
+
+    def __init__(
+        self, f: FileIO, bitmap_class: Bitmap, index_path: Optional[str] = None
+    ) -> None:
+        super().__init__()
+        self.file = f
+        self.name = f
+        self.file.seek(0)
+        self.bitmap_class = bitmap_class
+        line = self._readline_file()
+        if not line or not line.startswith("STARTFONT 2.1"):
+            raise ValueError("Unsupported file version")
+        self._verify_bounding_box()
+        self.point_size = None
+        self.x_resolution = None
+        self.y_resolution = None
+        self._ascent = None
+        self._descent = None
+        self._index = None
+        self._index_path = index_path
+        if index_path is not None:
+            self._load_index()
+
+    @property
+    def descent(self) -> Optional[int]:
+        """The number of pixels below the baseline of a typical descender"""
+        if self._index is None:
+            self._build_index()
+        return self._descent
+
+    @property
+    def ascent(self) -> Optional[int]:
+        """The number of pixels above the baseline of a typical ascender"""
+        if self._index is None:
+            self._build_index()
+        return self._ascent
+
+    def _verify_bounding_box(self) -> None:
+        """Private function to verify FOUNTBOUNDINGBOX parameter
+        This function will parse the first 10 lines of the font source
+        file to verify the value or raise an exception in case is not found
+        """
+        self.file.seek(0)
+        # Normally information about the FONT is in the first four lines.
+        # Exception is when font file have a comment. Comments are three lines
+        # 10 lines is a safe bet
+        for _ in range(11):
+            line = self._readline_file()
+            while line.startswith("COMMENT "):
+                line = self._readline_file()
+            if line.startswith("FONTBOUNDINGBOX "):
+                _, x, y, x_offset, y_offset = line.split()
+                self._boundingbox = (int(x), int(y), int(x_offset), int(y_offset))
+
+        try:
+            self._boundingbox
+        except AttributeError as error:
+            raise RuntimeError(
+                "Source file does not have the FOUNTBOUNDINGBOX parameter"
+            ) from error
+
+    def _readline_file(self) -> str:
+        line = self.file.readline()
+        return str(line, "utf-8")
+
+    def _file_size(self) -> int:
+        return self.file.seek(0, 2)
+
+    def _build_index(self, wanted: Optional[set] = None) -> None:
+        """Scan the whole file once, recording where each glyph starts along
+        with the font-wide properties that live in the header. Glyphs in
+        ``wanted`` are decoded as the scan reaches them."""
+        index = {}
+        position = 0
+        start = 0
+        self.file.seek(0)
+        while True:
+            line = self.file.readline()
+            if not line:
+                break
+            if line.startswith(b"STARTCHAR"):
+                start = position
+            elif line.startswith(b"ENCODING"):
+                code_point = int(line.split()[1])
+                if code_point >= 0:
+                    index[code_point] = start
+                if wanted and code_point in wanted:
+                    glyph = self._load_glyph(start)
+                    if glyph is not None:
+                        self._add_glyph(code_point, glyph)
+                    position = self.file.tell()
+                    continue
+            elif line.startswith(b"FONT_ASCENT "):
+                self._ascent = int(line.split()[1])
+            elif line.startswith(b"FONT_DESCENT "):
+                self._descent = int(line.split()[1])
+            elif line.startswith(b"SIZE"):
+                _, self.point_size, self.x_resolution, self.y_resolution = line.split()
+            position += len(line)
+        self._index = index
+        if self._index_path is not None:
+            self._save_index()
+
+    def _load_index(self) -> None:
+        header_size = struct.calcsize(_INDEX_HEADER)
+        entry_size = struct.calcsize(_INDEX_ENTRY)
+        try:
+            with open(self._index_path, "rb") as index_file:
+                header = index_file.read(header_size)
+                if len(header) != header_size:
+                    return
+                (
+                    magic,
+                    font_size,
+                    ascent,
+                    descent,
+                    point_size,
+                    x_resolution,
+                    y_resolution,
+                    count,
+                ) = struct.unpack(_INDEX_HEADER, header)
+                if magic != _INDEX_MAGIC or font_size != self._file_size():
+                    return
+                entries = index_file.read(entry_size * count)
+        except OSError:
+            return
+        if len(entries) != entry_size * count:
+            return
+        index = {}
+        for i in range(count):
+            code_point, offset = struct.unpack_from(
+                _INDEX_ENTRY, entries, i * entry_size
+            )
+            index[code_point] = offset
+        self._ascent = None if ascent == _NO_METRIC else ascent
+        self._descent = None if descent == _NO_METRIC else descent
+        # SIZE values are kept as the bytes a full scan reads from the file
+        if point_size != _NO_METRIC:
+            self.point_size = bytes(str(point_size), "utf-8")
+            self.x_resolution = bytes(str(x_resolution), "utf-8")
+            self.y_resolution = bytes(str(y_resolution), "utf-8")
+        self._index = index
+
+    def _save_index(self) -> None:
+        entry_size = struct.calcsize(_INDEX_ENTRY)
+        buffer = bytearray(entry_size * len(self._index))
+        for i, code_point in enumerate(self._index):
+            struct.pack_into(
+                _INDEX_ENTRY,
+                buffer,
+                i * entry_size,
+                code_point,
+                self._index[code_point],
+            )
+        point_size, x_resolution, y_resolution = self._size_metrics()
+        header = struct.pack(
+            _INDEX_HEADER,
+            _INDEX_MAGIC,
+            self._file_size(),
+            _NO_METRIC if self._ascent is None else self._ascent,
+            _NO_METRIC if self._descent is None else self._descent,
+            point_size,
+            x_resolution,
+            y_resolution,
+            len(self._index),
+        )
+        # CIRCUITPY is read-only to code.py unless boot.py remounts it, so a
+        # missing sidecar is not an error; the index is simply rebuilt next time.
+        try:
+            with open(self._index_path, "wb") as index_file:
+                index_file.write(header)
+                index_file.write(buffer)
+        except OSError:
+            pass
+
+    def _size_metrics(self) -> Tuple[int, int, int]:
+        try:
+            return (
+                int(self.point_size),
+                int(self.x_resolution),
+                int(self.y_resolution),
+            )
+        except (TypeError, ValueError):
+            # No SIZE line, or a fractional BDF 2.2 style value
+            return (_NO_METRIC, _NO_METRIC, _NO_METRIC)
+
+    def get_bounding_box(self) -> Tuple[int, int, int, int]:
+        """Return the maximum glyph size as a 4-tuple of: width, height, x_offset, y_offset"""
+        return self._boundingbox
+
+    def load_glyphs(self, code_points: Union[int, str, Iterable[int]]) -> None:
+        if isinstance(code_points, int):
+            remaining = set()
+            remaining.add(code_points)
+        elif isinstance(code_points, str):
+            remaining = set(ord(c) for c in code_points)
+        elif isinstance(code_points, set):
+            remaining = code_points
+        else:
+            remaining = set(code_points)
+        for code_point in remaining.copy():
+            if code_point in self._glyphs and self._glyphs[code_point]:
+                remaining.remove(code_point)
+        if not remaining:
+            return
+
+        if self._index is None:
+            # Cold font: build the index and decode the glyphs in the same pass
+            if len(remaining) > 1:
+                gc.collect()
+            self._build_index(remaining)
+            return
+
+        # Visit the glyphs in file order so the reads stay mostly forward.
+        offsets = sorted(
+            (self._index[code_point], code_point)
+            for code_point in remaining
+            if code_point in self._index
+        )
+        if not offsets:
+            return
+        # Only defragment ahead of a batch; single misses from get_glyph skip it
+        if len(offsets) > 1:
+            gc.collect()
+        for offset, code_point in offsets:
+            glyph = self._load_glyph(offset)
+            if glyph is not None:
+                self._add_glyph(code_point, glyph)
+
+    def _load_glyph(self, offset: int) -> Optional[Glyph]:
+        # pylint: disable=too-many-locals
+        bitmap = None
+        bounds = None
+        shift = None
+        width = 0
+        row_bits = 0
+        current_y = -1
+        self.file.seek(offset)
+        while True:
+            line = self.file.readline()
+            if not line or line.startswith(b"ENDCHAR"):
+                break
+            if current_y >= 0:
+                bits = int(line.strip(), 16)
+                start = current_y * width
+                for x in range(width):
+                    if bits & (1 << (row_bits - 1 - x)):
+                        bitmap[start + x] = 1
+                current_y += 1
+            elif line.startswith(b"BBX"):
+                _, x, y, x_offset, y_offset = line.split()
+                bounds = (int(x), int(y), int(x_offset), int(y_offset))
+                width = bounds[0]
+                row_bits = ((width + 7) // 8) * 8
+                bitmap = self.bitmap_class(bounds[0], bounds[1], 2)
+            elif line.startswith(b"DWIDTH"):
+                _, shift_x, shift_y = line.split()
+                shift = (int(shift_x), int(shift_y))
+            elif line.startswith(b"BITMAP"):
+                current_y = 0
+        if bounds is None or shift is None:
+            return None
+        return Glyph(
+            bitmap,
+            0,
+            bounds[0],
+            bounds[1],
+            bounds[2],
+            bounds[3],
+            shift[0],
+            shift[1],
+        )
@@ -0,0 +1,105 @@
+# SPDX-FileCopyrightText: 2019 Scott Shawcroft for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`adafruit_bitmap_font.bitmap_font`
+====================================================
+
+Loads bitmap glyphs from a variety of font.
+
+* Author(s): Scott Shawcroft
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://github.com/adafruit/circuitpython/releases
+
+"""
+
+try:
+    from typing import Dict, Iterable, Optional, Tuple, Union
+    from displayio import Bitmap
+    from . import bdf
+    from . import pbf
+    from . import pcf
+    from . import ttf
+except ImportError:
+    pass
+
+import time
+
+__version__ = "0.0.0+auto.0"
+__repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Bitmap_Font.git"
+
+
+def load_font(
+    filename: str, bitmap: Optional[Bitmap] = None, index: bool = False
+) -> Union[bdf.BDF, pbf.PBF, pcf.PCF, ttf.TTF]:
+    """Loads a font file. Returns None if unsupported.
+
+    With ``index`` set, BDF fonts keep their glyph offset table in a sidecar
+    file named ``filename + ".idx"`` so it is only built once.
+    """
+    # pylint: disable=import-outside-toplevel, redefined-outer-name, consider-using-with
+    if not bitmap:
+        import displayio
+
+        bitmap = displayio.Bitmap
+    font_file = open(filename, "rb")
+    first_four = font_file.read(4)
+    if filename.endswith("bdf") and first_four == b"STAR":
+        from . import bdf
+
+        return bdf.BDF(font_file, bitmap, filename + ".idx" if index else None)
+    if filename.endswith("pcf") and first_four == b"\x01fcp":
+        from . import pcf
+
+        return pcf.PCF(font_file, bitmap)
+    if filename.endswith("pbf") and first_four == b"PBF\x01":
+        from . import pbf
+
+        return pbf.PBF(font_file, bitmap)
+    if filename.endswith("ttf") and first_four == b"\x00\x01\x00\x00":
+        from . import ttf
+
+        return ttf.TTF(font_file, bitmap)
+
+    raise ValueError("Unknown magic number %r" % first_four)
+
+
+def prefetch(
+    font: Union[bdf.BDF, pbf.PBF, pcf.PCF], charset: Union[str, Iterable[int]]
+) -> float:
+    """Loads every glyph in ``charset`` up front so the first label refresh
+    does not stall on font reads. Returns the time taken in milliseconds."""
+    start = time.monotonic_ns()
+    font.load_glyphs(charset)
+    return (time.monotonic_ns() - start) / 1_000_000
+
+
+def load_fonts(
+    manifest: Dict[str, Tuple[str, Union[str, Iterable[int]]]],
+    bitmap: Optional[Bitmap] = None,
+    index: bool = False,
+) -> Tuple[Dict[str, Union[bdf.BDF, pbf.PBF, pcf.PCF]], Dict[str, float]]:
+    """Loads and warms several fonts at startup.
+
+    ``manifest`` maps a name to a ``(filename, charset)`` pair, for example
+    ``{"huge": ("/fonts/GoodTimesRg-Regular-121.bdf", "0123456789-.")}``.
+    Returns a dict of fonts and a dict of milliseconds spent on each, both
+    keyed by name.
+    """
+    fonts = {}
+    timings = {}
+    for name, (filename, charset) in manifest.items():
+        start = time.monotonic_ns()
+        fonts[name] = load_font(filename, bitmap, index)
+        prefetch(fonts[name], charset)
+        timings[name] = (time.monotonic_ns() - start) / 1_000_000
+    return fonts, timings
@@ -1,31 +1,147 @@
 # SPDX-FileCopyrightText: 2024 Tim Cocks, DJDevon3
 #
 # SPDX-License-Identifier: MIT
+"""
+`softkeyboard`
+================================================================================
 
+CircuitPython software defined keyboard for touch displays using a displayio TileGrid.
+
+
+* Author(s): Tim Cocks, DJDevon3
+
+Implementation Notes
+--------------------
+
+Every key is drawn once, at startup, into one shared atlas Bitmap shown by a
+single TileGrid with a tile per grid cell. Touches map to keys through a cell
+lookup table, and pressed keys are highlighted by drawing them into one of a
+few spare highlight tiles and pointing their cells at it.
+
+Drawing the keys makes construction slower than building a Label per key was,
+in exchange for nothing being redrawn per frame afterwards. Every key shows
+as soon as the keyboard does, so they can't be drawn later on first use.
+Construction only draws the divider lines and the label ink, into an atlas
+that starts out clear.
+
+**Hardware:**
+
+* Any touch capable display
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+
+"""
+
+# imports
 import json
 import time
-from displayio import Group
-from adafruit_display_text import label
-from adafruit_displayio_layout.layouts.grid_layout import GridLayout
-from adafruit_bitmap_font import bitmap_font
+import bitmaptools
+from displayio import Bitmap, Group, Palette, TileGrid
+
+__version__ = "0.0.0+auto.0"
+__repo__ = "https://github.com/Foamyguy/CircuitPython_SoftKeyboard.git"
+
 
 PRINTABLE_CHARACTERS = (
-    "`", "1", "2", "3", "4", "5", "6", "7", "8", "9", "0", "-", "=",
-    "A", "B", "C", "D", "E", "F", "G", "H", "I", "J", "K", "L", "M", "N", "O", "",
-    "P", "Q", "R", "S", "T", "U", "V", "W", "X", "Y", "Z", "a", "b", "c", "d", "e",
-    "f", "g", "h", "i", "j", "k", "l", "m", "n", "o", "",
-    "p", "q", "r", "s", "t", "u", "v", "w", "x", "y", "z", ",", ".", "/", "\\", "'",
-    "[", "]", ";", " "
+    "`",
+    "1",
+    "2",
+    "3",
+    "4",
+    "5",
+    "6",
+    "7",
+    "8",
+    "9",
+    "0",
+    "-",
+    "=",
+    "A",
+    "B",
+    "C",
+    "D",
+    "E",
+    "F",
+    "G",
+    "H",
+    "I",
+    "J",
+    "K",
+    "L",
+    "M",
+    "N",
+    "O",
+    "",
+    "P",
+    "Q",
+    "R",
+    "S",
+    "T",
+    "U",
+    "V",
+    "W",
+    "X",
+    "Y",
+    "Z",
+    "a",
+    "b",
+    "c",
+    "d",
+    "e",
+    "f",
+    "g",
+    "h",
+    "i",
+    "j",
+    "k",
+    "l",
+    "m",
+    "n",
+    "o",
+    "",
+    "p",
+    "q",
+    "r",
+    "s",
+    "t",
+    "u",
+    "v",
+    "w",
+    "x",
+    "y",
+    "z",
+    ",",
+    ".",
+    "/",
+    "\\",
+    "'",
+    "[",
+    "]",
+    ";",
+    " ",
 )
 
+# Atlas palette indices
+_CLEAR = 0  # transparent, looks better over background images
+_INK = 1  # white labels and cell dividers
+_SHIFT = 2  # blue background of the shift key while shift is on
+_LIT = 3  # green background of highlighted keys
+
+# Keys that can be highlighted at once
+HIGHLIGHT_SLOTS = 4
+
+
 class SoftKeyboard(Group):
     """
-    CircuitPython software defined keyboard for touch displays using displayio GridLayout.
+    CircuitPython software defined keyboard for touch displays using a displayio TileGrid.
 
-    :param int x: x location the layout should be placed. Pixel coordinates.
-    :param int y: y location the layout should be placed. Pixel coordinates.
-    :param int width: Width of the layout in pixels.
-    :param int height: Height of the layout in pixels.
+    :param int x: x location the keyboard should be placed. Pixel coordinates.
+    :param int y: y location the keyboard should be placed. Pixel coordinates.
+    :param int width: Width of the keyboard in pixels.
+    :param int height: Height of the keyboard in pixels.
     :param str character_font: Font for normal characters (terminalio.FONT)
     :param str symbol_font: Font for symbol characters (forkawesome_font)
     :param float keypress_cooldown: Time in seconds for keypress debounce.
@@ -33,129 +149,318 @@ class SoftKeyboard(Group):
     :param bool allow_sticky_repeat: Assistive sticky keys capability boolean
     :param str layout_config: Filename for JSON layout. None defaults to default_layout.json
 
+    Cells are width // columns by height // rows pixels.
     """
 
-    # pylint: disable=too-many-arguments
+    # pylint: disable=too-many-arguments,too-many-locals
     # pylint: disable=too-many-instance-attributes
-    
+
     DEFAULT_HIGHLIGHT_TIME = 0.2
     DEFAULT_KEYPRESS_COOLDOWN = 0.2
 
-    def __init__(self, x, y, width, height,
-                 character_font, symbol_font,
-                 keypress_cooldown=DEFAULT_KEYPRESS_COOLDOWN,
-                 highlight_duration=DEFAULT_HIGHLIGHT_TIME,
-                 allow_sticky_repeat=False, layout_config=None):
+    def __init__(
+        self,
+        x,
+        y,
+        width,
+        height,
+        character_font,
+        symbol_font,
+        keypress_cooldown=DEFAULT_KEYPRESS_COOLDOWN,
+        highlight_duration=DEFAULT_HIGHLIGHT_TIME,
+        allow_sticky_repeat=False,
+        layout_config=None,
+    ):
         super().__init__()
         self.shift_mode = False
         self.layout_config = layout_config
         lib_path = __file__
         lib_path = lib_path.split("/")[:-1]
         if self.layout_config is None:
-            f = open(f"{'/'.join(lib_path)}/default_layout.json", "r")
-        else:
-            f = open(f"{'/'.join(lib_path)}/{layout_config}", "r")
-        self.layout_config = json.loads(f.read())
-        # print(f"Layout Config: {layout_config}")
-
-        layout = GridLayout(
-            x=x,  # layout x
-            y=y,  # layout y
-            width=width,
-            height=height,
-            grid_size=tuple(self.layout_config['base_grid_size']),  # Grid Layout width,height
-            cell_padding=2,
-            divider_lines=True,  # divider lines around every cell
-            cell_anchor_point=(0.5, 0.5)
-        )
+            layout_config = "default_layout.json"
+        with open(f"{'/'.join(lib_path)}/{layout_config}", "r") as layout_file:
+            self.layout_config = json.loads(layout_file.read())
+
         self.highlight_duration = highlight_duration
         self.keypress_cooldown = keypress_cooldown
-        self._highlighted_views = []
         self.last_keypressed_time = -1
         self.keypress_debounced = None
         self.allow_sticky_repeat = allow_sticky_repeat
-        self.shift_key_view = None
 
+        cols, rows = self.layout_config["base_grid_size"]
+        self._cols = cols
+        self._rows = rows
+        self._cell_width = width // cols
+        self._cell_height = height // rows
+
+        # (first cell, col_span, key config, font, scale) of each key
+        self._keys = []
+        # (value, value with shift on) of each key
+        self._key_values = []
+        # Key number + 1 of each cell, 0 where there is no key
+        self._cell_keys = bytearray(cols * rows)
         for row_idx, row in enumerate(self.layout_config["rows"]):
-            cur_span_offset = 0
-            for col_idx, key in enumerate(row["keys"]):
+            col_idx = 0
+            for key in row["keys"]:
                 _font = character_font
-                if "font" in key:
-                    if key["font"] == "symbol_font":
-                        _font = symbol_font
-                _scale = 2
-                if "scale" in key:
-                    _scale = key["scale"]
-                l = label.Label(_font, scale=_scale, text=key["label"])
-                l.key_config = key
-                size = (1, 1)
-                if "col_span" in key:
-                    size = (key["col_span"], 1)
-
-                position = (col_idx + cur_span_offset, row_idx)
-                layout.add_content(l, grid_position=position, cell_size=size, layout_cells=False)
-                if "col_span" in key:
-                    cur_span_offset += key["col_span"] - 1
-        layout.layout_cells()
-        self.layout = layout
-        self.append(layout)
+                if key.get("font") == "symbol_font":
+                    _font = symbol_font
+                span = key.get("col_span", 1)
+                if col_idx + span > cols:
+                    raise ValueError(f"{row['name']} is wider than the grid")
+                cell = row_idx * cols + col_idx
+                self._keys.append((cell, span, key, _font, key.get("scale", 2)))
+                if "key_value" in key:
+                    self._key_values.append((key["key_value"], key["key_value"]))
+                else:
+                    self._key_values.append((key["label"].lower(), key["label"]))
+                for spanned in range(cell, cell + span):
+                    self._cell_keys[spanned] = len(self._keys)
+                col_idx += span
+
+        # The atlas has a tile per cell, in grid order, then rows of
+        # highlight slots, each as wide as the widest key.
+        self._max_span = max(key[1] for key in self._keys)
+        self._slots_per_row = cols // self._max_span
+        slot_rows = -(-HIGHLIGHT_SLOTS // self._slots_per_row)
+        self._atlas = Bitmap(
+            cols * self._cell_width, (rows + slot_rows) * self._cell_height, 4
+        )
+        palette = Palette(4)
+        palette[_INK] = 0xFFFFFF
+        palette[_SHIFT] = 0x0000FF
+        palette[_LIT] = 0x00FF00
+        palette.make_transparent(_CLEAR)
+        for key in range(len(self._keys)):
+            self._draw_key(key)
+
+        self.tile_grid = TileGrid(
+            self._atlas,
+            pixel_shader=palette,
+            width=cols,
+            height=rows,
+            tile_width=self._cell_width,
+            tile_height=self._cell_height,
+            x=x,
+            y=y,
+        )
+        for cell in range(cols * rows):
+            self.tile_grid[cell] = cell
+        self.append(self.tile_grid)
+
+        # Key number + 1 drawn in each slot, the background it was drawn on,
+        # and when it is unhighlighted, -1 when it is not showing.
+        self._slot_keys = bytearray(HIGHLIGHT_SLOTS)
+        self._slot_backgrounds = bytearray(HIGHLIGHT_SLOTS)
+        self._slot_until = [-1] * HIGHLIGHT_SLOTS
+        self._shift_slot = -1
 
     @property
     def height(self):
-        return self.layout.height
+        """
+        The height of the keyboard
+        :return:
+        """
+        return self._rows * self._cell_height
 
     @property
     def width(self):
-        return self.layout.width
+        """
+        The width of the keyboard
+        :return:
+        """
+        return self._cols * self._cell_width
+
+    def _key_box(self, key, tile):
+        """(left, top, right, bottom) in the atlas of a key starting at a tile."""
+        left = tile % self._cols * self._cell_width
+        top = tile // self._cols * self._cell_height
+        return (
+            left,
+            top,
+            left + self._keys[key][1] * self._cell_width,
+            top + self._cell_height,
+        )
+
+    def _draw_key(self, key):
+        """Draws a key's divider lines and label into its cells' tiles, which
+        must still be clear."""
+        tile, _, key_config, font, scale = self._keys[key]
+        atlas = self._atlas
+        left, top, right, bottom = self._key_box(key, tile)
+        bitmaptools.fill_region(atlas, left, top, right, top + 1, _INK)
+        bitmaptools.fill_region(atlas, left, bottom - 1, right, bottom, _INK)
+        bitmaptools.fill_region(atlas, left, top + 1, left + 1, bottom - 1, _INK)
+        bitmaptools.fill_region(atlas, right - 1, top + 1, right, bottom - 1, _INK)
+        left += 1
+        top += 1
+        right -= 1
+        bottom -= 1
+
+        glyphs = []
+        advance = 0
+        above = 0
+        below = 0
+        for char in key_config["label"]:
+            glyph = font.get_glyph(ord(char))
+            if glyph is None:
+                continue
+            glyphs.append(glyph)
+            advance += glyph.shift_x
+            above = max(above, glyph.height + glyph.dy)
+            below = max(below, -glyph.dy)
+
+        # Centre the text's ink in the key
+        pen_x = (left + right - advance * scale) // 2
+        baseline = (top + bottom - (above + below) * scale) // 2 + above * scale
+        for glyph in glyphs:
+            if glyph.width:
+                source = glyph.bitmap
+                across = source.width // glyph.width
+                source_x = glyph.tile_index % across * glyph.width
+                source_y = glyph.tile_index // across * glyph.height
+                glyph_x = pen_x + glyph.dx * scale
+                glyph_y = baseline - (glyph.height + glyph.dy) * scale
+                for row in range(glyph.height):
+                    y1 = max(glyph_y + row * scale, top)
+                    y2 = min(glyph_y + (row + 1) * scale, bottom)
+                    col = 0
+                    while col < glyph.width:
+                        if not source[source_x + col, source_y + row]:
+                            col += 1
+                            continue
+                        run = col
+                        while (
+                            col < glyph.width and source[source_x + col, source_y + row]
+                        ):
+                            col += 1
+                        x1 = max(glyph_x + run * scale, left)
+                        x2 = min(glyph_x + col * scale, right)
+                        if x1 < x2 and y1 < y2:
+                            bitmaptools.fill_region(atlas, x1, y1, x2, y2, _INK)
+            pen_x += glyph.shift_x * scale
+
+    def _slot_tile(self, slot):
+        """The first atlas tile of a highlight slot."""
+        return (self._rows + slot // self._slots_per_row) * self._cols + (
+            slot % self._slots_per_row
+        ) * self._max_span
+
+    def _show(self, key, tile):
+        """Shows a key's cells from the atlas, starting at a tile."""
+        cell = self._keys[key][0]
+        for offset in range(self._keys[key][1]):
+            self.tile_grid[cell + offset] = tile + offset
+
+    def _highlight(self, key, background):
+        """
+        Shows a key on a background in a highlight slot, reusing one it is
+        already in, else a free one, else the one due to be unhighlighted
+        first. The slot gets the background, then the key's tiles copied over
+        it without their clear pixels.
+        :return: the slot, -1 when there is none
+        """
+        slot = -1
+        for index in range(HIGHLIGHT_SLOTS):
+            if index == self._shift_slot:
+                continue
+            if (
+                self._slot_keys[index] == key + 1
+                and self._slot_backgrounds[index] == background
+            ):
+                slot = index
+                break
+            if slot < 0 or self._slot_until[index] < self._slot_until[slot]:
+                slot = index
+        if slot < 0:
+            return slot
+        if self._slot_until[slot] >= 0 and self._slot_keys[slot] != key + 1:
+            self._show(
+                self._slot_keys[slot] - 1, self._keys[self._slot_keys[slot] - 1][0]
+            )
+        if (
+            self._slot_keys[slot] != key + 1
+            or self._slot_backgrounds[slot] != background
+        ):
+            left, top, right, bottom = self._key_box(key, self._slot_tile(slot))
+            bitmaptools.fill_region(self._atlas, left, top, right, bottom, background)
+            source_left, source_top, source_right, source_bottom = self._key_box(
+                key, self._keys[key][0]
+            )
+            bitmaptools.blit(
+                self._atlas,
+                self._atlas,
+                left,
+                top,
+                x1=source_left,
+                y1=source_top,
+                x2=source_right,
+                y2=source_bottom,
+                skip_source_index=_CLEAR,
+            )
+            self._slot_keys[slot] = key + 1
+            self._slot_backgrounds[slot] = background
+        self._show(key, self._slot_tile(slot))
+        return slot
+
+    def _unhighlight(self, slot):
+        """Shows the key in a highlight slot normally again."""
+        key = self._slot_keys[slot] - 1
+        self._show(key, self._keys[key][0])
+        self._slot_until[slot] = -1
 
     def check_touches(self, touch_point):
+        """
+        Check the touch events and process any keys that have been pressed.
+        :param touch_point: tuple (x, y) or (x, y, pressure) coordinates of touch event
+        :return: The value of the key that was pressed. Either string or int.
+        """
         now = time.monotonic()
 
-        for _view, unhighlight_time in self._highlighted_views:
-            if now > unhighlight_time:
-                _view.color = 0xffffff
-                _view.background_color = None
-                # None looks better when used with background images
-
-        if touch_point:
-
-            # if sticky repeat is on, or if the most recent keypress has been debounced i.e. released
-            if self.allow_sticky_repeat or self.keypress_debounced:
-                touched_cell = self.layout.which_cell_contains(touch_point)
-                if touched_cell:
-                    if self.last_keypressed_time + self.keypress_cooldown < now:
-                        touched_cell_view = self.layout.get_cell(touched_cell)
-
-                        if not self.shift_mode:
-                            pressed_value = touched_cell_view.text.lower()
-                        else:
-                            pressed_value = touched_cell_view.text
-                            self.shift_mode = False
-                            self.shift_key_view.background_color = 0x000000
-                            
-                        print(touched_cell_view.key_config)
-                        if "key_value" in touched_cell_view.key_config:
-                            pressed_value = touched_cell_view.key_config["key_value"]
-
-                        print(f"key_text: {pressed_value}")
-
-                        self.last_keypressed_time = now
-                        self.keypress_debounced = False
-
-                        if pressed_value == 225:  # 0xE1 shift key
-                            self.shift_mode = not self.shift_mode
-                            if self.shift_mode:
-                                touched_cell_view.background_color = 0x0000ff
-                                self.shift_key_view = touched_cell_view
-                            else:
-                                touched_cell_view.background_color = 0x000000
-                        else:
-                            # non-special highlighting
-                            touched_cell_view.background_color = 0x00ff00
-                            touched_cell_view.color = 0x000000
-                            self._highlighted_views.append((touched_cell_view, now + self.keypress_cooldown))
-
-                        return pressed_value
-        # keypress is None
-        else:
+        for slot in range(HIGHLIGHT_SLOTS):
+            if 0 <= self._slot_until[slot] < now and slot != self._shift_slot:
+                self._unhighlight(slot)
+
+        if not touch_point:
+            # keypress is None
             self.keypress_debounced = True
+            return None
+        # if sticky repeat is on, or if most recent keypress has been debounced i.e. released
+        if not (self.allow_sticky_repeat or self.keypress_debounced):
+            return None
+        if self.last_keypressed_time + self.keypress_cooldown >= now:
+            return None
+        col = (int(touch_point[0]) - self.x - self.tile_grid.x) // self._cell_width
+        row = (int(touch_point[1]) - self.y - self.tile_grid.y) // self._cell_height
+        # touches outside on the edge of outer grid
+        if not (0 <= col < self._cols and 0 <= row < self._rows):
+            return None
+        key = self._cell_keys[row * self._cols + col] - 1
+        if key < 0:
+            return None
+
+        if not self.shift_mode:
+            pressed_value = self._key_values[key][0]
+        else:
+            pressed_value = self._key_values[key][1]
+            self.shift_mode = False
+            if self._shift_slot >= 0:
+                self._unhighlight(self._shift_slot)
+                self._shift_slot = -1
+
+        self.last_keypressed_time = now
+        self.keypress_debounced = False
+
+        if pressed_value == 225:  # 0xE1 shift key
+            self.shift_mode = not self.shift_mode
+            if self.shift_mode:
+                self._shift_slot = self._highlight(key, _SHIFT)
+                if self._shift_slot >= 0:
+                    self._slot_until[self._shift_slot] = -1
+        else:
+            # non-special highlighting
+            slot = self._highlight(key, _LIT)
+            if slot >= 0:
+                self._slot_until[slot] = now + self.highlight_duration
+
+        return pressed_value
@@ -0,0 +1,120 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+# Coded for Circuit Python 9.0
+"""MatrixPortal BDF glyph loading benchmark
+
+Times how long each font in /fonts takes to load the glyphs the weather
+labels actually use, first cold (glyph offset table built by scanning the
+file) and then warm (offset table read back from the .idx sidecar), and
+checks that a warm load reports the same font metrics as a cold one.
+
+Uses the indexed adafruit_bitmap_font .py sources in this project's lib.
+Runs on the board, or on a desktop from this folder:
+    python font_benchmark.py [path/to/fonts]
+On a desktop without Blinka, displayio.Bitmap and fontio.Glyph are replaced
+by small stand-ins.
+"""
+
+# pylint: disable=import-error, wrong-import-position, too-few-public-methods
+
+import os
+import sys
+import time
+
+try:
+    from displayio import Bitmap
+except ImportError:
+    import types
+    from collections import namedtuple
+
+    class Bitmap:
+        """displayio.Bitmap"""
+
+        def __init__(self, width, height, value_count):
+            self.width = width
+            self.height = height
+            self.value_count = value_count
+            self._data = bytearray(width * height)
+
+        def __setitem__(self, index, value):
+            self._data[index] = value
+
+    sys.modules["displayio"] = types.SimpleNamespace(Bitmap=Bitmap)
+    sys.modules["fontio"] = types.SimpleNamespace(
+        Glyph=namedtuple(
+            "Glyph",
+            "bitmap tile_index width height dx dy shift_x shift_y",
+        )
+    )
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "lib"))
+    sys.dont_write_bytecode = True
+
+from adafruit_bitmap_font import bdf
+
+FONT_DIR = sys.argv[1] if len(sys.argv) > 1 else "/fonts"
+if not os.path.isdir(FONT_DIR):
+    FONT_DIR = "fonts"
+# Characters the weather labels put on screen
+CHARSET = "0123456789.-%°:/ FCmphinHgPaAM"
+ROUNDS = 3
+
+
+def _elapsed_ms(start):
+    return (time.monotonic_ns() - start) / 1_000_000
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def metrics(font):
+    return (
+        font.ascent,
+        font.descent,
+        font.point_size,
+        font.x_resolution,
+        font.y_resolution,
+    )
+
+
+def bench_font(path):
+    """Returns (cold_ms, warm_ms, digit_reload_ms) for one BDF font."""
+    index_path = path + ".idx"
+    _remove(index_path)
+
+    start = time.monotonic_ns()
+    with open(path, "rb") as font_file:
+        font = bdf.BDF(font_file, Bitmap, index_path)
+        font.load_glyphs(CHARSET)
+        cold_metrics = metrics(font)
+        # SIZE values come back as the bytes read from the font, as before
+        assert font.point_size is None or isinstance(font.point_size, bytes)
+    cold = _elapsed_ms(start)
+
+    warm = 0
+    digits = 0
+    for _ in range(ROUNDS):
+        start = time.monotonic_ns()
+        with open(path, "rb") as font_file:
+            font = bdf.BDF(font_file, Bitmap, index_path)
+            font.load_glyphs(CHARSET)
+            warm += _elapsed_ms(start)
+            assert metrics(font) == cold_metrics, (metrics(font), cold_metrics)
+            # A label showing a new digit: one missing glyph at a time
+            font._glyphs.clear()  # pylint: disable=protected-access
+            start = time.monotonic_ns()
+            for digit in "0123456789":
+                font.get_glyph(ord(digit))
+            digits += _elapsed_ms(start)
+    return cold, warm / ROUNDS, digits / ROUNDS
+
+
+print(f"{'Font':<32}{'Cold ms':>10}{'Warm ms':>10}{'Digits ms':>11}")
+for name in sorted(os.listdir(FONT_DIR)):
+    if not name.endswith(".bdf"):
+        continue
+    results = bench_font(FONT_DIR + "/" + name)
+    print(f"{name:<32}{results[0]:>10.1f}{results[1]:>10.1f}{results[2]:>11.1f}")
@@ -0,0 +1,174 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""GIF decode benchmark: table driven decoder vs. the old bit-at-a-time one
+
+Desktop script, run with Blinka and this project's lib:
+    python gif_benchmark.py image1.gif image2.gif ...
+Reports decode throughput in pixels per second (the sum of every frame's
+width x height) and the average time per frame with the new decoder. The old
+loader, reproduced here as legacy_load, pulled LZW codes one bit at a time,
+built each dictionary entry as a new bytes object and wrote pixels one at a
+time. It cannot read interlaced images.
+"""
+
+import struct
+import sys
+import time
+import displayio
+from adafruit_imageload import gif
+
+ROUNDS = 3
+
+
+def legacy_load(file, *, bitmap, palette=None):
+    """The previous adafruit_imageload.gif.load, kept for comparison."""
+    # pylint: disable=too-many-locals,too-many-branches
+    if file.read(6) not in {b"GIF87a", b"GIF89a"}:
+        raise ValueError("Not a GIF file")
+    width, height, flags, _, _ = struct.unpack("<HHBBB", file.read(7))
+    pal = None
+    if flags & 0x80:
+        pal = palette(1 << ((flags & 0x07) + 1))
+        for i in range(len(pal)):
+            pal[i] = file.read(3)
+    bmp = bitmap(width, height, (1 << (((flags & 0x70) >> 4) + 1)) - 1)
+    while True:
+        block_type = file.read(1)[0]
+        if block_type == 0x2C:
+            left, top, frame_width, _, frame_flags = struct.unpack(
+                "<HHHHB", file.read(9)
+            )
+            if frame_flags & 0x40:
+                raise NotImplementedError("Interlacing not supported")
+            if frame_flags & 0x80:
+                file.read(3 << ((frame_flags & 0x07) + 1))
+            code_size = file.read(1)[0]
+            x = y = 0
+            for decoded in legacy_lzw_decode(read_blockstream(file), code_size):
+                for byte in decoded:
+                    bmp[left + x, top + y] = byte
+                    x += 1
+                    if x >= frame_width:
+                        x = 0
+                        y += 1
+        elif block_type == 0x21:
+            file.read(1)
+            bytes(read_blockstream(file))
+        elif block_type == 0x3B:
+            break
+        else:
+            raise ValueError("Bad block type")
+    return bmp, pal
+
+
+def read_blockstream(file):
+    """Yields a sub-block sequence one byte at a time."""
+    while True:
+        size = file.read(1)[0]
+        if size == 0:
+            break
+        for _ in range(size):
+            yield file.read(1)[0]
+
+
+def legacy_lzw_decode(data, code_size):
+    """Bit at a time LZW decoding with a list of bytes dictionary entries."""
+    clear_code = 1 << code_size
+    end_code = clear_code + 1
+    codes = []
+    last = b""
+    code_len = code_size + 1
+    bit = 0
+    byte = next(data, None)
+    while byte is not None:
+        code = 0
+        for i in range(code_len):
+            code |= ((byte >> bit) & 0x01) << i
+            bit += 1
+            if bit >= 8:
+                bit = 0
+                byte = next(data, None)
+                if byte is None:
+                    return
+        if code == clear_code:
+            codes = []
+            last = b""
+            code_len = code_size + 1
+            continue
+        if code == end_code:
+            for _ in data:
+                pass
+            return
+        if code < clear_code:
+            value = bytes([code])
+        elif code <= len(codes) + end_code:
+            value = codes[code - end_code - 1]
+        else:
+            value = last + last[0:1]
+        if last:
+            codes.append(last + value[0:1])
+        if len(codes) + end_code + 1 >= 1 << code_len and code_len < 12:
+            code_len += 1
+        last = value
+        yield value
+
+
+def count_pixels(path):
+    """Returns (frame count, total pixels over every frame) without decoding."""
+    frames = pixels = 0
+    with open(path, "rb") as file:
+        file.seek(10)
+        flags = file.read(3)[0]
+        if flags & 0x80:
+            file.seek(3 << ((flags & 0x07) + 1), 1)
+        while True:
+            block_type = file.read(1)[0]
+            if block_type == 0x2C:
+                _, _, width, height, frame_flags = struct.unpack("<HHHHB", file.read(9))
+                if frame_flags & 0x80:
+                    file.seek(3 << ((frame_flags & 0x07) + 1), 1)
+                file.read(1)
+                frames += 1
+                pixels += width * height
+            elif block_type == 0x21:
+                file.read(1)
+            elif block_type == 0x3B:
+                return frames, pixels
+            while True:
+                size = file.read(1)[0]
+                if size == 0:
+                    break
+                file.seek(size, 1)
+
+
+def measure(loader, path):
+    """Returns seconds per decode, or None if the loader can't read the file."""
+    elapsed = 0
+    for _ in range(ROUNDS):
+        with open(path, "rb") as file:
+            start = time.monotonic_ns()
+            try:
+                loader(file, bitmap=displayio.Bitmap, palette=displayio.Palette)
+            except NotImplementedError:
+                return None
+            elapsed += time.monotonic_ns() - start
+    return elapsed / ROUNDS / 1_000_000_000
+
+
+def describe(seconds, pixels):
+    """Formats a measure() result as a pixels per second table cell."""
+    if seconds is None:
+        return f"{'unsupported':>14}"
+    return f"{pixels / seconds:>14.0f}"
+
+
+print(f"{'Image':<28}{'Frames':>7}{'Old px/s':>14}{'New px/s':>14}{'ms/frame':>10}")
+for image_path in sys.argv[1:]:
+    name = image_path.rsplit("/", 1)[-1]
+    frame_count, pixel_count = count_pixels(image_path)
+    new = measure(gif.load, image_path)
+    print(
+        f"{name:<28}{frame_count:>7}"
+        f"{describe(measure(legacy_load, image_path), pixel_count)}"
+        f"{describe(new, pixel_count)}{new * 1000 / frame_count:>10.1f}"
+    )
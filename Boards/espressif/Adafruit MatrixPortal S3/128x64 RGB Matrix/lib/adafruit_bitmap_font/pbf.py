@@ -0,0 +1,174 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`adafruit_bitmap_font.pbf`
+====================================================
+
+Loads packed bitmap fonts (PBF) converted ahead of time from BDF or PCF.
+
+Every glyph in a PBF file is stored in a fixed size record, so its position
+is computed from the code point and a small range table that is read once
+when the font is opened. Loading a glyph is one seek and one read.
+
+File layout, all little endian:
+
+* header: magic ``b"PBF\\x01"``, ascent, descent, bounding box width,
+  height, x offset and y offset, range count, record size
+* range table: (first code point, glyph count, first record) per range
+* records: width, height, dx, dy, shift_x, shift_y followed by the bitmap,
+  one row per ``(width + 7) // 8`` bytes, most significant bit first.
+  Unused records have a width of 0xFFFF.
+
+* Author(s): DJDevon3
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://github.com/adafruit/circuitpython/releases
+
+"""
+
+try:
+    from typing import Union, Optional, Tuple, Iterable
+    from io import FileIO
+    from displayio import Bitmap
+except ImportError:
+    pass
+
+import gc
+import struct
+from fontio import Glyph
+from .glyph_cache import GlyphCache
+
+try:
+    from bitmaptools import readinto as _bitmap_readinto
+except ImportError:
+    _bitmap_readinto = None  # pylint: disable=invalid-name
+
+__version__ = "0.0.0+auto.0"
+__repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Bitmap_Font.git"
+
+MAGIC = b"PBF\x01"
+HEADER = "<4shhHHhhHI"
+RANGE = "<III"
+METRICS = "<HHhhhh"
+EMPTY = 0xFFFF
+
+
+class PBF(GlyphCache):
+    """Loads glyphs from a packed bitmap font file in the given bitmap_class."""
+
+    def __init__(self, f: FileIO, bitmap_class: Bitmap) -> None:
+        super().__init__()
+        self.file = f
+        self.name = f
+        self.bitmap_class = bitmap_class
+        f.seek(0)
+        header = f.read(struct.calcsize(HEADER))
+        (
+            magic,
+            self._ascent,
+            self._descent,
+            width,
+            height,
+            x_offset,
+            y_offset,
+            range_count,
+            self._record_size,
+        ) = struct.unpack(HEADER, header)
+        if magic != MAGIC:
+            raise ValueError("Unsupported file version")
+        self._bounding_box = (width, height, x_offset, y_offset)
+
+        range_size = struct.calcsize(RANGE)
+        table = f.read(range_size * range_count)
+        self._ranges = tuple(
+            struct.unpack_from(RANGE, table, i * range_size) for i in range(range_count)
+        )
+        self._data_offset = len(header) + len(table)
+        self._metrics_size = struct.calcsize(METRICS)
+        self._record = bytearray(self._record_size)
+
+    @property
+    def ascent(self) -> int:
+        """The number of pixels above the baseline of a typical ascender"""
+        return self._ascent
+
+    @property
+    def descent(self) -> int:
+        """The number of pixels below the baseline of a typical descender"""
+        return self._descent
+
+    def get_bounding_box(self) -> Tuple[int, int, int, int]:
+        """Return the maximum glyph size as a 4-tuple of: width, height, x_offset, y_offset"""
+        return self._bounding_box
+
+    def _record_offset(self, code_point: int) -> Optional[int]:
+        for first, count, record in self._ranges:
+            if first <= code_point < first + count:
+                record += code_point - first
+                return self._data_offset + record * self._record_size
+        return None
+
+    def load_glyphs(self, code_points: Union[int, str, Iterable[int]]) -> None:
+        if isinstance(code_points, int):
+            code_points = (code_points,)
+        elif isinstance(code_points, str):
+            code_points = [ord(c) for c in code_points]
+
+        offsets = []
+        for code_point in code_points:
+            if self._glyphs.get(code_point) is not None:
+                continue
+            offset = self._record_offset(code_point)
+            if offset is not None:
+                offsets.append((offset, code_point))
+        if not offsets:
+            return
+        offsets.sort()
+        if len(offsets) > 1:
+            gc.collect()
+        for offset, code_point in offsets:
+            glyph = self._load_glyph(offset)
+            if glyph is not None:
+                self._add_glyph(code_point, glyph)
+
+    def _load_glyph(self, offset: int) -> Optional[Glyph]:
+        self.file.seek(offset)
+        if _bitmap_readinto:
+            self.file.readinto(memoryview(self._record)[: self._metrics_size])
+        else:
+            self.file.readinto(self._record)
+        width, height, dx, dy, shift_x, shift_y = struct.unpack_from(
+            METRICS, self._record
+        )
+        if width == EMPTY:
+            return None
+        bitmap = self.bitmap_class(width, height, 2)
+        if _bitmap_readinto:
+            _bitmap_readinto(
+                bitmap,
+                self.file,
+                bits_per_pixel=1,
+                element_size=1,
+                reverse_pixels_in_element=True,
+            )
+        else:
+            record = self._record
+            row_bytes = (width + 7) // 8
+            start = 0
+            row = self._metrics_size
+            for _ in range(height):
+                for x in range(width):
+                    if record[row + (x >> 3)] & (0x80 >> (x & 7)):
+                        bitmap[start + x] = 1
+                start += width
+                row += row_bytes
+        return Glyph(bitmap, 0, width, height, dx, dy, shift_x, shift_y)
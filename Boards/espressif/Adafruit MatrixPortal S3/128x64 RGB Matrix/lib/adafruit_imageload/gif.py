@@ -10,23 +10,49 @@
 Load pixel values (indices or colors) into a bitmap and colors into a palette
 from a GIF file.
 
+`load` returns the image with every frame drawn. `frames` plays an animated
+GIF one frame at a time, honouring frame delays, transparency and disposal:
+
+.. code-block:: python
+
+    with open("/images/animation.gif", "rb") as file:
+        for bitmap, palette, delay in gif.frames(
+            file, bitmap=displayio.Bitmap, palette=displayio.Palette
+        ):
+            ...
+            time.sleep(delay)
+
 * Author(s): Radomir Dopieralski, Matt Land
 
 """
 
 import struct
+from array import array
 
 try:
-    from typing import Tuple, Iterator, Optional, List
+    from typing import Tuple, Iterator, Optional
     from io import BufferedReader
     from displayio import Palette, Bitmap
     from .displayio_types import PaletteConstructor, BitmapConstructor
 except ImportError:
     pass
 
+try:
+    import bitmaptools
+except ImportError:
+    bitmaptools = None  # pylint: disable=invalid-name
+
 __version__ = "0.0.0+auto.0"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_ImageLoad.git"
 
+_MAX_CODES = 4096
+# Distinct local color tables whose remap is kept while playing
+_REMAP_CACHE = 8
+
+# Disposal methods from the graphic control extension
+_DISPOSE_BACKGROUND = 2
+_DISPOSE_PREVIOUS = 3
+
 
 def load(
     file: BufferedReader,
@@ -44,134 +70,370 @@ def load(
     :param object palette: Type to store the palette. Must have API similar to
       `displayio.Palette`. Will be skipped if None.
     """
+    bitmap_obj = palette_obj = None
+    for bitmap_obj, palette_obj, _ in frames(file, bitmap=bitmap, palette=palette):
+        pass
+    return bitmap_obj, palette_obj
+
+
+def frames(
+    file: BufferedReader,
+    *,
+    bitmap: BitmapConstructor,
+    palette: Optional[PaletteConstructor] = None
+) -> Iterator[Tuple[Bitmap, Optional[Palette], float]]:
+    """Decodes a GIF from the open ``file`` one frame at a time.
+
+    Yields ``(bitmap, palette, delay)`` after each frame is drawn. The same
+    bitmap and palette objects are yielded every time, so they can be shown
+    in a `displayio.TileGrid` once and the screen updates as frames arrive.
+    ``delay`` is the number of seconds the frame should stay on screen.
+
+    :param io.BufferedReader file: Open file handle or compatible (like `io.BytesIO`)
+      with the data of a GIF file.
+    :param object bitmap: Type to store bitmap data. Must have API similar to `displayio.Bitmap`.
+    :param object palette: Type to store the palette. Must have API similar to
+      `displayio.Palette`. Will be skipped if None.
+    """
+    # pylint: disable=too-many-locals,too-many-branches
     header = file.read(6)
     if header not in {b"GIF87a", b"GIF89a"}:
         raise ValueError("Not a GIF file")
-    width, height, flags, _, _ = struct.unpack(  # pylint: disable=no-member
+    width, height, flags, background, _ = struct.unpack(  # pylint: disable=no-member
         "<HHBBB", file.read(7)
     )
+    palette_obj = colors = None
     if (flags & 0x80) != 0:
         if not palette:
             raise RuntimeError("palette argument required")
-        palette_size = 1 << ((flags & 0x07) + 1)
-        palette_obj = palette(palette_size)
-        for i in range(palette_size):
-            palette_obj[i] = file.read(3)
-    else:
-        palette_obj = None
+        colors = file.read(3 << ((flags & 0x07) + 1))
+        palette_obj = _make_palette(palette, colors)
     color_bits = ((flags & 0x70) >> 4) + 1
     bitmap_obj = bitmap(width, height, (1 << color_bits) - 1)
+    decoder = _LZWDecoder()
+
+    delay = 0
+    transparent = None
+    disposal = 0
+    # Shared palette entry currently made transparent
+    shown_transparent = None
+    remaps = {}
+    # Disposal left over from the previous frame:
+    # (method, x, y, width, height, transparent index, saved pixels)
+    previous = None
     while True:
         block_type = file.read(1)[0]
         if block_type == 0x2C:  # frame
-            _read_frame(file, bitmap_obj)
+            if previous is not None:
+                _dispose(bitmap_obj, previous, background)
+            x, y, frame_width, frame_height, frame_flags = struct.unpack(
+                "<HHHHB", file.read(9)
+            )
+            remap = None
+            if (frame_flags & 0x80) != 0:
+                local = file.read(3 << ((frame_flags & 0x07) + 1))
+                if palette_obj is None and palette:
+                    colors = local
+                    palette_obj = _make_palette(palette, colors)
+                elif colors is not None:
+                    remap = remaps.get(local, False)
+                    if remap is False:
+                        if len(remaps) >= _REMAP_CACHE:
+                            remaps.clear()
+                        remap = remaps[local] = _remap_colors(local, colors)
+                    if remap is not None and transparent is not None:
+                        remap, transparent = _reserve_transparent(
+                            remap, transparent, len(local) // 3, len(colors) // 3
+                        )
+            if (
+                transparent != shown_transparent
+                and palette_obj is not None
+                and hasattr(palette_obj, "make_transparent")
+            ):
+                if shown_transparent is not None:
+                    palette_obj.make_opaque(shown_transparent)
+                if transparent is not None:
+                    palette_obj.make_transparent(transparent)
+                shown_transparent = transparent
+            saved = None
+            if disposal == _DISPOSE_PREVIOUS:
+                saved = _save_region(bitmap_obj, x, y, frame_width, frame_height)
+            previous = (disposal, x, y, frame_width, frame_height, transparent, saved)
+            decoder.decode_frame(
+                file,
+                bitmap_obj,
+                x,
+                y,
+                frame_width,
+                frame_height,
+                (frame_flags & 0x40) != 0,
+                transparent,
+                remap,
+            )
+            yield bitmap_obj, palette_obj, delay / 100
+            delay = 0
+            transparent = None
+            disposal = 0
         elif block_type == 0x21:  # extension
-            _ = file.read(1)[0]
-            # 0x01 = label, 0xfe = comment
-            _ = bytes(_read_blockstream(file))
+            label = file.read(1)[0]
+            if label == 0xF9:  # graphic control
+                size = file.read(1)[0]
+                control, delay, index = struct.unpack("<BHB", file.read(4))
+                file.read(size - 4)
+                disposal = (control >> 2) & 0x07
+                if control & 0x01:
+                    transparent = index
+            _skip_blockstream(file)
         elif block_type == 0x3B:  # terminator
             break
         else:
             raise ValueError("Bad block type")
-    return bitmap_obj, palette_obj
 
 
-def _read_frame(file: BufferedReader, bitmap: Bitmap) -> None:
-    """Read a single frame and apply it to the bitmap."""
-    ddx, ddy, width, _, flags = struct.unpack(  # pylint: disable=no-member
-        "<HHHHB", file.read(9)
-    )
-    if (flags & 0x40) != 0:
-        raise NotImplementedError("Interlacing not supported")
-    if (flags & 0x80) != 0:
-        palette_size = 1 << ((flags & 0x07) + 1)
-        for _ in range(palette_size):
-            _ = file.read(3)
-    min_code_size = file.read(1)[0]
-    x = 0
-    y = 0
-    for decoded in lzw_decode(_read_blockstream(file), min_code_size):
-        for byte in decoded:
-            bitmap[ddx + x, ddy + y] = byte
-            x += 1
-            if x >= width:
-                x = 0
-                y += 1
-
-
-def _read_blockstream(file: BufferedReader) -> Iterator[int]:
-    """Read a block from a file."""
+def _make_palette(palette: PaletteConstructor, colors: bytes) -> Palette:
+    palette_obj = palette(len(colors) // 3)
+    for i in range(len(colors) // 3):
+        palette_obj[i] = colors[3 * i : 3 * i + 3]
+    return palette_obj
+
+
+def _remap_colors(local: bytes, colors: bytes) -> Optional[bytearray]:
+    """Map a frame's local color table onto the closest shared palette entries.
+
+    Every frame is drawn into one bitmap with one palette, so a local table
+    cannot be loaded without recoloring frames that use the global one.
+    Returns None when the local table matches the shared palette.
+    """
+    if colors[: len(local)] == local:
+        return None
+    remap = bytearray(256)
+    for i in range(len(local) // 3):
+        red, green, blue = local[3 * i], local[3 * i + 1], local[3 * i + 2]
+        best = 0
+        best_distance = 1 << 20
+        for j in range(0, len(colors), 3):
+            distance = (
+                (colors[j] - red) ** 2
+                + (colors[j + 1] - green) ** 2
+                + (colors[j + 2] - blue) ** 2
+            )
+            if distance < best_distance:
+                best = j // 3
+                best_distance = distance
+                if distance == 0:
+                    break
+        remap[i] = best
+    return remap
+
+
+def _reserve_transparent(
+    remap: bytearray, transparent: int, local_count: int, shared_count: int
+) -> Tuple[bytearray, int]:
+    """Give the frame's transparent color a shared palette entry that none of
+    its opaque colors were mapped to, so skipping it never drops an opaque
+    pixel. Returns the remap to use and the shared transparent index."""
+    used = bytearray(256)
+    for i in range(local_count):
+        if i != transparent:
+            used[remap[i]] = 1
+    target = remap[transparent]
+    if used[target]:
+        for index in range(shared_count):
+            if not used[index]:
+                # Copy so the cached remap keeps its nearest colors
+                remap = bytearray(remap)
+                remap[transparent] = index
+                return remap, index
+    # Either no collision or every shared entry is taken by an opaque color
+    return remap, target
+
+
+def _save_region(bitmap: Bitmap, x: int, y: int, width: int, height: int) -> bytearray:
+    saved = bytearray(width * height)
+    i = 0
+    for row in range(y, y + height):
+        for column in range(x, x + width):
+            saved[i] = bitmap[column, row]
+            i += 1
+    return saved
+
+
+def _dispose(bitmap: Bitmap, previous: tuple, background: int) -> None:
+    method, x, y, width, height, transparent, saved = previous
+    if method == _DISPOSE_BACKGROUND:
+        value = background if transparent is None else transparent
+        if bitmaptools:
+            bitmaptools.fill_region(bitmap, x, y, x + width, y + height, value)
+        else:
+            for row in range(y, y + height):
+                for column in range(x, x + width):
+                    bitmap[column, row] = value
+    elif method == _DISPOSE_PREVIOUS and saved is not None:
+        if bitmaptools:
+            bitmaptools.arrayblit(bitmap, saved, x, y, x + width, y + height)
+        else:
+            i = 0
+            for row in range(y, y + height):
+                for column in range(x, x + width):
+                    bitmap[column, row] = saved[i]
+                    i += 1
+
+
+def _skip_blockstream(file: BufferedReader) -> None:
+    """Skip over a sequence of data sub-blocks."""
     while True:
         size = file.read(1)[0]
         if size == 0:
             break
-        for _ in range(size):
-            yield file.read(1)[0]
-
-
-class EndOfData(Exception):
-    """Signified end of compressed data."""
-
-
-class LZWDict:
-    """A dictionary of LZW codes."""
-
-    def __init__(self, code_size: int) -> None:
-        self.code_size = code_size
-        self.clear_code = 1 << code_size
-        self.end_code = self.clear_code + 1
-        self.codes = []  # type: List[bytes]
-        self.last = b""
-        self.clear()
-
-    def clear(self) -> None:
-        """Reset the dictionary to default codes."""
-        self.last = b""
-        self.code_len = self.code_size + 1
-        self.codes[:] = []
-
-    def decode(self, code: int) -> bytes:
-        """Decode a code."""
-        if code == self.clear_code:
-            self.clear()
-            return b""
-        if code == self.end_code:
-            raise EndOfData()
-        if code < self.clear_code:
-            value = bytes([code])
-        elif code <= len(self.codes) + self.end_code:
-            value = self.codes[code - self.end_code - 1]
-        else:
-            value = self.last + self.last[0:1]
-        if self.last:
-            self.codes.append(self.last + value[0:1])
-        if (
-            len(self.codes) + self.end_code + 1 >= 1 << self.code_len
-            and self.code_len < 12
-        ):
-            self.code_len += 1
-        self.last = value
-        return value
-
-
-def lzw_decode(data: Iterator[int], code_size: int) -> Iterator[bytes]:
-    """Decode LZW-compressed data."""
-    dictionary = LZWDict(code_size)
-    bit = 0
-    try:
-        byte = next(data)  # pylint: disable=stop-iteration-return
-        try:
-            while True:
-                code = 0
-                for i in range(dictionary.code_len):
-                    code |= ((byte >> bit) & 0x01) << i
-                    bit += 1
-                    if bit >= 8:
-                        bit = 0
-                        byte = next(data)  # pylint: disable=stop-iteration-return
-                yield dictionary.decode(code)
-        except EndOfData:
-            while True:
-                next(data)  # pylint: disable=stop-iteration-return
-    except StopIteration:
-        pass
+        file.seek(size, 1)
+
+
+def _interlaced_rows(height: int) -> Iterator[int]:
+    for start, step in ((0, 8), (4, 8), (2, 4), (1, 2)):
+        yield from range(start, height, step)
+
+
+class _LZWDecoder:
+    """LZW decoder built on prefix/suffix code tables.
+
+    The tables are allocated once and reused for every frame, and decoded
+    pixels are gathered a row at a time before being written to the bitmap.
+    """
+
+    def __init__(self) -> None:
+        self.prefix = array("H", bytes(2 * _MAX_CODES))
+        self.suffix = bytearray(_MAX_CODES)
+        self.first = bytearray(_MAX_CODES)
+        self.stack = bytearray(_MAX_CODES)
+        self.block = bytearray(255)
+
+    def decode_frame(
+        self,
+        file: BufferedReader,
+        bitmap: Bitmap,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        interlaced: bool,
+        transparent: Optional[int],
+        remap: Optional[bytearray] = None,
+    ) -> None:
+        """Decode one frame's image data into ``bitmap`` at ``(x, y)``.
+
+        ``remap`` translates the frame's local color indices to the shared
+        palette, and ``transparent`` is given after translation."""
+        # pylint: disable=too-many-arguments,too-many-locals,too-many-branches
+        # pylint: disable=too-many-statements
+        prefix = self.prefix
+        suffix = self.suffix
+        first = self.first
+        stack = self.stack
+        stack_view = memoryview(stack)
+        block = self.block
+
+        min_code_size = file.read(1)[0]
+        clear_code = 1 << min_code_size
+        end_code = clear_code + 1
+        for code in range(clear_code):
+            suffix[code] = code
+            first[code] = code
+        next_code = end_code + 1
+        code_len = min_code_size + 1
+        code_mask = (1 << code_len) - 1
+        previous = -1
+
+        row = bytearray(width)
+        row_view = memoryview(row)
+        rows = _interlaced_rows(height) if interlaced else iter(range(height))
+        row_y = next(rows, None)
+        column = 0
+
+        bits = 0
+        bit_count = 0
+        block_size = 0
+        block_pos = 0
+        while True:
+            # Top up the bit accumulator a whole byte at a time
+            while bit_count < code_len:
+                if block_pos >= block_size:
+                    block_size = file.read(1)[0]
+                    if block_size == 0:
+                        return
+                    file.readinto(memoryview(block)[:block_size])
+                    block_pos = 0
+                bits |= block[block_pos] << bit_count
+                block_pos += 1
+                bit_count += 8
+            code = bits & code_mask
+            bits >>= code_len
+            bit_count -= code_len
+
+            if code == clear_code:
+                next_code = end_code + 1
+                code_len = min_code_size + 1
+                code_mask = (1 << code_len) - 1
+                previous = -1
+                continue
+            if code == end_code:
+                break
+
+            # Unwind the code into the stack, last pixel first
+            pos = _MAX_CODES
+            if previous == -1:
+                pos -= 1
+                stack[pos] = suffix[code]
+            else:
+                if code >= next_code:
+                    # KwKwK case: the string for previous plus its first pixel
+                    pos -= 1
+                    stack[pos] = first[previous]
+                    walk = previous
+                else:
+                    walk = code
+                while walk > end_code:
+                    pos -= 1
+                    stack[pos] = suffix[walk]
+                    walk = prefix[walk]
+                pos -= 1
+                stack[pos] = walk
+                if next_code < _MAX_CODES:
+                    prefix[next_code] = previous
+                    suffix[next_code] = stack[pos]
+                    first[next_code] = first[previous]
+                    next_code += 1
+                    if next_code > code_mask and code_len < 12:
+                        code_len += 1
+                        code_mask = (1 << code_len) - 1
+            previous = code
+
+            # Copy the decoded run into the row buffer, flushing full rows
+            while pos < _MAX_CODES and row_y is not None:
+                take = min(_MAX_CODES - pos, width - column)
+                row_view[column : column + take] = stack_view[pos : pos + take]
+                column += take
+                pos += take
+                if column == width:
+                    if remap is not None:
+                        for i in range(width):
+                            row[i] = remap[row[i]]
+                    _write_row(bitmap, row, x, y + row_y, transparent)
+                    column = 0
+                    row_y = next(rows, None)
+
+        # Skip any remaining sub-blocks after the end code
+        if block_size:
+            _skip_blockstream(file)
+
+
+def _write_row(
+    bitmap: Bitmap, row: bytearray, x: int, y: int, transparent: Optional[int]
+) -> None:
+    if bitmaptools:
+        bitmaptools.arrayblit(
+            bitmap, row, x, y, x + len(row), y + 1, skip_index=transparent
+        )
+        return
+    for column, value in enumerate(row):
+        if value != transparent:
+            bitmap[x + column, y] = value
@@ -8,9 +8,9 @@
 PaletteFader is a CircuitPython driver class for brightness-adjusting color
 lists and displayio palettes. Normalization is optionally applied to the palette
 prior to brightness and gamma adjustments. Transparency index values are
-preserved and associated with the adjusted palette. Creates an adjusted
-displayio color palette object (displayio.Palette) that can also be read as a
-color list.
+preserved and associated with the adjusted palette. Creates one adjusted
+displayio color palette object (displayio.Palette), updated in place on each
+brightness change, that can also be read as a color list.
 
 For adjusting a single color value, create a list containing a single color or
 use cedargrove_unit_converter.color.colorfader.color_fader().
@@ -22,8 +22,10 @@ cedargrove_palettefader.py v2.0.1 2022-09-03
 Implementation Notes
 --------------------
 
-The ulab-based reference palette creation code runs slightly faster than the
-"vanilla" version. The ulab code was adapted from the Adafruit Ocean Epoxy
+Brightness and gamma are applied through a 256-entry lookup table per
+normalization factor, computed in one ulab pass and cached, rather than
+adjusting every palette color. Only palette entries whose color changes are
+written back. The ulab code was adapted from the Adafruit Ocean Epoxy
 Lightbox project's Reshader class; Copyright 2020 J Epler and L Fried.
 <https://learn.adafruit.com/ocean-epoxy-resin-lightbox-with-rgb-led-matrix-image-scroller>
 
@@ -39,9 +41,13 @@ Lightbox project's Reshader class; Copyright 2020 J Epler and L Fried.
 __version__ = "0.0.0+auto.0"
 __repo__ = "https://github.com/CedarGroveStudios/CircuitPython_PaletteFader.git"
 
+from array import array
 from ulab import numpy
 import displayio
 
+# Lookup tables kept before the cache is emptied
+_LUT_CACHE_SIZE = 64
+
 
 class PaletteFader:
     """Displayio palette fader with normalization, brightness (fading), and
@@ -68,30 +74,43 @@ class PaletteFader:
 
         self._list_transparency = []  # List of transparent items in a color list
 
-        # Create the ulab array reference palette with source palette RGB values
-        self._ref_palette = numpy.zeros((len(self._src_palette), 3), dtype=numpy.uint8)
+        # Create the reference palette RGB channels from source palette values
+        count = len(self._src_palette)
+        self._ref_red = bytearray(count)
+        self._ref_green = bytearray(count)
+        self._ref_blue = bytearray(count)
         for index, rgb in enumerate(self._src_palette):
             if rgb is not None:
-                self._ref_palette[index, 2] = rgb & 0x0000FF
-                self._ref_palette[index, 1] = (rgb & 0x00FF00) >> 8
-                self._ref_palette[index, 0] = (rgb & 0xFF0000) >> 16
+                self._ref_blue[index] = rgb & 0x0000FF
+                self._ref_green[index] = (rgb & 0x00FF00) >> 8
+                self._ref_red[index] = (rgb & 0xFF0000) >> 16
 
                 if not isinstance(self._src_palette, list):
                     # Record palette transparency color index
                     if self._src_palette.is_transparent(index):
                         self._list_transparency.append(index)
             else:
-                """Color is None; replace with BLACK in the reference palette
+                """Color is None; leave BLACK in the reference palette
                 and record the color index in the transparency list."""
-                self._ref_palette[index] = [0, 0, 0]
                 self._list_transparency.append(index)
 
         # Find the brightest RGB component for the normalization process
         if self._normalize:
-            self._ref_palette_max = numpy.max(self._ref_palette)
+            self._ref_palette_max = max(
+                max(self._ref_red), max(self._ref_green), max(self._ref_blue)
+            )
         else:
             # Set the maximum value to the 8-bit limit (no normalization)
             self._ref_palette_max = 0xFF
+
+        # The adjusted palette and the colors last written to it
+        self._new_palette = displayio.Palette(count)
+        for index in self._list_transparency:
+            self._new_palette.make_transparent(index)
+        self._colors = array("L", [0] * count)
+
+        self._luts = {}  # Lookup table for each normalization factor
+        self._applied_lut = None
         self.fade_normalize()
 
     @property
@@ -120,37 +139,52 @@ class PaletteFader:
 
     @property
     def palette(self):
-        """The adjusted displayio palette."""
+        """The adjusted displayio palette. The same palette object is kept and
+        updated in place when the brightness changes."""
         return self._new_palette
 
+    def _lut(self, norm_factor):
+        """The 256-entry lookup table of adjusted values for each RGB
+        component value, for a normalization factor and the gamma."""
+        lut = self._luts.get(norm_factor)
+        if lut is None:
+            if len(self._luts) >= _LUT_CACHE_SIZE:
+                self._luts.clear()
+            # Adjust for normalization and brightness
+            levels = numpy.array(
+                numpy.minimum(numpy.arange(256) * norm_factor, 0xFF),
+                dtype=numpy.uint8,
+            )
+            # Adjust result for gamma
+            lut = bytearray(
+                numpy.array(numpy.minimum(levels**self._gamma, 0xFF), dtype=numpy.uint8)
+            )
+            self._luts[norm_factor] = lut
+        return lut
+
     def fade_normalize(self):
-        """Create an adjusted displayio palette from the reference palette. Use
-        the current brightness, gamma, and normalize parameters to build the
-        adjusted palette. The reference palette is first adjusted for
-        brightness and normalization (if enabled) followed by the gamma
-        adjustment. Transparency index values are preserved."""
+        """Adjust the displayio palette from the reference palette. Use the
+        current brightness, gamma, and normalize parameters to adjust the
+        palette. The reference palette is first adjusted for brightness and
+        normalization (if enabled) followed by the gamma adjustment. Only
+        changed colors are written. Transparency index values are preserved."""
 
         # Determine the normalization factor to apply to the palette
         self._norm_factor = round((0xFF / self._ref_palette_max) * self._brightness, 3)
 
-        # Create a clean new palette
-        self._new_palette = displayio.Palette(len(self._src_palette))
-
-        # Adjust for normalization and brightness
-        norm_palette = numpy.array(
-            self._ref_palette * self._norm_factor, dtype=numpy.uint8
-        )
-        # Adjust result for gamma
-        norm_palette = numpy.array(norm_palette**self._gamma, dtype=numpy.uint8)
-
-        # Build new_palette with the newly adjusted color values
-        for index in range(len(norm_palette)):
-            self._new_palette[index] = (
-                (norm_palette[index, 0] << 16)
-                + (norm_palette[index, 1] << 8)
-                + norm_palette[index, 2]
+        lut = self._lut(self._norm_factor)
+        if lut is self._applied_lut:
+            return
+        self._applied_lut = lut
+
+        red = self._ref_red
+        green = self._ref_green
+        blue = self._ref_blue
+        colors = self._colors
+        for index in range(len(colors)):
+            color = (
+                (lut[red[index]] << 16) + (lut[green[index]] << 8) + lut[blue[index]]
             )
-
-            if index in self._list_transparency:
-                # Set new_palette color index transparency status
-                self._new_palette.make_transparent(index)
+            if color != colors[index]:
+                colors[index] = color
+                self._new_palette[index] = color
@@ -0,0 +1,311 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""PaletteFader benchmark: in-place lookup table fading vs. a new palette per step
+
+Desktop script, run from this folder:
+    python palette_fader_benchmark.py
+Fades two 256 color palettes, the Astral Fruit background's and a random one
+with index 0 transparent, the way code.py sets them up (gamma 0.8,
+normalized), from full brightness to off in 64 steps and back up again,
+twice. The old fade_normalize, which built a new displayio.Palette and
+adjusted every color on each step, is reproduced here as LegacyPaletteFader.
+
+displayio and ulab are replaced by stand-ins. The Palette counts the colors
+written to it, and ulab.numpy is a small pure Python version of the calls the
+faders make. Its calls are C on the board, so time spent in them is left out
+of the timings and reported as the number of array elements ulab handled.
+
+Checks that both faders give the same colors and transparency at every step,
+then reports per step: the time spent in the fader, ulab elements, palette
+colors written and new palettes made.
+"""
+
+# pylint: disable=import-error, wrong-import-position, too-few-public-methods
+
+import os
+import random
+import struct
+import sys
+import time
+import types
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STEPS = 64
+GAMMA = 0.8
+
+# Stand-ins for the board only modules ---
+
+ULAB = {"ns": 0, "elements": 0}
+COUNTS = {"palettes": 0, "writes": 0}
+
+
+class Palette:
+    """displayio.Palette"""
+
+    def __init__(self, color_count):
+        COUNTS["palettes"] += 1
+        self._colors = [0] * color_count
+        self._transparent = set()
+
+    def __len__(self):
+        return len(self._colors)
+
+    def __getitem__(self, index):
+        return self._colors[index]
+
+    def __setitem__(self, index, color):
+        COUNTS["writes"] += 1
+        self._colors[index] = color
+
+    def make_transparent(self, index):
+        self._transparent.add(index)
+
+    def is_transparent(self, index):
+        return index in self._transparent
+
+
+def _ulab(function):
+    """Leaves a stand-in ulab call out of the timings."""
+
+    def call(*args, **kwargs):
+        start = time.perf_counter_ns()
+        result = function(*args, **kwargs)
+        ULAB["ns"] += time.perf_counter_ns() - start
+        return result
+
+    return call
+
+
+class NDArray:
+    """ulab.numpy.ndarray, flat data in a list"""
+
+    def __init__(self, data, shape, dtype):
+        self.data = data
+        self.shape = shape
+        self.dtype = dtype
+        ULAB["elements"] += len(data)
+
+    def _index(self, index):
+        if isinstance(index, tuple):
+            return index[0] * self.shape[1] + index[1]
+        return index
+
+    @_ulab
+    def __getitem__(self, index):
+        return self.data[self._index(index)]
+
+    @_ulab
+    def __setitem__(self, index, value):
+        if isinstance(value, list):
+            start = index * self.shape[1]
+            self.data[start : start + len(value)] = value
+        else:
+            self.data[self._index(index)] = value
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    @_ulab
+    def __mul__(self, factor):
+        return NDArray([value * factor for value in self.data], self.shape, float)
+
+    @_ulab
+    def __pow__(self, exponent):
+        return NDArray([value**exponent for value in self.data], self.shape, float)
+
+
+_numpy = types.ModuleType("ulab.numpy")
+_numpy.uint8 = "uint8"
+_numpy.zeros = _ulab(
+    lambda shape, dtype: NDArray([0] * (shape[0] * shape[1]), shape, dtype)
+)
+_numpy.arange = _ulab(lambda stop: NDArray(list(range(stop)), (stop,), "int16"))
+_numpy.max = _ulab(lambda array: max(array.data))
+_numpy.minimum = _ulab(
+    lambda array, limit: NDArray(
+        [min(value, limit) for value in array.data], array.shape, array.dtype
+    )
+)
+_numpy.array = _ulab(
+    lambda array, dtype: NDArray(
+        [int(value) & 0xFF for value in array.data], array.shape, dtype
+    )
+)
+_ulab_module = types.ModuleType("ulab")
+_ulab_module.numpy = _numpy
+sys.modules["ulab"] = _ulab_module
+sys.modules["ulab.numpy"] = _numpy
+sys.modules["displayio"] = types.SimpleNamespace(Palette=Palette)
+sys.path.insert(0, os.path.join(HERE, "lib"))
+sys.dont_write_bytecode = True
+
+from ulab import numpy
+from cedargrove_palettefader.palettefader_ulab import PaletteFader
+
+
+class LegacyPaletteFader:
+    """The previous palettefader_ulab.PaletteFader, kept for comparison."""
+
+    def __init__(self, source_palette, brightness=1.0, gamma=1.0, normalize=False):
+        self._src_palette = source_palette
+        self._brightness = brightness
+        self._gamma = gamma
+        self._normalize = normalize
+
+        self._list_transparency = []
+
+        self._ref_palette = numpy.zeros((len(self._src_palette), 3), dtype=numpy.uint8)
+        for index, rgb in enumerate(self._src_palette):
+            if rgb is not None:
+                self._ref_palette[index, 2] = rgb & 0x0000FF
+                self._ref_palette[index, 1] = (rgb & 0x00FF00) >> 8
+                self._ref_palette[index, 0] = (rgb & 0xFF0000) >> 16
+
+                if not isinstance(self._src_palette, list):
+                    if self._src_palette.is_transparent(index):
+                        self._list_transparency.append(index)
+            else:
+                self._ref_palette[index] = [0, 0, 0]
+                self._list_transparency.append(index)
+
+        if self._normalize:
+            self._ref_palette_max = numpy.max(self._ref_palette)
+        else:
+            self._ref_palette_max = 0xFF
+        self.fade_normalize()
+
+    @property
+    def brightness(self):
+        return self._brightness
+
+    @brightness.setter
+    def brightness(self, new_brightness):
+        if self._brightness != new_brightness:
+            self._brightness = new_brightness
+            self.fade_normalize()
+
+    @property
+    def palette(self):
+        return self._new_palette
+
+    def fade_normalize(self):
+        self._norm_factor = round((0xFF / self._ref_palette_max) * self._brightness, 3)
+
+        self._new_palette = Palette(len(self._src_palette))
+
+        norm_palette = numpy.array(
+            self._ref_palette * self._norm_factor, dtype=numpy.uint8
+        )
+        norm_palette = numpy.array(norm_palette**self._gamma, dtype=numpy.uint8)
+
+        for index in range(len(norm_palette)):
+            self._new_palette[index] = (
+                (norm_palette[index, 0] << 16)
+                + (norm_palette[index, 1] << 8)
+                + norm_palette[index, 2]
+            )
+
+            if index in self._list_transparency:
+                self._new_palette.make_transparent(index)
+
+
+def bmp_palette(filename):
+    """The color table of an 8 bit BMP file as a Palette."""
+    with open(filename, "rb") as file:
+        header = file.read(54)
+        header_size = struct.unpack_from("<I", header, 14)[0]
+        colors = struct.unpack_from("<I", header, 46)[0]
+        file.seek(14 + header_size)
+        table = file.read(4 * (colors or 256))
+    palette = Palette(len(table) // 4)
+    for index in range(len(palette)):
+        blue, green, red = table[4 * index : 4 * index + 3]
+        palette[index] = (red << 16) + (green << 8) + blue
+    return palette
+
+
+def random_palette():
+    """256 random colors, index 0 transparent as on a sprite sheet."""
+    generator = random.Random(64)
+    palette = Palette(256)
+    for index in range(256):
+        palette[index] = generator.getrandbits(24)
+    palette.make_transparent(0)
+    return palette
+
+
+def levels():
+    """Full brightness to off in STEPS steps, back up, twice."""
+    down = [round(1 - step / (STEPS - 1), 4) for step in range(STEPS)]
+    return (down + down[::-1]) * 2
+
+
+def colors(palette):
+    return [palette[index] for index in range(len(palette))], {
+        index for index in range(len(palette)) if palette.is_transparent(index)
+    }
+
+
+def fade(fader_class, source, check=None):
+    """Per step (us in the fader, ulab elements, colors written, palettes
+    made); with check, the legacy colors at each step to compare with."""
+    fader = fader_class(source, brightness=1.0, gamma=GAMMA, normalize=True)
+    steps = []
+    seen = []
+    for level in levels():
+        before = dict(ULAB), dict(COUNTS)
+        start = time.perf_counter_ns()
+        fader.brightness = level
+        elapsed = time.perf_counter_ns() - start - (ULAB["ns"] - before[0]["ns"])
+        steps.append(
+            (
+                elapsed / 1000,
+                ULAB["elements"] - before[0]["elements"],
+                COUNTS["writes"] - before[1]["writes"],
+                COUNTS["palettes"] - before[1]["palettes"],
+            )
+        )
+        seen.append(colors(fader.palette))
+    if check is not None:
+        assert seen == check
+    return steps, seen
+
+
+def report(name, steps):
+    count = len(steps)
+    print(
+        f"{name:<30}"
+        f"{sum(step[0] for step in steps) / count:>9.0f}"
+        f"{max(step[0] for step in steps):>9.0f}"
+        f"{sum(step[1] for step in steps) / count:>9.0f}"
+        f"{sum(step[2] for step in steps) / count:>9.0f}"
+        f"{sum(step[3] for step in steps) / count:>9.2f}"
+    )
+
+
+def main():
+    for name, source in (
+        (
+            "Astral_Fruit_128x64.bmp",
+            bmp_palette(HERE + "/images/Astral_Fruit_128x64.bmp"),
+        ),
+        ("random, index 0 transparent", random_palette()),
+    ):
+        print(f"{name}, {len(source)} colors, {len(levels())} steps")
+        print(
+            f"{'per step':<30}{'us':>9}{'worst':>9}{'ulab el':>9}"
+            f"{'written':>9}{'palettes':>9}"
+        )
+        legacy, expected = fade(LegacyPaletteFader, source)
+        steps, _ = fade(PaletteFader, source, check=expected)
+        half = len(steps) // 2
+        report("old, new palette", legacy)
+        report("new, first pass (tables)", steps[:half])
+        report("new, second pass (cached)", steps[half:])
+        print()
+
+
+main()
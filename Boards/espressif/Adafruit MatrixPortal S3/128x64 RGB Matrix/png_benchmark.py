@@ -0,0 +1,106 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""PNG decode benchmark: streaming loader vs. the old whole-buffer loader
+
+Desktop script (uses tracemalloc), run with Blinka and this project's lib:
+    python png_benchmark.py [--one-shot] image1.png image2.png ...
+Reports decode time and peak Python heap for each file. The old loader
+collected every IDAT chunk, inflated them in one go and only understood
+filter type 0 on indexed images; it is reproduced here as legacy_load.
+
+CPython's zlib can inflate a stream a piece at a time, CircuitPython's only
+has zlib.decompress. --one-shot hides everything else from the new loader so
+it takes the same path as on the board.
+"""
+
+import struct
+import sys
+import time
+import tracemalloc
+import types
+import zlib
+import displayio
+from adafruit_imageload import png
+
+ROUNDS = 3
+
+if "--one-shot" in sys.argv:
+    sys.argv.remove("--one-shot")
+    sys.modules["deflate"] = None
+    png.zlib = types.SimpleNamespace(decompress=zlib.decompress)
+
+
+def legacy_load(file, *, bitmap, palette=None):
+    """The previous adafruit_imageload.png.load, kept for comparison."""
+    # pylint: disable=too-many-locals
+    if file.read(8) != b"\x89PNG\r\n\x1a\n":
+        raise ValueError("Not a PNG file")
+    data = bytearray()
+    pal = None
+    while True:
+        size, chunk = struct.unpack(">I4s", file.read(8))
+        if chunk == b"IHDR":
+            width, height, depth, mode, _, _, _ = struct.unpack(
+                ">IIBBBBB", file.read(13)
+            )
+        elif chunk == b"PLTE" and palette is not None:
+            if mode != 3:
+                raise NotImplementedError("Palette in non-indexed image")
+            pal = palette(size // 3)
+            for i in range(size // 3):
+                pal[i] = file.read(3)
+        elif chunk == b"IDAT":
+            data.extend(file.read(size))
+        elif chunk == b"IEND":
+            break
+        else:
+            file.seek(size, 1)
+        file.seek(4, 1)
+    data_bytes = zlib.decompress(data)
+    bmp = bitmap(width, height, 1 << depth)
+    scanline = (width * depth + 7) // 8
+    mem = memoryview(bmp)
+    for y in range(height):
+        dst = y * scanline
+        src = y * (scanline + 1) + 1
+        filter_ = data_bytes[src - 1]
+        if filter_ == 0:
+            mem[dst : dst + scanline] = data_bytes[src : src + scanline]
+        else:
+            raise NotImplementedError("Filters not supported")
+    return bmp, pal
+
+
+def measure(loader, path):
+    """Returns (ms per decode, peak heap bytes) or None if unsupported."""
+    elapsed = 0
+    peak = 0
+    for _ in range(ROUNDS):
+        with open(path, "rb") as file:
+            tracemalloc.start()
+            start = time.monotonic_ns()
+            try:
+                loader(file, bitmap=displayio.Bitmap, palette=displayio.Palette)
+            except NotImplementedError:
+                tracemalloc.stop()
+                return None
+            elapsed += time.monotonic_ns() - start
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    return elapsed / ROUNDS / 1_000_000, peak
+
+
+def describe(result):
+    """Formats a measure() result as table cells."""
+    if result is None:
+        return f"{'unsupported':>24}"
+    return f"{result[0]:>12.1f}{result[1]:>12}"
+
+
+print(f"{'Image':<28}{'Old ms':>12}{'Old peak':>12}{'New ms':>12}{'New peak':>12}")
+for image_path in sys.argv[1:]:
+    name = image_path.rsplit("/", 1)[-1]
+    print(
+        f"{name:<28}{describe(measure(legacy_load, image_path))}"
+        f"{describe(measure(png.load, image_path))}"
+    )
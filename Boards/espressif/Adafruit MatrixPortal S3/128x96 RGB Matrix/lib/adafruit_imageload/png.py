@@ -10,14 +10,22 @@
 Load pixel values (indices or colors) into a bitmap and colors into a palette
 from a PNG file.
 
+Image data is unfiltered one scanline at a time. Where the firmware can
+inflate a stream piece by piece (``zlib.decompressobj`` or
+``deflate.DeflateIO``) only two scanlines are held besides the bitmap.
+CircuitPython's ``zlib`` only has ``decompress``, so there the compressed data
+is read into one buffer of its exact size and inflated in a single call: the
+peak is still the compressed plus the raw image, as with the old loader, but
+the compressed copy is dropped before the rows are unfiltered.
+
 * Author(s): Radomir Dopieralski, Matt Land
 
 """
 
 try:
     from io import BufferedReader
-    from typing import Optional, Tuple
-    from displayio import Palette, Bitmap
+    from typing import Iterator, Optional, Tuple, Union
+    from displayio import Palette, Bitmap, ColorConverter
     from .displayio_types import PaletteConstructor, BitmapConstructor
 except ImportError:
     pass
@@ -28,16 +36,167 @@ import zlib
 __version__ = "0.0.0-auto.0"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_ImageLoad.git"
 
+# Compressed bytes handed to the inflater per step
+_READ_SIZE = 512
+
+# Samples per pixel for each PNG color type
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+class _IDATReader:
+    """File-like view over the concatenated payload of consecutive IDAT chunks."""
+
+    def __init__(self, file: BufferedReader, size: int) -> None:
+        self._file = file
+        self._remaining = size
+
+    def _next_chunk(self) -> bool:
+        """Move on to the next IDAT chunk once the current one is used up."""
+        while self._remaining == 0:
+            self._file.seek(4, 1)  # skip CRC
+            header = self._file.read(8)
+            if len(header) < 8:
+                return False
+            self._remaining, chunk = struct.unpack(">I4s", header)
+            if chunk != b"IDAT":
+                self._remaining = 0
+                return False
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to ``size`` compressed bytes, crossing chunk boundaries."""
+        if not self._next_chunk():
+            return b""
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def readinto(self, buf: bytearray) -> int:
+        """Read compressed bytes into ``buf``, returning the count."""
+        if not self._next_chunk():
+            return 0
+        count = self._file.readinto(memoryview(buf)[: self._remaining])
+        self._remaining -= count
+        return count
+
+    def readall(self) -> bytearray:
+        """Read the rest of the compressed data into one exactly sized buffer."""
+        start = self._file.tell()
+        total = self._remaining
+        self._file.seek(self._remaining + 4, 1)  # skip to the next chunk
+        while True:
+            header = self._file.read(8)
+            if len(header) < 8:
+                break
+            size, chunk = struct.unpack(">I4s", header)
+            if chunk != b"IDAT":
+                break
+            total += size
+            self._file.seek(size + 4, 1)
+        self._file.seek(start)
+        data = bytearray(total)
+        view = memoryview(data)
+        filled = 0
+        while filled < total:
+            count = self.readinto(view[filled:])
+            if not count:
+                break
+            filled += count
+        return data
+
+
+def _inflate(reader: _IDATReader, max_out: int) -> Iterator[bytes]:
+    """Yield the decompressed image data in pieces of at most ``max_out`` bytes
+    where the platform allows it."""
+    if hasattr(zlib, "decompressobj"):
+        inflater = zlib.decompressobj()
+        data = b""
+        while True:
+            if not data:
+                data = reader.read(_READ_SIZE)
+                if not data:
+                    break
+            piece = inflater.decompress(data, max_out)
+            data = inflater.unconsumed_tail
+            if piece:
+                yield piece
+        piece = inflater.flush()
+        if piece:
+            yield piece
+        return
+    try:
+        import deflate  # pylint: disable=import-outside-toplevel
+
+        stream = deflate.DeflateIO(reader, deflate.ZLIB)
+        while True:
+            piece = stream.read(max_out)
+            if not piece:
+                return
+            yield piece
+    except ImportError:
+        pass
+    # No streaming inflate available: one shot decompression. Rebinding the
+    # name releases the compressed buffer before the caller walks the rows.
+    data = reader.readall()
+    data = zlib.decompress(data)
+    yield data
+
+
+def _unfilter(filter_: int, line: bytearray, prior: bytearray, bpp: int) -> None:
+    """Undo the PNG filter on ``line`` in place. Index 0 holds the filter type
+    byte in both buffers and is ignored."""
+    # pylint: disable=too-many-branches
+    size = len(line)
+    if filter_ == 0:
+        return
+    if filter_ == 1:  # Sub
+        for i in range(bpp + 1, size):
+            line[i] = (line[i] + line[i - bpp]) & 0xFF
+    elif filter_ == 2:  # Up
+        for i in range(1, size):
+            line[i] = (line[i] + prior[i]) & 0xFF
+    elif filter_ == 3:  # Average
+        for i in range(1, bpp + 1):
+            line[i] = (line[i] + (prior[i] >> 1)) & 0xFF
+        for i in range(bpp + 1, size):
+            line[i] = (line[i] + ((line[i - bpp] + prior[i]) >> 1)) & 0xFF
+    elif filter_ == 4:  # Paeth
+        for i in range(1, bpp + 1):
+            line[i] = (line[i] + prior[i]) & 0xFF
+        for i in range(bpp + 1, size):
+            left = line[i - bpp]
+            above = prior[i]
+            upper_left = prior[i - bpp]
+            pa = above - upper_left
+            pb = left - upper_left
+            pc = abs(pa + pb)
+            pa = abs(pa)
+            pb = abs(pb)
+            if pa <= pb and pa <= pc:
+                pred = left
+            elif pb <= pc:
+                pred = above
+            else:
+                pred = upper_left
+            line[i] = (line[i] + pred) & 0xFF
+    else:
+        raise ValueError("Invalid filter type %d" % filter_)
+
 
 def load(
     file: BufferedReader,
     *,
     bitmap: BitmapConstructor,
     palette: Optional[PaletteConstructor] = None
-) -> Tuple[Bitmap, Optional[Palette]]:
+) -> Tuple[Bitmap, Optional[Union[Palette, ColorConverter]]]:
     """
     Loads a PNG image from the open ``file``.
-    Only supports indexed color images.
+    Supports indexed, grayscale and truecolor images, with or without alpha,
+    at any filter type. Alpha is ignored except for fully transparent palette
+    entries. Truecolor images are converted to RGB565 and returned with a
+    matching `displayio.ColorConverter`.
 
     Returns tuple of bitmap object and palette object.
 
@@ -48,17 +207,18 @@ def load(
     :param object palette: Type to store the palette. Must have API similar to
       `displayio.Palette`. Will be skipped if None.
     """
-    # pylint: disable=too-many-locals,too-many-branches
+    # pylint: disable=too-many-locals,too-many-branches,too-many-statements
     header = file.read(8)
     if header != b"\x89PNG\r\n\x1a\n":
         raise ValueError("Not a PNG file")
     del header
-    data = bytearray()
     pal = None
+    transparency = None
     mode = None
     depth = 0
     width = 0
     height = 0
+    idat_size = None
     while True:
         size, chunk = struct.unpack(">I4s", file.read(8))
         if chunk == b"IHDR":
@@ -73,6 +233,8 @@ def load(
             ) = struct.unpack(">IIBBBBB", file.read(13))
             if interlaced:
                 raise NotImplementedError("Interlaced images unsupported")
+            if mode not in _CHANNELS:
+                raise ValueError("Invalid color type %d" % mode)
             # compression and filters must be 0 with current spec
             assert compression == 0
             assert filters == 0
@@ -81,28 +243,101 @@ def load(
                 file.seek(size, 1)
             else:
                 if mode != 3:
-                    raise NotImplementedError("Palette in non-indexed image")
-                pal_size = size // 3
-                pal = palette(pal_size)
-                for i in range(pal_size):
-                    pal[i] = file.read(3)
+                    # Suggested palette for a truecolor image, not needed
+                    file.seek(size, 1)
+                else:
+                    pal_size = size // 3
+                    pal = palette(pal_size)
+                    for i in range(pal_size):
+                        pal[i] = file.read(3)
+        elif chunk == b"tRNS" and mode == 3:
+            transparency = file.read(size)
         elif chunk == b"IDAT":
-            data.extend(file.read(size))
+            idat_size = size
+            break
         elif chunk == b"IEND":
             break
         else:
             file.seek(size, 1)  # skip unknown chunks
         file.seek(4, 1)  # skip CRC
-    data_bytes = zlib.decompress(data)
-    bmp = bitmap(width, height, 1 << depth)
-    scanline = (width * depth + 7) // 8
-    mem = memoryview(bmp)
-    for y in range(height):
-        dst = y * scanline
-        src = y * (scanline + 1) + 1
-        filter_ = data_bytes[src - 1]
-        if filter_ == 0:
-            mem[dst : dst + scanline] = data_bytes[src : src + scanline]
-        else:
-            raise NotImplementedError("Filters not supported")
+    if idat_size is None:
+        raise ValueError("PNG file has no image data")
+
+    if pal is not None and transparency is not None:
+        for i, alpha in enumerate(transparency):
+            if alpha == 0:
+                pal.make_transparent(i)
+
+    channels = _CHANNELS[mode]
+    bits_per_pixel = depth * channels
+    bpp = max(1, bits_per_pixel // 8)
+    scanline = (width * bits_per_pixel + 7) // 8
+    line = bytearray(scanline + 1)
+    prior = bytearray(scanline + 1)
+
+    mem = None
+    if mode in (2, 6):
+        # pylint: disable=import-outside-toplevel
+        from displayio import ColorConverter, Colorspace
+
+        bmp = bitmap(width, height, 65535)
+        pal = ColorConverter(input_colorspace=Colorspace.RGB565)
+    elif mode == 3 or depth <= 8:
+        bmp = bitmap(width, height, 1 << min(depth, 8))
+        if depth == 8 and mode == 3:
+            try:
+                mem = memoryview(bmp)
+            except TypeError:
+                mem = None
+    else:
+        bmp = bitmap(width, height, 256)
+    if mode in (0, 4) and palette is not None:
+        levels = 1 << min(depth, 8)
+        pal = palette(levels)
+        for i in range(levels):
+            gray = i * 255 // (levels - 1)
+            pal[i] = (gray << 16) | (gray << 8) | gray
+    # displayio rows are padded to a 32 bit boundary
+    stride = (width + 3) & ~3
+
+    fill = 0
+    y = 0
+    for piece in _inflate(_IDATReader(file, idat_size), scanline + 1):
+        view = memoryview(piece)
+        pos = 0
+        while pos < len(piece) and y < height:
+            count = min(len(piece) - pos, len(line) - fill)
+            line[fill : fill + count] = view[pos : pos + count]
+            fill += count
+            pos += count
+            if fill < len(line):
+                continue
+            _unfilter(line[0], line, prior, bpp)
+            offset = y * width
+            if mem is not None:
+                mem[y * stride : y * stride + width] = memoryview(line)[1:]
+            elif mode in (2, 6):
+                step = channels * (depth // 8)
+                green = depth // 8
+                blue = 2 * green
+                for x in range(width):
+                    i = 1 + x * step
+                    bmp[offset + x] = (
+                        (line[i] & 0xF8) << 8
+                        | (line[i + green] & 0xFC) << 3
+                        | line[i + blue] >> 3
+                    )
+            elif depth >= 8:
+                step = channels * (depth // 8)
+                for x in range(width):
+                    bmp[offset + x] = line[1 + x * step]
+            else:
+                mask = (1 << depth) - 1
+                per_byte = 8 // depth
+                for x in range(width):
+                    shift = (per_byte - 1 - x % per_byte) * depth
+                    bmp[offset + x] = (line[1 + x // per_byte] >> shift) & mask
+            line, prior = prior, line
+            fill = 0
+            y += 1
     return bmp, pal
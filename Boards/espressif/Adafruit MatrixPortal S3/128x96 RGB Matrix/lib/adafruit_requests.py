@@ -38,9 +38,15 @@ __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Requests.git"
 
 import errno
 import sys
+import time
 
 import json as json_module
 
+try:
+    import zlib
+except ImportError:
+    zlib = None
+
 if not sys.implementation.name == "circuitpython":
     from ssl import SSLContext
     from types import ModuleType, TracebackType
@@ -141,12 +147,60 @@ class _RawResponse:
         """
         if size == -1:
             return self._response.content
-        return self._response.socket.recv(size)
+        buf = bytearray(size)
+        read = self.readinto(buf)
+        return bytes(memoryview(buf)[:read])
 
     def readinto(self, buf: bytearray) -> int:
         """Read as much as available into buf or until it is full. Returns the number of bytes read
         into buf."""
-        return self._response._readinto(buf)  # pylint: disable=protected-access
+        return self._response._read_content_into(
+            buf
+        )  # pylint: disable=protected-access
+
+
+class _GzipDecoder:
+    """Inflates gzip encoded content as the response reads it.
+
+    With ``zlib.decompressobj`` (CPython and some ports) the content is
+    inflated 256 bytes at a time. CircuitPython's zlib only has
+    ``decompress``, so there the compressed content is read whole first.
+    """
+
+    def __init__(self, response: "Response") -> None:
+        self._response = response
+        self._output = b""
+        self._position = 0
+        self._finished = False
+        self._inflater = None
+        if hasattr(zlib, "decompressobj"):
+            self._inflater = zlib.decompressobj(31)
+            self._input = bytearray(256)
+
+    def readinto(self, buf: bytearray) -> int:
+        """Inflate into buf. Returns the number of bytes written, 0 at the end."""
+        # pylint: disable=protected-access
+        response = self._response
+        while self._position >= len(self._output):
+            if self._finished:
+                return 0
+            self._position = 0
+            if self._inflater is None:
+                hint = None if response._chunked else response._remaining
+                compressed = response._read_body(response._readinto, hint)
+                self._output = zlib.decompress(compressed, 31)
+                self._finished = True
+                continue
+            read = response._readinto(self._input)
+            if read:
+                self._output = self._inflater.decompress(memoryview(self._input)[:read])
+            else:
+                self._output = self._inflater.flush()
+                self._finished = True
+        size = min(len(buf), len(self._output) - self._position)
+        buf[:size] = memoryview(self._output)[self._position : self._position + size]
+        self._position += size
+        return size
 
 
 class OutOfRetries(Exception):
@@ -167,11 +221,17 @@ class Response:
         self._headers = {}
 
         # _start_index and _receive_buffer are used when parsing headers.
-        # _receive_buffer will grow by 32 bytes everytime it is too small.
+        # _receive_buffer doubles in size everytime it is too small. It
+        # belongs to the session, so later responses reuse the grown buffer.
+        self._session = session
         self._received_length = 0
-        self._receive_buffer = bytearray(32)
+        if session:
+            self._receive_buffer = session._receive_buffer
+        else:
+            self._receive_buffer = bytearray(32)
         self._remaining = None
         self._chunked = False
+        self._decoder = None
 
         http = self._readto(b" ")
         if not http:
@@ -186,7 +246,12 @@ class Response:
         """The status reason returned by the server"""
         self._parse_headers()
         self._raw = None
-        self._session = session
+        if (
+            session
+            and session.accept_gzip
+            and self._headers.get("content-encoding") == "gzip"
+        ):
+            self._decoder = _GzipDecoder(self)
 
     def __enter__(self) -> "Response":
         return self
@@ -220,10 +285,12 @@ class Response:
             # Not found so load more bytes.
             # If our buffer is full, then make it bigger to load more.
             if end == len(buf):
-                new_buf = bytearray(len(buf) + 32)
-                new_buf[: len(buf)] = buf
+                new_buf = bytearray(len(buf) * 2)
+                new_buf[:end] = buf
                 buf = new_buf
                 self._receive_buffer = buf
+                if self._session:
+                    self._session._receive_buffer = buf
 
             read = self._recv_into(memoryview(buf)[end:])
             if read == 0:
@@ -290,6 +357,37 @@ class Response:
 
         return read
 
+    def _read_content_into(self, buf: bytearray) -> int:
+        """_readinto, inflating the content first when it is gzip encoded."""
+        if self._decoder:
+            return self._decoder.readinto(buf)
+        return self._readinto(buf)
+
+    def _read_body(self, readinto, size: Optional[int] = None) -> bytearray:
+        """Read until readinto returns 0, straight into one buffer.
+
+        With a known size the buffer is allocated once at that size,
+        otherwise it starts at 256 bytes and doubles as needed.
+        """
+        body = bytearray(256 if size is None else size)
+        view = memoryview(body)
+        end = 0
+        while True:
+            if end == len(body):
+                if size is not None:
+                    break
+                grown = bytearray(end * 2)
+                grown[:end] = body
+                body = grown
+                view = memoryview(body)
+            read = readinto(view[end:])
+            if read == 0:
+                break
+            end += read
+        if end < len(body):
+            return body[:end]
+        return body
+
     def _throw_away(self, nbytes: int) -> None:
         nbytes -= self._read_from_buffer(nbytes=nbytes)
 
@@ -349,9 +447,11 @@ class Response:
                     self._headers[title] = content
 
     def _validate_not_gzip(self) -> None:
-        """gzip encoding is not supported. Raise an exception if found."""
+        """gzip content is only decoded when the session accepts gzip. Raise an
+        exception if it was sent anyway."""
         if (
-            "content-encoding" in self.headers
+            not self._decoder
+            and "content-encoding" in self.headers
             and self.headers["content-encoding"] == "gzip"
         ):
             raise ValueError(
@@ -369,13 +469,32 @@ class Response:
 
     @property
     def content(self) -> bytes:
-        """The HTTP content direct from the socket, as bytes"""
+        """The HTTP content direct from the socket, as bytes. gzip content is
+        inflated when the session accepts gzip."""
+        if isinstance(self._cached, bytearray):
+            self._cached = bytes(self._cached)
+        elif self._cached is None:
+            self._cached = bytes(self.content_buffer)
+        elif not isinstance(self._cached, bytes):
+            raise RuntimeError("Cannot access content after getting text or json")
+        return self._cached
+
+    @property
+    def content_buffer(self) -> bytearray:
+        """The HTTP content read straight into one bytearray, without the copy
+        `content` makes to return bytes. gzip content is inflated when the
+        session accepts gzip."""
         if self._cached is not None:
-            if isinstance(self._cached, bytes):
+            if isinstance(self._cached, (bytes, bytearray)):
                 return self._cached
             raise RuntimeError("Cannot access content after getting text or json")
 
-        self._cached = b"".join(self.iter_content(chunk_size=32))
+        size = None
+        if not self._decoder and not self._chunked:
+            # With a Content-Length the buffer is allocated once, at that size
+            size = self._remaining
+        self._cached = self._read_body(self._read_content_into, size)
+        self.close()
         return self._cached
 
     @property
@@ -389,7 +508,7 @@ class Response:
 
         self._validate_not_gzip()
 
-        self._cached = str(self.content, self.encoding)
+        self._cached = str(self.content_buffer, self.encoding)
         return self._cached
 
     def json(self) -> Any:
@@ -418,7 +537,7 @@ class Response:
 
         b = bytearray(chunk_size)
         while True:
-            size = self._readinto(b)
+            size = self._read_content_into(b)
             if size == 0:
                 break
             if size < chunk_size:
@@ -430,54 +549,142 @@ class Response:
 
 
 class Session:
-    """HTTP session that shares sockets and ssl context."""
+    """HTTP session that shares sockets and ssl context.
+
+    :param bool accept_gzip: Ask for gzip content and inflate it as it is read.
+    :param int max_sockets: Most sockets kept open at once. Idle ones are closed,
+      least recently used first, to stay under it. None for no limit.
+    :param int max_sockets_per_host: Most sockets open to one host and port.
+    :param float idle_timeout: Close sockets idle for longer than this many
+      seconds. None keeps them until they are needed elsewhere.
+    :param bool check_idle_sockets: Check that an idle socket is still open
+      before reusing it. Turn off for ESP32SPI sockets, which report no data
+      the same way as a closed connection.
+    """
 
     def __init__(
         self,
         socket_pool: SocketpoolModuleType,
         ssl_context: Optional[SSLContextType] = None,
+        *,
+        accept_gzip: bool = False,
+        max_sockets: Optional[int] = None,
+        max_sockets_per_host: int = 1,
+        idle_timeout: Optional[float] = None,
+        check_idle_sockets: bool = True,
     ) -> None:
+        # pylint: disable=too-many-arguments
         self._socket_pool = socket_pool
         self._ssl_context = ssl_context
+        # Ask servers for gzip content and inflate it as it is read. Ignored
+        # when the firmware has no zlib.
+        self.accept_gzip = accept_gzip and zlib is not None
+        # Header parsing buffer, shared by this session's responses
+        self._receive_buffer = bytearray(32)
+        # Keep-alive pool. Idle sockets are reused per (host, port, proto)
+        # and closed least recently used first when room is needed.
+        self.max_sockets = max_sockets
+        self.max_sockets_per_host = max_sockets_per_host
+        self.idle_timeout = idle_timeout
+        self.check_idle_sockets = check_idle_sockets
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "handshakes_avoided": 0,
+            "stale": 0,
+            "evicted": 0,
+        }
+        """Pool counters: sockets reused (hits) or opened (misses), TLS
+        handshakes saved by reuse, idle sockets found closed by the server
+        (stale) and idle sockets closed to make room or after idle_timeout
+        (evicted)."""
         # Hang onto open sockets so that we can reuse them.
+        # socket: (host, port, proto)
         self._open_sockets = {}
         self._socket_free = {}
+        # socket: time.monotonic() when it was last freed
+        self._idle_since = {}
+        self._probe_buffer = bytearray(1)
         self._last_response = None
 
     def _free_socket(self, socket: SocketType) -> None:
-        if socket not in self._open_sockets.values():
+        if socket not in self._open_sockets:
             raise RuntimeError("Socket not from session")
         self._socket_free[socket] = True
+        self._idle_since[socket] = time.monotonic()
 
     def _close_socket(self, sock: SocketType) -> None:
         sock.close()
         del self._socket_free[sock]
-        key = None
-        for k in self._open_sockets:  # pylint: disable=consider-using-dict-items
-            if self._open_sockets[k] == sock:
-                key = k
-                break
-        if key:
-            del self._open_sockets[key]
-
-    def _free_sockets(self) -> None:
-        free_sockets = []
-        for sock, val in self._socket_free.items():
-            if val:
-                free_sockets.append(sock)
-        for sock in free_sockets:
-            self._close_socket(sock)
+        del self._open_sockets[sock]
+        self._idle_since.pop(sock, None)
+
+    def _idle_sockets(self, key: Optional[Tuple[str, int, str]] = None) -> list:
+        """Free sockets, to key or to any host, least recently used first."""
+        idle = [
+            sock
+            for sock, free in self._socket_free.items()
+            if free and (key is None or self._open_sockets[sock] == key)
+        ]
+        idle.sort(key=self._idle_since.get)
+        return idle
+
+    def _evict_idle(self) -> bool:
+        """Close the least recently used idle socket. False if none are idle."""
+        idle = self._idle_sockets()
+        if not idle:
+            return False
+        self._close_socket(idle[0])
+        self.stats["evicted"] += 1
+        return True
+
+    def _close_expired(self) -> None:
+        """Close sockets that have been idle longer than idle_timeout."""
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        for sock in self._idle_sockets():
+            if now - self._idle_since[sock] > self.idle_timeout:
+                self._close_socket(sock)
+                self.stats["evicted"] += 1
+
+    def _socket_alive(self, sock: SocketType) -> bool:
+        """Check an idle socket before reuse with a non-blocking read. Nothing
+        to read means it is still open. 0 bytes means the server closed it and
+        any data is left over from an earlier response."""
+        if not self.check_idle_sockets:
+            return True
+        try:
+            sock.settimeout(0)
+            sock.recv_into(self._probe_buffer, 1)
+        except OSError as exc:
+            return exc.errno in (errno.EAGAIN, errno.ETIMEDOUT)
+        return False
 
     def _get_socket(
         self, host: str, port: int, proto: str, *, timeout: float = 1
     ) -> CircuitPythonSocketType:
         # pylint: disable=too-many-branches
         key = (host, port, proto)
-        if key in self._open_sockets:
-            sock = self._open_sockets[key]
-            if self._socket_free[sock]:
+        self._close_expired()
+        # Most recently used first, it is the least likely to have timed out
+        for sock in reversed(self._idle_sockets(key)):
+            if self._socket_alive(sock):
+                sock.settimeout(timeout)
                 self._socket_free[sock] = False
+                self.stats["hits"] += 1
+                if proto == "https:":
+                    self.stats["handshakes_avoided"] += 1
                 return sock
+            self._close_socket(sock)
+            self.stats["stale"] += 1
+        self.stats["misses"] += 1
+        if list(self._open_sockets.values()).count(key) >= self.max_sockets_per_host:
+            raise RuntimeError("All sockets to " + host + " are in use")
+        if self.max_sockets is not None:
+            while len(self._open_sockets) >= self.max_sockets:
+                if not self._evict_idle():
+                    raise RuntimeError("All sockets are in use")
         if proto == "https:" and not self._ssl_context:
             raise RuntimeError(
                 "ssl_context must be set before using adafruit_requests for https"
@@ -489,11 +696,9 @@ class Session:
         sock = None
         last_exc = None
         while retry_count < 5 and sock is None:
-            if retry_count > 0:
-                if any(self._socket_free.items()):
-                    self._free_sockets()
-                else:
-                    raise RuntimeError("Sending request failed") from last_exc
+            # Out of sockets or memory, make room and try again
+            if retry_count > 0 and not self._evict_idle():
+                raise RuntimeError("Sending request failed") from last_exc
             retry_count += 1
 
             try:
@@ -525,7 +730,7 @@ class Session:
         if sock is None:
             raise RuntimeError("Repeated socket failures") from last_exc
 
-        self._open_sockets[key] = sock
+        self._open_sockets[sock] = key
         self._socket_free[sock] = False
         return sock
 
@@ -572,6 +777,8 @@ class Session:
             self._send(socket, b"\r\n")
         if "User-Agent" not in headers:
             self._send(socket, b"User-Agent: Adafruit CircuitPython\r\n")
+        if self.accept_gzip and "Accept-Encoding" not in headers:
+            self._send(socket, b"Accept-Encoding: gzip\r\n")
         # Iterate over keys to avoid tuple alloc
         for k in headers:
             self._send(socket, k.encode())
@@ -769,9 +976,13 @@ def set_socket(
     global _default_session  # pylint: disable=global-statement,invalid-name
     if not iface:
         # pylint: disable=protected-access
-        _default_session = Session(sock, _FakeSSLContext(sock._the_interface))
+        _default_session = Session(
+            sock, _FakeSSLContext(sock._the_interface), check_idle_sockets=False
+        )
     else:
-        _default_session = Session(sock, _FakeSSLContext(iface))
+        _default_session = Session(
+            sock, _FakeSSLContext(iface), check_idle_sockets=False
+        )
     sock.set_interface(iface)
 
 
@@ -362,8 +362,9 @@ class PCF(GlyphCache):
             bitmap_offsets[i] = bitmap_offset
 
         # Batch creation of glyphs and bitmaps so that we need only gc.collect
-        # once
-        gc.collect()
+        # once, and not at all for the single misses coming from get_glyph
+        if len(code_points) > 1:
+            gc.collect()
         bitmaps = [None] * len(code_points)
         for i in range(len(all_metrics)):  # pylint: disable=consider-using-enumerate
             metrics = all_metrics[i]
@@ -371,15 +372,18 @@ class PCF(GlyphCache):
                 width = metrics.right_side_bearing - metrics.left_side_bearing
                 height = metrics.character_ascent + metrics.character_descent
                 bitmap = bitmaps[i] = self.bitmap_class(width, height, 2)
-                self._glyphs[code_points[i]] = Glyph(
-                    bitmap,
-                    0,
-                    width,
-                    height,
-                    metrics.left_side_bearing,
-                    -metrics.character_descent,
-                    metrics.character_width,
-                    0,
+                self._add_glyph(
+                    code_points[i],
+                    Glyph(
+                        bitmap,
+                        0,
+                        width,
+                        height,
+                        metrics.left_side_bearing,
+                        -metrics.character_descent,
+                        metrics.character_width,
+                        0,
+                    ),
                 )
 
         for i, code_point in enumerate(code_points):
@@ -30,6 +30,7 @@ except ImportError:
     pass
 
 import gc
+import struct
 from fontio import Glyph
 from .glyph_cache import GlyphCache
 
@@ -37,10 +38,27 @@ __version__ = "0.0.0+auto.0"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Bitmap_Font.git"
 
 
+# Sidecar index layout: magic, font file size, ascent, descent, point size,
+# x resolution, y resolution, glyph count, followed by one
+# (code point, STARTCHAR offset) pair per glyph.
+_INDEX_MAGIC = b"BDFj"
+_INDEX_HEADER = "<4sIhhhhhI"
+_INDEX_ENTRY = "<II"
+_NO_METRIC = -32768
+
+
 class BDF(GlyphCache):
-    """Loads glyphs from a BDF file in the given bitmap_class."""
+    """Loads glyphs from a BDF file in the given bitmap_class.
+
+    The first lookup scans the file once and records the byte offset of every
+    ``STARTCHAR`` so each later glyph load is a single seek. Pass ``index_path``
+    to keep that table in a sidecar file that is reused while the font file
+    size stays the same.
+    """
 
-    def __init__(self, f: FileIO, bitmap_class: Bitmap) -> None:
+    def __init__(
+        self, f: FileIO, bitmap_class: Bitmap, index_path: Optional[str] = None
+    ) -> None:
         super().__init__()
         self.file = f
         self.name = f
@@ -55,37 +73,23 @@ class BDF(GlyphCache):
         self.y_resolution = None
         self._ascent = None
         self._descent = None
+        self._index = None
+        self._index_path = index_path
+        if index_path is not None:
+            self._load_index()
 
     @property
     def descent(self) -> Optional[int]:
         """The number of pixels below the baseline of a typical descender"""
-        if self._descent is None:
-            self.file.seek(0)
-            while True:
-                line = self.file.readline()
-                if not line:
-                    break
-
-                if line.startswith(b"FONT_DESCENT "):
-                    self._descent = int(line.split()[1])
-                    break
-
+        if self._index is None:
+            self._build_index()
         return self._descent
 
     @property
     def ascent(self) -> Optional[int]:
         """The number of pixels above the baseline of a typical ascender"""
-        if self._ascent is None:
-            self.file.seek(0)
-            while True:
-                line = self._readline_file()
-                if not line:
-                    break
-
-                if line.startswith("FONT_ASCENT "):
-                    self._ascent = int(line.split()[1])
-                    break
-
+        if self._index is None:
+            self._build_index()
         return self._ascent
 
     def _verify_bounding_box(self) -> None:
@@ -116,20 +120,132 @@ class BDF(GlyphCache):
         line = self.file.readline()
         return str(line, "utf-8")
 
+    def _file_size(self) -> int:
+        return self.file.seek(0, 2)
+
+    def _build_index(self, wanted: Optional[set] = None) -> None:
+        """Scan the whole file once, recording where each glyph starts along
+        with the font-wide properties that live in the header. Glyphs in
+        ``wanted`` are decoded as the scan reaches them."""
+        index = {}
+        position = 0
+        start = 0
+        self.file.seek(0)
+        while True:
+            line = self.file.readline()
+            if not line:
+                break
+            if line.startswith(b"STARTCHAR"):
+                start = position
+            elif line.startswith(b"ENCODING"):
+                code_point = int(line.split()[1])
+                if code_point >= 0:
+                    index[code_point] = start
+                if wanted and code_point in wanted:
+                    glyph = self._load_glyph(start)
+                    if glyph is not None:
+                        self._add_glyph(code_point, glyph)
+                    position = self.file.tell()
+                    continue
+            elif line.startswith(b"FONT_ASCENT "):
+                self._ascent = int(line.split()[1])
+            elif line.startswith(b"FONT_DESCENT "):
+                self._descent = int(line.split()[1])
+            elif line.startswith(b"SIZE"):
+                _, self.point_size, self.x_resolution, self.y_resolution = line.split()
+            position += len(line)
+        self._index = index
+        if self._index_path is not None:
+            self._save_index()
+
+    def _load_index(self) -> None:
+        header_size = struct.calcsize(_INDEX_HEADER)
+        entry_size = struct.calcsize(_INDEX_ENTRY)
+        try:
+            with open(self._index_path, "rb") as index_file:
+                header = index_file.read(header_size)
+                if len(header) != header_size:
+                    return
+                (
+                    magic,
+                    font_size,
+                    ascent,
+                    descent,
+                    point_size,
+                    x_resolution,
+                    y_resolution,
+                    count,
+                ) = struct.unpack(_INDEX_HEADER, header)
+                if magic != _INDEX_MAGIC or font_size != self._file_size():
+                    return
+                entries = index_file.read(entry_size * count)
+        except OSError:
+            return
+        if len(entries) != entry_size * count:
+            return
+        index = {}
+        for i in range(count):
+            code_point, offset = struct.unpack_from(
+                _INDEX_ENTRY, entries, i * entry_size
+            )
+            index[code_point] = offset
+        self._ascent = None if ascent == _NO_METRIC else ascent
+        self._descent = None if descent == _NO_METRIC else descent
+        # SIZE values are kept as the bytes a full scan reads from the file
+        if point_size != _NO_METRIC:
+            self.point_size = bytes(str(point_size), "utf-8")
+            self.x_resolution = bytes(str(x_resolution), "utf-8")
+            self.y_resolution = bytes(str(y_resolution), "utf-8")
+        self._index = index
+
+    def _save_index(self) -> None:
+        entry_size = struct.calcsize(_INDEX_ENTRY)
+        buffer = bytearray(entry_size * len(self._index))
+        for i, code_point in enumerate(self._index):
+            struct.pack_into(
+                _INDEX_ENTRY,
+                buffer,
+                i * entry_size,
+                code_point,
+                self._index[code_point],
+            )
+        point_size, x_resolution, y_resolution = self._size_metrics()
+        header = struct.pack(
+            _INDEX_HEADER,
+            _INDEX_MAGIC,
+            self._file_size(),
+            _NO_METRIC if self._ascent is None else self._ascent,
+            _NO_METRIC if self._descent is None else self._descent,
+            point_size,
+            x_resolution,
+            y_resolution,
+            len(self._index),
+        )
+        # CIRCUITPY is read-only to code.py unless boot.py remounts it, so a
+        # missing sidecar is not an error; the index is simply rebuilt next time.
+        try:
+            with open(self._index_path, "wb") as index_file:
+                index_file.write(header)
+                index_file.write(buffer)
+        except OSError:
+            pass
+
+    def _size_metrics(self) -> Tuple[int, int, int]:
+        try:
+            return (
+                int(self.point_size),
+                int(self.x_resolution),
+                int(self.y_resolution),
+            )
+        except (TypeError, ValueError):
+            # No SIZE line, or a fractional BDF 2.2 style value
+            return (_NO_METRIC, _NO_METRIC, _NO_METRIC)
+
     def get_bounding_box(self) -> Tuple[int, int, int, int]:
         """Return the maximum glyph size as a 4-tuple of: width, height, x_offset, y_offset"""
         return self._boundingbox
 
     def load_glyphs(self, code_points: Union[int, str, Iterable[int]]) -> None:
-        # pylint: disable=too-many-statements,too-many-branches,too-many-nested-blocks,too-many-locals
-        metadata = True
-        character = False
-        code_point = None
-        bytes_per_row = 1
-        desired_character = False
-        current_info = {}
-        current_y = 0
-        rounded_x = 1
         if isinstance(code_points, int):
             remaining = set()
             remaining.add(code_points)
@@ -145,89 +261,69 @@ class BDF(GlyphCache):
         if not remaining:
             return
 
-        x, _, _, _ = self._boundingbox
+        if self._index is None:
+            # Cold font: build the index and decode the glyphs in the same pass
+            if len(remaining) > 1:
+                gc.collect()
+            self._build_index(remaining)
+            return
 
-        self.file.seek(0)
+        # Visit the glyphs in file order so the reads stay mostly forward.
+        offsets = sorted(
+            (self._index[code_point], code_point)
+            for code_point in remaining
+            if code_point in self._index
+        )
+        if not offsets:
+            return
+        # Only defragment ahead of a batch; single misses from get_glyph skip it
+        if len(offsets) > 1:
+            gc.collect()
+        for offset, code_point in offsets:
+            glyph = self._load_glyph(offset)
+            if glyph is not None:
+                self._add_glyph(code_point, glyph)
+
+    def _load_glyph(self, offset: int) -> Optional[Glyph]:
+        # pylint: disable=too-many-locals
+        bitmap = None
+        bounds = None
+        shift = None
+        width = 0
+        row_bits = 0
+        current_y = -1
+        self.file.seek(offset)
         while True:
             line = self.file.readline()
-            if not line:
+            if not line or line.startswith(b"ENDCHAR"):
                 break
-            if line.startswith(b"CHARS "):
-                metadata = False
-            elif line.startswith(b"SIZE"):
-                _, self.point_size, self.x_resolution, self.y_resolution = line.split()
-            elif line.startswith(b"COMMENT"):
-                pass
-            elif line.startswith(b"STARTCHAR"):
-                character = True
-            elif line.startswith(b"ENDCHAR"):
-                character = False
-                if desired_character:
-                    bounds = current_info["bounds"]
-                    shift = current_info["shift"]
-                    gc.collect()
-                    self._glyphs[code_point] = Glyph(
-                        current_info["bitmap"],
-                        0,
-                        bounds[0],
-                        bounds[1],
-                        bounds[2],
-                        bounds[3],
-                        shift[0],
-                        shift[1],
-                    )
-                    remaining.remove(code_point)
-                    if not remaining:
-                        return
-                desired_character = False
+            if current_y >= 0:
+                bits = int(line.strip(), 16)
+                start = current_y * width
+                for x in range(width):
+                    if bits & (1 << (row_bits - 1 - x)):
+                        bitmap[start + x] = 1
+                current_y += 1
             elif line.startswith(b"BBX"):
-                if desired_character:
-                    _, x, y, x_offset, y_offset = line.split()
-                    x = int(x)
-                    y = int(y)
-                    x_offset = int(x_offset)
-                    y_offset = int(y_offset)
-                    current_info["bounds"] = (x, y, x_offset, y_offset)
-                    current_info["bitmap"] = self.bitmap_class(x, y, 2)
-            elif line.startswith(b"BITMAP"):
-                if desired_character:
-                    rounded_x = x // 8
-                    if x % 8 > 0:
-                        rounded_x += 1
-                    bytes_per_row = rounded_x
-                    if bytes_per_row % 4 > 0:
-                        bytes_per_row += 4 - bytes_per_row % 4
-                    current_y = 0
-            elif line.startswith(b"ENCODING"):
-                _, code_point = line.split()
-                code_point = int(code_point)
-                if code_point in remaining:
-                    desired_character = True
-                    current_info = {"bitmap": None, "bounds": None, "shift": None}
+                _, x, y, x_offset, y_offset = line.split()
+                bounds = (int(x), int(y), int(x_offset), int(y_offset))
+                width = bounds[0]
+                row_bits = ((width + 7) // 8) * 8
+                bitmap = self.bitmap_class(bounds[0], bounds[1], 2)
             elif line.startswith(b"DWIDTH"):
-                if desired_character:
-                    _, shift_x, shift_y = line.split()
-                    shift_x = int(shift_x)
-                    shift_y = int(shift_y)
-                    current_info["shift"] = (shift_x, shift_y)
-            elif line.startswith(b"SWIDTH"):
-                pass
-            elif character:
-                if desired_character:
-                    bits = int(line.strip(), 16)
-                    width = current_info["bounds"][0]
-                    start = current_y * width
-                    x = 0
-                    for i in range(rounded_x):
-                        val = (bits >> ((rounded_x - i - 1) * 8)) & 0xFF
-                        for j in range(7, -1, -1):
-                            if x >= width:
-                                break
-                            bit = 0
-                            if val & (1 << j) != 0:
-                                bit = 1
-                            current_info["bitmap"][start + x] = bit
-                            x += 1
-                    current_y += 1
-            elif metadata:
-                pass
+                _, shift_x, shift_y = line.split()
+                shift = (int(shift_x), int(shift_y))
+            elif line.startswith(b"BITMAP"):
+                current_y = 0
+        if bounds is None or shift is None:
+            return None
+        return Glyph(
+            bitmap,
+            0,
+            bounds[0],
+            bounds[1],
+            bounds[2],
+            bounds[3],
+            shift[0],
+            shift[1],
+        )
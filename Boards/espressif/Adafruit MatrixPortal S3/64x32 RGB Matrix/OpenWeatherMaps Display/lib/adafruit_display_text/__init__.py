@@ -13,21 +13,54 @@ __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Display_Text.git"
 from displayio import Group, Palette
 
 try:
-    from typing import Optional, List, Tuple
+    from typing import Iterator, Optional, List, Tuple
     from fontio import FontProtocol
 except ImportError:
     pass
 
 
+def _advance_table(font: Optional[FontProtocol]) -> Optional[dict]:
+    """Returns the advance width table for ``font``, or None to measure in
+    characters. The table is kept on the font so it goes away with it."""
+    if font is None:
+        return None
+    table = getattr(font, "_advance_widths", None)
+    if table is None:
+        table = {}
+        try:
+            font._advance_widths = table  # pylint: disable=protected-access
+        except AttributeError:
+            # Built in fonts take no attributes; their table lasts one call
+            pass
+    return table
+
+
+def _measure(
+    text: str, table: Optional[dict], font: Optional[FontProtocol] = None
+) -> int:
+    """Width of ``text`` from the advance table, filling it in as needed."""
+    if table is None:
+        return len(text)
+    total = 0
+    for char in text:
+        advance = table.get(char)
+        if advance is None:
+            glyph = font.get_glyph(ord(char))
+            if not glyph:
+                continue
+            advance = table[char] = glyph.shift_x
+        total += advance
+    return total
+
+
 def wrap_text_to_pixels(
     string: str,
     max_width: int,
     font: Optional[FontProtocol] = None,
     indent0: str = "",
     indent1: str = "",
+    max_lines: Optional[int] = None,
 ) -> List[str]:
-    # pylint: disable=too-many-branches, too-many-locals, too-many-nested-blocks, too-many-statements
-
     """wrap_text_to_pixels function
     A helper that will return a list of lines with word-break wrapping.
     Leading and trailing whitespace in your string will be removed. If
@@ -40,42 +73,77 @@ def wrap_text_to_pixels(
     :type font: ~fontio.FontProtocol
     :param str indent0: Additional character(s) to add to the first line.
     :param str indent1: Additional character(s) to add to all other lines.
+    :param int max_lines: Stop wrapping once this many lines are produced.
+      Wrap the whole string if None.
 
     :return: A list of the lines resulting from wrapping the
         input text at ``max_width`` pixels size
     :rtype: List[str]
 
     """
-    if font is None:
+    lines = []
+    for line in wrap_text_to_pixels_iter(string, max_width, font, indent0, indent1):
+        lines.append(line)
+        if max_lines is not None and len(lines) >= max_lines:
+            break
+    return lines
 
-        def measure(text):
-            return len(text)
 
-    else:
-        if hasattr(font, "load_glyphs"):
-            font.load_glyphs(string)
+def wrap_text_to_pixels_iter(
+    string: str,
+    max_width: int,
+    font: Optional[FontProtocol] = None,
+    indent0: str = "",
+    indent1: str = "",
+) -> Iterator[str]:
+    # pylint: disable=too-many-branches, too-many-locals, too-many-nested-blocks, too-many-statements
 
-        def measure(text):
-            total_len = 0
-            for char in text:
-                this_glyph = font.get_glyph(ord(char))
-                if this_glyph:
-                    total_len += this_glyph.shift_x
-            return total_len
+    """wrap_text_to_pixels_iter function
+    Generator form of `wrap_text_to_pixels`, yielding each line as soon as it
+    is complete. Stop iterating once you have enough lines and the rest of
+    the string is never measured.
+
+    Widths are kept as running totals and each character's advance is looked
+    up from the font once, so wrapping is linear in the length of the text.
+    Glyphs are loaded a word at a time as the text is measured.
+
+    :param str string: The text to be wrapped.
+    :param int max_width: The maximum number of pixels on a line before wrapping.
+    :param font: The font to use for measuring the text.
+    :type font: ~fontio.FontProtocol
+    :param str indent0: Additional character(s) to add to the first line.
+    :param str indent1: Additional character(s) to add to all other lines.
+
+    """
+    table = _advance_table(font)
+    load_glyphs = getattr(font, "load_glyphs", None)
+    if load_glyphs is not None:
+        load_glyphs(indent0 + indent1 + " -")
+
+    def measure(text):
+        return _measure(text, table, font)
 
-    lines = []
     partial = [indent0]
-    width = measure(indent0)
+    # Measured width of "".join(partial)
+    partial_width = measure(indent0)
+    # Width used for fitting whole words, which also counts the space
+    # before the first word of each input line
+    width = partial_width
     swidth = measure(" ")
+    hyphen_width = measure("-")
+    indent1_width = measure(indent1)
     firstword = True
     for line_in_input in string.split("\n"):
         newline = True
         for index, word in enumerate(line_in_input.split(" ")):
+            if load_glyphs is not None:
+                load_glyphs(word)
             wwidth = measure(word)
-            word_parts = []
-            cur_part = ""
 
             if wwidth > max_width:
+                word_parts = []
+                cur_part = ""
+                cur_width = 0
                 for char in word:
                     if newline:
                         extraspace = 0
@@ -83,11 +151,12 @@ def wrap_text_to_pixels(
                     else:
                         extraspace = swidth
                         leadchar = " "
+                    char_width = measure(char)
                     if (
-                        measure("".join(partial))
-                        + measure(cur_part)
-                        + measure(char)
-                        + measure("-")
+                        partial_width
+                        + cur_width
+                        + char_width
+                        + hyphen_width
                         + extraspace
                         > max_width
                     ):
@@ -99,16 +168,19 @@ def wrap_text_to_pixels(
                         else:
                             word_parts.append("".join(partial))
                         cur_part = char
+                        cur_width = char_width
                         partial = [indent1]
+                        partial_width = indent1_width
                         newline = True
                     else:
                         cur_part += char
+                        cur_width += char_width
                 if cur_part:
                     word_parts.append(cur_part)
-                for line in word_parts[:-1]:
-                    lines.append(line)
+                yield from word_parts[:-1]
                 partial.append(word_parts[-1])
                 width = measure(word_parts[-1])
+                partial_width += width
                 if firstword:
                     firstword = False
             else:
@@ -116,23 +188,24 @@ def wrap_text_to_pixels(
                     partial.append(word)
                     firstword = False
                     width += wwidth
+                    partial_width += wwidth
                 elif width + swidth + wwidth < max_width:
                     if index > 0:
                         partial.append(" ")
+                        partial_width += swidth
                     partial.append(word)
                     width += wwidth + swidth
+                    partial_width += wwidth
                 else:
-                    lines.append("".join(partial))
+                    yield "".join(partial)
                     partial = [indent1, word]
-                    width = measure(indent1) + wwidth
+                    width = partial_width = indent1_width + wwidth
             if newline:
                 newline = False
 
-        lines.append("".join(partial))
+        yield "".join(partial)
         partial = [indent1]
-        width = measure(indent1)
-
-    return lines
+        width = partial_width = indent1_width
 
 
 def wrap_text_to_lines(string: str, max_chars: int) -> List[str]:
@@ -0,0 +1,236 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""adafruit_requests receive path on recorded responses
+
+Desktop script (uses tracemalloc), run from this folder:
+    python requests_benchmark.py
+A stand-in socket pool replays a recorded OpenWeatherMap forecast, as a
+Content-Length body, as a chunked body, and gzip encoded when the request
+asks for it. Each response is read with .json(), with .content and, on the
+new Response, with .content_buffer, which skips the copy to bytes. The old
+Response, reproduced below as LegacyResponse, grew its header buffer 32
+bytes at a time and joined 32 byte iter_content chunks for .content.
+Reports bytes on the wire, time per response and peak Python heap.
+"""
+
+import gzip
+import json
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, "lib")
+# pylint: disable=wrong-import-position
+import adafruit_requests
+
+ROUNDS = 20
+RECV_SIZE = 1460  # bytes per recv_into, about one TCP segment
+
+FORECAST = json.dumps(
+    {
+        "cod": "200",
+        "cnt": 40,
+        "list": [
+            {
+                "dt": 1710763200 + step * 10800,
+                "main": {
+                    "temp": 281.5 + step % 9,
+                    "feels_like": 279.1 + step % 7,
+                    "pressure": 1016,
+                    "humidity": 60 + step % 30,
+                },
+                "weather": [
+                    {
+                        "id": 500,
+                        "main": "Rain",
+                        "description": "light rain",
+                        "icon": "10d",
+                    }
+                ],
+                "wind": {"speed": 4.12, "deg": 250, "gust": 7.3},
+                "dt_txt": f"2024-03-{18 + step // 8} {step % 8 * 3:02}:00:00",
+            }
+            for step in range(40)
+        ],
+        "city": {"name": "Phoenix", "country": "US", "timezone": -25200},
+    }
+).encode()
+
+HEADERS = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Server: openresty\r\n"
+    b"Date: Mon, 18 Mar 2024 12:00:00 GMT\r\n"
+    b"Content-Type: application/json; charset=utf-8\r\n"
+    b"Connection: keep-alive\r\n"
+    b"X-Cache-Key: /data/2.5/forecast?lat=33.45&lon=-112.07&units=imperial\r\n"
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"Access-Control-Allow-Credentials: true\r\n"
+    b"Access-Control-Allow-Methods: GET, POST\r\n"
+)
+
+
+def chunked(body, size=1024):
+    """body with chunked transfer encoding."""
+    out = b""
+    for start in range(0, len(body), size):
+        piece = body[start : start + size]
+        out += b"%x\r\n" % len(piece) + piece + b"\r\n"
+    return out + b"0\r\n\r\n"
+
+
+RECORDINGS = {
+    "content-length": HEADERS
+    + b"Content-Length: %d\r\n\r\n" % len(FORECAST)
+    + FORECAST,
+    "chunked": HEADERS + b"Transfer-Encoding: chunked\r\n\r\n" + chunked(FORECAST),
+}
+GZIPPED = gzip.compress(FORECAST)
+RECORDINGS["gzip"] = (
+    HEADERS
+    + b"Content-Encoding: gzip\r\nContent-Length: %d\r\n\r\n" % len(GZIPPED)
+    + GZIPPED
+)
+
+
+class RecordedSocket:
+    """Answers each request with the recording picked by the pool."""
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._request = b""
+        self._response = memoryview(b"")
+
+    def settimeout(self, value):
+        pass
+
+    def connect(self, address):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, data):
+        self._request += bytes(data)
+        if self._request.endswith(b"\r\n\r\n"):
+            name = self._pool.recording
+            if name == "gzip" and b"Accept-Encoding: gzip" not in self._request:
+                name = "content-length"
+            self._response = memoryview(RECORDINGS[name])
+            self._pool.wire_bytes += len(self._response)
+            self._request = b""
+        return len(data)
+
+    def recv_into(self, buf, nbytes=0):
+        size = min(nbytes or len(buf), len(buf), RECV_SIZE, len(self._response))
+        buf[:size] = self._response[:size]
+        self._response = self._response[size:]
+        return size
+
+    def recv(self, nbytes):
+        buf = bytearray(nbytes)
+        return bytes(buf[: self.recv_into(buf)])
+
+
+class RecordedPool:
+    """Enough of socketpool for Session."""
+
+    SOCK_STREAM = 1
+
+    def __init__(self):
+        self.recording = "content-length"
+        self.wire_bytes = 0
+
+    @staticmethod
+    def getaddrinfo(host, port, family=0, socktype=0):
+        # pylint: disable=unused-argument
+        return [(2, 1, 0, "", ("10.0.0.1", port))]
+
+    def socket(self, family, socktype):
+        # pylint: disable=unused-argument
+        return RecordedSocket(self)
+
+
+class LegacyResponse(adafruit_requests.Response):
+    """The previous receive path: 32 byte buffer growth, joined content."""
+
+    def _readto(self, stop):
+        buf = self._receive_buffer
+        end = self._received_length
+        while True:
+            i = buf.find(stop, 0, end)
+            if i >= 0:
+                result = buf[:i]
+                new_start = i + len(stop)
+                new_end = end - new_start
+                buf[:new_end] = buf[new_start:end]
+                self._received_length = new_end
+                return result
+            if end == len(buf):
+                new_buf = bytearray(len(buf) + 32)
+                new_buf[: len(buf)] = buf
+                buf = new_buf
+                self._receive_buffer = buf
+            read = self._recv_into(memoryview(buf)[end:])
+            if read == 0:
+                self._received_length = 0
+                return buf[:end]
+            end += read
+
+    def _read_content_into(self, buf):
+        return self._readinto(buf)
+
+    @property
+    def content(self):
+        if self._cached is not None:
+            return self._cached
+        self._cached = b"".join(self.iter_content(chunk_size=32))
+        return self._cached
+
+
+def measure(response_class, recording, accept_gzip, reader):
+    """Returns (wire bytes, ms per response, peak heap bytes)."""
+    adafruit_requests.Response = response_class
+    pool = RecordedPool()
+    pool.recording = recording
+    session = adafruit_requests.Session(pool, accept_gzip=accept_gzip)
+    expected = json.loads(FORECAST)
+    elapsed = 0
+    peak = 0
+    for _ in range(ROUNDS):
+        tracemalloc.start()
+        start = time.monotonic_ns()
+        with session.get("http://api.openweathermap.org/data/2.5/forecast") as resp:
+            result = reader(resp)
+        elapsed += time.monotonic_ns() - start
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        if reader is READERS[1][1]:
+            assert isinstance(result, bytes)
+        if not isinstance(result, dict):
+            result = json.loads(result)
+        assert result == expected
+    adafruit_requests.Response = NEW_RESPONSE
+    return pool.wire_bytes // ROUNDS, elapsed / ROUNDS / 1_000_000, peak
+
+
+NEW_RESPONSE = adafruit_requests.Response
+READERS = (
+    ("json()", lambda resp: resp.json()),
+    ("content", lambda resp: resp.content),
+    ("buffer", lambda resp: resp.content_buffer),
+)
+CASES = (
+    ("old", LegacyResponse, "content-length", False),
+    ("old", LegacyResponse, "chunked", False),
+    ("new", NEW_RESPONSE, "content-length", False),
+    ("new", NEW_RESPONSE, "chunked", False),
+    ("new", NEW_RESPONSE, "gzip", True),
+)
+
+print(f"{'Response':<24}{'Reader':<9}{'Wire':>7}{'ms':>8}{'Peak':>9}")
+for label, response_type, body, gzip_ok in CASES:
+    for reader_name, read in READERS:
+        if response_type is LegacyResponse and reader_name == "buffer":
+            continue
+        wire, ms, heap = measure(response_type, body, gzip_ok, read)
+        print(f"{label + ' ' + body:<24}{reader_name:<9}{wire:>7}{ms:>8.2f}{heap:>9}")
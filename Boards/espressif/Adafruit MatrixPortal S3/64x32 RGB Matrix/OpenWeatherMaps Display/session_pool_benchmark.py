@@ -0,0 +1,227 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""adafruit_requests.Session socket pool against stand-in servers
+
+Desktop script, run from this folder:
+    python session_pool_benchmark.py
+Replays a social media dashboard: every refresh it fetches from six HTTPS
+hosts. The stand-in radio allows 4 sockets at once (about what fits with
+TLS on an ESP32-S2) or 8, and the stand-in servers close keep-alive
+connections after 60 idle seconds. Time is simulated: a TCP connect costs one round trip, a TLS
+handshake two more and a request one. The old pool, reproduced below as
+LegacySession, kept one socket per host and closed every idle socket when
+the radio ran out.
+
+For each radio and refresh period it reports round trips per refresh, TLS
+handshakes, requests sent on a socket the server had already closed, and
+the pool's hits/misses/stale/evicted counts.
+"""
+
+import errno
+import sys
+import types
+
+sys.path.insert(0, "lib")
+# pylint: disable=wrong-import-position
+import adafruit_requests
+
+HOSTS = (
+    "www.googleapis.com",
+    "api.twitter.com",
+    "api.twitch.tv",
+    "api.github.com",
+    "mastodon.social",
+    "api.steampowered.com",
+)
+KEEP_ALIVE = 60
+REFRESHES = 8
+RESPONSE = b'HTTP/1.1 200 OK\r\nContent-Length: 17\r\n\r\n{"followers": 42}'
+
+CLOCK = types.SimpleNamespace(now=0.0)
+CLOCK.monotonic = lambda: CLOCK.now
+# The session reads the stand-in clock
+adafruit_requests.time = CLOCK
+
+
+class StandInSocket:
+    """A TLS socket to a server that drops idle keep-alive connections."""
+
+    def __init__(self, radio):
+        self._radio = radio
+        self._timeout = None
+        self._request = b""
+        self._response = b""
+        self._last_used = CLOCK.now
+        self.tls = False
+
+    def _closed_by_server(self):
+        return CLOCK.now - self._last_used > KEEP_ALIVE
+
+    def settimeout(self, value):
+        self._timeout = value
+
+    def connect(self, address):
+        # pylint: disable=unused-argument
+        self._radio.round_trips += 3 if self.tls else 1
+        self._radio.handshakes += self.tls
+
+    def close(self):
+        if self._radio:
+            self._radio.open_sockets -= 1
+            self._radio = None
+
+    def send(self, data):
+        self._request += bytes(data)
+        if self._request.endswith(b"\r\n\r\n"):
+            self._request = b""
+            # A request on a closed connection still waits a round trip for
+            # the reset
+            self._radio.round_trips += 1
+            if self._closed_by_server():
+                self._radio.dead_sends += 1
+            else:
+                self._response = RESPONSE
+                self._last_used = CLOCK.now
+        return len(data)
+
+    def recv_into(self, buf, nbytes=0):
+        if not self._response:
+            if self._timeout == 0 and not self._closed_by_server():
+                raise OSError(errno.EAGAIN, "No data available")
+            return 0
+        size = min(nbytes or len(buf), len(buf), len(self._response))
+        buf[:size] = self._response[:size]
+        self._response = self._response[size:]
+        return size
+
+    def recv(self, nbytes):
+        buf = bytearray(nbytes)
+        return bytes(buf[: self.recv_into(buf, nbytes)])
+
+
+class StandInRadio:
+    """socketpool for a radio with a fixed number of sockets."""
+
+    SOCK_STREAM = 1
+
+    def __init__(self, sockets):
+        self.sockets = sockets
+        self.open_sockets = 0
+        self.round_trips = 0
+        self.handshakes = 0
+        self.dead_sends = 0
+
+    @staticmethod
+    def getaddrinfo(host, port, family=0, socktype=0):
+        # pylint: disable=unused-argument
+        return [(2, 1, 0, "", ("10.0.0.1", port))]
+
+    def socket(self, family, socktype):
+        # pylint: disable=unused-argument
+        if self.open_sockets >= self.sockets:
+            raise RuntimeError("Out of sockets")
+        self.open_sockets += 1
+        return StandInSocket(self)
+
+
+class StandInSSLContext:
+    """Marks sockets as TLS so connect counts the handshake."""
+
+    @staticmethod
+    def wrap_socket(sock, server_hostname=None):
+        # pylint: disable=unused-argument
+        sock.tls = True
+        return sock
+
+
+class LegacySession(adafruit_requests.Session):
+    """The previous pool: one socket per host, close everything when full."""
+
+    def __init__(self, socket_pool, ssl_context=None):
+        super().__init__(socket_pool, ssl_context)
+        self._sockets_by_key = {}
+
+    def _free_socket(self, socket):
+        self._socket_free[socket] = True
+
+    def _close_socket(self, sock):
+        sock.close()
+        del self._socket_free[sock]
+        for key, open_sock in self._sockets_by_key.items():
+            if open_sock == sock:
+                del self._sockets_by_key[key]
+                break
+
+    def _get_socket(self, host, port, proto, *, timeout=1):
+        key = (host, port, proto)
+        if key in self._sockets_by_key:
+            sock = self._sockets_by_key[key]
+            if self._socket_free[sock]:
+                self._socket_free[sock] = False
+                return sock
+        addr_info = self._socket_pool.getaddrinfo(host, port)[0]
+        retry_count = 0
+        sock = None
+        while retry_count < 5 and sock is None:
+            if retry_count > 0:
+                for free_sock in [s for s, free in self._socket_free.items() if free]:
+                    self._close_socket(free_sock)
+            retry_count += 1
+            try:
+                sock = self._socket_pool.socket(addr_info[0], addr_info[1])
+            except RuntimeError:
+                continue
+            sock = self._ssl_context.wrap_socket(sock, server_hostname=host)
+            sock.settimeout(timeout)
+            sock.connect((host, port))
+        self._sockets_by_key[key] = sock
+        self._socket_free[sock] = False
+        return sock
+
+
+def refresh_all(session):
+    """One dashboard refresh: a request to every host."""
+    for host in HOSTS:
+        with session.get("https://" + host + "/followers") as response:
+            response.json()
+
+
+def measure(make_session, sockets, period):
+    """Returns (round trips per refresh, handshakes, dead sends, stats)."""
+    radio = StandInRadio(sockets)
+    session = make_session(radio)
+    CLOCK.now = 0.0
+    for _ in range(REFRESHES):
+        refresh_all(session)
+        CLOCK.now += period
+    stats = "-"
+    if not isinstance(session, LegacySession):
+        stats = "/".join(
+            str(session.stats[name]) for name in ("hits", "misses", "stale", "evicted")
+        )
+    return radio.round_trips / REFRESHES, radio.handshakes, radio.dead_sends, stats
+
+
+SESSIONS = (
+    ("old pool", lambda radio: LegacySession(radio, StandInSSLContext())),
+    (
+        "new, defaults",
+        lambda radio: adafruit_requests.Session(radio, StandInSSLContext()),
+    ),
+    (
+        "new, 50 s idle timeout",
+        lambda radio: adafruit_requests.Session(
+            radio, StandInSSLContext(), idle_timeout=50
+        ),
+    ),
+)
+
+print(f"{'Session':<24}{'Radio':>6}{'Refresh':>8}{'RTT':>6}{'TLS':>5}{'Dead':>6}  Pool")
+for radio_sockets in (4, 8):
+    for period in (20, 900):
+        for name, factory in SESSIONS:
+            trips, tls, dead, pool = measure(factory, radio_sockets, period)
+            print(
+                f"{name:<24}{radio_sockets:>6}{period:>7}s{trips:>6.1f}{tls:>5}"
+                f"{dead:>6}  {pool}"
+            )
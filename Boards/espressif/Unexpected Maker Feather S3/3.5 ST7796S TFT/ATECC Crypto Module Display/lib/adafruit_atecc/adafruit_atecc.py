@@ -45,6 +45,7 @@ Implementation Notes
 """
 
 import time
+from array import array
 from struct import pack
 
 # Since the board may or may not have access to the typing library we need
@@ -53,6 +54,7 @@ from struct import pack
 try:
     from typing import Any, Sized, Optional
     from busio import I2C
+    from circuitpython_typing import ReadableBuffer, WriteableBuffer
 except ImportError:
     pass
 
@@ -93,6 +95,7 @@ OP_LOCK = const(0x17)
 OP_GEN_KEY = const(0x40)
 OP_SIGN = const(0x41)
 OP_WRITE = const(0x12)
+OP_READ = const(0x02)
 
 # Maximum execution times, in milliseconds (9-4)
 EXEC_TIME = {
@@ -105,8 +108,43 @@ EXEC_TIME = {
     OP_GEN_KEY: const(115),
     OP_SIGN: const(70),
     OP_WRITE: const(26),
+    OP_READ: const(5),
 }
 
+# The device NACKs its address until a command completes, so responses are
+# polled for, backing off from _POLL_DELAY up to _POLL_MAX_DELAY seconds,
+# until the command's EXEC_TIME is up.
+_POLL_DELAY = 0.0005
+_POLL_MAX_DELAY = 0.004
+
+# Largest command packet (count, opcode, params, 64 data bytes, CRC, plus
+# the word address) and response (count, 64 data bytes, CRC)
+_MAX_COMMAND = const(8 + 64)
+_MAX_RESPONSE = const(64 + 3)
+
+# The watchdog puts the device to sleep, losing the SHA context, about 1.3s
+# after a wakeup. Sessions go idle and wake again once awake this long, ms.
+_AWAKE_LIMIT = const(500)
+
+
+def _crc_table():
+    # The CRC is CRC-16 with polynomial 0x8005, data bits going in least
+    # significant first. That is the bit reversed (0xA001) CRC computed a
+    # byte at a time, with the result reversed back.
+    table = array("H", [0] * 256)
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            if crc & 1:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc >>= 1
+        table[i] = crc
+    return table
+
+
+_CRC_TABLE = _crc_table()
+
 # pylint: disable=line-too-long
 """
 Configuration Zone Bytes
@@ -186,6 +224,12 @@ class ATECC:
         """
         self._debug = debug
         self._i2cbuf = bytearray(12)
+        # Reused for every command and response
+        self._command = bytearray(_MAX_COMMAND)
+        self._response = bytearray(_MAX_RESPONSE)
+        self._deadline = 0
+        self.entropy = EntropyPool(self)
+        """Random bytes and integers, see `EntropyPool`."""
         # don't probe, the device will NACK until woken up
         self._wake_device = I2CDevice(i2c_bus, 0x00, probe=False)
         self._i2c_device = I2CDevice(i2c_bus, address, probe=False)
@@ -204,7 +248,7 @@ class ATECC:
         # pylint: disable=bare-except
         try:
             with self._wake_device as i2c:
-                i2c.write(bytes([0x00]))
+                i2c.write(b"\x00")
         except:
             pass
         time.sleep(0.001)
@@ -277,7 +321,6 @@ class ATECC:
         """
         self.wakeup()
         self._send_command(0x17, 0x80 | zone, 0x0000)
-        time.sleep(EXEC_TIME[OP_LOCK] / 1000)
         res = bytearray(1)
         self._get_response(res)
         assert res[0] == 0x00, "Failed locking ATECC!"
@@ -296,7 +339,6 @@ class ATECC:
             self._send_command(OP_INFO, mode)
         else:
             self._send_command(OP_INFO, mode, param)
-        time.sleep(EXEC_TIME[OP_INFO] / 1000)
         info_out = bytearray(4)
         self._get_response(info_out)
         self.idle()
@@ -327,7 +369,6 @@ class ATECC:
             calculated_nonce = bytearray(1)
         else:
             raise RuntimeError("Invalid mode specified!")
-        time.sleep(EXEC_TIME[OP_NONCE] / 1000)
         self._get_response(calculated_nonce)
         time.sleep(1 / 1000)
         if mode == 0x03:
@@ -355,7 +396,6 @@ class ATECC:
             self._send_command(OP_COUNTER, 0x01, counter)
         else:
             self._send_command(OP_COUNTER, 0x00, counter)
-        time.sleep(EXEC_TIME[OP_COUNTER] / 1000)
         count = bytearray(4)
         self._get_response(count)
         self.idle()
@@ -373,16 +413,7 @@ class ATECC:
             rnd_min = 0
         if rnd_min >= rnd_max:
             return rnd_min
-        delta = rnd_max - rnd_min
-        r = bytearray(16)
-        r = self._random(r)
-        data = 0
-        for i in enumerate(r):
-            data += r[i[0]]
-        if data < 0:
-            data = -data
-        data = data % delta
-        return data + rnd_min
+        return rnd_min + self.entropy.randbelow(rnd_max - rnd_min)
 
     def _random(self, data: bytearray) -> bytearray:
         """
@@ -392,15 +423,10 @@ class ATECC:
         :return: bytearray
         """
         self.wakeup()
-        data_len = len(data)
-        while data_len:
+        # 32 random bytes a command, straight into data
+        for start in range(0, len(data), 32):
             self._send_command(OP_RANDOM, 0x00, 0x0000)
-            time.sleep(EXEC_TIME[OP_RANDOM] / 1000)
-            resp = bytearray(32)
-            self._get_response(resp)
-            copy_len = min(32, data_len)
-            data = resp[0:copy_len]
-            data_len -= copy_len
+            self._get_response(data, 32, start=start)
         self.idle()
         return data
 
@@ -413,7 +439,6 @@ class ATECC:
         """
         self.wakeup()
         self._send_command(OP_SHA, 0x00)
-        time.sleep(EXEC_TIME[OP_SHA] / 1000)
         status = bytearray(1)
         self._get_response(status)
         assert status[0] == 0x00, "Error during sha_start."
@@ -430,7 +455,6 @@ class ATECC:
         """
         self.wakeup()
         self._send_command(OP_SHA, 0x01, 64, message)
-        time.sleep(EXEC_TIME[OP_SHA] / 1000)
         status = bytearray(1)
         self._get_response(status)
         assert status[0] == 0x00, "Error during SHA Update"
@@ -454,13 +478,21 @@ class ATECC:
             self._send_command(OP_SHA, 0x02, len(message), message)
         else:
             self._send_command(OP_SHA, 0x02)
-        time.sleep(EXEC_TIME[OP_SHA] / 1000)
         digest = bytearray(32)
         self._get_response(digest)
         assert len(digest) == 32, "SHA response length does not match expected length."
         self.idle()
         return digest
 
+    def sha_session(self) -> "SHASession":
+        """
+        Starts a SHA-256 calculation that takes any amount of data and
+        keeps the device awake until the digest, see `SHASession`.
+
+        :return: The session
+        """
+        return SHASession(self)
+
     def gen_key(
         self, key: bytearray, slot_num: int, private_key: bool = False
     ) -> bytearray:
@@ -478,7 +510,6 @@ class ATECC:
             self._send_command(OP_GEN_KEY, 0x04, slot_num)
         else:
             self._send_command(OP_GEN_KEY, 0x00, slot_num)
-        time.sleep(EXEC_TIME[OP_GEN_KEY] / 1000)
         self._get_response(key)
         time.sleep(0.001)
         self.idle()
@@ -508,7 +539,6 @@ class ATECC:
         """
         self.wakeup()
         self._send_command(0x41, 0x80, slot_id)
-        time.sleep(EXEC_TIME[OP_SIGN] / 1000)
         signature = bytearray(64)
         self._get_response(signature)
         self.idle()
@@ -540,8 +570,7 @@ class ATECC:
             raise RuntimeError("Only 4 or 32-byte writes supported.")
         if len(buffer) == 32:
             zone |= 0x80
-        self._send_command(0x12, zone, address, buffer)
-        time.sleep(26 / 1000)
+        self._send_command(OP_WRITE, zone, address, buffer)
         status = bytearray(1)
         self._get_response(status)
         self.idle()
@@ -559,8 +588,7 @@ class ATECC:
             raise RuntimeError("Only 4 and 32 byte reads supported")
         if len(buffer) == 32:
             zone |= 0x80
-        self._send_command(2, zone, address)
-        time.sleep(0.005)
+        self._send_command(OP_READ, zone, address)
         self._get_response(buffer)
         time.sleep(0.001)
         self.idle()
@@ -576,75 +604,285 @@ class ATECC:
         :param byte param_2: The second parameter, can be two bytes.
         :param byte param_3 data: Optional remaining input data.
         """
+        size = 8 + len(data)
+        if size > _MAX_COMMAND:
+            raise RuntimeError("Command data must be 64 bytes or less.")
         # assembling command packet
-        command_packet = bytearray(8 + len(data))
+        command_packet = self._command
         # word address
         command_packet[0] = 0x03
         # i/o group: count
-        command_packet[1] = len(command_packet) - 1  # count
+        command_packet[1] = size - 1  # count
         # security command packets
         command_packet[2] = opcode
         command_packet[3] = param_1
         command_packet[4] = param_2 & 0xFF
         command_packet[5] = param_2 >> 8
-        for i, cmd in enumerate(data):
-            command_packet[6 + i] = cmd
+        if data:
+            command_packet[6 : size - 2] = data
         if self._debug:
-            print("Command Packet Sz: ", len(command_packet))
-            print("\tSending:", [hex(i) for i in command_packet])
+            print("Command Packet Sz: ", size)
+            print("\tSending:", [hex(i) for i in command_packet[0:size]])
         # Checksum, CRC16 verification
-        crc = self._at_crc(command_packet[1:-2])
-        command_packet[-1] = crc >> 8
-        command_packet[-2] = crc & 0xFF
+        crc = self._at_crc(command_packet, size - 3, start=1)
+        command_packet[size - 1] = crc >> 8
+        command_packet[size - 2] = crc & 0xFF
 
-        self.wakeup()
+        # the caller has woken the device
         with self._i2c_device as i2c:
-            i2c.write(command_packet)
-        # small sleep
-        time.sleep(0.001)
+            i2c.write(command_packet, end=size)
+        # Poll for the response until the worst case execution time is up
+        self._deadline = time.monotonic_ns() + EXEC_TIME[opcode] * 1000000
 
-    def _get_response(self, buf: Sized, length: int = None, retries: int = 20) -> int:
-        self.wakeup()
+    def _get_response(
+        self, buf: Sized, length: int = None, retries: int = 20, start: int = 0
+    ) -> int:
+        """
+        Reads a command's response, once the device has finished it.
+
+        :param buf: Buffer for the response data.
+        :param int length: Number of data bytes in the response, defaults to len(buf).
+        :param int retries: Reads to try once the execution time is up.
+        :param int start: Where in buf to put the data.
+        :return: The first data byte, the status for most commands.
+        """
         if length is None:
             length = len(buf)
-        response = bytearray(length + 3)  # 1 byte header, 2 bytes CRC, len bytes data
+        # 1 byte header, 2 bytes CRC, len bytes data
+        response = self._response
+        end = length + 3
+        delay = _POLL_DELAY
         with self._i2c_device as i2c:
-            for _ in range(retries):
+            while True:
                 try:
-                    i2c.readinto(response)
+                    i2c.readinto(response, end=end)
                     break
                 except OSError:
+                    # Still busy, the device NACKs until it is done
                     pass
-            else:
-                raise RuntimeError("Failed to read data from chip")
+                if time.monotonic_ns() < self._deadline:
+                    time.sleep(delay)
+                    delay = min(delay * 2, _POLL_MAX_DELAY)
+                    continue
+                retries -= 1
+                if retries <= 0:
+                    raise RuntimeError("Failed to read data from chip")
         if self._debug:
-            print("\tReceived: ", [hex(i) for i in response])
-        crc = response[-2] | (response[-1] << 8)
-        crc2 = self._at_crc(response[0:-2])
+            print("\tReceived: ", [hex(i) for i in response[0:end]])
+        crc = response[end - 2] | (response[end - 1] << 8)
+        crc2 = self._at_crc(response, end - 2)
         crc=crc2
         if crc != crc2:
             raise RuntimeError("CRC Mismatch")
-        for i in range(length):
-            buf[i] = response[i + 1]
+        for i in range(min(length, len(buf) - start)):
+            buf[start + i] = response[i + 1]
         return response[1]
 
     @staticmethod
-    def _at_crc(data: Sized, length: int = None) -> int:
+    def _at_crc(data: Sized, length: int = None, start: int = 0) -> int:
         if length is None:
-            length = len(data)
-        if not data or not length:
+            length = len(data) - start
+        if not data or length <= 0:
             return 0
-        polynom = 0x8005
+        table = _CRC_TABLE
         crc = 0x0
-        for b in data:
-            for shift in range(8):
-                data_bit = 0
-                if b & (1 << shift):
-                    data_bit = 1
-                crc_bit = (crc >> 15) & 0x1
-                crc <<= 1
-                crc &= 0xFFFF
-                if data_bit != crc_bit:
-                    crc ^= polynom
-                    crc &= 0xFFFF
-        return crc & 0xFFFF
+        for i in range(start, start + length):
+            crc = (crc >> 8) ^ table[(crc ^ data[i]) & 0xFF]
+        # Reverse the bits back
+        crc = ((crc >> 1) & 0x5555) | ((crc & 0x5555) << 1)
+        crc = ((crc >> 2) & 0x3333) | ((crc & 0x3333) << 2)
+        crc = ((crc >> 4) & 0x0F0F) | ((crc & 0x0F0F) << 4)
+        return ((crc >> 8) | (crc << 8)) & 0xFFFF
+
+
+class SHASession:
+    """
+    SHA-256 of any amount of data in one wake cycle, from `ATECC.sha_session`.
+
+    Data is sent in 64-byte blocks as they fill up, without idling the device
+    in between. To keep the watchdog from putting the device to sleep, a long
+    session idles and wakes it again every _AWAKE_LIMIT ms; idle keeps the
+    SHA context.
+
+    .. code-block:: python
+
+        with atecc.sha_session() as sha:
+            for chunk in chunks:
+                sha.update(chunk)
+            digest = sha.digest()
+    """
+
+    # pylint: disable=protected-access
+
+    def __init__(self, atecc: ATECC):
+        self._atecc = atecc
+        self._block = bytearray(64)
+        self._status = bytearray(1)
+        self._fill = 0
+        self._open = True
+        atecc.wakeup()
+        self._woken = time.monotonic_ns()
+        self._command(0x00)
+
+    def __enter__(self) -> "SHASession":
+        return self
+
+    def __exit__(self, *exc):
+        if self._open:
+            self._open = False
+            self._atecc.idle()
+
+    def _command(self, mode: int, length: int = 0, data: Sized = "") -> None:
+        atecc = self._atecc
+        if time.monotonic_ns() - self._woken > _AWAKE_LIMIT * 1000000:
+            atecc.idle()
+            atecc.wakeup()
+            self._woken = time.monotonic_ns()
+        atecc._send_command(OP_SHA, mode, length, data)
+        if mode != 0x02:
+            atecc._get_response(self._status)
+            assert self._status[0] == 0x00, "Error during SHA session"
+
+    def update(self, data: ReadableBuffer) -> None:
+        """
+        Appends bytes to the message. Can be repeatedly called.
+
+        :param data: Any number of bytes.
+        """
+        if not self._open:
+            raise RuntimeError("SHA session is finished.")
+        view = memoryview(data)
+        size = len(view)
+        start = 0
+        if self._fill:
+            # Top up the block left over from last time
+            start = min(64 - self._fill, size)
+            self._block[self._fill : self._fill + start] = view[0:start]
+            self._fill += start
+            if self._fill < 64:
+                return
+            self._command(0x01, 64, self._block)
+            self._fill = 0
+        while size - start >= 64:
+            self._command(0x01, 64, view[start : start + 64])
+            start += 64
+        self._fill = size - start
+        self._block[0 : self._fill] = view[start:size]
+
+    def digest(self, digest: Optional[WriteableBuffer] = None) -> WriteableBuffer:
+        """
+        Finishes the session and returns the digest of everything passed
+        to update.
+
+        :param digest: Optional 32-byte buffer to put the digest into.
+        :return: The digest
+        """
+        if not self._open:
+            raise RuntimeError("SHA session is finished.")
+        if digest is None:
+            digest = bytearray(32)
+        if self._fill:
+            self._command(0x02, self._fill, memoryview(self._block)[0 : self._fill])
+        else:
+            self._command(0x02)
+        self._atecc._get_response(digest, 32)
+        self.__exit__()
+        return digest
+
+
+class EntropyPool:
+    """
+    Random bytes and unbiased random integers from the device's RNG.
+
+    Bytes are served from a 32-byte pool that is refilled by one Random
+    command once used up, so small requests don't cost a command each.
+    Bytes are never served twice.
+    """
+
+    # pylint: disable=protected-access
+
+    def __init__(self, atecc: ATECC):
+        self._atecc = atecc
+        self._pool = bytearray(32)
+        self._used = 32
+
+    def _fetch(self) -> None:
+        self._atecc._send_command(OP_RANDOM, 0x00, 0x0000)
+        self._atecc._get_response(self._pool)
+        self._used = 0
+
+    def refill(self) -> None:
+        """Replaces the pool with 32 new random bytes."""
+        self._atecc.wakeup()
+        self._fetch()
+        self._atecc.idle()
+
+    def readinto(self, buf: WriteableBuffer) -> WriteableBuffer:
+        """
+        Fills a buffer with random bytes, waking the device at most once.
+
+        :param buf: The buffer to fill.
+        :return: buf
+        """
+        count = len(buf)
+        done = 0
+        awake = False
+        while done < count:
+            if self._used == 32:
+                if not awake:
+                    self._atecc.wakeup()
+                    awake = True
+                self._fetch()
+            take = min(32 - self._used, count - done)
+            for i in range(take):
+                buf[done + i] = self._pool[self._used + i]
+            self._used += take
+            done += take
+        if awake:
+            self._atecc.idle()
+        return buf
+
+    def read(self, count: int) -> bytearray:
+        """
+        Returns random bytes.
+
+        :param int count: How many.
+        :return: bytearray of count random bytes
+        """
+        return self.readinto(bytearray(count))
+
+    def randbelow(self, limit: int) -> int:
+        """
+        Returns a random integer from 0 up to, not including, limit. Draws
+        just enough bits and tries again when they are out of range, rather
+        than taking a remainder, so every value is as likely.
+
+        :param int limit: Upper bound, at least 1.
+        :return: Random integer
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        bits = 0
+        while (1 << bits) < limit:
+            bits += 1
+        mask = (1 << bits) - 1
+        while True:
+            value = 0
+            for _ in range((bits + 7) // 8):
+                if self._used == 32:
+                    self.refill()
+                value = (value << 8) | self._pool[self._used]
+                self._used += 1
+            value &= mask
+            if value < limit:
+                return value
+
+    def randrange(self, start: int, stop: int) -> int:
+        """
+        Returns a random integer from start up to, not including, stop.
+
+        :param int start: Lowest value.
+        :param int stop: One more than the highest value.
+        :return: Random integer
+        """
+        return start + self.randbelow(stop - start)
@@ -18,7 +18,7 @@ import wifi
 
 from adafruit_bitmap_font import bitmap_font
 import adafruit_requests
-from adafruit_display_text import label, wrap_text_to_pixels
+from adafruit_display_text import label, wrap_text_to_pixels_iter
 from circuitpython_st7796s import ST7796S
 from jpegio import JpegDecoder
 
@@ -118,6 +118,10 @@ tile_grid_avatar = displayio.TileGrid(
 
 Arial12 = bitmap_font.load_font("/fonts/Arial-12.bdf")
 Arial16 = bitmap_font.load_font("/fonts/Arial-16.bdf")
+# PR titles can pull in any glyph, so bound the cache and keep the digits
+# and punctuation loaded (see glyph_cache_benchmark.py for the budgets)
+Arial12.max_bytes = 8192
+Arial12.pin("0123456789.,:;-#()/ ")
 
 # Label Customizations
 pr_author_label = label.Label(Arial16)
@@ -168,49 +172,17 @@ text_group.append(desc_key_label)
 text_group.append(desc_value_label)
 display.root_group = text_group
 
-# Assigning wrap_text_to_pixels to wordwrap
-wordwrap = wrap_text_to_pixels
-
-
-def truncate_text_to_lines(text, max_chars_per_line, max_lines):
-    lines = text.split('\r\n')
-    truncated_lines = []
-    total_chars = 0
-    total_lines = 0
-
-    for line in lines:
-        if total_lines >= max_lines:
-            break
-
-        # Subtract 2 characters for the newline characters at the end of each line
-        if len(line) == 0:
-            # Treat consecutive newlines as blank lines with 78 characters
-            if truncated_lines and truncated_lines[-1] != "":
-                total_chars += 78
-                total_lines += 1
-                truncated_lines.append(line)
-        elif len(line) <= max_chars_per_line:
-            truncated_lines.append(line)
-            total_chars += len(line)
-            total_chars -= 2
-            total_lines += 1
-        else:
-            # If the line exceeds max_chars_per_line, truncate it
-            truncated_lines.append(line[:max_chars_per_line] + '...')
-            total_chars += max_chars_per_line
-            total_chars -= 2
-            total_lines += 1
-
-    # Add any newlines as 78 characters to the total_chars count
-    total_chars += text.count('\r\n\r\n') * 78
-
-    # Adjust total_lines for consecutive newlines
-    total_lines += text.count('\r\n\r\n')
-
-    # Remove blank lines from the truncated text
-    truncated_text = '\r\n'.join(line for line in truncated_lines if line.strip())
-
-    return truncated_text, min(total_lines, max_lines), total_chars
+def wrap_text_to_display(text, max_lines, font=terminalio.FONT):
+    """Pixel wraps text to the display width, skipping blank lines.
+    Wrapping stops once max_lines lines are ready."""
+    lines = []
+    for line in wrap_text_to_pixels_iter(
+            text.replace('\r\n', '\n'), DISPLAY_WIDTH-2, font):
+        if line.strip():
+            lines.append(line)
+            if len(lines) >= max_lines:
+                break
+    return "\n".join(lines)
 
 
 def time_calc(input_time):
@@ -442,22 +414,13 @@ while True:
 
                     PR_TITLE = response_buffer["title"]
                     print(f" |  | Title: {PR_TITLE}")
-                    truncated_text1, total_lines, total_chars = truncate_text_to_lines(
-                            PR_TITLE, 75, 4)
-                    pixelwrapped1 = "\n".join(
-                            wrap_text_to_pixels(
-                                truncated_text1, DISPLAY_WIDTH-2, terminalio.FONT))
-
-                    title_value_label.text = f"{pixelwrapped1}"
+                    title_value_label.text = wrap_text_to_display(PR_TITLE, 4)
                     if response_buffer["body"] is not None:
                         PR_DESCRIPTION = response_buffer["body"][:800]
                         print(f" |  | Description: {PR_DESCRIPTION}\n\n")
-                        truncated_text2, total_lines, total_chars = truncate_text_to_lines(
-                                PR_DESCRIPTION, 75, 11)
                         desc_key_label.text = "Description:"
-                        pixelwrapped2 = "\n".join(wrap_text_to_pixels(
-                                truncated_text2, DISPLAY_WIDTH-2, terminalio.FONT))
-                        desc_value_label.text = f"{pixelwrapped2}"
+                        desc_value_label.text = wrap_text_to_display(
+                                PR_DESCRIPTION, 11)
 
                     time.sleep(5)
                     # Rotate through the submissions
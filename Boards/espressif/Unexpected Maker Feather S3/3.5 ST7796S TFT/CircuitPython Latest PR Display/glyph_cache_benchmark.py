@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+# Coded for Circuit Python 9.x
+"""Glyph cache footprint replay for the Latest PR Display
+
+Replays PR text the way the display labels consume it (load_glyphs for the
+whole string, then get_glyph per character) and reports cache hits, misses,
+evictions and the steady-state glyph memory for a few cache budgets.
+
+Uses the adafruit_bitmap_font .py sources in this project's lib; code.py
+runs Arial-12 with an 8192 byte budget and the HOT_GLYPHS pinned. Runs on
+the board or on a desktop with Blinka:
+    python glyph_cache_benchmark.py [fonts_dir] [text_file]
+A text file replays one label string per line instead of the built-in samples.
+"""
+
+import sys
+from displayio import Bitmap
+from adafruit_bitmap_font import bdf
+
+FONT_DIR = sys.argv[1] if len(sys.argv) > 1 else "/fonts"
+FONT_FILE = FONT_DIR + "/Arial-12.bdf"
+ROTATIONS = 20
+BUDGETS = (None, 8192, 6144, 4096, 3072)
+HOT_GLYPHS = "0123456789.,:;-#()/ "
+
+SAMPLES = (
+    "tannewt",
+    "#9321",
+    "closed",
+    "Update frozen libraries and translations for 9.1.0-beta.4",
+    "Fix ESP32-S3 USB host enumeration when a hub is attached (#9180)",
+    "This PR moves the displayio refresh onto a background task so that\r\n"
+    "long running user code no longer blocks the screen. Tested on\r\n"
+    "Feather ESP32-S3 TFT, MatrixPortal S3 and Pico W.\r\n\r\n"
+    "Fixes #9012, #9045",
+    "Adds `audiomixer.Mixer.voice[...].level` ramping; the default is\r\n"
+    "unchanged (0.0 -> 1.0 over 0 ms). Size impact: +412 bytes on SAMD21.",
+    "Translations update from Hosted Weblate: Deutsch 98.7% ✅, "
+    "Français 97.1%, Español 100%, 日本語 64.3%",
+    "Bump actions/checkout from 3 to 4 — see CHANGELOG.md for details",
+)
+
+
+def load_stream():
+    """Returns the label strings to replay, in display order."""
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], "r") as text_file:
+            return [line.rstrip("\n") for line in text_file if line.strip()]
+    return SAMPLES
+
+
+def replay(stream, max_bytes, pin_hot):
+    """Runs every rotation against a fresh font and returns its cache."""
+    font_file = open(FONT_FILE, "rb")  # pylint: disable=consider-using-with
+    font = bdf.BDF(font_file, Bitmap)
+    font.max_bytes = max_bytes
+    if pin_hot:
+        font.pin(HOT_GLYPHS)
+    for _ in range(ROTATIONS):
+        for text in stream:
+            font.load_glyphs(text)
+            for character in text:
+                font.get_glyph(ord(character))
+    font_file.close()
+    return font
+
+
+stream = load_stream()
+print(f"Replaying {len(stream)} strings x {ROTATIONS} rotations from {FONT_FILE}")
+print(
+    f"{'Budget':>8}{'Pinned':>8}{'Hits':>8}{'Misses':>8}"
+    f"{'Evicted':>9}{'Glyphs':>8}{'Bytes':>8}"
+)
+for budget in BUDGETS:
+    for pinned in (False, True):
+        cache = replay(stream, budget, pinned)
+        print(
+            f"{str(budget):>8}{str(pinned):>8}{cache.hits:>8}{cache.misses:>8}"
+            f"{cache.evictions:>9}{len(cache._glyphs):>8}"  # pylint: disable=protected-access
+            f"{cache.cache_bytes:>8}"
+        )
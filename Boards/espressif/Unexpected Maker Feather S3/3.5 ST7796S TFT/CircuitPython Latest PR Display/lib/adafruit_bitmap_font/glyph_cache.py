@@ -0,0 +1,153 @@
+# SPDX-FileCopyrightText: 2019 Scott Shawcroft for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`adafruit_bitmap_font.glyph_cache`
+====================================================
+
+Displays text using CircuitPython's displayio.
+
+* Author(s): Scott Shawcroft
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://github.com/adafruit/circuitpython/releases
+
+"""
+
+try:
+    from typing import Optional, Union, Iterable
+    from fontio import Glyph
+except ImportError:
+    pass
+
+import gc
+from collections import OrderedDict
+
+__version__ = "0.0.0+auto.0"
+__repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Bitmap_Font.git"
+
+# Rough cost of the Glyph and Bitmap objects themselves, on top of pixel data
+_GLYPH_OVERHEAD = 64
+# Code points remembered as absent from the font before the set starts over
+_MISSING_LIMIT = 64
+
+
+def _glyph_size(glyph: Glyph) -> int:
+    # Glyph bitmaps are 1 bit per pixel with rows padded to 32 bits
+    return ((glyph.width + 31) // 32) * 4 * glyph.height + _GLYPH_OVERHEAD
+
+
+def _code_point_set(code_points: Union[int, str, Iterable[int]]) -> set:
+    if isinstance(code_points, int):
+        return {code_points}
+    if isinstance(code_points, str):
+        return set(ord(c) for c in code_points)
+    return set(code_points)
+
+
+class GlyphCache:
+    """Caches glyphs loaded by a subclass.
+
+    By default every glyph is kept. Set ``max_bytes`` to bound the cache: the
+    least recently used glyphs are then dropped once their estimated size goes
+    over budget, except for glyphs that have been pinned with `pin`.
+    """
+
+    def __init__(self) -> None:
+        self._glyphs = OrderedDict()
+        self._sizes = {}
+        self._pinned = set()
+        self._missing = set()
+        self._freed = 0
+        self.max_bytes = None
+        """Upper bound on the estimated glyph memory, or None for no limit"""
+        self.cache_bytes = 0
+        """Estimated memory held by the cached glyphs"""
+        self.hits = 0
+        """Number of `get_glyph` calls served from the cache"""
+        self.misses = 0
+        """Number of `get_glyph` calls that had to load from the font file"""
+        self.evictions = 0
+        """Number of glyphs dropped to stay within ``max_bytes``"""
+
+    def load_glyphs(self, code_points: Union[int, str, Iterable[int]]) -> None:
+        """Loads displayio.Glyph objects into the GlyphCache from the font."""
+
+    def get_glyph(self, code_point: int) -> Optional[Glyph]:
+        """Returns a displayio.Glyph for the given code point or None is unsupported."""
+        glyph = self._glyphs.get(code_point)
+        if glyph is not None:
+            self.hits += 1
+            if self.max_bytes is not None:
+                # Re-inserting moves the glyph to the most recently used end.
+                # That shifts the dict entries on MicroPython, so it is only
+                # worth doing when a budget makes the order matter.
+                del self._glyphs[code_point]
+                self._glyphs[code_point] = glyph
+            return glyph
+        if code_point in self._missing:
+            self.hits += 1
+            return None
+
+        self.misses += 1
+        self.load_glyphs((code_point,))
+        glyph = self._glyphs.get(code_point)
+        if glyph is None:
+            if len(self._missing) >= _MISSING_LIMIT:
+                self._missing.clear()
+            self._missing.add(code_point)
+        return glyph
+
+    def pin(self, code_points: Union[int, str, Iterable[int]]) -> None:
+        """Loads the given glyphs and keeps them out of LRU eviction."""
+        code_points = _code_point_set(code_points)
+        self._pinned.update(code_points)
+        self.load_glyphs(code_points)
+
+    def unpin(self, code_points: Union[int, str, Iterable[int]]) -> None:
+        """Lets previously pinned glyphs be evicted again."""
+        self._pinned.difference_update(_code_point_set(code_points))
+
+    def _add_glyph(self, code_point: int, glyph: Glyph) -> None:
+        """Stores a glyph loaded by a subclass and applies the memory budget."""
+        if code_point in self._glyphs:
+            self.cache_bytes -= self._sizes[code_point]
+            del self._glyphs[code_point]
+        size = _glyph_size(glyph)
+        self._glyphs[code_point] = glyph
+        self._sizes[code_point] = size
+        self.cache_bytes += size
+        self._missing.discard(code_point)
+        if self.max_bytes is not None and self.cache_bytes > self.max_bytes:
+            self._evict(code_point)
+
+    def _evict(self, keep: int) -> None:
+        victims = []
+        excess = self.cache_bytes - self.max_bytes
+        for code_point in self._glyphs:
+            if excess <= 0:
+                break
+            if code_point == keep or code_point in self._pinned:
+                continue
+            victims.append(code_point)
+            excess -= self._sizes[code_point]
+        for code_point in victims:
+            del self._glyphs[code_point]
+            size = self._sizes.pop(code_point)
+            self.cache_bytes -= size
+            self._freed += size
+        self.evictions += len(victims)
+        # Most evictions free a glyph or two, which the allocator reclaims on
+        # its own. Only collect once half the budget has been dropped, so a
+        # full cache does not pay for a collection on every miss.
+        if self._freed * 2 >= self.max_bytes:
+            self._freed = 0
+            gc.collect()
@@ -0,0 +1,163 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+# Coded for Circuit Python 9.x
+"""Word wrap timing for long PR bodies
+
+Wraps 800 character PR bodies to the display width three ways: the old
+wrap_text_to_pixels (reproduced below as legacy_wrap, it re-measures the
+whole partial line for every character of an overlong word), the new
+wrap_text_to_pixels on the full body, and wrap_text_to_pixels_iter stopped
+at the 11 lines the description label shows.
+
+Needs the adafruit_display_text __init__.py from this project's /lib. Runs
+on the board (terminalio.FONT) or on a desktop with Blinka, given a BDF:
+    python wrap_benchmark.py [fonts/Arial-12.bdf]
+"""
+
+import sys
+import time
+from adafruit_display_text import wrap_text_to_pixels, wrap_text_to_pixels_iter
+
+if len(sys.argv) > 1:
+    from displayio import Bitmap
+    from adafruit_bitmap_font import bitmap_font
+
+    FONT = bitmap_font.load_font(sys.argv[1], Bitmap)
+else:
+    import terminalio
+
+    FONT = terminalio.FONT
+
+MAX_WIDTH = 478
+MAX_LINES = 11
+ROUNDS = 5
+
+BODIES = (
+    (
+        "This PR moves the displayio refresh onto a background task so that "
+        "long running user code no longer blocks the screen. Tested on "
+        "Feather ESP32-S3 TFT, MatrixPortal S3 and Pico W.\r\n\r\n"
+    )
+    * 5,
+    "Build log: https://github.com/adafruit/circuitpython/actions/runs/"
+    + "8471623519/job/23212318421?pr=9321#step:7:1" * 16
+    + "\r\n\r\nThe failure above is unrelated to this change.",
+    "- [x] Tested on hardware\r\n- [ ] Docs updated\r\n" * 20,
+    "Translations update from Hosted Weblate: Deutsch 98.7%, Français 97.1%, "
+    "Español 100%, 日本語 64.3%. " * 8,
+)
+
+
+def legacy_wrap(string, max_width, font=None, indent0="", indent1=""):
+    """The previous wrap_text_to_pixels, kept for comparison."""
+    # pylint: disable=too-many-branches,too-many-locals,too-many-statements
+    # pylint: disable=too-many-nested-blocks
+    if font is None:
+
+        def measure(text):
+            return len(text)
+
+    else:
+        if hasattr(font, "load_glyphs"):
+            font.load_glyphs(string)
+
+        def measure(text):
+            total_len = 0
+            for char in text:
+                this_glyph = font.get_glyph(ord(char))
+                if this_glyph:
+                    total_len += this_glyph.shift_x
+            return total_len
+
+    lines = []
+    partial = [indent0]
+    width = measure(indent0)
+    swidth = measure(" ")
+    firstword = True
+    for line_in_input in string.split("\n"):
+        newline = True
+        for index, word in enumerate(line_in_input.split(" ")):
+            wwidth = measure(word)
+            word_parts = []
+            cur_part = ""
+            if wwidth > max_width:
+                for char in word:
+                    extraspace = 0 if newline else swidth
+                    leadchar = "" if newline else " "
+                    if (
+                        measure("".join(partial))
+                        + measure(cur_part)
+                        + measure(char)
+                        + measure("-")
+                        + extraspace
+                        > max_width
+                    ):
+                        if cur_part:
+                            word_parts.append(
+                                "".join(partial) + leadchar + cur_part + "-"
+                            )
+                        else:
+                            word_parts.append("".join(partial))
+                        cur_part = char
+                        partial = [indent1]
+                        newline = True
+                    else:
+                        cur_part += char
+                if cur_part:
+                    word_parts.append(cur_part)
+                for line in word_parts[:-1]:
+                    lines.append(line)
+                partial.append(word_parts[-1])
+                width = measure(word_parts[-1])
+                firstword = False
+            else:
+                if firstword:
+                    partial.append(word)
+                    firstword = False
+                    width += wwidth
+                elif width + swidth + wwidth < max_width:
+                    if index > 0:
+                        partial.append(" ")
+                    partial.append(word)
+                    width += wwidth + swidth
+                else:
+                    lines.append("".join(partial))
+                    partial = [indent1, word]
+                    width = measure(indent1) + wwidth
+            newline = False
+        lines.append("".join(partial))
+        partial = [indent1]
+        width = measure(indent1)
+    return lines
+
+
+def first_lines(body):
+    """Streams the body until the label is full, like code.py does."""
+    lines = []
+    for line in wrap_text_to_pixels_iter(body, MAX_WIDTH, FONT):
+        if line.strip():
+            lines.append(line)
+            if len(lines) >= MAX_LINES:
+                break
+    return lines
+
+
+def time_ms(wrapper, body):
+    """Average ms for one call of wrapper(body)."""
+    start = time.monotonic_ns()
+    for _ in range(ROUNDS):
+        wrapper(body)
+    return (time.monotonic_ns() - start) / ROUNDS / 1_000_000
+
+
+print(f"{'Body':>5}{'Chars':>7}{'Lines':>7}{'Old ms':>9}{'New ms':>9}{'11 lines':>10}")
+for number, text in enumerate(BODIES):
+    text = text[:800].replace("\r\n", "\n")
+    wrapped = wrap_text_to_pixels(text, MAX_WIDTH, FONT)
+    assert wrapped == legacy_wrap(text, MAX_WIDTH, FONT)
+    old_ms = time_ms(lambda body: legacy_wrap(body, MAX_WIDTH, FONT), text)
+    new_ms = time_ms(lambda body: wrap_text_to_pixels(body, MAX_WIDTH, FONT), text)
+    print(
+        f"{number:>5}{len(text):>7}{len(wrapped):>7}{old_ms:>9.1f}{new_ms:>9.1f}"
+        f"{time_ms(first_lines, text):>10.1f}"
+    )
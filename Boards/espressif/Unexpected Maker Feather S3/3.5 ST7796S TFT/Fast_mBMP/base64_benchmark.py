@@ -0,0 +1,138 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""
+Buffer base64 decoding against the old character at a time a2b_base64
+
+Desktop script, run from this folder:
+    python base64_benchmark.py
+Decodes a 100 KB payload, base64 encoded on one line and as 76 character
+MIME lines, with:
+- the old a2b_base64, kept below as it was
+- the new a2b_base64, which returns a new bytes object
+- a2b_base64_into a preallocated buffer
+- Base64Decoder fed 1460 byte chunks (a TCP segment) into one reused
+  buffer, as a network download would be
+
+Checks every result against CPython's binascii, then reports decoded bytes
+per second (best of five) and the peak heap above what was allocated
+before decoding (tracemalloc, which counts Python objects, not the
+microcontroller's heap, but the same allocations). Host speeds are only a
+guide to relative speed on the board.
+"""
+
+# pylint: disable=import-error, wrong-import-position
+
+import base64
+import binascii
+import os
+import sys
+import time
+import tracemalloc
+import types
+
+_typing = types.ModuleType("circuitpython_typing")
+_typing.ReadableBuffer = _typing.WriteableBuffer = object
+sys.modules.setdefault("circuitpython_typing", _typing)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "lib"))
+sys.dont_write_bytecode = True
+
+import adafruit_binascii
+
+PAYLOAD = os.urandom(100 * 1024)
+CHUNK = 1460
+
+
+def old_a2b_base64(b64_data):
+    """adafruit_binascii.a2b_base64 before the buffer codec."""
+    table = adafruit_binascii.TABLE_A2B_B64
+    res = []
+    quad_pos = 0
+    leftchar = 0
+    leftbits = 0
+    last_char_was_a_pad = False
+
+    for char in b64_data:
+        char = chr(char)
+        if char == "=":
+            if quad_pos > 2 or (quad_pos == 2 and last_char_was_a_pad):
+                break  # stop on 'xxx=' or on 'xx=='
+            last_char_was_a_pad = True
+        else:
+            n = ord(table[ord(char)])
+            if n == 0xFF:
+                continue  # ignore strange characters
+            quad_pos = (quad_pos + 1) & 3
+            leftchar = (leftchar << 6) | n
+            leftbits += 6
+            if leftbits >= 8:
+                leftbits -= 8
+                res.append((leftchar >> leftbits).to_bytes(1, "big"))
+                leftchar &= (1 << leftbits) - 1
+            last_char_was_a_pad = False
+    else:
+        if leftbits != 0:
+            raise ValueError("Incorrect padding")
+
+    return b"".join(res)
+
+
+def new_into(encoded, buf):
+    count = adafruit_binascii.a2b_base64_into(encoded, buf)
+    return memoryview(buf)[:count]
+
+
+def new_chunked(encoded, buf, decoder, decoded):
+    """Decode a chunk at a time; decoded stands for the file or display the
+    bytes would be written to, and is only used to check them."""
+    view = memoryview(encoded)
+    for start in range(0, len(encoded), CHUNK):
+        count = decoder.decode_into(view[start : start + CHUNK], buf)
+        if decoded is not None:
+            decoded += buf[:count]
+    decoder.finish()
+    return decoded
+
+
+def measure(function, *args):
+    """(best bytes per second, peak heap bytes) of a call."""
+    best = None
+    for _ in range(5):
+        start = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return len(PAYLOAD) / best, peak
+
+
+def main():
+    one_line = binascii.b2a_base64(PAYLOAD)
+    mime = base64.encodebytes(PAYLOAD)
+    into_buf = bytearray(len(mime) * 3 // 4)
+    chunk_buf = bytearray(adafruit_binascii.Base64Decoder.max_decoded_length(CHUNK))
+    decoder = adafruit_binascii.Base64Decoder()
+    for encoded in (one_line, mime):
+        assert old_a2b_base64(encoded) == PAYLOAD
+        assert adafruit_binascii.a2b_base64(encoded) == PAYLOAD
+        assert new_into(encoded, into_buf) == PAYLOAD
+        assert new_chunked(encoded, chunk_buf, decoder, bytearray()) == PAYLOAD
+    assert adafruit_binascii.b2a_base64(PAYLOAD) == one_line
+
+    print(f"{'Decoding 100 KB':<32}{'KB/s':>9}{'Peak heap B':>13}")
+    for name, encoded in (("one line", one_line), ("MIME lines", mime)):
+        for method, function, args in (
+            ("old a2b_base64", old_a2b_base64, ()),
+            ("new a2b_base64", adafruit_binascii.a2b_base64, ()),
+            ("a2b_base64_into", new_into, (into_buf,)),
+            ("Base64Decoder, 1460 B", new_chunked, (chunk_buf, decoder, None)),
+        ):
+            speed, peak = measure(function, encoded, *args)
+            print(f"{name + ', ' + method:<32}{speed / 1024:>9.0f}{peak:>13}")
+
+
+main()
@@ -24,7 +24,7 @@ Implementation Notes
 """
 try:
     from typing import Union
-    from circuitpython_typing import ReadableBuffer
+    from circuitpython_typing import ReadableBuffer, WriteableBuffer
     from binascii import hexlify, unhexlify
 except ImportError:
     pass
@@ -105,50 +105,189 @@ def _transform(n: int) -> str:
     return chr(n)
 
 
+# Byte lookup tables for the buffer codecs: sextet of each character, 0xFF
+# for characters outside the alphabet, and character of each sextet
+_A2B_B64 = bytes(n & 0xFF for n in TABLE_A2B_B64)
+_B2A_B64 = bytes(TABLE_B2A_B64, "ascii")
+_PAD = 0x3D  # "="
+
 TABLE_A2B_B64 = "".join(map(_transform, TABLE_A2B_B64))
 assert len(TABLE_A2B_B64) == 256
 
 
-def a2b_base64(b64_data: ReadableBuffer) -> bytes:
-    """Convert a block of base64 data back to binary and return the binary data.
+class Base64Decoder:
+    """Decodes base64 into a buffer, a chunk at a time.
 
-    :param bytes b64_data: Base64 data.
+    Gives the same results as `a2b_base64` on the data joined up, so chunks
+    may split groups of four characters anywhere. Characters outside the
+    alphabet are skipped, and everything after the closing padding is
+    ignored. Nothing is allocated once the decoder exists.
+
+    .. code-block:: python
+
+        decoder = Base64Decoder()
+        while True:
+            count = socket.recv_into(chunk)
+            if not count:
+                break
+            size = decoder.decode_into(memoryview(chunk)[:count], out)
+            # out[:size] holds the decoded bytes
+        decoder.finish()
     """
 
-    res = []
-    quad_pos = 0
-    leftchar = 0
-    leftbits = 0
-    last_char_was_a_pad = False
-
-    for char in b64_data:
-        char = chr(char)
-        if char == "=":
-            if quad_pos > 2 or (quad_pos == 2 and last_char_was_a_pad):
-                break  # stop on 'xxx=' or on 'xx=='
-            last_char_was_a_pad = True
-        else:
-            n = ord(TABLE_A2B_B64[ord(char)])
-            if n == 0xFF:
-                continue  # ignore strange characters
-            #
-            # Shift it in on the low end, and see if there's
-            # a byte ready for output.
-            quad_pos = (quad_pos + 1) & 3
-            leftchar = (leftchar << 6) | n
-            leftbits += 6
-            #
-            if leftbits >= 8:
-                leftbits -= 8
-                res.append((leftchar >> leftbits).to_bytes(1, "big"))
-                leftchar &= (1 << leftbits) - 1
-            #
-            last_char_was_a_pad = False
-    else:
-        if leftbits != 0:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Start on new data."""
+        self._quad_pos = 0
+        self._leftchar = 0
+        self._leftbits = 0
+        self._last_char_was_a_pad = False
+        self._done = False
+
+    @staticmethod
+    def max_decoded_length(length: int) -> int:
+        """Largest number of bytes that length characters (plus up to three
+        carried over from an earlier chunk) can decode to."""
+        return (length + 3) * 3 // 4
+
+    def decode_into(self, b64_data: ReadableBuffer, buf: WriteableBuffer) -> int:
+        """Decode a chunk of base64 data into buf.
+
+        :param ReadableBuffer b64_data: Base64 data.
+        :param WriteableBuffer buf: Where to put the bytes, at least
+            `max_decoded_length` of the chunk.
+        :return: Number of bytes put in buf.
+        """
+        # pylint: disable=too-many-branches
+        if self._done:
+            return 0
+        table = _A2B_B64
+        quad_pos = self._quad_pos
+        leftchar = self._leftchar
+        leftbits = self._leftbits
+        last_char_was_a_pad = self._last_char_was_a_pad
+        length = len(b64_data)
+        i = 0
+        out = 0
+        while i < length:
+            if quad_pos == 0:
+                # Whole groups of four, the usual case
+                end = length - 3
+                while i < end:
+                    a = table[b64_data[i]]
+                    b = table[b64_data[i + 1]]
+                    c = table[b64_data[i + 2]]
+                    d = table[b64_data[i + 3]]
+                    if (a | b | c | d) & 0xC0:
+                        break  # padding, line breaks or other characters
+                    group = (a << 18) | (b << 12) | (c << 6) | d
+                    buf[out] = group >> 16
+                    buf[out + 1] = (group >> 8) & 0xFF
+                    buf[out + 2] = group & 0xFF
+                    out += 3
+                    i += 4
+                    last_char_was_a_pad = False
+                if i == length:
+                    break
+            # A character at a time, as a2b_base64 always did
+            char = b64_data[i]
+            i += 1
+            if char == _PAD:
+                if quad_pos > 2 or (quad_pos == 2 and last_char_was_a_pad):
+                    self._done = True  # stop on 'xxx=' or on 'xx=='
+                    break
+                last_char_was_a_pad = True
+            else:
+                n = table[char]
+                if n == 0xFF:
+                    continue  # ignore strange characters
+                quad_pos = (quad_pos + 1) & 3
+                leftchar = (leftchar << 6) | n
+                leftbits += 6
+                if leftbits >= 8:
+                    leftbits -= 8
+                    buf[out] = leftchar >> leftbits
+                    out += 1
+                    leftchar &= (1 << leftbits) - 1
+                last_char_was_a_pad = False
+        self._quad_pos = quad_pos
+        self._leftchar = leftchar
+        self._leftbits = leftbits
+        self._last_char_was_a_pad = last_char_was_a_pad
+        return out
+
+    def finish(self) -> None:
+        """Check that the data ended on a whole group, then reset.
+
+        :raises ValueError: if it did not.
+        """
+        incomplete = self._leftbits != 0 and not self._done
+        self.reset()
+        if incomplete:
             raise ValueError("Incorrect padding")
 
-    return b"".join(res)
+
+def a2b_base64_into(b64_data: ReadableBuffer, buf: WriteableBuffer) -> int:
+    """Convert a block of base64 data back to binary, into buf.
+
+    :param bytes b64_data: Base64 data.
+    :param WriteableBuffer buf: Where to put the bytes, at least
+        len(b64_data) * 3 // 4 long.
+    :return: Number of bytes put in buf.
+    """
+    decoder = Base64Decoder()
+    count = decoder.decode_into(b64_data, buf)
+    decoder.finish()
+    return count
+
+
+def b2a_base64_into(
+    bin_data: ReadableBuffer, buf: WriteableBuffer, newline: bool = True
+) -> int:
+    """Convert binary data to base64, into buf.
+
+    :param ReadableBuffer bin_data: Binary data.
+    :param WriteableBuffer buf: Where to put the characters, at least
+        (len(bin_data) + 2) // 3 * 4 + 1 long.
+    :param bool newline: End with a newline, as `b2a_base64` does.
+    :return: Number of bytes put in buf.
+    """
+    table = _B2A_B64
+    length = len(bin_data)
+    whole = length - length % 3
+    out = 0
+    for i in range(0, whole, 3):
+        group = (bin_data[i] << 16) | (bin_data[i + 1] << 8) | bin_data[i + 2]
+        buf[out] = table[group >> 18]
+        buf[out + 1] = table[(group >> 12) & 0x3F]
+        buf[out + 2] = table[(group >> 6) & 0x3F]
+        buf[out + 3] = table[group & 0x3F]
+        out += 4
+    if length > whole:
+        group = bin_data[whole] << 16
+        if length - whole == 2:
+            group |= bin_data[whole + 1] << 8
+        buf[out] = table[group >> 18]
+        buf[out + 1] = table[(group >> 12) & 0x3F]
+        buf[out + 2] = table[(group >> 6) & 0x3F] if length - whole == 2 else _PAD
+        buf[out + 3] = _PAD
+        out += 4
+    if newline:
+        buf[out] = 0x0A
+        out += 1
+    return out
+
+
+def a2b_base64(b64_data: ReadableBuffer) -> bytes:
+    """Convert a block of base64 data back to binary and return the binary data.
+
+    :param bytes b64_data: Base64 data.
+    """
+    buf = bytearray(len(b64_data) * 3 // 4)
+    count = a2b_base64_into(b64_data, buf)
+    return bytes(memoryview(buf)[:count])
 
 
 def b2a_base64(bin_data: ReadableBuffer) -> bytes:
@@ -156,29 +295,6 @@ def b2a_base64(bin_data: ReadableBuffer) -> bytes:
 
     :param ReadableBuffer bin_data: Binary data string, as bytes
     """
-
-    newlength = (len(bin_data) + 2) // 3
-    newlength = newlength * 4 + 1
-    res = []
-
-    leftchar = 0
-    leftbits = 0
-    for char in bin_data:
-        # Shift into our buffer, and output any 6bits ready
-        leftchar = (leftchar << 8) | char
-        leftbits += 8
-        res.append(TABLE_B2A_B64[(leftchar >> (leftbits - 6)) & 0x3F])
-        leftbits -= 6
-        if leftbits >= 6:
-            res.append(TABLE_B2A_B64[(leftchar >> (leftbits - 6)) & 0x3F])
-            leftbits -= 6
-    #
-    if leftbits == 2:
-        res.append(TABLE_B2A_B64[(leftchar & 3) << 4])
-        res.append("=")
-        res.append("=")
-    elif leftbits == 4:
-        res.append(TABLE_B2A_B64[(leftchar & 0xF) << 2])
-        res.append("=")
-    res.append("\n")
-    return bytes("".join(res), "ascii")
+    buf = bytearray((len(bin_data) + 2) // 3 * 4 + 1)
+    b2a_base64_into(bin_data, buf)
+    return bytes(buf)
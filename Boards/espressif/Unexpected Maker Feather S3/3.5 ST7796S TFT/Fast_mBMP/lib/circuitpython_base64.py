@@ -58,6 +58,7 @@ __all__ = [
     # Generalized interface for other encodings
     "b64encode",
     "b64decode",
+    "b64decode_into",
     "b32encode",
     "b32decode",
     "b16encode",
@@ -135,6 +136,23 @@ def b64decode(todecode, altchars=None, validate=False):
     return binascii.a2b_base64(todecode)
 
 
+def b64decode_into(todecode, buf, altchars=None):
+    """Decode a Base64 encoded byte string into a buffer.
+
+    Like b64decode, but the decoded bytes go into buf, a bytearray or
+    memoryview at least len(todecode) * 3 // 4 long, and their number is
+    returned. todecode may also be a memoryview. To decode data as it
+    arrives, use binascii.Base64Decoder.
+    """
+    if not isinstance(todecode, memoryview):
+        todecode = _bytes_from_decode_data(todecode)
+    if altchars is not None:
+        altchars = _bytes_from_decode_data(altchars)
+        assert len(altchars) == 2, repr(altchars)
+        todecode = bytes(todecode).translate(bytes.maketrans(altchars, b"+/"))
+    return binascii.a2b_base64_into(todecode, buf)
+
+
 def standard_b64encode(toencode):
     """Encode a byte string using the standard Base64 alphabet.
 
@@ -23,10 +23,10 @@ DISPLAY_HEIGHT = 320
 DISPLAY_ROTATION = 180
 
 # Touch calibration
-TOUCH_X_MIN = 100
-TOUCH_X_MAX = 1988
-TOUCH_Y_MIN = 100
-TOUCH_Y_MAX = 1988
+TOUCH_X_MIN = 200
+TOUCH_X_MAX = 3976
+TOUCH_Y_MIN = 200
+TOUCH_Y_MAX = 3976
 
 tft_cs = board.D9
 tft_dc = board.D10
@@ -102,7 +102,9 @@ print("Go Ahead - Touch the Screen - Make My Day!")
 
 x = y = 0
 x_min = y_min = x_max = y_max = min(DISPLAY_WIDTH, DISPLAY_HEIGHT) // 2
-z_min = z_max = 500
+# Pressure in the units of Touch(z_threshold=...)
+z_min = 4095
+z_max = 0
 x_min_label.text = f"X-Min:{x_min}"
 x_max_label.text = f"X-Max:{x_max}"
 y_min_label.text = f"Y-Min:{y_min}"
@@ -110,9 +112,10 @@ y_max_label.text = f"Y-Max:{y_max}"
 instructions_label.text = f"draw swirlies on corners to calibrate"
 
 while True:
-    x = touch.raw_touch()
-    z = touch.get_pressure()
-    if x and z is not None:
+    # Filtered raw reading, spikes and light touches are already dropped
+    x = touch.raw_point
+    if x is not None:
+        z = x[2]
         x_min = min(x_min, x[0])
         x_max = max(x_max, x[0])
         y_min = min(y_min, x[1])
@@ -0,0 +1,227 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+# Coded for Circuit Python 9.x
+"""XPT2046 touch latency against a simulated controller
+
+Runs on the board (uses a spare pin as chip select, nothing needs to be
+wired) or on a desktop:
+    python touch_benchmark.py [seed]
+A simulated XPT2046 answers the SPI transactions with a noisy reading of a
+fixed touch. Compares the old get_touch (five single-command samples 50 ms
+apart, reproduced below) with the batched, filtered get_touch and with
+touch_point, and reports time per tap, SPI transactions per tap and the
+error from the true position in pixels.
+
+Also checks the orientation handling: at rotation 0 the raw axes are
+swapped, at 180 they are not, and 90 or 270 are refused without a
+calibration matrix, which then maps touches on its own.
+"""
+
+import random
+import sys
+import time
+
+try:
+    import board
+    import digitalio  # pylint: disable=unused-import
+
+    CS_PIN = board.D6
+except (ImportError, NotImplementedError, AttributeError):
+    # Desktop: stand-ins for the board only modules the driver imports
+    import types
+
+    _digitalio = types.ModuleType("digitalio")
+
+    class _DigitalInOut:
+        def __init__(self, pin):
+            self.value = 1
+            self.direction = None
+            self.pull = None
+
+        def switch_to_output(self, value=False, drive_mode=None):
+            # pylint: disable=unused-argument
+            self.value = value
+
+    _digitalio.DigitalInOut = _DigitalInOut
+    _digitalio.Direction = types.SimpleNamespace(INPUT=0, OUTPUT=1)
+    _digitalio.Pull = types.SimpleNamespace(UP=1, DOWN=2)
+    _digitalio.DriveMode = types.SimpleNamespace(PUSH_PULL=0)
+    sys.modules["digitalio"] = _digitalio
+    if "micropython" not in sys.modules:
+        _micropython = types.ModuleType("micropython")
+        _micropython.const = lambda value: value
+        sys.modules["micropython"] = _micropython
+    CS_PIN = None
+
+sys.path.insert(0, "lib")
+# pylint: disable=wrong-import-position
+from circuitpython_xpt2046 import Touch
+
+WIDTH = 480
+HEIGHT = 320
+ROTATION = 180
+TAPS = 20
+# Raw 12 bit reading of the simulated touch and its display position
+TOUCH_X = 2600
+TOUCH_Y = 1400
+NOISE = 6
+
+
+class SimulatedXPT2046:
+    """Enough of busio.SPI for SPIDevice, answering like an XPT2046."""
+
+    def __init__(self):
+        self.transactions = 0
+
+    def try_lock(self):
+        return True
+
+    def unlock(self):
+        pass
+
+    def configure(self, **kwargs):
+        pass
+
+    @staticmethod
+    def conversion(command):
+        """A noisy 12 bit conversion for a control byte."""
+        channel = command & 0x70
+        if channel == 0x10:
+            value = TOUCH_X
+        elif channel == 0x50:
+            value = TOUCH_Y
+        elif channel == 0x30:
+            value = 900
+        else:
+            value = 3200
+        if random.random() < 0.02:
+            # Occasional spike, the kind the median filter removes
+            return random.randrange(4096)
+        return max(0, min(4095, value + random.randrange(-NOISE, NOISE + 1)))
+
+    def write_readinto(self, out_buffer, in_buffer):
+        """Shift out control bytes and shift in 16 clock results."""
+        self.transactions += 1
+        for index in range(len(in_buffer)):
+            in_buffer[index] = 0
+        for index, command in enumerate(out_buffer):
+            if command & 0x80 and index + 2 < len(in_buffer) + 1:
+                word = self.conversion(command) << 3
+                in_buffer[index + 1] = word >> 8
+                if index + 2 < len(in_buffer):
+                    in_buffer[index + 2] |= word & 0xFF
+
+
+class LegacyTouch(Touch):
+    """The previous get_touch: five samples 50 ms apart."""
+
+    def legacy_command(self, command):
+        """The old send_command, an 11 bit result."""
+        self.tx_buf[0] = command
+        with self.device as spi:
+            spi.write_readinto(self.tx_buf, self.rx_buf)
+        return ((self.rx_buf[1] << 4) | (self.rx_buf[2] >> 4)) << 1
+
+    def get_touch(self):
+        timeout = 2
+        confidence = 5
+        buff = [[0, 0] for x in range(confidence)]
+        buffptr = 0
+        nsamples = 0
+        while timeout > 0:
+            if nsamples == confidence:
+                meanx = sum([c[0] for c in buff]) // confidence
+                meany = sum([c[1] for c in buff]) // confidence
+                dev = (
+                    sum([(c[0] - meanx) ** 2 + (c[1] - meany) ** 2 for c in buff])
+                    / confidence
+                )
+                if dev <= 50 * 4:  # scaled for 12 bit readings
+                    return self.normalize(meanx, meany)
+            x = self.legacy_command(self.GET_X)
+            y = self.legacy_command(self.GET_Y)
+            if self.x_min <= x <= self.x_max and self.y_min <= y <= self.y_max:
+                buff[buffptr] = [x, y]
+                buffptr = (buffptr + 1) % confidence
+                nsamples = min(nsamples + 1, confidence)
+            else:
+                nsamples = 0
+            time.sleep(0.05)
+            timeout -= 0.05
+        return None
+
+
+def run(name, touch, read):
+    """Time TAPS taps through read() and print a result row."""
+    bus = touch.spi
+    bus.transactions = 0
+    expected = touch.normalize(TOUCH_X, TOUCH_Y)
+    error = 0
+    found = 0
+    start = time.monotonic_ns()
+    for _ in range(TAPS):
+        point = read(touch)
+        if point is not None:
+            found += 1
+            error += abs(point[0] - expected[0]) + abs(point[1] - expected[1])
+    elapsed = (time.monotonic_ns() - start) / TAPS / 1_000_000
+    print(
+        f"{name:<22}{elapsed:>10.2f}{bus.transactions / TAPS:>8.1f}"
+        f"{found:>7}{error / max(found, 1):>9.1f}"
+    )
+
+
+def make(touch_class, rotation=ROTATION, calibration=None):
+    """A driver on a fresh simulated controller."""
+    return touch_class(
+        spi=SimulatedXPT2046(), cs=CS_PIN, width=WIDTH, height=HEIGHT,
+        rotation=rotation, calibration=calibration,
+    )
+
+
+def near(point, expected):
+    """Within a pixel, the mapping truncates to int."""
+    return abs(point[0] - expected[0]) <= 1 and abs(point[1] - expected[1]) <= 1
+
+
+def check_rotations():
+    """Corner mapping at 0 and 180, and the 90/270 calibration rule."""
+    for rotation, corner in ((0, (1400, 2600)), (180, (2600, 1400))):
+        touch = Touch(
+            spi=SimulatedXPT2046(), cs=CS_PIN, width=WIDTH, height=HEIGHT,
+            rotation=rotation, x_min=200, x_max=4000, y_min=200, y_max=4000,
+        )
+        assert near(touch.to_display(200, 200), (0, 0))
+        assert near(touch.to_display(4000, 4000), (WIDTH, HEIGHT))
+        # Raw X reaches display x only when the axes are not swapped
+        assert touch.to_display(*corner) == touch.normalize(2600, 1400)
+    display_points = ((20, 20), (460, 20), (240, 300))
+    raw_points = ((3900, 300), (3900, 3700), (400, 2000))
+    matrix = Touch.compute_calibration(raw_points, display_points)
+    for rotation in (90, 270):
+        try:
+            make(Touch, rotation)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"rotation {rotation} without calibration")
+        touch = make(Touch, rotation, matrix)
+        for raw, expected in zip(raw_points, display_points):
+            assert near(touch.to_display(*raw), expected)
+    print("Rotation 0/180 mapping and 90/270 calibration checks passed")
+
+
+def streaming(touch):
+    """touch_point once per main loop pass, after a few passes of warm up."""
+    point = None
+    for _ in range(3):
+        point = touch.touch_point
+    return point
+
+
+random.seed(int(sys.argv[1]) if len(sys.argv) > 1 else 1)
+print(f"{'Reader':<22}{'ms/tap':>10}{'SPI':>8}{'Found':>7}{'Error':>9}")
+run("old get_touch", make(LegacyTouch), lambda touch: touch.get_touch())
+run("new get_touch", make(Touch), lambda touch: touch.get_touch())
+run("touch_point x3", make(Touch), streaming)
+check_rotations()
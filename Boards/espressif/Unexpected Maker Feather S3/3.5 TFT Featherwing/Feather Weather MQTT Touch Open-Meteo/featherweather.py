@@ -8,7 +8,6 @@ import digitalio
 import adafruit_imageload
 import adafruit_sdcard
 import storage
-import json
 import feathers3
 from adafruit_hx8357 import HX8357
 import adafruit_stmpe610
@@ -17,6 +16,7 @@ from adafruit_bitmap_font import bitmap_font
 from adafruit_display_shapes.roundrect import RoundRect
 from adafruit_button.sprite_button import SpriteButton
 from slider import Slider
+from weather_table import weather_code_parser, weather_icon_parser
 from soft_keyboard.soft_keyboard import SoftKeyboard, PRINTABLE_CHARACTERS
 
 # 3.5" TFT Featherwing is 480x320
@@ -163,13 +163,30 @@ TEXT_YELLOW = 0xFFFF00
 
 # Custom BDF or PCF fonts
 splash_label.text = "Loading Fonts..."
-forkawesome_font = bitmap_font.load_font("/fonts/forkawesome-12.pcf")
-Arial_16 = bitmap_font.load_font("/fonts/Arial-16.bdf")
-GoodTimes_16 = bitmap_font.load_font("/fonts/GoodTimesRg-Regular-16.bdf")
-GoodTimes_22 = bitmap_font.load_font("/fonts/GoodTimesRg-Regular-22.bdf")
-GoodTimes_30 = bitmap_font.load_font("/fonts/GoodTimesRg-Regular-30.bdf")
-GoodTimes_40 = bitmap_font.load_font("/fonts/GoodTimesRg-Regular-40.bdf")
-GoodTimes_121 = bitmap_font.load_font("/fonts/GoodTimesRg-Regular-121.bdf")
+# Each font comes up with the glyphs its main page labels show, so the first
+# weather update does not stop to read them. BDF glyph offsets are kept in
+# .idx files beside the fonts whenever CIRCUITPY is writable.
+fonts, font_load_ms = bitmap_font.load_fonts(
+    {
+        # Keyboard icons and menu button text load when those are built
+        "forkawesome": ("/fonts/forkawesome-12.pcf", ""),
+        "Arial_16": ("/fonts/Arial-16.bdf", ""),
+        "GoodTimes_16": ("/fonts/GoodTimesRg-Regular-16.bdf", "0123456789/: °FHumidityPressure"),
+        "GoodTimes_22": ("/fonts/GoodTimesRg-Regular-22.bdf", "0123456789.-% mphv"),
+        "GoodTimes_30": ("/fonts/GoodTimesRg-Regular-30.bdf", "0123456789:"),
+        "GoodTimes_40": ("/fonts/GoodTimesRg-Regular-40.bdf", "0123456789.-% "),
+        "GoodTimes_121": ("/fonts/GoodTimesRg-Regular-121.bdf", "0123456789.-"),
+    },
+    index=True,
+)
+print(f"Font load ms: {font_load_ms}")
+forkawesome_font = fonts["forkawesome"]
+Arial_16 = fonts["Arial_16"]
+GoodTimes_16 = fonts["GoodTimes_16"]
+GoodTimes_22 = fonts["GoodTimes_22"]
+GoodTimes_30 = fonts["GoodTimes_30"]
+GoodTimes_40 = fonts["GoodTimes_40"]
+GoodTimes_121 = fonts["GoodTimes_121"]
 
 splash_label.text = "Loading Labels..."
 
@@ -756,26 +773,3 @@ def time_calc(input_time):
     if input_time < 86400.0:
         return f"{math.floor(input_time / 3600.0)} hours"
     return f"{math.floor(input_time / 86400.0)} days"
-
-def weather_code_parser(code, is_day):
-    weather_codes_file = "weather_codes.py"
-    with open(f"{weather_codes_file}", "r") as wc:
-        weather_codes_json = json.loads(wc.read())
-        if is_day == 1:
-            day_description = weather_codes_json[code]["day"]["description"]
-            return (day_description)
-        if is_day == 0:
-            night_description = weather_codes_json[code]["night"]["description"]
-            return (night_description)
-
-def weather_icon_parser(code, is_day):
-    weather_codes_file = "weather_codes.py"
-    with open(f"{weather_codes_file}", "r") as wc:
-        weather_codes_json = json.loads(wc.read())
-        if is_day == 1:
-            day_icon = weather_codes_json[code]["day"]["image"]
-            return (day_icon)
-        if is_day == 0:
-            night_icon = weather_codes_json[code]["night"]["image"]
-            return (night_icon)
-
@@ -0,0 +1,732 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""
+Tile atlas SoftKeyboard against the old Label per key GridLayout one
+
+Desktop script, run from this folder:
+    python soft_keyboard_benchmark.py
+Builds both keyboards the way featherweather.py does (478x220 pixels,
+mobile_layout.json, 0.1 s cooldown and highlight), then types a sentence
+600 times over on a simulated clock, a frame every 20 ms: three frames
+touching the key, three released. The old keyboard is kept below as it was;
+shift is pressed before each capital.
+
+Board only modules are replaced by stand-ins:
+- displayio and bitmaptools, drawing into one byte per pixel; bitmap memory
+  is counted at the bits per pixel displayio would use
+- terminalio.FONT and the forkawesome font, 6x12 and 12x12 made up glyphs
+- label.Label and GridLayout, modelled on adafruit_display_text 3.x and
+  adafruit_displayio_layout 2.x: a TileGrid per glyph, a background box
+  Bitmap while a background colour is set, divider line Bitmaps per cell,
+  which_cell_contains by arithmetic and get_cell by walking the cells
+- json, which on the board accepts the trailing comma in mobile_layout.json
+
+Checks that both keyboards return the same key values, that pressed keys
+and shift are highlighted and that every highlight is taken down again.
+Then reports construction time (best of 5), memory per key (tracemalloc,
+host objects) and the time check_touches takes on the frame a key is
+pressed and on the frames between, early on and after 550 presses. Times
+leave out the bitmaptools stand-ins, which are C on the board; the pixels
+they draw are reported instead.
+
+Construction is the tile atlas keyboard's cost: it draws every label up
+front, reading the font's glyph pixels in Python, where the old keyboard
+only made Labels and left the drawing to displayio on every refresh.
+"""
+
+# pylint: disable=import-error, wrong-import-position, too-few-public-methods
+# pylint: disable=too-many-arguments, too-many-instance-attributes
+
+import contextlib
+import gc
+import io
+import os
+import re
+import sys
+import time
+import tracemalloc
+import types
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LIB = os.path.join(HERE, "lib", "soft_keyboard")
+
+# Stand-ins for the board only modules ---
+
+_BITMAP_SLACK = [0]  # host bytes above what displayio would allocate
+DRAWING = {"ns": 0, "pixels": 0}  # spent in the bitmaptools stand-ins
+
+
+class Bitmap:
+    """displayio.Bitmap, one byte per pixel."""
+
+    def __init__(self, width, height, value_count):
+        self.width = width
+        self.height = height
+        bits = 1
+        while (1 << bits) < value_count:
+            bits *= 2
+        self.pixels = bytearray(width * height)
+        _BITMAP_SLACK[0] += len(self.pixels) - (width * bits + 31) // 32 * 4 * height
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            index = index[1] * self.width + index[0]
+        return self.pixels[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, tuple):
+            index = index[1] * self.width + index[0]
+        self.pixels[index] = value
+
+
+def fill_region(bitmap, x1, y1, x2, y2, value):
+    """bitmaptools.fill_region"""
+    start = time.perf_counter_ns()
+    run = bytes((value,)) * (x2 - x1)
+    for y in range(y1, y2):
+        bitmap.pixels[y * bitmap.width + x1 : y * bitmap.width + x2] = run
+    DRAWING["pixels"] += (x2 - x1) * (y2 - y1)
+    DRAWING["ns"] += time.perf_counter_ns() - start
+
+
+def blit(
+    dest_bitmap,
+    source_bitmap,
+    x,
+    y,
+    *,
+    x1=0,
+    y1=0,
+    x2=None,
+    y2=None,
+    skip_source_index=None,
+):
+    """bitmaptools.blit, between regions that do not overlap"""
+    start_ns = time.perf_counter_ns()
+    x2 = source_bitmap.width if x2 is None else x2
+    y2 = source_bitmap.height if y2 is None else y2
+    runs = re.compile(b"[^" + re.escape(bytes((skip_source_index,))) + b"]+")
+    for row in range(y2 - y1):
+        start = (y1 + row) * source_bitmap.width + x1
+        line = source_bitmap.pixels[start : start + x2 - x1]
+        dest = (y + row) * dest_bitmap.width + x
+        for run in runs.finditer(line):
+            dest_bitmap.pixels[dest + run.start() : dest + run.end()] = run.group()
+    DRAWING["pixels"] += (x2 - x1) * (y2 - y1)
+    DRAWING["ns"] += time.perf_counter_ns() - start_ns
+
+
+class Palette(list):
+    """displayio.Palette"""
+
+    def __init__(self, count):
+        super().__init__([0] * count)
+        self.transparent = set()
+
+    def make_transparent(self, index):
+        self.transparent.add(index)
+
+
+class TileGrid:
+    """displayio.TileGrid"""
+
+    def __init__(
+        self,
+        bitmap,
+        pixel_shader=None,
+        width=1,
+        height=1,
+        tile_width=None,
+        tile_height=None,
+        default_tile=0,
+        x=0,
+        y=0,
+    ):
+        self.bitmap = bitmap
+        self.pixel_shader = pixel_shader
+        self.width = width
+        self.height = height
+        self.tile_width = tile_width or bitmap.width
+        self.tile_height = tile_height or bitmap.height
+        self.tiles = [default_tile] * (width * height)
+        self.x = x
+        self.y = y
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            index = index[1] * self.width + index[0]
+        return self.tiles[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, tuple):
+            index = index[1] * self.width + index[0]
+        self.tiles[index] = value
+
+
+class Group(list):
+    """displayio.Group"""
+
+    def __init__(self, x=0, y=0, scale=1):
+        super().__init__()
+        self.x = x
+        self.y = y
+        self.scale = scale
+
+
+class Glyph:
+    """fontio.Glyph"""
+
+    def __init__(self, bitmap, tile_index, width, height, dx, dy, shift_x):
+        self.bitmap = bitmap
+        self.tile_index = tile_index
+        self.width = width
+        self.height = height
+        self.dx = dx
+        self.dy = dy
+        self.shift_x = shift_x
+        self.shift_y = 0
+
+
+def _ink(code, col, row):
+    """A made up glyph pixel."""
+    return 1 if (code * 7 + col * 3 + row * 5) % 4 else 0
+
+
+class BuiltinFont:
+    """terminalio.FONT: 6x12 glyphs tiled across one shared bitmap."""
+
+    def __init__(self):
+        self.bitmap = Bitmap(6 * 95, 12, 2)
+        for code in range(32, 127):
+            for row in range(12):
+                for col in range(1, 5):
+                    self.bitmap[(code - 32) * 6 + col, row] = _ink(code, col, row)
+
+    def get_bounding_box(self):
+        return 6, 12
+
+    def get_glyph(self, code):
+        if not 32 <= code < 127:
+            return None
+        return Glyph(self.bitmap, code - 32, 6, 12, 0, 0, 6)
+
+
+class SymbolFont:
+    """A loaded bitmap_font: a 12x12 bitmap per glyph, below the baseline."""
+
+    def __init__(self):
+        self.glyphs = {}
+
+    def get_bounding_box(self):
+        return 12, 14, 0, -2
+
+    def get_glyph(self, code):
+        if code not in self.glyphs:
+            bitmap = Bitmap(12, 12, 2)
+            for row in range(12):
+                for col in range(12):
+                    bitmap[col, row] = _ink(code, col, row)
+            self.glyphs[code] = Glyph(bitmap, 0, 12, 12, 0, -2, 13)
+        return self.glyphs[code]
+
+
+class Label(Group):
+    """adafruit_display_text.label.Label"""
+
+    def __init__(self, font, scale=1, text=""):
+        super().__init__(scale=scale)
+        self.font = font
+        self.text = text
+        self.palette = Palette(2)
+        self.width = 0
+        for char in text:
+            glyph = font.get_glyph(ord(char))
+            if glyph is not None:
+                self.append(TileGrid(glyph.bitmap, pixel_shader=self.palette))
+                self.width += glyph.shift_x
+        self.height = font.get_bounding_box()[1]
+        self._color = 0xFFFFFF
+        self._background_color = None
+        self._background = None
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, new_color):
+        self._color = new_color
+        self.palette[1] = new_color
+
+    @property
+    def background_color(self):
+        return self._background_color
+
+    @background_color.setter
+    def background_color(self, new_color):
+        self._background_color = new_color
+        if new_color is None:
+            if self._background is not None:
+                self.remove(self._background)
+                self._background = None
+            return
+        self.palette[0] = new_color
+        if self._background is not None:
+            self.remove(self._background)
+        self._background = TileGrid(
+            Bitmap(self.width + 2, self.height + 2, 1), pixel_shader=self.palette
+        )
+        self.insert(0, self._background)
+
+
+class GridLayout(Group):
+    """adafruit_displayio_layout.layouts.grid_layout.GridLayout"""
+
+    def __init__(
+        self,
+        x,
+        y,
+        width,
+        height,
+        grid_size,
+        cell_padding=0,
+        divider_lines=False,
+        cell_anchor_point=(0.0, 0.0),
+    ):
+        super().__init__(x=x, y=y)
+        self._width = width
+        self._height = height
+        self.grid_size = grid_size
+        self.cell_padding = cell_padding
+        self._divider_lines = divider_lines
+        self.cell_anchor_point = cell_anchor_point
+        self._cell_content_list = []
+
+    @property
+    def width(self):
+        return self._width
+
+    @property
+    def height(self):
+        return self._height
+
+    def add_content(self, cell_content, grid_position, cell_size, layout_cells=True):
+        self._cell_content_list.append(
+            {
+                "content": cell_content,
+                "grid_position": grid_position,
+                "cell_size": cell_size,
+            }
+        )
+        if layout_cells:
+            self.layout_cells()
+
+    def layout_cells(self):
+        cell_width = self._width // self.grid_size[0]
+        cell_height = self._height // self.grid_size[1]
+        palette = Palette(2)
+        for cell in self._cell_content_list:
+            content = cell["content"]
+            width = cell["cell_size"][0] * cell_width
+            content.x = (
+                cell["grid_position"][0] * cell_width
+                + (width - content.width * content.scale) // 2
+            )
+            content.y = cell["grid_position"][1] * cell_height
+            self.append(content)
+            if self._divider_lines:
+                for line_width, line_height in (
+                    (width, 1),
+                    (width, 1),
+                    (1, cell_height),
+                    (1, cell_height),
+                ):
+                    self.append(TileGrid(Bitmap(line_width, line_height, 2), palette))
+
+    def which_cell_contains(self, pixel_location):
+        cell_width = self._width // self.grid_size[0]
+        cell_height = self._height // self.grid_size[1]
+        return (
+            (pixel_location[0] - self.x) // cell_width,
+            (pixel_location[1] - self.y) // cell_height,
+        )
+
+    def get_cell(self, cell_coordinates):
+        for index, cell in enumerate(self._cell_content_list):
+            if cell["grid_position"] == cell_coordinates:
+                return self._cell_content_list[index]["content"]
+            if (
+                cell["grid_position"][0]
+                <= cell_coordinates[0]
+                < cell["grid_position"][0] + cell["cell_size"][0]
+                and cell["grid_position"][1]
+                <= cell_coordinates[1]
+                < cell["grid_position"][1] + cell["cell_size"][1]
+            ):
+                return self._cell_content_list[index]["content"]
+        raise KeyError(f"no content at {cell_coordinates}")
+
+
+class Clock:
+    """Simulated time.monotonic()"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+def _loads(text):
+    return _json.loads(re.sub(r",(\s*[}\]])", r"\1", text))
+
+
+import json as _json
+
+CLOCK = Clock()
+sys.modules["displayio"] = types.SimpleNamespace(
+    Bitmap=Bitmap, Group=Group, Palette=Palette, TileGrid=TileGrid
+)
+sys.modules["bitmaptools"] = types.SimpleNamespace(blit=blit, fill_region=fill_region)
+sys.path.insert(0, os.path.join(HERE, "lib"))
+sys.dont_write_bytecode = True
+
+from soft_keyboard import soft_keyboard
+
+soft_keyboard.json = types.SimpleNamespace(loads=_loads)
+soft_keyboard.time = CLOCK
+
+
+class OldSoftKeyboard(Group):
+    """soft_keyboard.SoftKeyboard before the tile atlas, as it was."""
+
+    def __init__(
+        self,
+        x,
+        y,
+        width,
+        height,
+        character_font,
+        symbol_font,
+        keypress_cooldown=0.2,
+        highlight_duration=0.2,
+        allow_sticky_repeat=False,
+        layout_config=None,
+    ):
+        # pylint: disable=too-many-locals
+        super().__init__()
+        self.shift_mode = False
+        self.layout_config = layout_config
+        if self.layout_config is None:
+            layout_config = "default_layout.json"
+        with open(f"{LIB}/{layout_config}", "r") as layout_file:
+            self.layout_config = _loads(layout_file.read())
+
+        layout = GridLayout(
+            x=x,
+            y=y,
+            width=width,
+            height=height,
+            grid_size=tuple(self.layout_config["base_grid_size"]),
+            cell_padding=2,
+            divider_lines=True,
+            cell_anchor_point=(0.5, 0.5),
+        )
+        self.highlight_duration = highlight_duration
+        self.keypress_cooldown = keypress_cooldown
+        self._highlighted_views = []
+        self.last_keypressed_time = -1
+        self.keypress_debounced = None
+        self.allow_sticky_repeat = allow_sticky_repeat
+        self.shift_key_view = None
+
+        for row_idx, row in enumerate(self.layout_config["rows"]):
+            cur_span_offset = 0
+            for col_idx, key in enumerate(row["keys"]):
+                _font = character_font
+                if "font" in key:
+                    if key["font"] == "symbol_font":
+                        _font = symbol_font
+                _scale = 2
+                if "scale" in key:
+                    _scale = key["scale"]
+                cur_lbl = Label(_font, scale=_scale, text=key["label"])
+                cur_lbl.key_config = key
+                size = (1, 1)
+                if "col_span" in key:
+                    size = (key["col_span"], 1)
+
+                position = (col_idx + cur_span_offset, row_idx)
+                layout.add_content(
+                    cur_lbl, grid_position=position, cell_size=size, layout_cells=False
+                )
+                if "col_span" in key:
+                    cur_span_offset += key["col_span"] - 1
+        layout.layout_cells()
+        self.layout = layout
+        self.append(layout)
+
+    def check_touches(self, touch_point):
+        # pylint: disable=too-many-branches,too-many-nested-blocks
+        now = CLOCK.monotonic()
+
+        for _view, unhighlight_time in self._highlighted_views:
+            if now > unhighlight_time:
+                _view.color = 0xFFFFFF
+                _view.background_color = None
+
+        if touch_point:
+            if self.allow_sticky_repeat or self.keypress_debounced:
+                touched_cell = self.layout.which_cell_contains(touch_point)
+                if touched_cell:
+                    try:
+                        if self.last_keypressed_time + self.keypress_cooldown < now:
+                            touched_cell_view = self.layout.get_cell(touched_cell)
+
+                            if not self.shift_mode:
+                                pressed_value = touched_cell_view.text.lower()
+                            else:
+                                pressed_value = touched_cell_view.text
+                                self.shift_mode = False
+                                self.shift_key_view.background_color = 0x000000
+
+                            print(touched_cell_view.key_config)
+                            if "key_value" in touched_cell_view.key_config:
+                                pressed_value = touched_cell_view.key_config[
+                                    "key_value"
+                                ]
+
+                            print(f"key_text: {pressed_value}")
+
+                            self.last_keypressed_time = now
+                            self.keypress_debounced = False
+
+                            if pressed_value == 225:
+                                self.shift_mode = not self.shift_mode
+                                if self.shift_mode:
+                                    touched_cell_view.background_color = 0x0000FF
+                                    self.shift_key_view = touched_cell_view
+                                else:
+                                    touched_cell_view.background_color = 0x000000
+                            else:
+                                touched_cell_view.background_color = 0x00FF00
+                                touched_cell_view.color = 0x000000
+                                self._highlighted_views.append(
+                                    (touched_cell_view, now + self.keypress_cooldown)
+                                )
+
+                            return pressed_value
+                    except KeyError:
+                        pass
+        else:
+            self.keypress_debounced = True
+        return None
+
+
+# THE SESSION -------------------------
+
+X, Y, WIDTH, HEIGHT = 2, 100, 480 - 2, 320 - 100
+LAYOUT = "mobile_layout.json"
+SENTENCE = "The quick brown fox jumps over the lazy dog"
+PRESSES = 600
+FRAME = 0.02
+CHARACTER_FONT = BuiltinFont()
+SYMBOL_FONT = SymbolFont()
+
+
+def build(keyboard_class):
+    return keyboard_class(
+        X,
+        Y,
+        WIDTH,
+        HEIGHT,
+        CHARACTER_FONT,
+        SYMBOL_FONT,
+        keypress_cooldown=0.1,
+        highlight_duration=0.1,
+        layout_config=LAYOUT,
+    )
+
+
+def key_points():
+    """Touch point at the centre of each key label, and of shift."""
+    with open(f"{LIB}/{LAYOUT}", "r") as layout_file:
+        config = _loads(layout_file.read())
+    cols, rows = config["base_grid_size"]
+    cell_width = WIDTH // cols
+    cell_height = HEIGHT // rows
+    points = {}
+    for row_idx, row in enumerate(config["rows"]):
+        col_idx = 0
+        for key in row["keys"]:
+            span = key.get("col_span", 1)
+            point = (
+                X + col_idx * cell_width + span * cell_width // 2,
+                Y + row_idx * cell_height + cell_height // 2,
+                40000,
+            )
+            points[key.get("key_value", key["label"])] = point
+            col_idx += span
+    return points
+
+
+def taps():
+    """(touch point, expected value) of each press in the session."""
+    points = key_points()
+    presses = []
+    while len(presses) < PRESSES:
+        for char in SENTENCE:
+            if char == " ":
+                presses.append((points[" "], " "))
+            elif char.isupper():
+                presses.append((points[225], 225))
+                presses.append((points[char], char))
+            else:
+                presses.append((points[char.upper()], char))
+    return presses[:PRESSES]
+
+
+def timed_call(function, *args):
+    """(result, us less time in bitmaptools, pixels bitmaptools drew)"""
+    drawn_ns = DRAWING["ns"]
+    drawn = DRAWING["pixels"]
+    start = time.perf_counter_ns()
+    result = function(*args)
+    elapsed = time.perf_counter_ns() - start - (DRAWING["ns"] - drawn_ns)
+    return result, elapsed / 1000, DRAWING["pixels"] - drawn
+
+
+def session(keyboard):
+    """Per press: (us on the pressed frame, pixels drawn on it, mean us on
+    the other frames)."""
+    timings = []
+    CLOCK.now = 100.0
+    keyboard.check_touches(None)  # Nothing is pressed until a release
+    with contextlib.redirect_stdout(io.StringIO()):
+        for point, expected in taps():
+            frames = []
+            pressed = None
+            for touch in (point, point, point, None, None, None):
+                CLOCK.now += FRAME
+                value, microseconds, pixels = timed_call(keyboard.check_touches, touch)
+                frames.append(microseconds)
+                if value is not None:
+                    assert pressed is None and value == expected, (value, expected)
+                    pressed = len(frames) - 1
+                    drawn = pixels
+            assert pressed is not None, expected
+            others = frames[:pressed] + frames[pressed + 1 :]
+            timings.append((frames[pressed], drawn, sum(others) / len(others)))
+        for _ in range(10):
+            CLOCK.now += FRAME
+            keyboard.check_touches(None)
+    return timings
+
+
+def tile_pixels(keyboard, cell):
+    """The values in the atlas tile a cell shows."""
+    grid = keyboard.tile_grid
+    atlas = grid.bitmap
+    tile = grid[cell]
+    left = tile % grid.width * grid.tile_width
+    top = tile // grid.width * grid.tile_height
+    return {
+        atlas[x, y]
+        for y in range(top, top + grid.tile_height)
+        for x in range(left, left + grid.tile_width)
+    }
+
+
+def check_highlights():
+    """A pressed key shows white on green until the highlight time is up,
+    the shift key white on blue while shift is on."""
+    keyboard = build(soft_keyboard.SoftKeyboard)
+    grid = keyboard.tile_grid
+    points = key_points()
+    cell = grid.width + 1  # S
+    CLOCK.now = 100.0
+    keyboard.check_touches(None)
+    assert tile_pixels(keyboard, cell) == {0, 1}
+    assert keyboard.check_touches(points["S"]) == "s"
+    assert tile_pixels(keyboard, cell) == {1, 3}
+    CLOCK.now += 0.15
+    assert keyboard.check_touches(None) is None
+    assert tile_pixels(keyboard, cell) == {0, 1}
+    assert keyboard.check_touches(points[225]) == 225
+    assert tile_pixels(keyboard, grid.width * 2) == {1, 2}
+    CLOCK.now += 0.15
+    keyboard.check_touches(None)
+    assert tile_pixels(keyboard, grid.width * 2) == {1, 2}
+    CLOCK.now += 0.15
+    assert keyboard.check_touches(points["S"]) == "S"
+    assert tile_pixels(keyboard, grid.width * 2) == {0, 1}
+
+
+def check_taken_down(keyboard):
+    """Every cell shows its own tile again."""
+    grid = keyboard.tile_grid
+    assert grid.tiles == list(range(len(grid.tiles)))
+
+
+def construction(keyboard_class):
+    """(best ms to build, pixels drawn, host bytes per key)"""
+    best = None
+    for _ in range(5):
+        _, microseconds, drawn = timed_call(build, keyboard_class)
+        best = microseconds if best is None else min(best, microseconds)
+    gc.collect()
+    slack = _BITMAP_SLACK[0]
+    tracemalloc.start()
+    keyboard = build(keyboard_class)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - (_BITMAP_SLACK[0] - slack)
+    tracemalloc.stop()
+    keys = sum(len(row["keys"]) for row in keyboard.layout_config["rows"])
+    return best / 1000, drawn, size / keys
+
+
+def summary(timings):
+    """(mean us, worst us, mean pixels drawn) pressing, mean us between"""
+    pressed = [timing[0] for timing in timings]
+    drawn = [timing[1] for timing in timings]
+    others = [timing[2] for timing in timings]
+    return (
+        sum(pressed) / len(pressed),
+        max(pressed),
+        sum(drawn) / len(drawn),
+        sum(others) / len(others),
+    )
+
+
+KEYBOARDS = (
+    ("old, Label per key", OldSoftKeyboard),
+    ("new, tile atlas", soft_keyboard.SoftKeyboard),
+)
+
+
+def main():
+    check_highlights()
+    print(f"{'Construction':<36}{'ms':>8}{'px drawn':>10}{'B per key':>11}")
+    for name, keyboard_class in KEYBOARDS:
+        milliseconds, drawn, per_key = construction(keyboard_class)
+        print(f"{name:<36}{milliseconds:>8.2f}{drawn:>10}{per_key:>11.0f}")
+
+    print()
+    print(
+        f"{'check_touches':<36}{'press us':>9}{'worst':>8}{'px drawn':>10}"
+        f"{'between us':>12}"
+    )
+    for name, keyboard_class in KEYBOARDS:
+        keyboard = build(keyboard_class)
+        timings = session(keyboard)
+        if keyboard_class is soft_keyboard.SoftKeyboard:
+            check_taken_down(keyboard)
+        for part, span in (("presses 1-50", timings[:50]), ("551-600", timings[550:])):
+            mean, worst, drawn, between = summary(span)
+            print(
+                f"{name + ', ' + part:<36}{mean:>9.1f}{worst:>8.1f}{drawn:>10.0f}"
+                f"{between:>12.1f}"
+            )
+
+
+main()
@@ -0,0 +1,83 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""Open-Meteo weather code lookups
+
+The descriptions and icons from weather_codes.py, built into tables once at
+import. Lookups index straight into them and return shared strings, so
+nothing is read, parsed or allocated per call.
+"""
+
+# WMO weather code, day description, night description, openweathermap icon
+_WEATHER_CODES = (
+    (0, "Sunny", "Clear", 1),
+    (1, "Mainly Sunny", "Mainly Clear", 1),
+    (2, "Partly Cloudy", "Partly Cloudy", 2),
+    (3, "Cloudy", "Cloudy", 3),
+    (45, "Foggy", "Foggy", 50),
+    (48, "Rime Fog", "Rime Fog", 50),
+    (51, "Light Drizzle", "Light Drizzle", 9),
+    (53, "Drizzle", "Drizzle", 9),
+    (55, "Heavy Drizzle", "Heavy Drizzle", 9),
+    (56, "Light Freezing Drizzle", "Light Freezing Drizzle", 9),
+    (57, "Freezing Drizzle", "Freezing Drizzle", 9),
+    (61, "Light Rain", "Light Rain", 10),
+    (63, "Rain", "Rain", 10),
+    (65, "Heavy Rain", "Heavy Rain", 10),
+    (66, "Light Freezing Rain", "Light Freezing Rain", 10),
+    (67, "Freezing Rain", "Freezing Rain", 10),
+    (71, "Light Snow", "Light Snow", 13),
+    (73, "Snow", "Snow", 13),
+    (75, "Heavy Snow", "Heavy Snow", 13),
+    (77, "Snow Grains", "Snow Grains", 13),
+    (80, "Light Showers", "Light Showers", 9),
+    (81, "Showers", "Showers", 9),
+    (82, "Heavy Showers", "Heavy Showers", 9),
+    (85, "Light Snow Showers", "Light Snow Showers", 13),
+    (86, "Snow Showers", "Snow Showers", 13),
+    (95, "Thunderstorm", "Thunderstorm", 11),
+    (96, "Light Thunderstorms With Hail", "Light Thunderstorms With Hail", 11),
+    (99, "Thunderstorm With Hail", "Thunderstorm With Hail", 11),
+)
+
+# _WEATHER_ROWS[code] is the code's row + 1, or 0 for an unknown code
+_WEATHER_ROWS = bytearray(100)
+for _row, (_code, _, _, _) in enumerate(_WEATHER_CODES):
+    _WEATHER_ROWS[_code] = _row + 1
+
+# Descriptions and icon URLs per row, indexed [is_day][row]
+_WEATHER_TEXT = (
+    tuple(night for _, _, night, _ in _WEATHER_CODES),
+    tuple(day for _, day, _, _ in _WEATHER_CODES),
+)
+_icon_urls = {}
+for _, _, _, _icon in _WEATHER_CODES:
+    _icon_urls[_icon] = (
+        f"http://openweathermap.org/img/wn/{_icon:02}n@2x.png",
+        f"http://openweathermap.org/img/wn/{_icon:02}d@2x.png",
+    )
+_WEATHER_ICON_URLS = (
+    tuple(_icon_urls[icon][0] for _, _, _, icon in _WEATHER_CODES),
+    tuple(_icon_urls[icon][1] for _, _, _, icon in _WEATHER_CODES),
+)
+del _icon_urls
+
+
+def _weather_row(code):
+    row = _WEATHER_ROWS[code] if 0 <= code < len(_WEATHER_ROWS) else 0
+    if not row:
+        raise KeyError(code)
+    return row - 1
+
+
+def weather_code_parser(code, is_day):
+    """Weather description for an Open-Meteo weather code, day (1) or night (0)"""
+    if is_day in (0, 1):
+        return _WEATHER_TEXT[is_day][_weather_row(code)]
+    return None
+
+
+def weather_icon_parser(code, is_day):
+    """Weather icon URL for an Open-Meteo weather code, day (1) or night (0)"""
+    if is_day in (0, 1):
+        return _WEATHER_ICON_URLS[is_day][_weather_row(code)]
+    return None
@@ -0,0 +1,78 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+# Coded for Circuit Python 9.x
+"""Weather code lookup: weather_table vs. parsing weather_codes.py per call
+
+Run on the board from the project folder, or on a desktop with
+    python weather_table_benchmark.py
+The old parsers reopened weather_codes.py and parsed the whole file for each
+lookup; they are reproduced below. Reports the time per lookup and, on the
+board, the heap allocated per lookup.
+"""
+
+import gc
+import json
+import time
+from weather_table import weather_code_parser, weather_icon_parser
+
+WEATHER_CODES_FILE = "weather_codes.py"
+CODES = (0, 3, 45, 61, 73, 95)
+ROUNDS = 20
+
+
+def load_weather_codes():
+    """Parse weather_codes.py the way the old parsers did."""
+    with open(WEATHER_CODES_FILE, "r") as wc:
+        text = wc.read()
+    try:
+        return json.loads(text)
+    except ValueError:
+        # Desktop json rejects the integer keys that CircuitPython accepts
+        import ast  # pylint: disable=import-outside-toplevel
+
+        return ast.literal_eval(text)
+
+
+def legacy_code_parser(code, is_day):
+    """The previous featherweather.weather_code_parser."""
+    return load_weather_codes()[code]["day" if is_day else "night"]["description"]
+
+
+def legacy_icon_parser(code, is_day):
+    """The previous featherweather.weather_icon_parser."""
+    return load_weather_codes()[code]["day" if is_day else "night"]["image"]
+
+
+def measure(code_parser, icon_parser):
+    """Returns (us per lookup, bytes allocated per lookup or None)."""
+    lookups = 0
+    allocated = 0
+    start = time.monotonic_ns()
+    for _ in range(ROUNDS):
+        for code in CODES:
+            for is_day in (0, 1):
+                free = gc.mem_free() if hasattr(gc, "mem_free") else None
+                description = code_parser(code, is_day)
+                icon = icon_parser(code, is_day)
+                if free is not None:
+                    allocated += free - gc.mem_free()
+                lookups += 2
+    elapsed = time.monotonic_ns() - start
+    del description, icon
+    per_lookup = allocated // lookups if hasattr(gc, "mem_free") else None
+    return elapsed / lookups / 1000, per_lookup
+
+
+for code in CODES:
+    for is_day in (0, 1):
+        assert weather_code_parser(code, is_day) == legacy_code_parser(code, is_day)
+        assert weather_icon_parser(code, is_day) == legacy_icon_parser(code, is_day)
+
+print(f"{'Parser':<14}{'us/lookup':>12}{'bytes/lookup':>14}")
+for name, parsers in (
+    ("weather_codes", (legacy_code_parser, legacy_icon_parser)),
+    ("weather_table", (weather_code_parser, weather_icon_parser)),
+):
+    gc.collect()
+    micros, allocated = measure(*parsers)
+    print(f"{name:<14}{micros:>12.1f}{str(allocated):>14}")
@@ -22,6 +22,7 @@ from adafruit_hx8357 import HX8357
 from adafruit_display_text import label
 from adafruit_displayio_layout.widgets.cartesian import Cartesian
 import adafruit_requests
+import json_paths
 
 displayio.release_displays()
 
@@ -77,6 +78,13 @@ pool = adafruit_connection_manager.get_radio_socketpool(wifi.radio)
 ssl_context = adafruit_connection_manager.get_radio_ssl_context(wifi.radio)
 requests = adafruit_requests.Session(pool, ssl_context)
 
+# Only these values are kept from the Fitbit responses, the full-day
+# intraday dataset is streamed through without being stored.
+HEART_DATE = "activities-heart[0].dateTime"
+HEART_COUNT = "activities-heart-intraday.dataset[#]"
+HEART_LATEST = "activities-heart-intraday.dataset[-15:]"
+WATCH_BATTERY = "[0].batteryLevel"
+
 
 def time_calc(input_time):
     """Converts seconds to minutes/hours/days"""
@@ -374,7 +382,9 @@ while True:
         FBH = fitbit_header
         fitbit_get_response = requests.get(url=FBIS, headers=FBH)
         try:
-            fitbit_json = fitbit_get_response.json()
+            fitbit_json = json_paths.extract(
+                fitbit_get_response, (HEART_DATE, HEART_COUNT, HEART_LATEST)
+            )
         except ConnectionError as e:
             print("Connection Error:", e)
             print("Retrying in 10 seconds")
@@ -382,20 +392,17 @@ while True:
         if debug:
             print(f"Full API GET URL: {FBIS}")
             print(f"Header: {fitbit_header}")
-            # print(f"JSON Full Response: {fitbit_json}")
-            Intraday_Response = fitbit_json["activities-heart-intraday"]["dataset"]
-            # print(f"Intraday Full Response: {Intraday_Response}")
+            # print(f"JSON Extracted: {fitbit_json}")
 
         try:
-            activities_heart_value = fitbit_json.get(
-                "activities-heart-intraday", {}
-            ).get("dataset", [])
-            response_length = len(activities_heart_value)
+            activities_heart_value = fitbit_json[HEART_LATEST]
+            response_length = fitbit_json[HEART_COUNT]
+            if response_length is None:
+                # Error bodies (expired token, rate limit) have no dataset
+                raise KeyError(HEART_COUNT)
             if response_length >= 15:
                 midnight_label.text = ""
-                activities_timestamp = fitbit_json.get("activities-heart", [{}])[0].get(
-                    "dateTime", ""
-                )
+                activities_timestamp = fitbit_json[HEART_DATE] or ""
                 activities_latest_heart_time = activities_heart_value[-1].get(
                     "time", ""
                 )
@@ -403,9 +410,7 @@ while True:
                 print(f"Fitbit Time: {activities_latest_heart_time[0:-3]}")
                 print(f"Today's Logged Pulses: {response_length}")
 
-                latest_15_values = [
-                    data["value"] for data in activities_heart_value[-15:]
-                ]
+                latest_15_values = [data["value"] for data in activities_heart_value]
                 print("Latest 15 Minute Averages:", latest_15_values[::-1])
 
                 list_data = latest_15_values
@@ -459,7 +464,9 @@ while True:
         FBH = fitbit_header
         fitbit_get_device_response = requests.get(url=FBDS, headers=FBH)
         try:
-            fitbit_device_json = fitbit_get_device_response.json()
+            fitbit_device_json = json_paths.extract(
+                fitbit_get_device_response, (WATCH_BATTERY,)
+            )
         except ConnectionError as e:
             print("Connection Error:", e)
             print("Retrying in 10 seconds")
@@ -467,9 +474,23 @@ while True:
         if debug:
             print(f"Full API GET URL: {FITBIT_DEVICE_SOURCE}")
             print(f"Header: {fitbit_header}")
-            print(f"JSON Full Response: {fitbit_device_json}")
+            print(f"JSON Extracted: {fitbit_device_json}")
 
-        Device_Response = fitbit_device_json[0]["batteryLevel"]
+        try:
+            Device_Response = fitbit_device_json[WATCH_BATTERY]
+            if Device_Response is None:
+                # Error bodies (expired token, rate limit) have no device list
+                raise KeyError(WATCH_BATTERY)
+        except KeyError as keyerror:
+            print(f"Key Error: {keyerror}")
+            print(
+                "Too Many Requests, "
+                + "Expired token, "
+                + "invalid permission, "
+                + "or (key:value) pair error."
+            )
+            time.sleep(60)
+            continue
         error_label.text = ""
         print(f"Watch Battery %: {Device_Response}")
         watch_bat_shadow.text = f"Battery: {Device_Response}%"
@@ -0,0 +1,143 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""Streaming path extraction vs. response.json() on recorded payloads
+
+Desktop script (uses tracemalloc), run from this folder:
+    python json_paths_benchmark.py [payload.json path [path ...]]
+With no arguments it replays a full-day Fitbit intraday heart rate payload
+(1440 one minute entries) and a 30 issue GitHub issues listing, shaped like
+the real responses. Payloads are fed in 256 byte chunks, the way
+Response.iter_content hands them over. Reports time and peak Python heap for
+json.loads on the whole body (what .json() does) and for json_paths.extract.
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, "lib")
+import json_paths  # pylint: disable=wrong-import-position
+
+CHUNK_SIZE = 256
+ROUNDS = 5
+
+
+def fitbit_intraday():
+    """A day of 1 minute heart rate samples."""
+    return json.dumps(
+        {
+            "activities-heart": [
+                {
+                    "dateTime": "2024-03-18",
+                    "value": {
+                        "customHeartRateZones": [],
+                        "heartRateZones": [
+                            {"caloriesOut": 1853.2, "max": 110, "min": 30},
+                            {"caloriesOut": 412.9, "max": 136, "min": 110},
+                        ],
+                        "restingHeartRate": 61,
+                    },
+                }
+            ],
+            "activities-heart-intraday": {
+                "dataset": [
+                    {
+                        "time": f"{minute // 60:02}:{minute % 60:02}:00",
+                        "value": 58 + (minute * 7) % 41,
+                    }
+                    for minute in range(1440)
+                ],
+                "datasetInterval": 1,
+                "datasetType": "minute",
+            },
+        }
+    ).encode()
+
+
+def github_issues():
+    """30 issues with long markdown bodies."""
+    body = (
+        "### CircuitPython version\r\n\r\n```\r\nAdafruit CircuitPython 9.0.0 on "
+        "2024-03-19; Adafruit Feather ESP32-S3 TFT with ESP32S3\r\n```\r\n\r\n"
+        "### Code/REPL\r\n\r\n```python\r\nimport board\r\nprint(board.I2C())"
+        "\r\n```\r\n\r\n### Behavior\r\n\r\nHard fault after a soft reload. "
+    ) * 4
+    return json.dumps(
+        [
+            {
+                "url": f"https://api.github.com/repos/adafruit/circuitpython/issues/{9100 + n}",
+                "number": 9100 + n,
+                "title": f"Crash number {n} after soft reload on ESP32-S3",
+                "user": {"login": f"user{n}", "id": 1000 + n, "type": "User"},
+                "labels": [{"name": "bug", "color": "ee0701", "default": True}],
+                "state": "open",
+                "comments": n % 7,
+                "created_at": "2024-03-18T12:00:00Z",
+                "body": body,
+            }
+            for n in range(30)
+        ]
+    ).encode()
+
+
+SAMPLES = (
+    (
+        "fitbit intraday",
+        fitbit_intraday(),
+        (
+            "activities-heart[0].dateTime",
+            "activities-heart-intraday.dataset[#]",
+            "activities-heart-intraday.dataset[-15:]",
+        ),
+    ),
+    ("github issues", github_issues(), ("[*].number", "[*].title", "[*].user.login")),
+)
+
+
+def chunks(payload):
+    """Yields the payload in iter_content sized pieces."""
+    for start in range(0, len(payload), CHUNK_SIZE):
+        yield payload[start : start + CHUNK_SIZE]
+
+
+def full_json(payload, paths):
+    """Parse everything, as Response.json() does, then keep the paths."""
+    # pylint: disable=unused-argument
+    return json.loads(b"".join(chunks(payload)))
+
+
+def streamed(payload, paths):
+    """Extract just the paths while the chunks stream past."""
+    return json_paths.extract(chunks(payload), paths)
+
+
+def measure(parser, payload, paths):
+    """Returns (ms per parse, peak heap bytes)."""
+    elapsed = 0
+    peak = 0
+    for _ in range(ROUNDS):
+        tracemalloc.start()
+        start = time.monotonic_ns()
+        result = parser(payload, paths)
+        elapsed += time.monotonic_ns() - start
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del result
+    return elapsed / ROUNDS / 1_000_000, peak
+
+
+if len(sys.argv) > 2:
+    with open(sys.argv[1], "rb") as payload_file:
+        SAMPLES = ((sys.argv[1], payload_file.read(), tuple(sys.argv[2:])),)
+
+print(
+    f"{'Payload':<18}{'Bytes':>8}{'json ms':>9}{'json peak':>11}{'paths ms':>10}{'paths peak':>12}"
+)
+for name, data, wanted in SAMPLES:
+    json_ms, json_peak = measure(full_json, data, wanted)
+    paths_ms, paths_peak = measure(streamed, data, wanted)
+    print(
+        f"{name:<18}{len(data):>8}{json_ms:>9.1f}{json_peak:>11}"
+        f"{paths_ms:>10.1f}{paths_peak:>12}"
+    )
@@ -0,0 +1,385 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`json_paths`
+================================================================================
+
+Pull a few values out of a JSON document as it streams in, without building
+the whole document in memory.
+
+Paths are dotted keys with optional array selectors:
+
+* ``activities-heart[0].dateTime`` - a single value
+* ``items[*].title`` - every match, as a list
+* ``activities-heart-intraday.dataset[-15:]`` - the last 15 elements only
+* ``activities-heart-intraday.dataset[#]`` - the number of elements
+
+.. code-block:: python
+
+    import json_paths
+
+    response = requests.get(url)
+    found = json_paths.extract(response, ("[0].batteryLevel", "[0].lastSyncTime"))
+    battery = found["[0].batteryLevel"]
+
+Anything that is not on a path is scanned over byte by byte and thrown away.
+Matched values are handed to `json.loads` on their own, so only the matched
+part of the document is ever parsed into objects.
+
+* Author(s): DJDevon3
+"""
+
+import json
+
+try:
+    from typing import Any, Dict, Iterable, List, Union
+except ImportError:
+    pass
+
+__version__ = "0.0.0+auto.0"
+
+# Kinds of path step
+_KEY = 0
+_INDEX = 1
+_ALL = 2
+_LAST = 3
+_COUNT = 4
+
+_WHITESPACE = b" \t\r\n"
+_SCALAR_END = b" \t\r\n,]}"
+
+
+class _Done(Exception):
+    """Every path has been found."""
+
+
+class _Path:
+    """A compiled path: a list of (kind, argument) steps."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.steps = []
+        for part in path.split("."):
+            key, _, selectors = part.partition("[")
+            if key:
+                self.steps.append((_KEY, key))
+            if not selectors:
+                continue
+            for selector in selectors.rstrip("]").split("]["):
+                if selector == "*":
+                    self.steps.append((_ALL, None))
+                elif selector == "#":
+                    self.steps.append((_COUNT, None))
+                elif selector.startswith("-") and selector.endswith(":"):
+                    self.steps.append((_LAST, int(selector[1:-1])))
+                else:
+                    self.steps.append((_INDEX, int(selector)))
+        if (_COUNT, None) in self.steps[:-1]:
+            raise ValueError("[#] must end the path: " + path)
+        self.multiple = any(kind in (_ALL, _LAST) for kind, _ in self.steps)
+
+
+class _Stream:
+    """Byte reader over an iterator of chunks, able to record the bytes of
+    one value while skipping over it."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._buffer = b""
+        self._pos = 0
+        self._capture = None
+        self._mark = 0
+
+    def _fill(self) -> bool:
+        if self._capture is not None:
+            self._capture.extend(memoryview(self._buffer)[self._mark :])
+            self._mark = 0
+        for chunk in self._chunks:
+            if chunk:
+                self._buffer = chunk
+                self._pos = 0
+                return True
+        self._buffer = b""
+        self._pos = 0
+        return False
+
+    def peek(self) -> int:
+        """The next non-whitespace byte, left unread. -1 at the end."""
+        while True:
+            if self._pos >= len(self._buffer) and not self._fill():
+                return -1
+            byte = self._buffer[self._pos]
+            if byte not in _WHITESPACE:
+                return byte
+            self._pos += 1
+
+    def read(self) -> int:
+        """The next non-whitespace byte."""
+        byte = self.peek()
+        if byte < 0:
+            raise ValueError("Unexpected end of JSON")
+        self._pos += 1
+        return byte
+
+    def skip_string(self) -> None:
+        """Skip to just past the closing quote; the opening one is read."""
+        while True:
+            buffer = self._buffer
+            quote = buffer.find(b'"', self._pos)
+            if quote < 0:
+                escape = buffer.find(b"\\", self._pos)
+            else:
+                escape = buffer.find(b"\\", self._pos, quote)
+            if escape >= 0:
+                self._pos = escape + 1
+                if self._pos >= len(buffer) and not self._fill():
+                    raise ValueError("Unexpected end of JSON")
+                self._pos += 1
+            elif quote >= 0:
+                self._pos = quote + 1
+                return
+            else:
+                self._pos = len(buffer)
+                if not self._fill():
+                    raise ValueError("Unexpected end of JSON")
+
+    def read_string(self) -> str:
+        """Read a string; the opening quote is already read."""
+        self.start_capture()
+        self.skip_string()
+        raw = self.end_capture()
+        if b"\\" in raw:
+            return json.loads(b'"' + raw)
+        return str(raw[:-1], "utf-8")
+
+    def skip_value(self) -> None:
+        """Skip one complete value of any type."""
+        byte = self.read()
+        if byte == 0x22:  # "
+            self.skip_string()
+            return
+        if byte not in b"[{":
+            while True:
+                if self._pos >= len(self._buffer) and not self._fill():
+                    return
+                if self._buffer[self._pos] in _SCALAR_END:
+                    return
+                self._pos += 1
+        depth = 1
+        while depth:
+            if self._pos >= len(self._buffer) and not self._fill():
+                raise ValueError("Unexpected end of JSON")
+            byte = self._buffer[self._pos]
+            self._pos += 1
+            if byte == 0x22:
+                self.skip_string()
+            elif byte in b"[{":
+                depth += 1
+            elif byte in b"]}":
+                depth -= 1
+
+    def start_capture(self) -> None:
+        """Start recording bytes from the current position."""
+        self._capture = bytearray()
+        self._mark = self._pos
+
+    def end_capture(self) -> bytearray:
+        """Stop recording and return everything read since start_capture."""
+        captured = self._capture
+        captured.extend(memoryview(self._buffer)[self._mark : self._pos])
+        self._capture = None
+        return captured
+
+    def read_value(self) -> Any:
+        """Read and decode one complete value."""
+        self.peek()
+        self.start_capture()
+        self.skip_value()
+        return json.loads(bytes(self.end_capture()))
+
+
+def _select(value: Any, path: _Path, step: int, out: List) -> None:
+    """Apply the rest of ``path`` to an already decoded value."""
+    while step < len(path.steps):
+        kind, argument = path.steps[step]
+        step += 1
+        if kind == _KEY:
+            if not isinstance(value, dict) or argument not in value:
+                return
+            value = value[argument]
+            continue
+        if not isinstance(value, list):
+            return
+        if kind == _COUNT:
+            value = len(value)
+        elif kind == _INDEX:
+            if argument >= len(value):
+                return
+            value = value[argument]
+        else:
+            for item in value if kind == _ALL else value[-argument:]:
+                _select(item, path, step, out)
+            return
+    out.append((path, value))
+
+
+class _Extractor:
+    """Walks the stream, descending only into values that are on a path.
+
+    Matches are collected in ``out`` as (path, value) pairs. Matches under a
+    last-N selector are held per element until the array closes, so at most
+    N elements' worth are kept at a time."""
+
+    def __init__(self, stream: _Stream, paths: List[_Path]) -> None:
+        self.stream = stream
+        self.out = []
+        # With no multi-valued paths, reading can stop once all are found
+        self.remaining = -1 if any(path.multiple for path in paths) else len(paths)
+
+    def emit(self, path: _Path, value: Any) -> None:
+        """Record a match."""
+        self.out.append((path, value))
+        if not path.multiple:
+            self.remaining -= 1
+            if self.remaining == 0:
+                raise _Done()
+
+    def value(self, active: List) -> None:
+        """Parse the next value for the (path, step) pairs in ``active``."""
+        stream = self.stream
+        complete = [path for path, step in active if step == len(path.steps)]
+        descend = [(path, step) for path, step in active if step < len(path.steps)]
+        if complete:
+            value = stream.read_value()
+            for path in complete:
+                self.emit(path, value)
+            for path, step in descend:
+                matches = []
+                _select(value, path, step, matches)
+                for match in matches:
+                    self.emit(*match)
+            return
+        byte = stream.peek()
+        if byte == 0x7B:  # {
+            self.object([pair for pair in descend if pair[0].steps[pair[1]][0] == _KEY])
+        elif byte == 0x5B:  # [
+            self.array([pair for pair in descend if pair[0].steps[pair[1]][0] != _KEY])
+        else:
+            stream.skip_value()
+
+    def object(self, active: List) -> None:
+        """Parse an object, descending only into keys on a path."""
+        stream = self.stream
+        stream.read()
+        if stream.peek() == 0x7D:  # }
+            stream.read()
+            return
+        while True:
+            if stream.read() != 0x22:  # "
+                raise ValueError("Expected object key")
+            key = stream.read_string()
+            if stream.read() != 0x3A:  # :
+                raise ValueError("Expected ':'")
+            matched = [
+                (path, step + 1) for path, step in active if path.steps[step][1] == key
+            ]
+            if matched:
+                self.value(matched)
+            else:
+                stream.skip_value()
+            byte = stream.read()
+            if byte == 0x7D:
+                return
+            if byte != 0x2C:  # ,
+                raise ValueError("Expected ',' or '}'")
+
+    def array(self, active: List) -> None:
+        """Parse an array, keeping last-N windows and counts as it goes."""
+        # pylint: disable=too-many-branches
+        stream = self.stream
+        out = self.out
+        # path: (N, [matches of each of the last N elements])
+        windows = {}
+        for path, step in active:
+            kind, argument = path.steps[step]
+            if kind == _LAST:
+                windows[path] = (argument, [])
+        stream.read()
+        index = 0
+        if stream.peek() == 0x5D:  # ]
+            stream.read()
+        else:
+            while True:
+                matched = [
+                    (path, step + 1)
+                    for path, step in active
+                    if path.steps[step][0] in (_ALL, _LAST)
+                    or path.steps[step] == (_INDEX, index)
+                ]
+                if matched:
+                    mark = len(out)
+                    self.value(matched)
+                    for path, (size, window) in windows.items():
+                        window.append(
+                            [match for match in out[mark:] if match[0] is path]
+                        )
+                        if len(window) > size:
+                            window.pop(0)
+                    if windows:
+                        out[mark:] = [
+                            match for match in out[mark:] if match[0] not in windows
+                        ]
+                else:
+                    stream.skip_value()
+                index += 1
+                byte = stream.read()
+                if byte == 0x5D:
+                    break
+                if byte != 0x2C:
+                    raise ValueError("Expected ',' or ']'")
+        for _, window in windows.values():
+            for matches in window:
+                out.extend(matches)
+        for path, step in active:
+            if path.steps[step][0] == _COUNT:
+                self.emit(path, index)
+
+
+def extract(
+    source: Union[Iterable[bytes], Any], paths: Iterable[str], chunk_size: int = 256
+) -> Dict[str, Any]:
+    """Read the JSON document from ``source`` and return the values at ``paths``.
+
+    :param source: An `adafruit_requests.Response`, read with ``iter_content``
+      and closed afterwards, or any iterable of bytes chunks.
+    :param paths: The paths to look up, see the module documentation.
+    :param int chunk_size: Bytes to read from a response at a time.
+    :return: A dictionary keyed by path. Paths with ``[*]`` or ``[-N:]`` map
+      to a list of every match; the others map to their value, or None if the
+      document has nothing there.
+    """
+    compiled = [_Path(path) for path in paths]
+    response = None
+    if hasattr(source, "iter_content"):
+        response = source
+        source = response.iter_content(chunk_size)
+    extractor = _Extractor(_Stream(source), compiled)
+    try:
+        if compiled:
+            extractor.value([(path, 0) for path in compiled])
+    except _Done:
+        pass
+    finally:
+        if response is not None:
+            response.close()
+    results = {}
+    for path in compiled:
+        results[path.path] = [] if path.multiple else None
+    for path, value in extractor.out:
+        if path.multiple:
+            results[path.path].append(value)
+        else:
+            results[path.path] = value
+    return results
@@ -0,0 +1,501 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""
+adafruit_atecc against a mock ATECC608: old fixed sleeps against polling,
+SHA blocks against SHA sessions, summed random bytes against the entropy pool
+
+Desktop script, run from this folder:
+    python atecc_benchmark.py
+Board only modules are replaced by stand-ins. The mock ATECC608 sits on a
+simulated 75 kHz I2C bus (the bus code.py sets up): every transfer costs
+9 bits a byte, address included, and reads NACK (OSError) while a command
+is executing, as the chip does. Commands take the TYPICAL_MS below, an
+assumption, where the old code always slept the datasheet maximum
+(EXEC_TIME). The mock checks every command CRC with the datasheet's bit at
+a time algorithm, so a wrong CRC table fails the run, and answers with real
+SHA-256 digests so the results can be checked. Its watchdog puts it to sleep,
+losing the SHA context, 1.3 s after a wake up unless it is sent idle first.
+
+The old library is the new one with its old _send_command, _get_response,
+_at_crc, _random and random put back. Its EXEC_TIME sleep, which always came
+right after sending a command, is made at the end of the old _send_command.
+
+Reports:
+- per call of sha_update, random and gen_key: simulated time from the first
+  wake up to the last idle; I2C transfers, including wake ups and NACKed
+  polls; buffers the library allocates (bytes and bytearray), and their bytes
+- the host time one 72 byte command CRC takes
+- hashing 16 KB with sha_update a block at a time and with a sha_session
+- random(rnd_max=1024) drawn 20480 times, old and new, and randbelow(1000),
+  with the Random commands it took and a chi-square test of the counts
+"""
+
+# pylint: disable=import-error, wrong-import-position, protected-access
+# pylint: disable=too-few-public-methods
+
+import binascii
+import hashlib
+import os
+import sys
+import time
+import types
+
+BUS_HZ = 75000
+WATCHDOG_NS = 1_300_000_000
+TYPICAL_MS = {
+    0x30: 0.5,  # Info
+    0x1B: 2,  # Random
+    0x47: 2,  # SHA
+    0x40: 60,  # GenKey
+    0x02: 0.5,  # Read
+}
+
+
+class SimClock:
+    """Simulated time, standing in for the library's time module."""
+
+    def __init__(self):
+        self.now_ns = 0
+
+    def monotonic_ns(self):
+        return self.now_ns
+
+    def sleep(self, seconds):
+        self.now_ns += round(seconds * 1e9)
+
+    def transfer(self, size):
+        """Time for an I2C transfer of size bytes plus the address."""
+        self.now_ns += (size + 1) * 9 * 10**9 // BUS_HZ
+
+
+CLOCK = SimClock()
+
+
+def reference_crc(data):
+    """The datasheet's CRC, a bit at a time."""
+    crc = 0
+    for byte in data:
+        for shift in range(8):
+            data_bit = (byte >> shift) & 1
+            crc_bit = crc >> 15
+            crc = (crc << 1) & 0xFFFF
+            if data_bit != crc_bit:
+                crc ^= 0x8005
+    return crc
+
+
+class MockATECC608:
+    """Executes commands, NACKing reads until each one is done."""
+
+    def __init__(self):
+        self.busy_until = 0
+        self.awake_until = 0
+        self.response = None
+        self.sha = None
+        self.transfers = 0
+        self.wakeups = 0
+        self.watchdog_sleeps = 0
+        self.commands = {}
+
+    def _awake(self):
+        if self.awake_until and CLOCK.now_ns >= self.awake_until:
+            # The watchdog ran out
+            self.awake_until = 0
+            self.sha = None
+            self.watchdog_sleeps += 1
+        return bool(self.awake_until)
+
+    def wake(self):
+        if not self._awake():
+            self.awake_until = CLOCK.now_ns + WATCHDOG_NS
+            self.wakeups += 1
+
+    def write(self, buf, start=0, end=None):
+        self.transfers += 1
+        if not self._awake():
+            CLOCK.transfer(0)
+            raise OSError(19, "NACK")
+        packet = bytes(buf[start:end])
+        CLOCK.transfer(len(packet))
+        if packet[0] in (0x01, 0x02):
+            # Sleep, or idle which keeps the SHA context
+            self.awake_until = 0
+            if packet[0] == 0x01:
+                self.sha = None
+            return
+        count = packet[1]
+        assert len(packet) == count + 1, "count byte"
+        crc = reference_crc(packet[1:-2])
+        assert packet[-2:] == bytes((crc & 0xFF, crc >> 8)), "command CRC"
+        opcode, param_1 = packet[2], packet[3]
+        self.commands[opcode] = self.commands.get(opcode, 0) + 1
+        data = packet[6:-2]
+        if opcode == 0x30:
+            result = b"\x00\x00\x60\x02"
+        elif opcode == 0x1B:
+            result = os.urandom(32)
+        elif opcode == 0x40:
+            result = os.urandom(64)
+        elif opcode == 0x02:
+            result = bytes(32 if param_1 & 0x80 else 4)
+        elif opcode == 0x47 and param_1 == 0x00:
+            self.sha = hashlib.sha256()
+            result = b"\x00"
+        elif opcode == 0x47 and param_1 == 0x01:
+            self.sha.update(data)
+            result = b"\x00"
+        elif opcode == 0x47 and param_1 == 0x02:
+            self.sha.update(data)
+            result = self.sha.digest()
+        else:
+            raise AssertionError("unexpected opcode %#x" % opcode)
+        result = bytes((len(result) + 3,)) + result
+        crc = reference_crc(result)
+        self.response = result + bytes((crc & 0xFF, crc >> 8))
+        self.busy_until = CLOCK.now_ns + round(TYPICAL_MS[opcode] * 1e6)
+
+    def readinto(self, buf, start=0, end=None):
+        self.transfers += 1
+        if not self._awake() or CLOCK.now_ns < self.busy_until or not self.response:
+            CLOCK.transfer(0)
+            raise OSError(19, "NACK")
+        end = len(buf) if end is None else end
+        CLOCK.transfer(end - start)
+        buf[start:end] = self.response[: end - start]
+
+
+CHIP = MockATECC608()
+
+
+class I2CDevice:
+    """adafruit_bus_device stand-in: 0x60 is the chip, 0x00 always NACKs."""
+
+    def __init__(self, i2c, device_address, probe=True):
+        # pylint: disable=unused-argument
+        self.device_address = device_address
+
+    def __enter__(self):
+        if self.device_address == 0x00:
+            return self
+        return CHIP
+
+    def __exit__(self, *exc):
+        return False
+
+    @staticmethod
+    def write(buf, start=0, end=None):
+        # pylint: disable=unused-argument
+        CHIP.transfers += 1
+        CLOCK.transfer(0)
+        CHIP.wake()
+        raise OSError(19, "NACK")
+
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+
+
+_module("micropython", const=lambda value: value)
+_module("busio", I2C=object)
+_module("circuitpython_typing", ReadableBuffer=object, WriteableBuffer=object)
+_module("adafruit_bus_device")
+_module("adafruit_bus_device.i2c_device", I2CDevice=I2CDevice)
+_module("adafruit_binascii", hexlify=binascii.hexlify, unhexlify=binascii.unhexlify)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "lib"))
+sys.dont_write_bytecode = True
+
+from adafruit_atecc import adafruit_atecc
+
+adafruit_atecc.time = CLOCK
+
+# Buffers allocated by library code ---
+
+ALLOCATED = []
+
+
+class CountedBytearray(bytearray):
+    """bytearray, counting itself and its slices in ALLOCATED."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        ALLOCATED.append(len(self))
+
+    def __getitem__(self, index):
+        item = super().__getitem__(index)
+        if isinstance(index, slice):
+            ALLOCATED.append(len(item))
+        return item
+
+
+class CountedBytes(bytes):
+    """bytes, counting itself in ALLOCATED."""
+
+    def __new__(cls, *args):
+        item = super().__new__(cls, *args)
+        ALLOCATED.append(len(item))
+        return item
+
+
+adafruit_atecc.bytearray = CountedBytearray
+adafruit_atecc.bytes = CountedBytes
+
+
+# THE OLD LIBRARY ---------------------
+
+
+def _in_library(function):
+    """The function, looking up names in adafruit_atecc as if written there."""
+    return types.FunctionType(
+        function.__code__,
+        vars(adafruit_atecc),
+        function.__name__,
+        function.__defaults__,
+    )
+
+
+# pylint: disable=undefined-variable, invalid-name
+
+
+def _old_send_command(self, opcode, param_1, param_2=0x00, data=""):
+    command_packet = bytearray(8 + len(data))
+    command_packet[0] = 0x03
+    command_packet[1] = len(command_packet) - 1
+    command_packet[2] = opcode
+    command_packet[3] = param_1
+    command_packet[4] = param_2 & 0xFF
+    command_packet[5] = param_2 >> 8
+    for i, cmd in enumerate(data):
+        command_packet[6 + i] = cmd
+    crc = self._at_crc(command_packet[1:-2])
+    command_packet[-1] = crc >> 8
+    command_packet[-2] = crc & 0xFF
+    self.wakeup()
+    with self._i2c_device as i2c:
+        i2c.write(command_packet)
+    time.sleep(0.001)
+    # The caller's sleep
+    time.sleep(EXEC_TIME[opcode] / 1000)
+
+
+def _old_get_response(self, buf, length=None, retries=20):
+    self.wakeup()
+    if length is None:
+        length = len(buf)
+    response = bytearray(length + 3)
+    with self._i2c_device as i2c:
+        for _ in range(retries):
+            try:
+                i2c.readinto(response)
+                break
+            except OSError:
+                pass
+        else:
+            raise RuntimeError("Failed to read data from chip")
+    crc = response[-2] | (response[-1] << 8)
+    crc2 = self._at_crc(response[0:-2])
+    if crc != crc2:
+        raise RuntimeError("CRC Mismatch")
+    for i in range(length):
+        buf[i] = response[i + 1]
+    return response[1]
+
+
+def _old_at_crc(data, length=None):
+    if length is None:
+        length = len(data)
+    if not data or not length:
+        return 0
+    polynom = 0x8005
+    crc = 0x0
+    for b in data:
+        for shift in range(8):
+            data_bit = 0
+            if b & (1 << shift):
+                data_bit = 1
+            crc_bit = (crc >> 15) & 0x1
+            crc <<= 1
+            crc &= 0xFFFF
+            if data_bit != crc_bit:
+                crc ^= polynom
+                crc &= 0xFFFF
+    return crc & 0xFFFF
+
+
+def _old_random(self, data):
+    self.wakeup()
+    data_len = len(data)
+    while data_len:
+        self._send_command(OP_RANDOM, 0x00, 0x0000)
+        resp = bytearray(32)
+        self._get_response(resp)
+        copy_len = min(32, data_len)
+        data = resp[0:copy_len]
+        data_len -= copy_len
+    self.idle()
+    return data
+
+
+def _old_random_int(self, rnd_min=0, rnd_max=0):
+    if rnd_max:
+        rnd_min = 0
+    if rnd_min >= rnd_max:
+        return rnd_min
+    delta = rnd_max - rnd_min
+    r = bytearray(16)
+    r = self._random(r)
+    data = 0
+    for i in enumerate(r):
+        data += r[i[0]]
+    if data < 0:
+        data = -data
+    data = data % delta
+    return data + rnd_min
+
+
+# pylint: enable=undefined-variable, invalid-name
+
+
+class OldATECC(adafruit_atecc.ATECC):
+    """The library before table CRCs, buffers, polling and the entropy pool."""
+
+    _send_command = _in_library(_old_send_command)
+    _get_response = _in_library(_old_get_response)
+    _at_crc = staticmethod(_in_library(_old_at_crc))
+    _random = _in_library(_old_random)
+    random = _in_library(_old_random_int)
+
+
+# MEASUREMENTS ------------------------
+
+MESSAGE = bytes(range(64))
+CALLS = 20
+
+
+def measure(atecc, name, call):
+    """Mean simulated ms, transfers and allocations (count, bytes) a call."""
+    start_ns, start_transfers = CLOCK.now_ns, CHIP.transfers
+    ALLOCATED.clear()
+    for _ in range(CALLS):
+        call(atecc)
+    return (
+        name,
+        (CLOCK.now_ns - start_ns) / 1e6 / CALLS,
+        (CHIP.transfers - start_transfers) / CALLS,
+        len(ALLOCATED) / CALLS,
+        sum(ALLOCATED) / CALLS,
+    )
+
+
+def run(kind):
+    atecc = kind(None)
+    atecc.sha_start()
+    rows = [measure(atecc, "sha_update", lambda a: a.sha_update(MESSAGE))]
+    digest = atecc.sha_digest()
+    assert bytes(digest) == hashlib.sha256(MESSAGE * CALLS).digest(), "digest"
+    rows.append(measure(atecc, "random", lambda a: a.random(rnd_max=1024)))
+    key = bytearray(64)
+    rows.append(measure(atecc, "gen_key", lambda a: a.gen_key(key, 0)))
+    return rows
+
+
+def crc_us(crc):
+    packet = bytearray(os.urandom(72))
+    best = None
+    for _ in range(20):
+        start = time.perf_counter_ns()
+        crc(packet[1:-2])
+        elapsed = (time.perf_counter_ns() - start) / 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def hash_blocks(atecc, data):
+    atecc.sha_start()
+    for start in range(0, len(data), 64):
+        atecc.sha_update(data[start : start + 64])
+    return atecc.sha_digest()
+
+
+def hash_session(atecc, data):
+    with atecc.sha_session() as sha:
+        for start in range(0, len(data), 1000):
+            sha.update(memoryview(data)[start : start + 1000])
+        return sha.digest()
+
+
+def sha_throughput():
+    data = os.urandom(16384)
+    atecc = adafruit_atecc.ATECC(None)
+    print(f"{'SHA-256 of 16 KB':<24}{'Sim s':>7}{'KB/s':>7}{'Wakeups':>9}")
+    for name, function in (
+        ("sha_update per block", hash_blocks),
+        ("sha_session", hash_session),
+    ):
+        start_ns, wakeups = CLOCK.now_ns, CHIP.wakeups
+        digest = function(atecc, data)
+        seconds = (CLOCK.now_ns - start_ns) / 1e9
+        assert bytes(digest) == hashlib.sha256(data).digest(), name
+        assert not CHIP.watchdog_sleeps, "watchdog ran out"
+        print(f"{name:<24}{seconds:>7.2f}{16 / seconds:>7.1f}", end="")
+        print(f"{CHIP.wakeups - wakeups:>9}")
+
+
+def chi_square(draws, limit):
+    counts = [0] * limit
+    for value in draws:
+        counts[value] += 1
+    expected = len(draws) / limit
+    return sum((count - expected) ** 2 for count in counts) / expected
+
+
+def distribution():
+    """Counts of each value against uniform; with n - 1 degrees of freedom
+    the statistic should be about n - 1, give or take sqrt(2 (n - 1))."""
+    print(f"{'20480 draws':<28}{'Random cmds':>12}{'Sim s':>7}{'Chi-sq':>9}{'Dof':>6}")
+    old, new = OldATECC(None), adafruit_atecc.ATECC(None)
+    for name, draw, limit, checked in (
+        ("random(rnd_max=1024), old", lambda n: old.random(rnd_max=n), 1024, False),
+        ("random(rnd_max=1024), new", lambda n: new.random(rnd_max=n), 1024, True),
+        ("entropy.randbelow(1000)", new.entropy.randbelow, 1000, True),
+    ):
+        start_ns, commands = CLOCK.now_ns, CHIP.commands.get(0x1B, 0)
+        draws = [draw(limit) for _ in range(20480)]
+        assert 0 <= min(draws) and max(draws) < limit
+        statistic = chi_square(draws, limit)
+        print(
+            f"{name:<28}{CHIP.commands[0x1B] - commands:>12}"
+            f"{(CLOCK.now_ns - start_ns) / 1e9:>7.1f}{statistic:>9.0f}{limit - 1:>6}"
+        )
+        if checked:
+            assert abs(statistic - (limit - 1)) < 5 * (2 * (limit - 1)) ** 0.5
+    commands = CHIP.commands[0x1B]
+    data = new.entropy.read(1000)
+    assert len(data) == 1000 and len(set(data)) > 200
+    print(f"entropy.read(1000): {CHIP.commands[0x1B] - commands} Random commands")
+
+
+def main():
+    for _ in range(100):
+        packet = os.urandom(os.urandom(1)[0] % 72)
+        assert adafruit_atecc.ATECC._at_crc(packet) == reference_crc(packet)
+    results = {"old": run(OldATECC), "new": run(adafruit_atecc.ATECC)}
+    print(f"{'Per call':<20}{'Sim ms':>9}{'Transfers':>11}{'Buffers':>9}{'Bytes':>7}")
+    for old, new in zip(results["old"], results["new"]):
+        for version, row in (("old", old), ("new", new)):
+            name, milliseconds, transfers, buffers, size = row
+            print(
+                f"{name + ', ' + version:<20}{milliseconds:>9.2f}"
+                f"{transfers:>11.1f}{buffers:>9.1f}{size:>7.0f}"
+            )
+    print()
+    print(f"72 byte command CRC, host us: old {crc_us(_old_at_crc):.1f}, ", end="")
+    print(f"new {crc_us(adafruit_atecc.ATECC._at_crc):.1f}")
+    print()
+    sha_throughput()
+    print()
+    distribution()
+
+
+main()
@@ -11,13 +11,15 @@ set, press MACROPAD keys to send key sequences and other USB protocols.
 
 # pylint: disable=import-error, unused-import, too-few-public-methods
 
+import gc
 import os
-import time
 import displayio
 import terminalio
 from adafruit_display_shapes.rect import Rect
 from adafruit_display_text import label
 from adafruit_macropad import MacroPad
+import macro_compiler
+from macro_scheduler import Scheduler
 
 
 # CONFIGURABLES ------------------------
@@ -29,15 +31,39 @@ MACRO_FOLDER = '/macros'
 
 class App:
     """ Class representing a host-side application, for which we have a set
-        of macro sequences. Project code was originally more complex and
-        this was helpful, but maybe it's excessive now?"""
-    def __init__(self, appdata):
-        self.name = appdata['name']
-        self.macros = appdata['macros']
+        of macro sequences. Only the macro file's name is kept until the
+        app is selected; its macros are compiled (see macro_compiler.py)
+        then. macro_compiler keeps the last few apps compiled in RAM, the
+        rest are dropped as other apps are selected. """
+    def __init__(self, filename):
+        self.filename = filename
+        self.name = filename[:-3]
+        self.macros = []
+        self.compiled = None
+
+    def load(self):
+        """ Compile (or read the cached compile of) the macro file. """
+        try:
+            self.compiled = macro_compiler.load(MACRO_FOLDER, self.filename)
+            self.name = self.compiled.name
+            self.macros = self.compiled.macros
+        except (SyntaxError, ImportError, AttributeError, KeyError, NameError,
+                IndexError, TypeError, ValueError, OSError) as err:
+            print("ERROR in", self.filename)
+            import traceback
+            traceback.print_exception(err, err, err.__traceback__)
+            self.name = 'ERROR: ' + self.filename
+            self.macros = []
+
+    def unload(self):
+        """ Let go of the compiled macros (macro_compiler may keep them). """
+        self.compiled = None
+        self.macros = []
 
     def switch(self):
         """ Activate application settings; update OLED labels and LED
             colors. """
+        self.load()
         group[13].text = self.name   # Application name
         for i in range(12):
             if i < len(self.macros): # Key in use, set label + LED color
@@ -59,6 +85,8 @@ class App:
 macropad = MacroPad()
 macropad.display.auto_refresh = False
 macropad.pixels.auto_write = False
+# Runs macros a step at a time so keys and the encoder are always read
+scheduler = Scheduler(macropad)
 
 # Set up displayio group with all the labels
 group = displayio.Group()
@@ -76,20 +104,13 @@ group.append(label.Label(terminalio.FONT, text='', color=0x000000,
                          anchor_point=(0.5, 0.0)))
 macropad.display.show(group)
 
-# Load all the macro key setups from .py files in MACRO_FOLDER
+# List the macro files in MACRO_FOLDER. Each is only loaded when selected.
 apps = []
 files = os.listdir(MACRO_FOLDER)
 files.sort()
 for filename in files:
     if filename.endswith('.py') and not filename.startswith('._'):
-        try:
-            module = __import__(MACRO_FOLDER + '/' + filename[:-3])
-            apps.append(App(module.app))
-        except (SyntaxError, ImportError, AttributeError, KeyError, NameError,
-                IndexError, TypeError) as err:
-            print("ERROR in", filename)
-            import traceback
-            traceback.print_exception(err, err, err.__traceback__)
+        apps.append(App(filename))
 
 if not apps:
     group[13].text = 'NO MACRO FILES FOUND'
@@ -99,16 +120,21 @@ if not apps:
 
 last_position = None
 last_encoder_switch = macropad.encoder_switch_debounced.pressed
-app_index = 0
-apps[app_index].switch()
+app_index = 0  # The main loop loads and switches to the first app
 
 
 # MAIN LOOP ----------------------------
 
 while True:
+    # Carry on with any macros that are running
+    scheduler.update()
+
     # Read encoder position. If it's changed, switch apps.
     position = macropad.encoder
     if position != last_position:
+        scheduler.cancel()
+        apps[app_index].unload()
+        gc.collect()
         app_index = position % len(apps)
         apps[app_index].switch()
         last_position = position
@@ -135,69 +161,23 @@ while True:
     # and there IS a corresponding macro available for it...other situations
     # are avoided by 'continue' statements above which resume the loop.
 
-    sequence = apps[app_index].macros[key_number][2]
+    app = apps[app_index].compiled
+    color, _, press_ops, release_ops = app.macros[key_number]
     if pressed:
-        # 'sequence' is an arbitrary-length list, each item is one of:
-        # Positive integer (e.g. Keycode.KEYPAD_MINUS): key pressed
-        # Negative integer: (absolute value) key released
-        # Float (e.g. 0.25): delay in seconds
-        # String (e.g. "Foo"): corresponding keys pressed & released
-        # List []: one or more Consumer Control codes (can also do float delay)
-        # Dict {}: mouse buttons/motion (might extend in future)
+        # The macro file's key sequence, compiled to opcodes (see
+        # macro_compiler.py for what each kind of sequence item becomes)
         if key_number < 12: # No pixel for encoder button
             macropad.pixels[key_number] = 0xFFFFFF
             macropad.pixels.show()
-        for item in sequence:
-            if isinstance(item, int):
-                if item >= 0:
-                    macropad.keyboard.press(item)
-                else:
-                    macropad.keyboard.release(-item)
-            elif isinstance(item, float):
-                time.sleep(item)
-            elif isinstance(item, str):
-                macropad.keyboard_layout.write(item)
-            elif isinstance(item, list):
-                for code in item:
-                    if isinstance(code, int):
-                        macropad.consumer_control.release()
-                        macropad.consumer_control.press(code)
-                    if isinstance(code, float):
-                        time.sleep(code)
-            elif isinstance(item, dict):
-                if 'buttons' in item:
-                    if item['buttons'] >= 0:
-                        macropad.mouse.press(item['buttons'])
-                    else:
-                        macropad.mouse.release(-item['buttons'])
-                macropad.mouse.move(item['x'] if 'x' in item else 0,
-                                    item['y'] if 'y' in item else 0,
-                                    item['wheel'] if 'wheel' in item else 0)
-                if 'tone' in item:
-                    if item['tone'] > 0:
-                        macropad.stop_tone()
-                        macropad.start_tone(item['tone'])
-                    else:
-                        macropad.stop_tone()
-                elif 'play' in item:
-                    macropad.play_file(item['play'])
+        scheduler.press(key_number, app, press_ops)
     else:
         # Release any still-pressed keys, consumer codes, mouse buttons
         # Keys and mouse buttons are individually released this way (rather
         # than release_all()) because pad supports multi-key rollover, e.g.
         # could have a meta key or right-mouse held down by one macro and
         # press/release keys/buttons with others. Navigate popups, etc.
-        for item in sequence:
-            if isinstance(item, int):
-                if item >= 0:
-                    macropad.keyboard.release(item)
-            elif isinstance(item, dict):
-                if 'buttons' in item:
-                    if item['buttons'] >= 0:
-                        macropad.mouse.release(item['buttons'])
-                elif 'tone' in item:
-                    macropad.stop_tone()
-        macropad.consumer_control.release()
+        # This runs once the key's press macro is done.
+        scheduler.release(key_number, app, release_ops)
         if key_number < 12: # No pixel for encoder button
-            macropad.pixels[key_number] = apps[app_index].macros[key_number][0]
+            macropad.pixels[key_number] = color
             macropad.pixels.show()
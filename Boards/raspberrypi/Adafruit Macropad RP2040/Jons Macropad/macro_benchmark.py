@@ -0,0 +1,414 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Compiled, lazily loaded macros against importing every macro file at boot
+
+Desktop script, run from this folder:
+    python macro_benchmark.py
+Works on a copy of /macros in a temporary folder, so no .mcr cache files are
+left behind. Board only modules are replaced by stand-ins: Keycode and the
+other adafruit_hid constants give every name a made up code, and a stand-in
+MACROPAD records what each key press would send instead of sending it.
+
+First checks that every key of every macro file sends the same thing both
+ways, and that an app too big for a .mcr file still loads. Then reports,
+for the old code.py and for macro_compiler:
+- boot time: listing /macros and getting the first app on screen (the old
+  way imports all of them), with and without .mcr cache files
+- resident memory: what stays allocated once booted (tracemalloc)
+- switching back to an app still compiled in RAM
+- per key latency: interpreting a press and a release, delays not slept,
+  with strings typed in one go (play) and a character at a time with a
+  yield after each (steps, as macro_scheduler runs them)
+"""
+
+# pylint: disable=import-error, wrong-import-position, too-few-public-methods
+
+import gc
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+# Stand-ins for the board only modules ---
+
+_micropython = types.ModuleType('micropython')
+_micropython.const = lambda value: value
+sys.modules.setdefault('micropython', _micropython)
+
+
+class _Codes(type):
+    """ Any upper case name is a code, the same for the same name. """
+    def __getattr__(cls, name):
+        if not name.isupper():
+            raise AttributeError(name)
+        return sum(name.encode()) % 200 + 4
+
+
+def _constants(module_name, class_name, **known):
+    module = types.ModuleType(module_name)
+    setattr(module, class_name, _Codes(class_name, (), known))
+    sys.modules[module_name] = module
+    return module
+
+
+sys.modules['adafruit_hid'] = types.ModuleType('adafruit_hid')
+_constants('adafruit_hid.keycode', 'Keycode')
+_constants('adafruit_hid.consumer_control_code', 'ConsumerControlCode')
+_constants('adafruit_hid.mouse', 'Mouse',
+           LEFT_BUTTON=1, RIGHT_BUTTON=2, MIDDLE_BUTTON=4)
+
+
+class _SlashImporter:
+    """ CircuitPython imports '/macros/name' from the file /macros/name.py,
+        CPython needs help. """
+    @staticmethod
+    def find_spec(name, path=None, target=None):
+        # pylint: disable=unused-argument
+        if name.startswith('/'):
+            return importlib.util.spec_from_file_location(name, name + '.py')
+        return None
+
+
+sys.meta_path.insert(0, _SlashImporter)
+sys.dont_write_bytecode = True
+
+import macro_compiler
+
+
+class Recorder:
+    """ A MACROPAD's HID devices and speaker, recording each call. """
+    def __init__(self):
+        self.calls = []
+        self.keyboard = self._device('keyboard')
+        self.keyboard_layout = self._device('layout')
+        self.consumer_control = self._device('consumer')
+        self.mouse = self._device('mouse')
+
+    def _device(self, device):
+        recorder = self
+
+        class Device:
+            """ Records calls to any method. """
+            def __getattr__(self, method):
+                def call(*args):
+                    recorder.calls.append((device, method) + args)
+                return call
+        return Device()
+
+    def stop_tone(self):
+        self.calls.append(('speaker', 'stop_tone'))
+
+    def start_tone(self, frequency):
+        self.calls.append(('speaker', 'start_tone', frequency))
+
+    def play_file(self, name):
+        self.calls.append(('speaker', 'play_file', name))
+
+
+# THE OLD code.py ---------------------
+
+def old_press(macropad, sequence):
+    """ The old code.py key press handling. """
+    # pylint: disable=too-many-branches
+    for item in sequence:
+        if isinstance(item, int):
+            if item >= 0:
+                macropad.keyboard.press(item)
+            else:
+                macropad.keyboard.release(-item)
+        elif isinstance(item, float):
+            time.sleep(item)
+        elif isinstance(item, str):
+            macropad.keyboard_layout.write(item)
+        elif isinstance(item, list):
+            for code in item:
+                if isinstance(code, int):
+                    macropad.consumer_control.release()
+                    macropad.consumer_control.press(code)
+                if isinstance(code, float):
+                    time.sleep(code)
+        elif isinstance(item, dict):
+            if 'buttons' in item:
+                if item['buttons'] >= 0:
+                    macropad.mouse.press(item['buttons'])
+                else:
+                    macropad.mouse.release(-item['buttons'])
+            macropad.mouse.move(item['x'] if 'x' in item else 0,
+                                item['y'] if 'y' in item else 0,
+                                item['wheel'] if 'wheel' in item else 0)
+            if 'tone' in item:
+                if item['tone'] > 0:
+                    macropad.stop_tone()
+                    macropad.start_tone(item['tone'])
+                else:
+                    macropad.stop_tone()
+            elif 'play' in item:
+                macropad.play_file(item['play'])
+
+
+def old_release(macropad, sequence):
+    """ The old code.py key release handling. """
+    for item in sequence:
+        if isinstance(item, int):
+            if item >= 0:
+                macropad.keyboard.release(item)
+        elif isinstance(item, dict):
+            if 'buttons' in item:
+                if item['buttons'] >= 0:
+                    macropad.mouse.release(item['buttons'])
+            elif 'tone' in item:
+                macropad.stop_tone()
+    macropad.consumer_control.release()
+
+
+def new_release(macropad, app, ops):
+    """ The new code.py key release handling. """
+    macro_compiler.play(macropad, app, ops)
+    macropad.consumer_control.release()
+
+
+def old_boot(folder):
+    """ The old code.py: import every macro file, keep every app dict. """
+    apps = []
+    for filename in sorted(os.listdir(folder)):
+        if filename.endswith('.py') and not filename.startswith('._'):
+            module = __import__(folder + '/' + filename[:-3])
+            apps.append(module.app)
+    return apps
+
+
+def new_boot(folder):
+    """ The new code.py: list the macro files, load the first. """
+    files = [filename for filename in sorted(os.listdir(folder))
+             if filename.endswith('.py') and not filename.startswith('._')]
+    return files, macro_compiler.load(folder, files[0])
+
+
+def forget_modules(folder):
+    for name in [name for name in sys.modules if name.startswith(folder)]:
+        del sys.modules[name]
+
+
+def forget_cache(folder):
+    macro_compiler.forget_loaded()
+    for filename in os.listdir(folder):
+        if filename.endswith(macro_compiler.CACHE_EXTENSION):
+            os.remove(folder + '/' + filename)
+
+
+# CHECKS AND MEASUREMENTS -------------
+
+def sequences(appdata):
+    for _, _, sequence in appdata['macros']:
+        yield list(sequence) if isinstance(sequence, str) else sequence
+
+
+def without_noops(calls, releasing=False):
+    """ mouse.move(0, 0, 0) sends nothing, and on key up releasing a key
+        again does nothing, so the old code's extra calls are dropped. """
+    kept = []
+    for call in calls:
+        if call == ('mouse', 'move', 0, 0, 0):
+            continue
+        if releasing and call[:2] == ('keyboard', 'release') and call in kept:
+            continue
+        kept.append(call)
+    return kept
+
+
+def joined_writes(calls):
+    """ Compiled macros type a character at a time, join up what is
+        typed back to back. """
+    joined = []
+    for call in calls:
+        if call[:2] == ('layout', 'write') and joined and \
+                joined[-1][:2] == ('layout', 'write'):
+            joined[-1] = ('layout', 'write', joined[-1][2] + call[2])
+        else:
+            joined.append(call)
+    return joined
+
+
+def check(folder, apps):
+    """ Each key sends the same calls, compiled or not, also when the
+        compiled app is read back from its cache file. """
+    keys = 0
+    for filename, appdata in zip(sorted(f for f in os.listdir(folder)
+                                        if f.endswith('.py')), apps):
+        compiled = macro_compiler.load(folder, filename)
+        macro_compiler.forget_loaded()
+        cached = macro_compiler.load(folder, filename)
+        assert compiled.name == cached.name == appdata['name']
+        for sequence, new, again in zip(sequences(appdata), compiled.macros,
+                                        cached.macros):
+            assert new == again, filename
+            old_pad, new_pad = Recorder(), Recorder()
+            old_press(old_pad, sequence)
+            macro_compiler.play(new_pad, compiled, new[2])
+            assert joined_writes(without_noops(old_pad.calls)) == \
+                joined_writes(new_pad.calls), filename
+            old_pad.calls.clear()
+            new_pad.calls.clear()
+            old_release(old_pad, sequence)
+            new_release(new_pad, compiled, new[3])
+            assert joined_writes(without_noops(old_pad.calls, True)) == \
+                joined_writes(new_pad.calls), filename
+            keys += 1
+    return keys
+
+
+def check_oversized(folder):
+    """ An app with more strings than a .mcr file can count is compiled
+        and kept, without leaving a cache file behind. """
+    filename = 'zz_oversized.py'
+    with open(folder + '/' + filename, 'w') as file:
+        file.write("app = {'name': 'Big', 'macros': [\n")
+        for index in range(300):
+            file.write("    (0, 'K%d', ['text %d']),\n" % (index, index))
+        file.write(']}\n')
+    try:
+        app = macro_compiler.load(folder, filename)
+        assert len(app.strings) == 300
+        assert not os.path.exists(folder + '/zz_oversized'
+                                  + macro_compiler.CACHE_EXTENSION)
+        assert macro_compiler.load(folder, filename) is app
+    finally:
+        macro_compiler.forget_loaded()
+        forget_modules(folder)
+        os.remove(folder + '/' + filename)
+
+
+def timed(function, *args, repeat=5):
+    """ Best time of a few runs, in ms. """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        function(*args)
+        elapsed = (time.perf_counter_ns() - start) / 1e6
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def resident(function, folder):
+    """ Bytes still allocated after boot. """
+    forget_modules(folder)
+    gc.collect()
+    tracemalloc.start()
+    kept = function(folder)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+class SilentPad:
+    """ A MACROPAD whose HID calls cost as little as possible, so latency
+        is mostly the interpreting. """
+    def __init__(self):
+        device = types.SimpleNamespace(
+            press=lambda *args: None, release=lambda *args: None,
+            move=lambda *args: None, write=lambda *args: None)
+        self.keyboard = self.keyboard_layout = device
+        self.consumer_control = self.mouse = device
+        self.stop_tone = self.start_tone = self.play_file = device.press
+
+
+def latency(press, release, keys, runs=20):
+    """ Mean and worst us per key, press and release, best of some runs. """
+    macropad = SilentPad()
+    times = []
+    for key in keys:
+        best = None
+        for _ in range(runs):
+            start = time.perf_counter_ns()
+            press(macropad, key)
+            release(macropad, key)
+            elapsed = (time.perf_counter_ns() - start) / 1000
+            best = elapsed if best is None else min(best, elapsed)
+        times.append(best)
+    return sum(times) / len(times), max(times)
+
+
+def stepped(macropad, app, ops):
+    """ Runs a stream the way macro_scheduler does, a step at a time. """
+    for _ in macro_compiler.steps(macropad, app, ops):
+        pass
+
+
+def main():
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as temp:
+        folder = temp + '/macros'
+        shutil.copytree(here + '/macros', folder,
+                        ignore=shutil.ignore_patterns('__pycache__'))
+        # No real delays
+        time.sleep = lambda seconds: None
+
+        apps = old_boot(folder)
+        print(len(apps), 'macro files,', check(folder, apps),
+              'keys send the same compiled')
+        check_oversized(folder)
+        print('300 string app loads without a cache file\n')
+
+        def old_cold(folder):
+            forget_modules(folder)
+            return old_boot(folder)
+
+        def new_cold(folder):
+            forget_modules(folder)
+            forget_cache(folder)
+            return new_boot(folder)
+
+        def new_cached(folder):
+            macro_compiler.forget_loaded()
+            return new_boot(folder)
+
+        new_boot(folder)  # Leave the first app's cache file in place
+        boot = (('old, import all', old_cold, timed(old_cold, folder),
+                 resident(old_cold, folder)),
+                ('new, compile first', new_cold, timed(new_cold, folder),
+                 resident(new_cold, folder)))
+        new_boot(folder)
+        boot += (('new, cached first', new_cached, timed(new_cached, folder),
+                  resident(new_cached, folder)),)
+        print(f"{'Boot':<22}{'ms':>8}{'Resident B':>12}")
+        for name, _, milliseconds, size in boot:
+            print(f'{name:<22}{milliseconds:>8.2f}{size:>12}')
+        files = new_boot(folder)[0]
+        macro_compiler.load(folder, files[1])
+        print(f"{'switch back, in RAM':<22}"
+              f'{timed(macro_compiler.load, folder, files[0]):>8.2f}')
+
+        old_keys = [sequence for appdata in apps
+                    for sequence in sequences(appdata)]
+        new_keys = []
+        for filename in sorted(f for f in os.listdir(folder)
+                               if f.endswith('.py')):
+            compiled = macro_compiler.load(folder, filename)
+            new_keys += [(compiled, macro[2], macro[3])
+                         for macro in compiled.macros]
+        print()
+        print(f"{'Per key':<22}{'mean us':>8}{'worst us':>12}")
+        for name, press, release, keys in (
+                ('old, isinstance', old_press, old_release, old_keys),
+                ('new, opcodes',
+                 lambda pad, key: macro_compiler.play(pad, key[0], key[1]),
+                 lambda pad, key: new_release(pad, key[0], key[2]),
+                 new_keys),
+                ('new, steps',
+                 lambda pad, key: stepped(pad, key[0], key[1]),
+                 lambda pad, key: stepped(pad, key[0], key[2]),
+                 new_keys)):
+            mean, worst = latency(press, release, keys)
+            print(f'{name:<22}{mean:>8.2f}{worst:>12.2f}')
+
+
+main()
@@ -0,0 +1,321 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Compiles MACROPAD macro files into compact opcode streams.
+
+A macro file's 'app' dict holds each key sequence as a list of ints, floats,
+strings, lists and dicts that code.py used to pick apart with isinstance()
+on every key press. compile_app() does that once, turning each sequence into
+an array of 16-bit opcodes and operands, plus a second stream holding what to
+release when the key comes back up. steps() then runs a stream with nothing
+but integer compares, handing back control at each delay.
+
+load() imports a single macro file, compiles it and lets the module go, so
+only compiled opcodes stay in RAM. The last few apps loaded are kept there
+(RAM_CACHE_SIZE), so turning the encoder back and forth doesn't compile
+them again. The compiled form is also cached beside the macro file
+(name.mcr) when the filesystem is writable, and used instead of importing
+the file for as long as the file's size and time stamp match.
+"""
+
+# pylint: disable=import-error
+
+import os
+import struct
+import sys
+import time
+from array import array
+from micropython import const
+
+# Opcodes, each followed by its operands
+_KEY_PRESS = const(0)  # keycode
+_KEY_RELEASE = const(1)  # keycode
+_DELAY = const(2)  # milliseconds
+_WRITE = const(3)  # string index
+_CONSUMER = const(4)  # consumer control code
+_CONSUMER_RELEASE = const(5)
+_MOUSE_PRESS = const(6)  # buttons
+_MOUSE_RELEASE = const(7)  # buttons
+_MOUSE_MOVE = const(8)  # x, y, wheel
+_TONE = const(9)  # frequency, 0 to stop
+_PLAY = const(10)  # string index
+
+_MAX_DELAY_MS = const(32767)
+
+CACHE_MAGIC = b'MCR1'
+CACHE_EXTENSION = '.mcr'
+# Compiled apps kept in RAM
+RAM_CACHE_SIZE = 4
+
+_loaded = []  # (path, stamp, app), most recently loaded last
+
+
+class CompiledApp:
+    """ A macro file's app, compiled. 'macros' is a list with a
+        (color, label, press ops, release ops) tuple per key. """
+    # pylint: disable=too-few-public-methods
+    def __init__(self, name, macros, strings):
+        self.name = name
+        self.macros = macros
+        self.strings = strings
+
+
+def _delay(ops, seconds):
+    milliseconds = round(seconds * 1000)
+    while milliseconds > 0:
+        ops.append(_DELAY)
+        ops.append(min(milliseconds, _MAX_DELAY_MS))
+        milliseconds -= _MAX_DELAY_MS
+
+
+def _string(strings, text):
+    if text not in strings:
+        strings.append(text)
+    return strings.index(text)
+
+
+def _compile_sequence(sequence, strings):
+    """ Returns (press ops, release ops) for one key sequence, in the same
+        order code.py used to act on the items. """
+    press = []
+    release = []
+    keys = []
+    for item in sequence:
+        if isinstance(item, int):
+            if item >= 0:
+                press += (_KEY_PRESS, item)
+                if item not in keys:
+                    keys.append(item)
+                    release += (_KEY_RELEASE, item)
+            else:
+                press += (_KEY_RELEASE, -item)
+        elif isinstance(item, float):
+            _delay(press, item)
+        elif isinstance(item, str):
+            press += (_WRITE, _string(strings, item))
+        elif isinstance(item, list):
+            for code in item:
+                if isinstance(code, int):
+                    if code >= 0:
+                        press += (_CONSUMER, code)
+                    else:
+                        press.append(_CONSUMER_RELEASE)
+                elif isinstance(code, float):
+                    _delay(press, code)
+        elif isinstance(item, dict):
+            buttons = item.get('buttons')
+            if buttons is not None:
+                if buttons >= 0:
+                    press += (_MOUSE_PRESS, buttons)
+                    release += (_MOUSE_RELEASE, buttons)
+                else:
+                    press += (_MOUSE_RELEASE, -buttons)
+            motion = (item.get('x', 0), item.get('y', 0), item.get('wheel', 0))
+            if any(motion):
+                press.append(_MOUSE_MOVE)
+                press += motion
+            if 'tone' in item:
+                press += (_TONE, max(item['tone'], 0))
+                if buttons is None:
+                    release += (_TONE, 0)
+            elif 'play' in item:
+                press += (_PLAY, _string(strings, item['play']))
+        else:
+            raise TypeError('Unsupported macro item %r' % (item,))
+    return array('h', press), array('h', release)
+
+
+def compile_app(appdata):
+    """ Compile a macro file's 'app' dict. """
+    strings = []
+    macros = []
+    for color, label, sequence in appdata['macros']:
+        if isinstance(sequence, str):
+            # A bare string is a sequence of one character strings
+            sequence = list(sequence)
+        macros.append((color, label) + _compile_sequence(sequence, strings))
+    return CompiledApp(appdata['name'], macros, tuple(strings))
+
+
+def steps(macropad, app, ops, each_character=True):
+    """ Generator sending a compiled stream through the MACROPAD's HID
+        devices. Yields the milliseconds to wait at each delay, and 0
+        after each character typed, so a caller can do other things in
+        between (see macro_scheduler.py). With each_character False,
+        strings are typed in one go and only delays yield. """
+    # pylint: disable=too-many-branches
+    keyboard = macropad.keyboard
+    consumer_control = macropad.consumer_control
+    mouse = macropad.mouse
+    operands = iter(ops)
+    for op in operands:
+        if op == _KEY_PRESS:
+            keyboard.press(next(operands))
+        elif op == _KEY_RELEASE:
+            keyboard.release(next(operands))
+        elif op == _DELAY:
+            yield next(operands)
+        elif op == _WRITE:
+            write = macropad.keyboard_layout.write
+            if not each_character:
+                write(app.strings[next(operands)])
+                continue
+            for character in app.strings[next(operands)]:
+                write(character)
+                yield 0
+        elif op == _CONSUMER:
+            consumer_control.release()
+            consumer_control.press(next(operands))
+        elif op == _CONSUMER_RELEASE:
+            consumer_control.release()
+        elif op == _MOUSE_PRESS:
+            mouse.press(next(operands))
+        elif op == _MOUSE_RELEASE:
+            mouse.release(next(operands))
+        elif op == _MOUSE_MOVE:
+            mouse.move(next(operands), next(operands), next(operands))
+        elif op == _TONE:
+            macropad.stop_tone()
+            frequency = next(operands)
+            if frequency:
+                macropad.start_tone(frequency)
+        elif op == _PLAY:
+            macropad.play_file(app.strings[next(operands)])
+        else:
+            raise ValueError('Bad opcode %d' % op)
+
+
+def play(macropad, app, ops):
+    """ Send a compiled stream, sleeping through its delays. """
+    for delay in steps(macropad, app, ops, each_character=False):
+        time.sleep(delay / 1000)
+
+
+# CACHE FILES --------------------------
+
+def _write_string(file, text):
+    data = text.encode('utf-8')
+    file.write(struct.pack('<H', len(data)))
+    file.write(data)
+
+
+def _read_string(file):
+    length = struct.unpack('<H', file.read(2))[0]
+    return str(file.read(length), 'utf-8')
+
+
+def _write_ops(file, ops):
+    file.write(struct.pack('<H', len(ops)))
+    file.write(ops)
+
+
+def _read_ops(file):
+    ops = array('h', [0] * struct.unpack('<H', file.read(2))[0])
+    file.readinto(ops)
+    return ops
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return stat[6] & 0xFFFFFFFF, stat[8] & 0xFFFFFFFF
+
+
+def save(app, path, stamp):
+    """ Write a compiled app to a cache file. 'stamp' is the
+        (size, mtime) of the macro file it came from. Raises struct.error
+        for an app with more than 255 keys or strings. """
+    try:
+        _save(app, path, stamp)
+    except (OSError, struct.error):
+        # Don't leave half a file behind, it would pass the stamp check
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+
+
+def _save(app, path, stamp):
+    with open(path, 'wb') as file:
+        file.write(CACHE_MAGIC)
+        file.write(struct.pack('<II', *stamp))
+        _write_string(file, app.name)
+        file.write(struct.pack('<BB', len(app.strings), len(app.macros)))
+        for text in app.strings:
+            _write_string(file, text)
+        for color, label, press, release in app.macros:
+            file.write(struct.pack('<I', color))
+            _write_string(file, label)
+            _write_ops(file, press)
+            _write_ops(file, release)
+
+
+def read_cache(path, stamp):
+    """ Read a cache file, or return None if it is missing or was
+        compiled from a different version of the macro file. """
+    try:
+        with open(path, 'rb') as file:
+            if file.read(4) != CACHE_MAGIC:
+                return None
+            if struct.unpack('<II', file.read(8)) != tuple(stamp):
+                return None
+            name = _read_string(file)
+            string_count, macro_count = struct.unpack('<BB', file.read(2))
+            strings = tuple(_read_string(file) for _ in range(string_count))
+            macros = []
+            for _ in range(macro_count):
+                color = struct.unpack('<I', file.read(4))[0]
+                label = _read_string(file)
+                macros.append((color, label, _read_ops(file), _read_ops(file)))
+    except (OSError, struct.error, UnicodeError):
+        return None
+    return CompiledApp(name, macros, strings)
+
+
+def forget_loaded():
+    """ Drop the compiled apps kept in RAM. """
+    _loaded.clear()
+
+
+def _remember(path, stamp, app):
+    for index, entry in enumerate(_loaded):
+        if entry[0] == path:
+            del _loaded[index]
+            break
+    if len(_loaded) >= RAM_CACHE_SIZE:
+        del _loaded[0]
+    _loaded.append((path, stamp, app))
+
+
+def load(folder, filename):
+    """ Compile (or read from cache) the macro file 'filename' in 'folder'.
+        Only the compiled app stays in memory; the imported module is
+        dropped. """
+    path = folder + '/' + filename
+    stamp = _source_stamp(path)
+    for loaded_path, loaded_stamp, app in _loaded:
+        if loaded_path == path and loaded_stamp == stamp:
+            _remember(path, stamp, app)
+            return app
+    cache_path = path[:-3] + CACHE_EXTENSION
+    app = read_cache(cache_path, stamp)
+    if app is not None:
+        _remember(path, stamp, app)
+        return app
+    module_name = path[:-3]
+    module = __import__(module_name)
+    try:
+        app = compile_app(module.app)
+    finally:
+        sys.modules.pop(module_name, None)
+        del module
+    try:
+        save(app, cache_path, stamp)
+    except OSError:
+        pass  # Read-only filesystem (the usual case while USB is mounted)
+    except struct.error:
+        pass  # Too many keys or strings for the cache file, kept in RAM only
+    _remember(path, stamp, app)
+    return app
@@ -0,0 +1,97 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Runs MACROPAD macros without blocking the main loop.
+
+Each key press or release queues its compiled stream (see macro_compiler.py)
+on that key. update(), called every pass of the main loop, resumes each
+key's running stream once its delay is over, so keys and the encoder are
+still read while a long macro runs and several keys' macros interleave.
+One key's streams run in the order they were queued, so a key's release
+always follows its press, as it did when macros blocked.
+"""
+
+# pylint: disable=import-error
+
+import time
+import macro_compiler
+
+
+def monotonic_ms():
+    """ Milliseconds from time.monotonic_ns(). """
+    return time.monotonic_ns() // 1_000_000
+
+
+def _release_steps(macropad, app, ops):
+    yield from macro_compiler.steps(macropad, app, ops)
+    macropad.consumer_control.release()
+
+
+class Scheduler:
+    """ Interleaves running macros against a millisecond clock.
+
+        :param macropad: The MacroPad, or anything with its HID devices.
+        :param clock: Returns the time in ms, monotonic_ms() by default. """
+    def __init__(self, macropad, clock=monotonic_ms):
+        self.macropad = macropad
+        self.clock = clock
+        self._running = {}  # key number: [wake ms, steps, queued steps...]
+        self.longest_step_ms = 0
+        """ Longest the main loop was held up by a macro step """
+
+    @property
+    def busy(self):
+        """ True while any macro is running or queued. """
+        return bool(self._running)
+
+    def press(self, key_number, app, ops):
+        """ Queue a key's press stream and start it if the key is idle. """
+        self._queue(key_number,
+                    macro_compiler.steps(self.macropad, app, ops))
+
+    def release(self, key_number, app, ops):
+        """ Queue a key's release stream, then a consumer control release,
+            to run once its press stream is done. """
+        self._queue(key_number, _release_steps(self.macropad, app, ops))
+
+    def _queue(self, key_number, steps):
+        entry = self._running.get(key_number)
+        if entry is None:
+            self._running[key_number] = [self.clock(), steps]
+            self.update()
+        else:
+            entry.append(steps)
+
+    def cancel(self):
+        """ Drop every running and queued macro, e.g. on an app switch. """
+        self._running.clear()
+
+    def update(self):
+        """ Resume every macro whose delay is over. Call this often. """
+        if not self._running:
+            return
+        now = self.clock()
+        for key_number in list(self._running):
+            entry = self._running[key_number]
+            while now >= entry[0]:
+                try:
+                    delay = next(entry[1])
+                except StopIteration:
+                    delay = None
+                end = self.clock()
+                self.longest_step_ms = max(self.longest_step_ms, end - now)
+                now = end
+                if delay is None:
+                    # Done, start the key's next queued stream if any
+                    del entry[1]
+                    if len(entry) == 1:
+                        del self._running[key_number]
+                        break
+                    continue
+                entry[0] = now + delay
+                # A typed character hands back control with no delay; go on
+                # to the other keys before typing the next one
+                if not delay:
+                    break
@@ -0,0 +1,230 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+#
+# SPDX-License-Identifier: MIT
+
+"""
+macro_scheduler against the old blocking macros, on a simulated clock
+
+Desktop script, run from this folder:
+    python scheduler_benchmark.py
+A stand-in MACROPAD records every HID call with the simulated time it was
+made, and each call costs the time its USB reports take (1 ms a report, a
+typed character is a press and a release). A pass of the main loop costs
+LOOP_MS for reading keys, the encoder and the debouncer. Board only modules
+are replaced by stand-ins; Keycode names get made up codes.
+
+The input: the Minecraft PE (equip) 'helm' key, about 10 seconds of typed
+commands and delays, with Tones 'Rising' and Mouse 'Up' pressed while it
+runs, and the encoder turned every 250 ms. The old code.py only reads
+inputs between macros; the new one every pass of the main loop.
+
+Checks that each macro sends the same calls when interleaved as it does on
+its own, with its delays kept, then reports the time to finish, the worst
+and mean delay from an input happening to the main loop reading it, and the
+longest macro step.
+"""
+
+# pylint: disable=import-error, wrong-import-position, too-few-public-methods
+
+import importlib.util
+import os
+import sys
+import time
+import types
+
+# Stand-ins for the board only modules ---
+
+_micropython = types.ModuleType('micropython')
+_micropython.const = lambda value: value
+sys.modules.setdefault('micropython', _micropython)
+
+
+class _Codes(type):
+    """ Any upper case name is a code, the same for the same name. """
+    def __getattr__(cls, name):
+        if not name.isupper():
+            raise AttributeError(name)
+        return sum(name.encode()) % 200 + 4
+
+
+def _constants(module_name, class_name, **known):
+    module = types.ModuleType(module_name)
+    setattr(module, class_name, _Codes(class_name, (), known))
+    sys.modules[module_name] = module
+
+
+sys.modules['adafruit_hid'] = types.ModuleType('adafruit_hid')
+_constants('adafruit_hid.keycode', 'Keycode')
+_constants('adafruit_hid.consumer_control_code', 'ConsumerControlCode')
+_constants('adafruit_hid.mouse', 'Mouse',
+           LEFT_BUTTON=1, RIGHT_BUTTON=2, MIDDLE_BUTTON=4)
+sys.dont_write_bytecode = True
+
+import macro_compiler
+from macro_scheduler import Scheduler
+
+LOOP_MS = 2
+REPORT_MS = 1
+ENCODER_EVERY_MS = 250
+
+
+class Clock:
+    """ Simulated milliseconds. """
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += round(seconds * 1000)
+
+
+class FakePad:
+    """ A MACROPAD's HID devices and speaker. Records (ms, device, method,
+        args...) for each call and takes the time its reports would. """
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+        self.keyboard = self._device('keyboard')
+        self.keyboard_layout = self._device('layout')
+        self.consumer_control = self._device('consumer')
+        self.mouse = self._device('mouse')
+        self.stop_tone = self._call('speaker', 'stop_tone', 0)
+        self.start_tone = self._call('speaker', 'start_tone', 0)
+        self.play_file = self._call('speaker', 'play_file', 0)
+
+    def _call(self, device, method, reports):
+        def call(*args):
+            self.calls.append((self.clock.now, device, method) + args)
+            if method == 'write':
+                reports_sent = 2 * len(args[0])
+            else:
+                reports_sent = reports
+            self.clock.now += reports_sent * REPORT_MS
+        return call
+
+    def _device(self, device):
+        return types.SimpleNamespace(
+            press=self._call(device, 'press', 1),
+            release=self._call(device, 'release', 1),
+            move=self._call(device, 'move', 1),
+            write=self._call(device, 'write', 2))
+
+
+def compiled(filename):
+    """ The compiled app of a file in ./macros """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'macros', filename)
+    spec = importlib.util.spec_from_file_location(filename[:-3], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return macro_compiler.compile_app(module.app)
+
+
+def key(app, label):
+    """ (app, press ops, release ops) of the key with this label """
+    for _, key_label, press, release in app.macros:
+        if key_label == label:
+            return app, press, release
+    raise KeyError(label)
+
+
+EQUIP = key(compiled('minecraft-pe-equip.py'), 'helm')
+RISING = key(compiled('tones.py'), 'Rising')
+UP = key(compiled('mouse.py'), 'Up')
+# (ms, key number, macro, pressed), 'encoder' inputs are only read
+INPUTS = [(0, 0, EQUIP, True), (60, 0, EQUIP, False),
+          (1200, 3, RISING, True), (1300, 3, RISING, False),
+          (3000, 4, UP, True), (3050, 4, UP, False)]
+INPUTS += [(ms, 'encoder', None, None)
+           for ms in range(ENCODER_EVERY_MS, 10_000, ENCODER_EVERY_MS)]
+INPUTS.sort(key=lambda event: event[0])
+
+
+def old_loop():
+    """ The old code.py: one input a pass, macros sleep through delays. """
+    clock = Clock()
+    macropad = FakePad(clock)
+    time.sleep = clock.sleep
+    delays = []
+    pending = list(INPUTS)
+    while pending:
+        clock.now += LOOP_MS
+        if pending[0][0] > clock.now:
+            continue
+        happened, key_number, macro, pressed = pending.pop(0)
+        delays.append(clock.now - happened)
+        if key_number == 'encoder':
+            continue
+        app, press, release = macro
+        if pressed:
+            macro_compiler.play(macropad, app, press)
+        else:
+            macro_compiler.play(macropad, app, release)
+            macropad.consumer_control.release()
+    return clock.now, delays, macropad.calls, None
+
+
+def new_loop():
+    """ The new code.py: scheduler.update() every pass. """
+    clock = Clock()
+    macropad = FakePad(clock)
+    scheduler = Scheduler(macropad, clock)
+    delays = []
+    pending = list(INPUTS)
+    while pending or scheduler.busy:
+        scheduler.update()
+        clock.now += LOOP_MS
+        if not pending or pending[0][0] > clock.now:
+            continue
+        happened, key_number, macro, pressed = pending.pop(0)
+        delays.append(clock.now - happened)
+        if key_number == 'encoder':
+            continue
+        app, press, release = macro
+        if pressed:
+            scheduler.press(key_number, app, press)
+        else:
+            scheduler.release(key_number, app, release)
+    return clock.now, delays, macropad.calls, scheduler.longest_step_ms
+
+
+def alone(macro):
+    """ A macro's calls and the ms between them, run on its own. """
+    clock = Clock()
+    macropad = FakePad(clock)
+    time.sleep = clock.sleep
+    app, press, release = macro
+    # A character at a time, as the scheduler types
+    for ops in (press, release):
+        for delay in macro_compiler.steps(macropad, app, ops):
+            time.sleep(delay / 1000)
+    macropad.consumer_control.release()
+    return macropad.calls
+
+
+def check(calls):
+    """ Each macro's calls, picked out by device, match it run alone and
+        come no sooner after each other than they did then. """
+    for macro, devices in ((EQUIP, ('keyboard', 'layout')),
+                           (RISING, ('speaker',)), (UP, ('mouse',))):
+        expected = alone(macro)
+        expected = [call for call in expected if call[1] in devices]
+        got = [call for call in calls if call[1] in devices]
+        assert [call[1:] for call in got] == \
+            [call[1:] for call in expected], devices
+        for before, after, was_before, was_after in zip(
+                got, got[1:], expected, expected[1:]):
+            assert after[0] - before[0] >= was_after[0] - was_before[0]
+
+
+print(f"{'Main loop':<16}{'Done s':>8}{'Worst ms':>10}{'Mean ms':>9}"
+      f"{'Step ms':>9}")
+for name, loop in (('old, blocking', old_loop), ('new, scheduler', new_loop)):
+    done, input_delays, hid_calls, longest_step = loop()
+    if longest_step is not None:
+        check(hid_calls)
+    print(f'{name:<16}{done / 1000:>8.2f}{max(input_delays):>10}'
+          f'{sum(input_delays) / len(input_delays):>9.1f}'
+          f"{'-' if longest_step is None else longest_step:>9}")
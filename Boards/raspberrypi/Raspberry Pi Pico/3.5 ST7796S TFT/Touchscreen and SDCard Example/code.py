@@ -43,10 +43,10 @@ DISPLAY_HEIGHT = 320
 DISPLAY_ROTATION = 180
 
 # Touch calibration
-TOUCH_X_MIN = 100
-TOUCH_X_MAX = 1996
-TOUCH_Y_MIN = 100
-TOUCH_Y_MAX = 1996
+TOUCH_X_MIN = 200
+TOUCH_X_MAX = 3992
+TOUCH_Y_MIN = 200
+TOUCH_Y_MAX = 3992
 
 display_bus = displayio.FourWire(spi, command=tft_dc, chip_select=tft_cs, reset=tft_rst)
 display = ST7796S(display_bus, width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT, rotation=DISPLAY_ROTATION)
@@ -141,7 +141,8 @@ y_max_label.text = f"Y-Max:{y_max}"
 instructions_label.text = f"draw swirlies on corners to calibrate"
 
 while True:
-    x = touch.raw_touch()
+    # Filtered raw reading, spikes and light touches are already dropped
+    x = touch.raw_point
     if x is not None:
         x_min = min(x_min, x[0])
         x_max = max(x_max, x[0])
@@ -4,13 +4,12 @@
 # https://github.com/todbot/picostepseq/
 # This config requires the bodge fix to work.
 import asyncio
-import time
 import board
 import busio
 import adafruit_displayio_ssd1306
 import displayio
 import terminalio
-from supervisor import ticks_ms
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
 from digitalio import Direction
 from adafruit_mcp230xx.mcp23017 import MCP23017
 from mcp23017_scanner import McpKeysScanner
@@ -27,6 +26,10 @@ WIDTH = 128
 HEIGHT = 64  # Change to 64 if needed
 BORDER = 5
 TEMPO = 120 # Beats Per Minute (approximation)
+# Pico pins wired to each MCP23017's INT breakout, if any. With them, scans
+# only read the chip over I2C while a key is down.
+MCP1_IRQ = None  # e.g. board.GP0
+MCP2_IRQ = None
 
 display_bus = displayio.I2CDisplay(i2c1, device_address=0x3C)
 display = adafruit_displayio_ssd1306.SSD1306(display_bus, width=WIDTH, height=HEIGHT)
@@ -40,8 +43,8 @@ PINS1 = [0, 1, 2, 3, 4, 5, 6, 7]
 PINS2 = [0, 1, 2, 3, 4, 5, 6, 7]
 
 # MCP scanner and multikeypad
-scanner1 = McpKeysScanner(mcp1, PINS1)
-scanner2 = McpKeysScanner(mcp2, PINS2)
+scanner1 = McpKeysScanner(mcp1, PINS1, irq=MCP1_IRQ)
+scanner2 = McpKeysScanner(mcp2, PINS2, irq=MCP2_IRQ)
 all_scanner = MultiKeypad(scanner1, scanner2)
 
 # LED pins on ports B
@@ -85,17 +88,20 @@ async def blink_the_leds(delay=0.125):
             latched_pin = led_pins_per_chip[x][y]
             if not get_latch(x, y):
                 latched_pin.value = True
-                time.sleep(0.001)
+                await asyncio.sleep(0.001)
                 latched_pin.value = False
                 await asyncio.sleep(delay)
             elif get_latch(x, y):
                 # print(latched_pin, latched_pin.value)
                 latched_pin.value = False
-                time.sleep(0.001)
+                await asyncio.sleep(0.001)
                 latched_pin.value = True
                 await asyncio.sleep(delay)
 
 async def read_buttons():
+    # scan on a steady BPM tick, however long handling the events took
+    tick_ms = int(BPM * 1000)
+    next_tick = ticks_ms()
     while True:
         # scan the buttons
         scanner1.update()
@@ -115,13 +121,19 @@ async def read_buttons():
                 led_pin.value = get_latch(mcp_number, key_number)
             if not event.pressed and led_pin.value:
                 led_pin.value = False
-                time.sleep(0.001)
+                await asyncio.sleep(0.001)
                 led_pin.value = True
 
             # make sure to yield during the reading of the buttons
             await asyncio.sleep(0)
         # slow down the loop a little bit, can be adjusted
-        await asyncio.sleep(BPM)
+        next_tick = ticks_add(next_tick, tick_ms)
+        wait = ticks_diff(next_tick, ticks_ms())
+        if wait < 0:
+            # fell behind, start the ticks again from now
+            next_tick = ticks_ms()
+            wait = 0
+        await asyncio.sleep(wait / 1000)
 
 async def main():
     await asyncio.gather(
@@ -21,6 +21,7 @@ Implementation Notes
 
 """
 
+from array import array
 from digitalio import DigitalInOut, Pull
 from supervisor import ticks_ms
 
@@ -76,70 +77,98 @@ class Event:
 class EventQueue:
     """
     A queue of Event objects, filled by a scanner.
+
+    Events are kept in a ring buffer allocated once, like `keypad.EventQueue`.
+    When it is full, new events are dropped and `overflowed` is set.
+
+    :param int max_events: The most events the queue holds.
     """
 
-    def __init__(self):  # , max_events=64):
-        self._outq = []
-        self._inq = []
+    def __init__(self, max_events: int = 64):
+        self._keys = bytearray(max_events)
+        self._pressed = bytearray(max_events)
+        self._timestamps = array("L", [0] * max_events)
+        self._start = 0
+        self._count = 0
+        self.overflowed = False
+        """True if an event could not be queued because the queue was full.
+        Cleared by `clear`."""
+
+    def _push(self, key: int, pressed: bool, timestamp: int) -> None:
+        size = len(self._keys)
+        if self._count == size:
+            self.overflowed = True
+            return
+        index = (self._start + self._count) % size
+        self._keys[index] = key
+        self._pressed[index] = pressed
+        self._timestamps[index] = timestamp
+        self._count += 1
 
     def append(self, event: Event) -> None:
         """Append an event at the end of the queue"""
-        self._inq.append(event)
+        self._push(event.key_number, event.pressed, event.timestamp)
 
     def get(self) -> Event:
         """
         Return the next key transition event.
         Return None if no events are pending.
         """
-        if self._outq:
-            return self._outq.pop()
-        if len(self._inq) == 1:
-            return self._inq.pop()
-        if self._inq:
-            self._outq = list(reversed(self._inq))
-            self._inq.clear()
-            return self._outq.pop()
-        return None
+        if not self._count:
+            return None
+        event = Event(0, False, 0)
+        self.get_into(event)
+        return event
 
     def get_into(self, event: Event) -> bool:
         """
         Store the next key transition event in the supplied event, if available,
         and return True. If there are no queued events, do not touch event
-        and return False.
-        Note: in python this does not optimize to avoid allocating.
+        and return False. Nothing is allocated.
         """
-        next_event = self.get()
-        if next_event:
-            event.key_number = next_event.key_number
-            event.timestamp = next_event.timestamp
-            event.pressed = next_event.pressed
-            return True
-        return False
+        if not self._count:
+            return False
+        index = self._start
+        event.key_number = self._keys[index]
+        event.pressed = bool(self._pressed[index])
+        event.timestamp = self._timestamps[index]
+        self._start = (index + 1) % len(self._keys)
+        self._count -= 1
+        return True
 
     def clear(self) -> None:
         """Clear any queued key transition events."""
-        self._outq.clear()
-        self._inq.clear()
+        self._start = 0
+        self._count = 0
+        self.overflowed = False
 
     def __bool__(self) -> bool:
         """
         True if len() is greater than zero.
         This is an easy way to check if the queue is empty.
         """
-        return len(self) > 0
+        return self._count > 0
 
     def __len__(self) -> int:
         """
         Return the number of events currently in the queue.
         Used to implement len().
         """
-        return len(self._outq) + len(self._inq)
+        return self._count
 
 
 class McpScanner:
     """
     Base class for MCP scanners.
 
+    The keys down are kept as a bitmask by key number. Each scan XORs it
+    with the new one and queues an event for each bit that changed, so a
+    scan with no change allocates nothing.
+
+    With an ``irq`` pin wired to the MCP's (mirrored, open drain) INT output,
+    a scan only reads the MCP while INT is asserted; when it is not, no key
+    differs from its released level and the scan skips I2C entirely.
+
     .. property:: events
 
         The `EventQueue` associated with this Scanner. (read-only)
@@ -149,11 +178,12 @@ class McpScanner:
         self,
         mcp: any,
         irq: Optional[Pin] = None,
+        max_events: int = 64,
     ):
         self._key_count = 0
         self.mcp = mcp
-        self.keys_state = set()
-        self.events = EventQueue()
+        self._state = 0
+        self.events = EventQueue(max_events)
         self.irq = None
         if irq:
             self.irq = DigitalInOut(irq)
@@ -164,26 +194,47 @@ class McpScanner:
         """The number of keys that are being scanned. (read-only)"""
         return self._key_count
 
-    def _scan_pins(self) -> Set[int]:  # pylint:disable=no-self-use
-        return Set()
+    @property
+    def keys_state(self) -> Set[int]:
+        """The key numbers that are down, as of the last scan. (read-only)"""
+        # key numbers are bit positions, pin numbers for McpKeysScanner
+        keys = set()
+        bits = self._state
+        key = 0
+        while bits:
+            if bits & 1:
+                keys.add(key)
+            bits >>= 1
+            key += 1
+        return keys
+
+    def _scan(self) -> int:  # pylint:disable=no-self-use
+        """Return the bitmask of keys down"""
+        return 0
 
     def update(self) -> None:
         """
         Run the scan and create events in the event queue.
         """
+        current_state = self._scan()
+        changed = current_state ^ self._state
+        if not changed:
+            return
         timestamp = ticks_ms()
-        # scan the matrix, find Neo
-        current_state = self._scan_pins()
-        # use set algebra to find released and pressed keys
-        released_keys = self.keys_state - current_state
-        pressed_keys = current_state - self.keys_state
-        # create the events into the queue
-        for key in released_keys:
-            self.events.append(Event(key, False, timestamp))
-        for key in pressed_keys:
-            self.events.append(Event(key, True, timestamp))
-        # end
-        self.keys_state = current_state
+        # released keys first, then pressed keys, by key number
+        for pressed, bits in (
+            (False, changed & self._state),
+            (True, changed & current_state),
+        ):
+            key = 0
+            while bits:
+                if bits & 1:
+                    self.events._push(  # pylint: disable=protected-access
+                        key, pressed, timestamp
+                    )
+                bits >>= 1
+                key += 1
+        self._state = current_state
 
     def reset(self) -> None:
         """
@@ -192,7 +243,7 @@ class McpScanner:
         therefore cause a new key-pressed event to occur on the next scan.
         """
         self.events.clear()
-        self.keys_state.clear()
+        self._state = 0
 
     def deinit(self) -> None:
         """Release the IRQ pin"""
@@ -224,8 +275,9 @@ class McpMatrixScanner(McpScanner):
         row_pins: Iterable[int],
         column_pins: Iterable[int],
         irq: Optional[Pin] = None,
+        max_events: int = 64,
     ):
-        super().__init__(mcp, irq)
+        super().__init__(mcp, irq, max_events)
         self._key_count = len(column_pins) * len(row_pins)
         self.columns = column_pins
         self.rows = row_pins
@@ -245,21 +297,20 @@ class McpMatrixScanner(McpScanner):
             mcp.io_control = 0x44  # Interrupt as open drain and mirrored
             mcp.clear_ints()
 
-    def _scan_pins(self) -> Set[int]:
-        """Scan the matrix and return the list of keys down"""
-        pressed = set()
+    def _scan(self) -> int:
+        """Scan the matrix and return the bitmask of keys down"""
+        pressed = 0
         num_cols = len(self.columns)
         for scan_column in self.columns:
             # set all outputs to 1 on port A except the scan_column
             self.mcp.gpioa = 0xFF - (1 << scan_column)
             if self.irq is None or not self.irq.value:
-                # read the input
-                inputs = self.mcp.gpiob
-                if inputs:
-                    # adds (columns,row) if the row is 0 too
+                # read the input, a row is down if its bit is 0
+                inputs = ~self.mcp.gpiob
+                if inputs & 0xFF:
                     for row in self.rows:
-                        if (inputs >> row) & 1 == 0:
-                            pressed.add(scan_column + num_cols * row)
+                        if (inputs >> row) & 1:
+                            pressed |= 1 << (scan_column + num_cols * row)
         # set back port A to default
         self.mcp.gpioa = 0xFF
         return pressed
@@ -287,8 +338,9 @@ class McpKeysScanner(McpScanner):
         mcp: any,
         pins: Iterable[int],
         irq: Optional[Pin] = None,
+        max_events: int = 64,
     ):
-        super().__init__(mcp, irq)
+        super().__init__(mcp, irq, max_events)
         self._key_count = len(pins)
         self.pins = pins
         self.pin_bits = sum(1 << x for x in pins)
@@ -305,11 +357,10 @@ class McpKeysScanner(McpScanner):
             mcp.io_control = 0x44  # Interrupt as open drain and mirrored
             mcp.clear_ints()
 
-    def _scan_pins(self) -> Set[int]:
-        """Scan the buttons and return the list of keys down"""
-        pressed = set()
-        inputs = self.mcp.gpio & self.pin_bits
-        for pin in self.pins:
-            if inputs & (1 << pin) == 0:
-                pressed.add(pin)
-        return pressed
+    def _scan(self) -> int:
+        """Scan the buttons and return the bitmask of keys down"""
+        if self.irq is not None and self.irq.value:
+            # INT not asserted: every key is at its released level
+            return 0
+        # pins read 0 when their key is down; key numbers are pin numbers
+        return ~self.mcp.gpio & self.pin_bits
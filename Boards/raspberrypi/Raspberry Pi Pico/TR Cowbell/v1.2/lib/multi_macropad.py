@@ -2,37 +2,53 @@
 # Multi Keypad
 ################################################################
 
-from adafruit_ticks import ticks_ms, ticks_less
+from adafruit_ticks import ticks_less
+from mcp23017_scanner import Event as KeyEvent
 
 class Event:
-	def __init__(self, keypad, event):
+	def __init__(self, keypad=0, event=None):
+		self.pad_number = keypad
+		self.timestamp = 0
+		self.pressed = False
+		self.released = True
+		self.key_number = 0
+		if event is not None:
+			self.set(keypad, event)
+	def set(self, keypad, event):
 		self.pad_number = keypad
 		self.timestamp = event.timestamp
 		self.pressed = event.pressed
-		self.released = event.released
+		self.released = not event.pressed
 		self.key_number = event.key_number
 	def __repr__(self):
 		status = "pressed" if self.pressed else "released"
 		return f"<Event: pad_number {self.pad_number} key_number {self.key_number} {status}>"
 
 class MultiKeypad:
+	"""Merges the events of several keypads in timestamp order.
+
+	Each keypad's events.get_into() fills a pending event allocated once,
+	and next_event() returns the same Event object every time: use it
+	before the next call, or copy it.
+	"""
 	def __init__(self, *keypads):
 		self.keypads = keypads
-		self.events = [None] * len(keypads)
+		self._pending = [KeyEvent(0, False, 0) for _ in keypads]
+		self._has_pending = bytearray(len(keypads))
+		self._event = Event()
 
 	def next_event(self):
-		event = None
-		for index, keypad in enumerate(self.keypads):
-			if self.events[index] == None:
-				nev = keypad.events.get()
-				if nev:
-					self.events[index] = (nev.timestamp, index, nev)
-		if any(self.events):
-			for evt in self.events:
-				if evt is None:
-					continue
-				if (event is None) or (ticks_less(evt[0], event[0])):
-					event = evt
-			self.events[event[1]] = None
-			return Event(event[1], event[2])
-		return None
+		earliest = -1
+		# a for over range() allocates nothing on MicroPython
+		for index in range(len(self.keypads)):
+			if not self._has_pending[index]:
+				self._has_pending[index] = self.keypads[index].events.get_into(
+					self._pending[index])
+			if self._has_pending[index] and (earliest < 0 or ticks_less(
+					self._pending[index].timestamp, self._pending[earliest].timestamp)):
+				earliest = index
+		if earliest < 0:
+			return None
+		self._has_pending[earliest] = 0
+		self._event.set(earliest, self._pending[earliest])
+		return self._event
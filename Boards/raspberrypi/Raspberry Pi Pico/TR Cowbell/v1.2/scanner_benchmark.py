@@ -0,0 +1,438 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""mcp23017_scanner against the old set based scanner, on stand-in MCP23017s
+
+Desktop script, run from this folder:
+    python scanner_benchmark.py
+Two stand-in MCP23017s take the place of the TR Cowbell's, with 8 step
+switches each. Reading their 16 bit GPIO register counts as one I2C
+transaction, 5 bytes at 100 kHz. Their INT outputs are mirrored, and
+asserted while any switch is down, as code.py configures them with an
+irq pin. The old scanner, queue and MultiKeypad are reproduced below.
+
+First checks that both scanners give the same events for a random run of
+presses and releases. Then reports, per scan of both chips and handling of
+its events: host CPU time, I2C transactions, the scan rate the bus allows,
+and the most memory allocated in passing, idle and with keys changing.
+
+Last, runs the code.py read_buttons and blink_the_leds tasks with asyncio
+for TICKS ticks of BPM, the old way (time.sleep(0.001) pulses, sleep(BPM)
+after each scan) and the new way, and reports how far the scan ticks
+drift and jitter from the BPM period. Here the I2C time really is slept.
+"""
+
+import asyncio
+import random
+import sys
+import time
+import tracemalloc
+import types
+
+sys.path.insert(0, "lib")
+
+TEMPO = 120
+BPM = TEMPO / 60 / 16
+TICKS = 24
+SCANS = 2000
+I2C_MS = 5 * 9 / 100_000 * 1000
+
+
+# Stand-ins for the board only modules the scanner imports
+def _ticks_ms():
+    return (time.monotonic_ns() // 1_000_000) & 0x3FFFFFFF
+
+
+def _ticks_add(ticks, delta):
+    return (ticks + delta) & 0x3FFFFFFF
+
+
+def _ticks_diff(ticks1, ticks2):
+    diff = (ticks1 - ticks2) & 0x3FFFFFFF
+    return ((diff + 0x20000000) & 0x3FFFFFFF) - 0x20000000
+
+
+class _DigitalInOut:
+    """An input pin, the stand-in MCP's INT output."""
+
+    def __init__(self, pin):
+        self.pin = pin
+
+    def switch_to_input(self, pull=None):
+        pass
+
+    @property
+    def value(self):
+        return self.pin.int_level()
+
+    def deinit(self):
+        pass
+
+
+_digitalio = types.ModuleType("digitalio")
+_digitalio.DigitalInOut = _DigitalInOut
+_digitalio.Pull = types.SimpleNamespace(UP=1)
+_supervisor = types.ModuleType("supervisor")
+_supervisor.ticks_ms = _ticks_ms
+_adafruit_ticks = types.ModuleType("adafruit_ticks")
+_adafruit_ticks.ticks_ms = _ticks_ms
+_adafruit_ticks.ticks_add = _ticks_add
+_adafruit_ticks.ticks_diff = _ticks_diff
+_adafruit_ticks.ticks_less = lambda ticks1, ticks2: _ticks_diff(ticks1, ticks2) < 0
+# Only used for type annotations
+_microcontroller = types.ModuleType("microcontroller")
+_microcontroller.Pin = object
+sys.modules.update(
+    digitalio=_digitalio,
+    supervisor=_supervisor,
+    adafruit_ticks=_adafruit_ticks,
+    microcontroller=_microcontroller,
+)
+
+# pylint: disable=wrong-import-position
+from mcp23017_scanner import McpKeysScanner
+from multi_macropad import MultiKeypad
+
+
+class StandInMCP:
+    """The registers the scanner uses. Switches pull their pin low."""
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, sleep_i2c=False):
+        self.down = 0
+        self.transactions = 0
+        self.sleep_i2c = sleep_i2c
+        self.iodir = self.gppu = self.default_value = 0
+        self.interrupt_enable = self.interrupt_configuration = 0
+        self.io_control = 0
+
+    @property
+    def gpio(self):
+        self.transactions += 1
+        if self.sleep_i2c:
+            time.sleep(I2C_MS / 1000)
+        return 0xFFFF & ~self.down
+
+    def clear_ints(self):
+        pass
+
+    def int_level(self):
+        """INT is open drain, low while an enabled pin differs from DEFVAL."""
+        return not self.down & self.interrupt_enable
+
+
+class StandInLED:
+    """An LED pin, only ever written."""
+
+    value = False
+
+
+# THE OLD SCANNER ---------------------
+
+
+class LegacyEvent:
+    """The old scanner Event."""
+
+    def __init__(self, key, pressed, timestamp=None):
+        self.key_number = key
+        self.timestamp = timestamp or _ticks_ms()
+        self.pressed = pressed
+
+    @property
+    def released(self):
+        return not self.pressed
+
+
+class LegacyQueue:
+    """The old EventQueue: two lists, one reversed into the other."""
+
+    def __init__(self):
+        self._outq = []
+        self._inq = []
+
+    def append(self, event):
+        self._inq.append(event)
+
+    def get(self):
+        if self._outq:
+            return self._outq.pop()
+        if len(self._inq) == 1:
+            return self._inq.pop()
+        if self._inq:
+            self._outq = list(reversed(self._inq))
+            self._inq.clear()
+            return self._outq.pop()
+        return None
+
+
+class LegacyScanner:
+    """The old McpKeysScanner: a set of keys down per scan."""
+
+    def __init__(self, mcp, pins):
+        self.mcp = mcp
+        self.pins = pins
+        self.pin_bits = sum(1 << x for x in pins)
+        self.keys_state = set()
+        self.events = LegacyQueue()
+
+    def _scan_pins(self):
+        pressed = set()
+        inputs = self.mcp.gpio & self.pin_bits
+        for pin in self.pins:
+            if inputs & (1 << pin) == 0:
+                pressed.add(pin)
+        return pressed
+
+    def update(self):
+        timestamp = _ticks_ms()
+        current_state = self._scan_pins()
+        released_keys = self.keys_state - current_state
+        pressed_keys = current_state - self.keys_state
+        for key in released_keys:
+            self.events.append(LegacyEvent(key, False, timestamp))
+        for key in pressed_keys:
+            self.events.append(LegacyEvent(key, True, timestamp))
+        self.keys_state = current_state
+
+
+class LegacyMultiEvent:
+    """The old multi_macropad Event wrapper."""
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, keypad, event):
+        self.pad_number = keypad
+        self.timestamp = event.timestamp
+        self.pressed = event.pressed
+        self.released = event.released
+        self.key_number = event.key_number
+
+
+class LegacyMultiKeypad:
+    """The old MultiKeypad: tuples and a new Event per call."""
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, *keypads):
+        self.keypads = keypads
+        self.events = [None] * len(keypads)
+
+    def next_event(self):
+        event = None
+        for index, keypad in enumerate(self.keypads):
+            if self.events[index] is None:
+                nev = keypad.events.get()
+                if nev:
+                    self.events[index] = (nev.timestamp, index, nev)
+        if any(self.events):
+            for evt in self.events:
+                if evt is None:
+                    continue
+                if (event is None) or (_adafruit_ticks.ticks_less(evt[0], event[0])):
+                    event = evt
+            self.events[event[1]] = None
+            return LegacyMultiEvent(event[1], event[2])
+        return None
+
+
+# SETUPS ------------------------------
+
+PINS = [0, 1, 2, 3, 4, 5, 6, 7]
+
+
+def old_setup(sleep_i2c=False):
+    chips = (StandInMCP(sleep_i2c), StandInMCP(sleep_i2c))
+    scanners = [LegacyScanner(chip, PINS) for chip in chips]
+    return chips, scanners, LegacyMultiKeypad(*scanners)
+
+
+def new_setup(sleep_i2c=False, irq=False):
+    chips = (StandInMCP(sleep_i2c), StandInMCP(sleep_i2c))
+    scanners = [McpKeysScanner(chip, PINS, irq=chip if irq else None) for chip in chips]
+    return chips, scanners, MultiKeypad(*scanners)
+
+
+SETUPS = (
+    ("old, sets", old_setup),
+    ("new, bitmask", new_setup),
+    ("new, bitmask + irq", lambda sleep_i2c=False: new_setup(sleep_i2c, True)),
+)
+
+
+def changes(seed, count, hold=4):
+    """(chip, pin) to toggle before each scan, or None: a key changes every
+    hold scans on average."""
+    rng = random.Random(seed)
+    return [
+        (rng.randrange(2), rng.randrange(8)) if rng.randrange(hold) == 0 else None
+        for _ in range(count)
+    ]
+
+
+def scan(scanners, keypad, handle=None):
+    """One pass of read_buttons, without the LEDs."""
+    for scanner in scanners:
+        scanner.update()
+    while event := keypad.next_event():
+        if handle is not None:
+            handle((event.pad_number, event.key_number, event.pressed))
+
+
+def check():
+    """Both scanners give the same events in the same order, and the same
+    keys_state after each scan."""
+    results = []
+    states = []
+    for _, setup in SETUPS:
+        chips, scanners, keypad = setup()
+        got = []
+        seen = []
+        for change in changes(1, SCANS, hold=2):
+            if change is not None:
+                chips[change[0]].down ^= 1 << change[1]
+            # several keys at once now and then
+            if change == (0, 0):
+                chips[1].down ^= 0b1010_0101
+            scan(scanners, keypad, got.append)
+            seen.append([scanner.keys_state for scanner in scanners])
+        results.append(got)
+        states.append(seen)
+    assert results[0] == results[1] == results[2]
+    assert states[0] == states[1] == states[2]
+    return len(results[0])
+
+
+def check_port_b_pins():
+    """keys_state gives pin numbers for keys wired to port B as well."""
+    pins = [8, 9, 12, 15]
+    chip = StandInMCP()
+    scanner = McpKeysScanner(chip, pins)
+    legacy = LegacyScanner(StandInMCP(), pins)
+    for down in (0, 1 << 8, 1 << 12 | 1 << 15, 1 << 3 | 1 << 9, 0):
+        chip.down = legacy.mcp.down = down
+        scanner.update()
+        legacy.update()
+        assert scanner.keys_state == legacy.keys_state, (
+            scanner.keys_state,
+            legacy.keys_state,
+        )
+
+
+def measure(setup, hold):
+    """(us CPU, I2C transactions, peak bytes allocated) per scan."""
+    chips, scanners, keypad = setup()
+    plan = changes(2, SCANS, hold)
+    scan(scanners, keypad)
+    before = sum(chip.transactions for chip in chips)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter_ns()
+    for change in plan:
+        if change is not None:
+            chips[change[0]].down ^= 1 << change[1]
+        scan(scanners, keypad)
+    elapsed = time.perf_counter_ns() - start
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    transactions = sum(chip.transactions for chip in chips) - before
+    return elapsed / SCANS / 1000, transactions / SCANS, peak
+
+
+# THE code.py TASKS -------------------
+
+
+def tasks(new, scanners, keypad, leds, ticks):
+    """read_buttons and blink_the_leds, the old or new way."""
+    latches = [False] * 16
+    pulse = asyncio.sleep if new else lambda seconds: asyncio.sleep(0)
+
+    async def blocking_or_not(seconds):
+        if not new:
+            time.sleep(seconds)
+        await pulse(seconds)
+
+    async def blink_the_leds(delay=0.125):
+        while True:
+            for index, led in enumerate(leds):
+                led.value = not latches[index]
+                await blocking_or_not(0.001)
+                led.value = latches[index]
+                await asyncio.sleep(delay)
+
+    async def read_buttons():
+        tick_ms = int(BPM * 1000)
+        next_tick = _ticks_ms()
+        while len(ticks) < TICKS:
+            ticks.append(time.perf_counter())
+            for scanner in scanners:
+                scanner.update()
+            while event := keypad.next_event():
+                index = event.pad_number * 8 + event.key_number
+                if event.pressed:
+                    latches[index] = not latches[index]
+                    leds[index].value = latches[index]
+                if not event.pressed and leds[index].value:
+                    leds[index].value = False
+                    await blocking_or_not(0.001)
+                    leds[index].value = True
+                await asyncio.sleep(0)
+            if not new:
+                await asyncio.sleep(BPM)
+                continue
+            next_tick = _ticks_add(next_tick, tick_ms)
+            wait = _ticks_diff(next_tick, _ticks_ms())
+            if wait < 0:
+                next_tick = _ticks_ms()
+                wait = 0
+            await asyncio.sleep(wait / 1000)
+
+    return blink_the_leds, read_buttons
+
+
+def tick_timing(new, setup):
+    """(mean period ms, worst deviation ms, drift ms over TICKS)."""
+    chips, scanners, keypad = setup(sleep_i2c=True)
+    leds = [StandInLED() for _ in range(16)]
+    ticks = []
+    blink_the_leds, read_buttons = tasks(new, scanners, keypad, leds, ticks)
+
+    async def press_keys():
+        rng = random.Random(3)
+        while len(ticks) < TICKS:
+            chips[rng.randrange(2)].down ^= 1 << rng.randrange(8)
+            await asyncio.sleep(0.05)
+
+    async def main():
+        blinker = asyncio.create_task(blink_the_leds())
+        presser = asyncio.create_task(press_keys())
+        await read_buttons()
+        blinker.cancel()
+        presser.cancel()
+
+    asyncio.run(main())
+    periods = [(after - before) * 1000 for before, after in zip(ticks, ticks[1:])]
+    worst = max(abs(period - BPM * 1000) for period in periods)
+    drift = (ticks[-1] - ticks[0]) * 1000 - BPM * 1000 * (len(ticks) - 1)
+    return sum(periods) / len(periods), worst, drift
+
+
+check_port_b_pins()
+print(f"{check()} events and key states match between the old and new scanners\n")
+print(f"{'Scanner':<22}{'Keys':>6}{'us CPU':>8}{'I2C':>6}{'scans/s':>9}{'Peak B':>8}")
+for name, setup_function in SETUPS:
+    for keys, hold in (("idle", 10**9), ("busy", 4)):
+        cpu_us, i2c, peak_bytes = measure(setup_function, hold)
+        rate = 1000 / (cpu_us / 1000 + i2c * I2C_MS)
+        print(
+            f"{name:<22}{keys:>6}{cpu_us:>8.1f}{i2c:>6.1f}{rate:>9.0f}{peak_bytes:>8}"
+        )
+print()
+print(f"BPM tick {BPM * 1000:.0f} ms, {TICKS} ticks")
+print(f"{'Tasks':<22}{'Mean ms':>8}{'Worst ms':>10}{'Drift ms':>10}")
+for name, is_new, setup_function in (
+    ("old, sleep(BPM)", False, old_setup),
+    ("new, ticks deadline", True, new_setup),
+):
+    mean, worst_ms, drift_ms = tick_timing(is_new, setup_function)
+    print(f"{name:<22}{mean:>8.1f}{worst_ms:>10.1f}{drift_ms:>10.1f}")
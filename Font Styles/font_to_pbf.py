@@ -0,0 +1,147 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""Convert BDF or PCF fonts to the packed PBF format
+
+Run on a desktop, not on the board. Glyphs are decoded with the same
+adafruit_bitmap_font loaders the board uses, so it needs the library's .py
+sources and Blinka's fontio on the path:
+    pip install adafruit-blinka-displayio
+    python font_to_pbf.py fonts/Arial-12.bdf [more fonts...]
+Each font is written next to the original with a .pbf extension.
+See adafruit_bitmap_font/pbf.py for the file layout.
+"""
+
+import struct
+import sys
+from adafruit_bitmap_font import bdf, pcf
+from adafruit_bitmap_font.pbf import MAGIC, HEADER, RANGE, METRICS, EMPTY
+
+# Holes of up to this many missing code points are padded with empty records
+# rather than starting a new range.
+MAX_GAP = 4
+
+
+class HostBitmap:
+    """Just enough of displayio.Bitmap for the font loaders to write into."""
+
+    def __init__(self, width, height, value_count):
+        # pylint: disable=unused-argument
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(width * height)
+
+    def __setitem__(self, index, value):
+        self.pixels[index] = value
+
+    def __getitem__(self, index):
+        return self.pixels[index]
+
+
+def open_font(path):
+    """Returns the font and every code point it defines."""
+    font_file = open(path, "rb")  # pylint: disable=consider-using-with
+    if path.endswith(".bdf"):
+        font = bdf.BDF(font_file, HostBitmap)
+        font._build_index()  # pylint: disable=protected-access
+        code_points = list(font._index)  # pylint: disable=protected-access
+    elif path.endswith(".pcf"):
+        font = pcf.PCF(font_file, HostBitmap)
+        encoding = font._encoding  # pylint: disable=protected-access
+        code_points = [
+            (byte1 << 8) | byte2
+            for byte1 in range(encoding.min_byte1, encoding.max_byte1 + 1)
+            for byte2 in range(encoding.min_byte2, encoding.max_byte2 + 1)
+        ]
+    else:
+        raise ValueError(f"Unsupported font {path}")
+    font.load_glyphs(code_points)
+    glyphs = {}
+    for code_point in code_points:
+        glyph = font.get_glyph(code_point)
+        if glyph is not None:
+            glyphs[code_point] = glyph
+    return font, glyphs
+
+
+def pack_bitmap(glyph):
+    """Packs a glyph bitmap into MSB-first rows of (width + 7) // 8 bytes."""
+    row_bytes = (glyph.width + 7) // 8
+    packed = bytearray(row_bytes * glyph.height)
+    for y in range(glyph.height):
+        for x in range(glyph.width):
+            if glyph.bitmap[y * glyph.width + x]:
+                packed[y * row_bytes + (x >> 3)] |= 0x80 >> (x & 7)
+    return packed
+
+
+def build_ranges(code_points):
+    """Groups sorted code points into (first, count, first_record) ranges."""
+    ranges = []
+    record = 0
+    for code_point in code_points:
+        if ranges and code_point - (ranges[-1][0] + ranges[-1][1]) <= MAX_GAP:
+            first, _, start = ranges[-1]
+            ranges[-1] = (first, code_point - first + 1, start)
+        else:
+            if ranges:
+                record += ranges[-1][1]
+            ranges.append((code_point, 1, record))
+    return ranges
+
+
+def convert(path):
+    """Writes path with a .pbf extension and returns the new file name."""
+    font, glyphs = open_font(path)
+    bitmaps = {code_point: pack_bitmap(glyphs[code_point]) for code_point in glyphs}
+    metrics_size = struct.calcsize(METRICS)
+    record_size = metrics_size + max(len(bitmap) for bitmap in bitmaps.values())
+    ranges = build_ranges(sorted(glyphs))
+    width, height, x_offset, y_offset = font.get_bounding_box()
+
+    out_path = path.rsplit(".", 1)[0] + ".pbf"
+    with open(out_path, "wb") as out:
+        out.write(
+            struct.pack(
+                HEADER,
+                MAGIC,
+                font.ascent or 0,
+                font.descent or 0,
+                width,
+                height,
+                x_offset,
+                y_offset,
+                len(ranges),
+                record_size,
+            )
+        )
+        for font_range in ranges:
+            out.write(struct.pack(RANGE, *font_range))
+        empty = struct.pack(METRICS, EMPTY, 0, 0, 0, 0, 0)
+        for first, count, _ in ranges:
+            for code_point in range(first, first + count):
+                record = bytearray(record_size)
+                glyph = glyphs.get(code_point)
+                if glyph is None:
+                    record[:metrics_size] = empty
+                else:
+                    struct.pack_into(
+                        METRICS,
+                        record,
+                        0,
+                        glyph.width,
+                        glyph.height,
+                        glyph.dx,
+                        glyph.dy,
+                        glyph.shift_x,
+                        glyph.shift_y,
+                    )
+                    bitmap = bitmaps[code_point]
+                    record[metrics_size : metrics_size + len(bitmap)] = bitmap
+                out.write(record)
+    font.file.close()
+    return out_path
+
+
+if __name__ == "__main__":
+    for font_path in sys.argv[1:]:
+        print(f"{font_path} -> {convert(font_path)}")
@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+"""Compare glyph load times for BDF, PCF and packed PBF fonts
+
+For every BDF/PCF font in the given folders that has a converted .pbf
+beside it (see font_to_pbf.py), loads the printable ASCII set from a fresh
+font object and reports the average time per format. Runs on the board with
+the .pbf files copied over, or on a desktop with Blinka:
+    python pbf_benchmark.py fonts "../Boards/.../Feather Weather MQTT Touch/fonts"
+"""
+
+import os
+import sys
+import time
+from displayio import Bitmap
+from adafruit_bitmap_font import bitmap_font
+
+FONT_DIRS = sys.argv[1:] or ["/fonts"]
+CHARSET = "".join(chr(code_point) for code_point in range(32, 127))
+SINGLE = "0123456789"
+ROUNDS = 5
+
+
+def time_load(path):
+    """Average ms to open a font and load CHARSET, then one glyph at a time."""
+    batch = 0
+    single = 0
+    for _ in range(ROUNDS):
+        start = time.monotonic_ns()
+        font = bitmap_font.load_font(path, Bitmap)
+        font.load_glyphs(CHARSET)
+        batch += time.monotonic_ns() - start
+        font.file.close()
+
+        font = bitmap_font.load_font(path, Bitmap)
+        start = time.monotonic_ns()
+        for character in SINGLE:
+            font.get_glyph(ord(character))
+        single += time.monotonic_ns() - start
+        font.file.close()
+    return batch / ROUNDS / 1_000_000, single / ROUNDS / 1_000_000
+
+
+print(f"{'Font':<34}{'Format':>7}{'Bytes':>9}{'Charset ms':>12}{'Digits ms':>11}")
+for font_dir in FONT_DIRS:
+    for name in sorted(os.listdir(font_dir)):
+        base, _, extension = name.rpartition(".")
+        if extension not in ("bdf", "pcf"):
+            continue
+        packed = base + ".pbf"
+        if packed not in os.listdir(font_dir):
+            print(f"{name:<34} no {packed}, run font_to_pbf.py first")
+            continue
+        for font_name in (name, packed):
+            path = font_dir + "/" + font_name
+            size = os.stat(path)[6]
+            charset_ms, digits_ms = time_load(path)
+            print(
+                f"{base:<34}{font_name[-3:]:>7}{size:>9}"
+                f"{charset_ms:>12.1f}{digits_ms:>11.1f}"
+            )
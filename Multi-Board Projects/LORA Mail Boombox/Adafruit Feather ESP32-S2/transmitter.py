@@ -8,6 +8,7 @@ import board
 import busio
 import digitalio
 import adafruit_rfm9x
+import lora_frames
 
 # Reed switch (A0 to COM & GND to NC)
 switch_pin = digitalio.DigitalInOut(board.A0)
@@ -59,6 +60,11 @@ rfm9x.destination = 255
 
 with_header = True  # Set if you want header bytes printed for debug
 
+# Packets are sent as binary frames with a sequence number (see lora_frames.py)
+mail_switch = lora_frames.FrameWriter(lora_frames.MAIL_SWITCH)
+# The first reading goes out at once, later ones are batched into one frame
+TRANSMIT_INTERVAL_MS = 5_000
+
 def _format_datetime(datetime):
     return "{:02}/{:02}/{} {:02}:{:02}:{:02}".format(
         datetime.tm_mon,
@@ -104,14 +110,20 @@ while True:
         # Now we're inside a received packet!
         LED.value = True
         try:
+            # Frames are decoded, text from older code is shown as before
+            frame = lora_frames.decode(
+                packet[4:] if with_header else packet, lora_frames.SCHEMAS
+            )
+            if frame is not None:
+                packet_text = str(frame)
             # Header bytes are raw bytes. Good for debugging.
-            if with_header:
+            elif with_header:
                 packet_text = str(packet)
             # No header strips header bytes and decodes to ascii.
-            if not with_header:
+            else:
                 packet_text = str(packet, "ascii")
-        except (UnicodeError) as e:
-            print("Unicode Error", e)
+        except (UnicodeError, ValueError) as e:
+            print("Packet Error", e)
             continue
 
         # received sig strenth and sig/noise
@@ -141,14 +153,18 @@ while True:
     # Original New Packet Transmit (252 byte maximum)
     # Each send waits for previous send to finish
     LED.switch_to_output()
+    full = False
     debug_reedswitch = True
     if debug_reedswitch:
         if switch_pin.value is True:
             LED.value = switch_pin.value
             print("Switch Value: ", switch_pin.value)
-            # Transmit Test
-            message = str("ESP32-S2 Test 🙂")
-            rfm9x.send(bytes(str(now) + " " + message + "\r\n", "utf-8"), keep_listening=False)
-            print("(Sent)" + " " + message)
+            full = mail_switch.add((switch_pin.value,))
+    # Transmit Test
+    if full or mail_switch.due(TRANSMIT_INTERVAL_MS):
+        sequence = mail_switch.sequence
+        count = len(mail_switch)
+        rfm9x.send(mail_switch.pack(), keep_listening=False)
+        print("(Sent) Frame #{0}, {1} readings".format(sequence, count))
     print("Monotonic: " + str(now), "\n")
     time.sleep(0.5)  # Smaller the delay more likely for packet loss. There is a speed limit.
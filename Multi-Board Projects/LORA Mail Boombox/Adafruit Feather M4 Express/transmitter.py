@@ -8,6 +8,7 @@ import board
 import busio
 import digitalio
 import adafruit_rfm9x
+import lora_frames
 import adafruit_vl53l4cd
 
 # VL53L4CD Time of Flight Sensor
@@ -63,6 +64,11 @@ rfm9x.destination = 255
 
 with_header = True  # Set if you want header bytes printed for debug
 
+# Packets are sent as binary frames with a sequence number (see lora_frames.py)
+mail_distance = lora_frames.FrameWriter(lora_frames.MAIL_DISTANCE)
+# The first reading goes out at once, later ones are batched into one frame
+TRANSMIT_INTERVAL_MS = 5_000
+
 def _format_datetime(datetime):
     return "{:02}/{:02}/{} {:02}:{:02}:{:02}".format(
         datetime.tm_mon,
@@ -108,14 +114,20 @@ while True:
         # Now we're inside a received packet!
         LED.value = True
         try:
+            # Frames are decoded, text from older code is shown as before
+            frame = lora_frames.decode(
+                packet[4:] if with_header else packet, lora_frames.SCHEMAS
+            )
+            if frame is not None:
+                packet_text = str(frame)
             # Header bytes are raw bytes. Good for debugging.
-            if with_header:
+            elif with_header:
                 packet_text = str(packet)
             # No header strips header bytes and decodes to ascii.
-            if not with_header:
+            else:
                 packet_text = str(packet, "ascii")
-        except (UnicodeError) as e:
-            print("Unicode Error", e)
+        except (UnicodeError, ValueError) as e:
+            print("Packet Error", e)
             continue
 
         # received sig strenth and sig/noise
@@ -146,6 +158,7 @@ while True:
     # Original New Packet Transmit (252 byte maximum)
     # Each send waits for previous send to finish
     vl53.start_ranging()
+    full = False
     if vl53.distance <= 50:
         while not vl53.data_ready:
             pass
@@ -153,9 +166,12 @@ while True:
         print("Distance: {} cm".format(vl53.distance))
         print(vl53.distance)
         
-        # Transmit Test
-        message = str("Feather M4 Test 🙂")
-        rfm9x.send(bytes(str(now) + " " + message + "\r\n", "utf-8"), keep_listening=False)
-        print("(Sent)" + " " + message)
+        full = mail_distance.add((vl53.distance,))
+    # Transmit Test
+    if full or mail_distance.due(TRANSMIT_INTERVAL_MS):
+        sequence = mail_distance.sequence
+        count = len(mail_distance)
+        rfm9x.send(mail_distance.pack(), keep_listening=False)
+        print("(Sent) Frame #{0}, {1} readings".format(sequence, count))
         print("Monotonic: " + str(now), "\n")
     time.sleep(0.5) # The smaller the delay the more likely for packet loss. There is a speed limit.
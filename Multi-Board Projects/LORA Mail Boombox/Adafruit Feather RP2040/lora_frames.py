@@ -0,0 +1,323 @@
+# SPDX-FileCopyrightText: 2024 DJDevon3
+# SPDX-License-Identifier: MIT
+# Coded for Circuit Python 8.x
+"""Compact binary frames for RFM9x telemetry
+
+A frame carries one or more readings of a Schema, a sequence number and
+a millisecond timestamp, packed with struct instead of sent as text:
+
+    header   magic, schema id, reading count (+ DELTA flag), sequence,
+             time ms of the first reading
+    reading  ms since the reading before it, then each field of the schema
+
+With DELTA set, every reading after the first stores each field as a signed
+byte difference from the reading before it. FrameWriter picks that layout
+by itself when all the differences fit.
+
+Frames start with MAGIC, which can't start a UTF-8 string, so receivers
+can still accept text packets from boards running older code.
+"""
+
+import struct
+import time
+
+MAGIC = 0xB7
+# Set in the count byte when readings after the first are deltas
+DELTA = 0x80
+# magic, schema id, count, sequence, time ms
+HEADER = "<BBBHI"
+HEADER_SIZE = struct.calcsize(HEADER)
+# Largest RFM9x payload once the 4 byte RadioHead header is added
+MAX_PAYLOAD = 252
+MAX_READINGS = 0x7F
+# Range of each integer struct code
+_LIMITS = {
+    "b": (-0x80, 0x7F),
+    "B": (0, 0xFF),
+    "h": (-0x8000, 0x7FFF),
+    "H": (0, 0xFFFF),
+    "i": (-0x80000000, 0x7FFFFFFF),
+    "I": (0, 0xFFFFFFFF),
+}
+
+
+def ticks_ms():
+    """Milliseconds from time.monotonic_ns(), wrapping at 32 bits."""
+    return (time.monotonic_ns() // 1_000_000) & 0xFFFFFFFF
+
+
+class Schema:
+    """The fields of one reading.
+
+    :param int schema_id: 0-255, sent in every frame so receivers can tell
+      schemas apart.
+    :param fields: (name, struct code, scale) for each field. Values are
+      multiplied by scale and rounded before packing into an integer code,
+      so a battery voltage could be ("vbat", "H", 1000) for millivolts.
+      Values outside the range of their code are clamped to it, so an RSSI
+      below -128 dBm packed as "b" is sent as -128. Float fields ("f") are
+      packed as they are.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, schema_id, fields):
+        self.id = schema_id
+        self.names = tuple(field[0] for field in fields)
+        self.scales = tuple(field[2] for field in fields)
+        codes = "".join(field[1] for field in fields)
+        self.is_float = tuple(code == "f" for code in codes)
+        self.limits = tuple(_LIMITS.get(code) for code in codes)
+        self.format = "<H" + codes
+        self.size = struct.calcsize(self.format)
+        # Only integer fields can be delta encoded
+        self.delta_format = None if any(self.is_float) else "<H" + "b" * len(codes)
+        self.delta_size = struct.calcsize(self.delta_format or "")
+
+    def to_raw(self, values):
+        """Scale a reading to the integers that get packed."""
+        raw = []
+        for value, scale, limits in zip(values, self.scales, self.limits):
+            if limits is None:
+                raw.append(value * scale)
+            else:
+                raw.append(min(max(round(value * scale), limits[0]), limits[1]))
+        return tuple(raw)
+
+    def from_raw(self, raw):
+        """Scale packed integers back to a reading."""
+        return tuple(
+            value / scale if scale != 1 else value
+            for value, scale in zip(raw, self.scales)
+        )
+
+
+class Frame:
+    """A decoded frame.
+
+    ``readings`` is a list of (time ms, values) with the oldest first.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, schema, sequence, time_ms, readings):
+        self.schema = schema
+        self.sequence = sequence
+        self.time_ms = time_ms
+        self.readings = readings
+
+    def __str__(self):
+        names = self.schema.names
+        return "#%d %s" % (
+            self.sequence,
+            "; ".join(
+                " ".join("%s=%s" % field for field in zip(names, values))
+                for _, values in self.readings
+            ),
+        )
+
+
+# Schemas of the range finder and mail boombox boards, shared so that any
+# of them can decode what the others send
+RANGE_FINDER = Schema(
+    1,
+    (
+        ("rssi", "b", 1),
+        ("snr", "b", 4),  # quarter dB
+        ("vbat", "H", 1000),  # millivolts
+    ),
+)
+MAIL_SWITCH = Schema(2, (("switch", "B", 1),))
+MAIL_DISTANCE = Schema(3, (("distance_cm", "H", 1),))
+# A reply to a RANGE_FINDER frame: its sequence number and how it was heard
+RANGE_ECHO = Schema(
+    4,
+    (
+        ("echo", "H", 1),
+        ("rssi", "b", 1),
+        ("snr", "b", 4),  # quarter dB
+    ),
+)
+SCHEMAS = {
+    schema.id: schema
+    for schema in (RANGE_FINDER, MAIL_SWITCH, MAIL_DISTANCE, RANGE_ECHO)
+}
+
+
+def _fits_delta(previous, raw):
+    for before, after in zip(previous, raw):
+        if not -128 <= after - before <= 127:
+            return False
+    return True
+
+
+class FrameWriter:
+    """Collects readings and packs them into frames.
+
+    Add every reading as it is taken and send a frame when `add` says it is
+    full or when `due` says enough time has passed since the last one:
+
+    .. code-block:: python
+
+        full = writer.add((rfm9x.last_rssi, vbat))
+        if full or writer.due(10_000):
+            rfm9x.send(writer.pack())
+
+    :param Schema schema: The fields of each reading.
+    :param bool delta: Use the delta layout when the readings allow it.
+    :param int max_payload: Largest frame in bytes.
+    """
+
+    def __init__(self, schema, *, delta=True, max_payload=MAX_PAYLOAD):
+        self.schema = schema
+        self.delta = delta and schema.delta_format is not None
+        self.max_payload = max_payload
+        if HEADER_SIZE + schema.size > max_payload:
+            raise ValueError("A reading does not fit in max_payload")
+        self.sequence = 0
+        """Sequence number of the next frame, wraps at 16 bits"""
+        self._buffer = bytearray(max_payload)
+        self._readings = []
+        self._deltas_fit = True
+        self._carry = None
+        self._packed_ms = None
+
+    def __len__(self):
+        return len(self._readings)
+
+    def _size(self, count, deltas_fit):
+        schema = self.schema
+        if count and self.delta and deltas_fit:
+            return HEADER_SIZE + schema.size + (count - 1) * schema.delta_size
+        return HEADER_SIZE + count * schema.size
+
+    def add(self, values, time_ms=None):
+        """Add a reading. Returns True when the frame is full and should be sent.
+
+        A reading that doesn't fit any more is held for the next frame.
+
+        :param values: One value per schema field.
+        :param int time_ms: When it was read, from ticks_ms(). Defaults to now.
+        """
+        if time_ms is None:
+            time_ms = ticks_ms()
+        raw = self.schema.to_raw(values)
+        readings = self._readings
+        if self._carry is not None or len(readings) >= MAX_READINGS:
+            raise ValueError("Frame is full, pack it first")
+        deltas_fit = self._deltas_fit
+        too_late = False
+        if readings:
+            deltas_fit = deltas_fit and _fits_delta(readings[-1][1], raw)
+            too_late = (time_ms - readings[-1][0]) & 0xFFFFFFFF > 0xFFFF
+        if too_late or self._size(len(readings) + 1, deltas_fit) > self.max_payload:
+            self._carry = (time_ms, raw)
+            return True
+        readings.append((time_ms, raw))
+        self._deltas_fit = deltas_fit
+        # Full if even a delta encoded reading would not fit after this one
+        return (
+            len(readings) >= MAX_READINGS
+            or self._size(len(readings) + 1, deltas_fit) > self.max_payload
+        )
+
+    def due(self, interval_ms, time_ms=None):
+        """True when there are readings and at least interval_ms have passed
+        since the last pack, or nothing has been packed yet.
+
+        The first reading after a quiet spell is sent straight away, later
+        ones wait and go out together.
+
+        :param int interval_ms: Shortest time between frames.
+        :param int time_ms: Now, from ticks_ms(). Defaults to now.
+        """
+        if not self._readings:
+            return False
+        if self._packed_ms is None:
+            return True
+        if time_ms is None:
+            time_ms = ticks_ms()
+        return (time_ms - self._packed_ms) & 0xFFFFFFFF >= interval_ms
+
+    def pack(self):
+        """Pack the readings into a frame and start the next one.
+
+        :return: A memoryview of the frame, valid until the next pack.
+        """
+        schema = self.schema
+        readings = self._readings
+        time_ms = readings[0][0] if readings else ticks_ms()
+        use_delta = self.delta and self._deltas_fit and len(readings) > 1
+        buffer = self._buffer
+        count = len(readings) | (DELTA if use_delta else 0)
+        struct.pack_into(
+            HEADER, buffer, 0, MAGIC, schema.id, count, self.sequence, time_ms
+        )
+        offset = HEADER_SIZE
+        previous = None
+        last_ms = time_ms
+        for reading_ms, raw in readings:
+            gap = (reading_ms - last_ms) & 0xFFFF
+            last_ms = reading_ms
+            if use_delta and previous is not None:
+                struct.pack_into(
+                    schema.delta_format,
+                    buffer,
+                    offset,
+                    gap,
+                    *(after - before for before, after in zip(previous, raw)),
+                )
+                offset += schema.delta_size
+            else:
+                struct.pack_into(schema.format, buffer, offset, gap, *raw)
+                offset += schema.size
+            previous = raw
+        self.sequence = (self.sequence + 1) & 0xFFFF
+        self._packed_ms = ticks_ms()
+        readings.clear()
+        self._deltas_fit = True
+        if self._carry is not None:
+            readings.append(self._carry)
+            self._carry = None
+        return memoryview(buffer)[:offset]
+
+
+def decode(packet, schemas):
+    """Decode a frame.
+
+    :param packet: The received bytes, without the RadioHead header.
+    :param dict schemas: Schemas by id.
+    :return: A Frame, or None when the packet is not a frame, such as text
+      from older code.
+    """
+    if len(packet) < HEADER_SIZE or packet[0] != MAGIC:
+        return None
+    _, schema_id, count, sequence, time_ms = struct.unpack_from(HEADER, packet, 0)
+    schema = schemas.get(schema_id)
+    if schema is None:
+        raise ValueError("Unknown schema %d" % schema_id)
+    use_delta = count & DELTA
+    count &= MAX_READINGS
+    size = schema.size
+    if use_delta:
+        size += (count - 1) * schema.delta_size
+    else:
+        size *= count
+    if len(packet) < HEADER_SIZE + size:
+        raise ValueError("Truncated frame")
+    readings = []
+    offset = HEADER_SIZE
+    raw = None
+    reading_ms = time_ms
+    for _ in range(count):
+        if use_delta and raw is not None:
+            fields = struct.unpack_from(schema.delta_format, packet, offset)
+            offset += schema.delta_size
+            raw = tuple(before + delta for before, delta in zip(raw, fields[1:]))
+        else:
+            fields = struct.unpack_from(schema.format, packet, offset)
+            offset += schema.size
+            raw = fields[1:]
+        reading_ms = (reading_ms + fields[0]) & 0xFFFFFFFF
+        readings.append((reading_ms, schema.from_raw(raw)))
+    return Frame(schema, sequence, time_ms, readings)
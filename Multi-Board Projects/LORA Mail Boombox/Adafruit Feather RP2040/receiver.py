@@ -14,6 +14,7 @@ import audiobusio
 import audiomp3
 import digitalio
 import adafruit_rfm9x
+import lora_frames
 import neopixel
 from adafruit_motor import servo
 
@@ -97,6 +98,11 @@ with_header = True  # Set if you want header bytes printed for debug
 # Node (0-255) Only packets addressed to this node will be accepted.
 # Comment out to disable and receive all packets from anywhere
 # rfm9x.node = 13
+
+# Range finder frames are answered with an echo of their sequence number
+range_echo = lora_frames.FrameWriter(lora_frames.RANGE_ECHO)
+# Echoes are sent as soon as a frame arrives, never held for batching
+echo = None
 print("-"*80, "\n")
 while True:
     # Can only process one 252 byte packet at a time.
@@ -138,14 +144,21 @@ while True:
         print("MP3 Played: ", song_name)
         mixer.voice[0].level = 0.0
         try:
+            # Frames are decoded, text from older code is shown as before.
+            # packet was received with_header=False.
+            frame = lora_frames.decode(packet, lora_frames.SCHEMAS)
+            if frame is not None:
+                packet_text = str(frame)
+                if frame.schema is lora_frames.RANGE_FINDER:
+                    echo = frame.sequence
             # Header bytes are raw bytes. Good for debugging.
-            if with_header:
+            elif with_header:
                 packet_text = str(packet)
             # Strips header bytes and decodes to ascii.
-            if not with_header:
+            else:
                 packet_text = str(packet, "ascii")
-        except (UnicodeError) as e:
-            print("Unicode Error", e)
+        except (UnicodeError, ValueError) as e:
+            print("Packet Error", e)
             continue
         debug_flagservo = True
         if debug_flagservo:
@@ -175,11 +188,18 @@ while True:
             print("| {0}".format(packet_text), "|")
             print("-"*text_length)
         gc.collect
-    message = str("Feather RP2040 Msg Test 😇 ")  # Transmit Test MSG
-    
-    # Transmit Test
-    rfm9x.send(bytes(str(now) + " " + message + "\r\n", "utf-8"), keep_listening=True)
-    print("(Sent)" + " " + message)
-    
+    if echo is not None:
+        # Lets the range finder time the round trip
+        range_echo.add((echo, rfm9x.last_rssi, rfm9x.last_snr))
+        rfm9x.send(range_echo.pack(), keep_listening=True)
+        print("(Sent) Echo #{0}".format(echo))
+        echo = None
+    else:
+        message = str("Feather RP2040 Msg Test 😇 ")  # Transmit Test MSG
+
+        # Transmit Test
+        rfm9x.send(bytes(str(now) + " " + message + "\r\n", "utf-8"), keep_listening=True)
+        print("(Sent)" + " " + message)
+
     print("Timestamp: " + str(now), "\n")
     time.sleep(2) # The smaller the delay the more likely for packet loss. There is a speed limit.